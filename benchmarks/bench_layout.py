@@ -0,0 +1,50 @@
+"""
+Layout Solver Benchmark
+
+Times LayoutSolver on scenes with hundreds of text labels and shapes
+scattered around the frame, reporting overlaps before and after solving.
+
+Usage:
+    python benchmarks/bench_layout.py [num_objects]
+"""
+
+import random
+import sys
+import time
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from data_processing.layout import LayoutSolver
+from data_processing.scene_structure import SceneStructure
+
+
+def make_scene(rng: random.Random, num_objects: int) -> SceneStructure:
+    objects = []
+    for i in range(num_objects):
+        position = [round(rng.uniform(-6, 6), 2), round(rng.uniform(-3.5, 3.5), 2), 0]
+        if rng.random() < 0.8:
+            objects.append({"id": f"label_{i}", "type": "text", "text_content": f"Label {i}",
+                            "position": position, "properties": {"font_size": 12}})
+        else:
+            objects.append({"id": f"dot_{i}", "type": "circle", "size": 0.1, "position": position})
+    return SceneStructure.from_dict({"settings": {"title": "Benchmark"}, "objects": objects, "animations": []})
+
+
+def main(num_objects: int = 500):
+    rng = random.Random(7)
+    solver = LayoutSolver(gap=0.05)
+    print("=== Layout solving ===")
+    
+    for size in (num_objects // 10, num_objects // 2, num_objects):
+        structure = make_scene(rng, size)
+        start = time.perf_counter()
+        report = solver.solve(structure.objects, structure.animations)
+        elapsed = time.perf_counter() - start
+        print(f"  {size:6,} objects  {elapsed * 1000:9.1f} ms  overlaps {report.overlaps_before:,} -> "
+              f"{report.overlaps_after:,}  moved {len(report.moved):,}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 500)
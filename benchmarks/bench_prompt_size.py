@@ -0,0 +1,56 @@
+"""
+Prompt Size Benchmark
+
+Estimates the input tokens ManimCodeGenerator sends per scene with the
+verbose prompt (indented JSON plus a duplicated timeline, system prompt
+resent every call) and with the compact prompt (unindented, no timeline,
+no default values, system prompt served from the provider cache).
+
+Tokens are estimated at about four characters per token.
+
+Usage:
+    python benchmarks/bench_prompt_size.py [num_scenes]
+"""
+
+import random
+import sys
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from code_generation.manim_code_generator import ManimCodeGenerator
+from data_processing.scene_parser import SceneParser
+from data_processing.scene_structure import SceneStructure
+from models.llm import estimate_tokens
+from bench_schema_validation import make_scene_dict
+
+
+def main(num_scenes: int = 200):
+    rng = random.Random(5)
+    parser = SceneParser()
+    contexts = [parser.parse(SceneStructure.from_dict(make_scene_dict(rng, i))) for i in range(num_scenes)]
+    
+    verbose = ManimCodeGenerator(api_key="benchmark", prompt_format="verbose")
+    compact = ManimCodeGenerator(api_key="benchmark", prompt_format="compact")
+    
+    verbose_user = sum(estimate_tokens(verbose.build_user_prompt(c)) for c in contexts) / num_scenes
+    compact_user = sum(estimate_tokens(compact.build_user_prompt(c)) for c in contexts) / num_scenes
+    verbose_system = estimate_tokens(verbose.system_prompt)
+    compact_system = estimate_tokens(compact.system_prompt)
+    
+    print(f"=== Estimated input tokens per scene ({num_scenes} scenes, 12 objects / 10 animations) ===")
+    print(f"  system prompt            verbose {verbose_system:6,}   compact {compact_system:6,} (cacheable)")
+    print(f"  scene prompt             verbose {verbose_user:6,.0f}   compact {compact_user:6,.0f}  "
+          f"({100 * (1 - compact_user / verbose_user):.0f}% smaller)")
+    
+    before = verbose_system + verbose_user
+    after_uncached = compact_system + compact_user
+    print(f"  total per call           verbose {before:6,.0f}   compact {after_uncached:6,.0f}  "
+          f"({100 * (1 - after_uncached / before):.0f}% smaller)")
+    print(f"  uncached per call        verbose {before:6,.0f}   compact {compact_user:6,.0f}  "
+          f"(system prompt served from cache)")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
@@ -0,0 +1,65 @@
+"""
+Scene Codec Benchmark
+
+Compares the binary scene codec with the JSON path (to_json/from_json) on
+a synthetic course library: encode and decode throughput plus payload size.
+
+Usage:
+    python benchmarks/bench_scene_codec.py [num_scenes]
+"""
+
+import random
+import sys
+import time
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from data_processing.scene_structure import SceneStructure
+from data_processing.multi_scene_processor import MultiSceneStructure
+from data_processing.scene_codec import MSGPACK_AVAILABLE
+from bench_schema_validation import make_scene_dict
+
+
+def time_call(label: str, func, arg, repeat: int = 3):
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(arg)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    print(f"  {label:<16} {best:8.3f}s")
+    return result, best
+
+
+def main(num_scenes: int = 2000):
+    rng = random.Random(11)
+    scenes = [SceneStructure.from_dict(make_scene_dict(rng, i)) for i in range(num_scenes)]
+    course = MultiSceneStructure(
+        title="Benchmark course",
+        description="Synthetic course library",
+        total_duration=sum(s.settings.duration for s in scenes),
+        scenes=scenes,
+        scene_order=[f"scene_{i + 1}" for i in range(num_scenes)]
+    )
+    
+    backend = "msgpack" if MSGPACK_AVAILABLE else "pure Python"
+    print(f"=== Serializing a course of {num_scenes:,} scenes (binary backend: {backend}) ===")
+    
+    json_text, json_encode = time_call("json encode", MultiSceneStructure.to_json, course)
+    _, json_decode = time_call("json decode", MultiSceneStructure.from_json, json_text)
+    binary, bin_encode = time_call("binary encode", MultiSceneStructure.to_bytes, course)
+    decoded, bin_decode = time_call("binary decode", MultiSceneStructure.from_bytes, binary)
+    assert decoded == course
+    
+    json_size = len(json_text.encode("utf-8"))
+    print(f"\n  encode speedup: {json_encode / bin_encode:.1f}x")
+    print(f"  decode speedup: {json_decode / bin_decode:.1f}x")
+    print(f"  size: {json_size / 1024:,.0f} KiB json -> {len(binary) / 1024:,.0f} KiB binary "
+          f"({len(binary) / json_size * 100:.0f}%)")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
@@ -0,0 +1,73 @@
+"""
+Scene Columns Benchmark
+
+Compares library-wide statistics computed by looping over SceneStructure
+objects in Python with the vectorized SceneColumns aggregates.
+
+Usage:
+    python benchmarks/bench_scene_columns.py [num_scenes]
+"""
+
+import random
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from data_processing.scene_structure import SceneStructure
+from data_processing.scene_columns import SceneColumns
+from bench_schema_validation import make_scene_dict
+
+
+def python_stats(scenes):
+    """Statistics computed the way the frontend used to, plus histograms."""
+    total_objects = sum(len(scene.objects) for scene in scenes)
+    total_animations = sum(len(scene.animations) for scene in scenes)
+    object_types = Counter(obj.type.value for scene in scenes for obj in scene.objects)
+    animation_types = Counter(anim.type.value for scene in scenes for anim in scene.animations)
+    durations = sorted(anim.duration for scene in scenes for anim in scene.animations)
+    density = Counter()
+    for scene in scenes:
+        for anim in scene.animations:
+            for step in range(int(anim.delay * 2), int((anim.delay + anim.duration) * 2 + 0.999)):
+                density[step] += 1
+    return total_objects, total_animations, object_types, animation_types, durations[len(durations) // 2], density
+
+
+def column_stats(columns):
+    return (
+        columns.num_objects, columns.num_animations, columns.object_type_histogram(),
+        columns.animation_type_histogram(), columns.duration_stats(), columns.timeline_density()
+    )
+
+
+def main(num_scenes: int = 20000):
+    rng = random.Random(5)
+    scenes = [SceneStructure.from_dict(make_scene_dict(rng, i)) for i in range(num_scenes)]
+    total = sum(len(s.objects) + len(s.animations) for s in scenes)
+    print(f"=== Statistics over {num_scenes:,} scenes ({total:,} objects + animations) ===")
+    
+    start = time.perf_counter()
+    python_stats(scenes)
+    python_time = time.perf_counter() - start
+    print(f"  python loops          {python_time:8.3f}s")
+    
+    start = time.perf_counter()
+    columns = SceneColumns.from_scenes(scenes)
+    build_time = time.perf_counter() - start
+    print(f"  build columns (once)  {build_time:8.3f}s")
+    
+    start = time.perf_counter()
+    column_stats(columns)
+    column_time = time.perf_counter() - start
+    print(f"  vectorized aggregates {column_time:8.3f}s")
+    
+    print(f"\n  aggregate speedup: {python_time / column_time:.0f}x "
+          f"({python_time / (build_time + column_time):.1f}x including the column build)")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
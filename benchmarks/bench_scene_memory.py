@@ -0,0 +1,160 @@
+"""
+Scene Memory Benchmark
+
+Measures the memory footprint of a large synthetic course library built
+from the slotted scene dataclasses, compared with the previous layout of
+plain dataclasses that carry a per-instance __dict__ and allocate a fresh
+Position/Color for every object.
+
+Usage:
+    python benchmarks/bench_scene_memory.py [num_scenes]
+"""
+
+import random
+import sys
+import tracemalloc
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional
+
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from data_processing.scene_structure import (
+    SceneStructure, SceneObject, AnimationStep, SceneSettings, Position, Color, ObjectType, AnimationType
+)
+from bench_schema_validation import make_scene_dict
+
+
+# Previous (dict-backed) layout of the scene dataclasses
+@dataclass
+class LegacyPosition:
+    x: float = 0.0
+    y: float = 0.0
+    z: float = 0.0
+
+
+@dataclass
+class LegacyColor:
+    name: Optional[str] = None
+    hex: Optional[str] = None
+    rgb: Optional[List[float]] = None
+
+
+@dataclass
+class LegacySceneObject:
+    id: str
+    type: ObjectType
+    properties: Dict = field(default_factory=dict)
+    position: LegacyPosition = field(default_factory=LegacyPosition)
+    color: Optional[LegacyColor] = None
+    text_content: Optional[str] = None
+    size: Optional[float] = None
+    opacity: float = 1.0
+    layer: int = 0
+
+
+@dataclass
+class LegacyAnimationStep:
+    id: str
+    type: AnimationType
+    target_objects: List[str]
+    duration: float = 1.0
+    delay: float = 0.0
+    properties: Dict = field(default_factory=dict)
+    easing: str = "smooth"
+    from_object: Optional[str] = None
+    to_object: Optional[str] = None
+    target_position: Optional[LegacyPosition] = None
+    offset: Optional[LegacyPosition] = None
+
+
+@dataclass
+class LegacySceneSettings:
+    title: str = ""
+    description: str = ""
+    duration: float = 10.0
+    background_color: LegacyColor = field(default_factory=lambda: LegacyColor(name="BLACK"))
+    camera_position: LegacyPosition = field(default_factory=LegacyPosition)
+    quality: str = "medium_quality"
+    resolution: str = "720p"
+
+
+@dataclass
+class LegacySceneStructure:
+    settings: LegacySceneSettings
+    objects: List[LegacySceneObject]
+    animations: List[LegacyAnimationStep]
+
+
+def legacy_from_dict(data: Dict) -> LegacySceneStructure:
+    """Mirror of the previous SceneStructure.from_dict allocation pattern."""
+    s = data["settings"]
+    bg = s["background_color"]
+    settings = LegacySceneSettings(
+        title=s["title"], description=s["description"], duration=s["duration"],
+        background_color=LegacyColor(bg["name"], bg["hex"], bg["rgb"]),
+        camera_position=LegacyPosition(*s["camera_position"]),
+        quality=s["quality"], resolution=s["resolution"]
+    )
+    objects = []
+    for o in data["objects"]:
+        c = o["color"]
+        objects.append(LegacySceneObject(
+            id=o["id"], type=ObjectType(o["type"]), properties=o["properties"],
+            position=LegacyPosition(*o["position"]),
+            color=LegacyColor(c["name"], c["hex"], c["rgb"]) if c else None,
+            text_content=o["text_content"], size=o["size"], opacity=o["opacity"], layer=o["layer"]
+        ))
+    animations = [
+        LegacyAnimationStep(
+            id=a["id"], type=AnimationType(a["type"]), target_objects=a["target_objects"],
+            duration=a["duration"], delay=a["delay"], properties=a["properties"], easing=a["easing"]
+        )
+        for a in data["animations"]
+    ]
+    return LegacySceneStructure(settings, objects, animations)
+
+
+def count_elements(library) -> int:
+    """Count the objects and animations held by the library."""
+    return sum(len(scene.objects) + len(scene.animations) for scene in library)
+
+
+def measure(label: str, build, payloads) -> int:
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    library = [build(payload) for payload in payloads]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    
+    used = after - before
+    elements = count_elements(library)
+    print(f"  {label:<10} {used / 1024 / 1024:8.1f} MiB total, "
+          f"{used / elements:6.1f} bytes per object/animation (incl. positions, colors, settings)")
+    return used
+
+
+def main(num_scenes: int = 5000):
+    rng = random.Random(7)
+    payloads = [make_scene_dict(rng, i) for i in range(num_scenes)]
+    print(f"=== Memory for a library of {num_scenes:,} scenes ===")
+    
+    legacy = measure("legacy", legacy_from_dict, payloads)
+    slotted = measure("slotted", SceneStructure.from_dict, payloads)
+    print(f"  reduction: {(1 - slotted / legacy) * 100:.1f}%")
+    
+    print("\n  Single instance sizes (instance + __dict__):")
+    for name, legacy_obj, new_obj in [
+        ("Position", LegacyPosition(1, 2, 0), Position(1, 2, 0)),
+        ("Color", LegacyColor("BLUE"), Color("BLUE")),
+        ("SceneObject", LegacySceneObject("a", ObjectType.TEXT), SceneObject("a", ObjectType.TEXT)),
+        ("AnimationStep", LegacyAnimationStep("a", AnimationType.WRITE, []), AnimationStep("a", AnimationType.WRITE, [])),
+        ("SceneSettings", LegacySceneSettings(), SceneSettings()),
+    ]:
+        legacy_size = sys.getsizeof(legacy_obj) + sys.getsizeof(legacy_obj.__dict__)
+        print(f"    {name:<14} {legacy_size:4d} -> {sys.getsizeof(new_obj):4d} bytes")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000)
@@ -0,0 +1,136 @@
+"""
+Scene Parser Benchmark
+
+Compares SceneParser.parse on large scenes (10k objects by default) with
+the previous implementation, which tested each element against freshly
+built list literals and walked the animations three more times for the
+timeline, dependencies and transformation chains.
+
+Two cases are timed: parse only (what callers that just need the type
+buckets pay) and parse plus access to every derived field.
+
+Usage:
+    python benchmarks/bench_scene_parser.py [num_objects]
+"""
+
+import random
+import sys
+import time
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from data_processing.scene_parser import SceneParser
+from data_processing.scene_structure import (
+    SceneStructure, SceneObject, AnimationStep, SceneSettings, ObjectType, AnimationType
+)
+
+
+def legacy_parse(scene: SceneStructure) -> dict:
+    """Previous SceneParser.parse grouping and derived fields."""
+    text_objects, shape_objects, math_objects, line_objects, graph_objects = [], [], [], [], []
+    for obj in scene.objects:
+        if obj.type in [ObjectType.TEXT]:
+            text_objects.append(obj)
+        elif obj.type in [ObjectType.MATHTEXT, ObjectType.FORMULA]:
+            math_objects.append(obj)
+        elif obj.type in [ObjectType.CIRCLE, ObjectType.SQUARE, ObjectType.RECTANGLE, ObjectType.POLYGON]:
+            shape_objects.append(obj)
+        elif obj.type in [ObjectType.LINE, ObjectType.ARROW]:
+            line_objects.append(obj)
+        elif obj.type in [ObjectType.AXES, ObjectType.GRAPH]:
+            graph_objects.append(obj)
+    
+    creation, transformation, movement, style = [], [], [], []
+    for anim in scene.animations:
+        if anim.type in [AnimationType.CREATE, AnimationType.WRITE, AnimationType.SHOW_CREATION, AnimationType.DRAW_BORDER_THEN_FILL]:
+            creation.append(anim)
+        elif anim.type in [AnimationType.TRANSFORM, AnimationType.REPLACE_TRANSFORM]:
+            transformation.append(anim)
+        elif anim.type in [AnimationType.MOVE_TO, AnimationType.SHIFT]:
+            movement.append(anim)
+        elif anim.type in [AnimationType.FADE_IN, AnimationType.FADE_OUT, AnimationType.SCALE, AnimationType.ROTATE, AnimationType.WIGGLE, AnimationType.INDICATE, AnimationType.FLASH, AnimationType.CIRCUMSCRIBE]:
+            style.append(anim)
+    
+    timeline = []
+    for anim in scene.animations:
+        timeline.append((anim.delay, anim))
+    timeline.sort(key=lambda x: x[0])
+    
+    dependencies = {obj.id: [] for obj in scene.objects}
+    for anim in scene.animations:
+        if anim.type in [AnimationType.TRANSFORM, AnimationType.REPLACE_TRANSFORM]:
+            if anim.from_object and anim.to_object:
+                dependencies.setdefault(anim.to_object, []).append(anim.from_object)
+    
+    transform_map = {}
+    for anim in scene.animations:
+        if anim.type in [AnimationType.TRANSFORM, AnimationType.REPLACE_TRANSFORM]:
+            if anim.from_object and anim.to_object:
+                transform_map[anim.from_object] = anim.to_object
+    chains = []
+    visited = set()
+    for obj_id in transform_map:
+        if obj_id not in visited:
+            chain = []
+            current = obj_id
+            while current and current not in visited:
+                chain.append(current)
+                visited.add(current)
+                current = transform_map.get(current)
+            if len(chain) > 1:
+                chains.append(chain)
+    
+    return {"timeline": timeline, "dependencies": dependencies, "chains": chains}
+
+
+def make_scene(rng: random.Random, num_objects: int) -> SceneStructure:
+    object_types = list(ObjectType)
+    animation_types = list(AnimationType)
+    objects = [SceneObject(id=f"obj_{i}", type=rng.choice(object_types)) for i in range(num_objects)]
+    animations = []
+    for i in range(num_objects):
+        anim_type = rng.choice(animation_types)
+        animations.append(AnimationStep(
+            id=f"anim_{i}",
+            type=anim_type,
+            target_objects=[f"obj_{i}"],
+            delay=float(rng.randint(0, 60)),
+            from_object=f"obj_{i}" if anim_type == AnimationType.TRANSFORM else None,
+            to_object=f"obj_{rng.randrange(num_objects)}" if anim_type == AnimationType.TRANSFORM else None
+        ))
+    return SceneStructure(settings=SceneSettings(title="Large scene"), objects=objects, animations=animations)
+
+
+def parse_and_derive(parser: SceneParser, scene: SceneStructure):
+    context = parser.parse(scene)
+    return context.animation_timeline, context.object_dependencies, context.transformation_chains
+
+
+def best_of(func, repeat: int = 20) -> float:
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main(num_objects: int = 10000):
+    scene = make_scene(random.Random(3), num_objects)
+    parser = SceneParser()
+    print(f"=== SceneParser.parse on {num_objects:,} objects + {num_objects:,} animations ===")
+    
+    legacy = best_of(lambda: legacy_parse(scene))
+    parse_only = best_of(lambda: parser.parse(scene))
+    full = best_of(lambda: parse_and_derive(parser, scene))
+    
+    print(f"  previous parser          {legacy * 1000:8.2f} ms")
+    print(f"  dispatch, parse only     {parse_only * 1000:8.2f} ms  ({legacy / parse_only:.1f}x)")
+    print(f"  dispatch, all fields     {full * 1000:8.2f} ms  ({legacy / full:.1f}x)")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10000)
@@ -0,0 +1,102 @@
+"""
+Schema Validation Benchmark
+
+Compares the compiled SceneStructure validator against generic jsonschema
+validation on a large batch of synthetic scene dictionaries.
+
+Usage:
+    python benchmarks/bench_schema_validation.py [num_scenes]
+"""
+
+import random
+import sys
+import time
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from data_processing.scene_structure import (
+    SCENE_STRUCTURE_SCHEMA, ObjectType, AnimationType, validate_scene_dict
+)
+
+
+def make_scene_dict(rng: random.Random, index: int, num_objects: int = 12, num_animations: int = 10) -> dict:
+    """Build a synthetic scene payload in the shape the LLM returns."""
+    object_types = [t.value for t in ObjectType]
+    animation_types = [t.value for t in AnimationType]
+    
+    objects = [
+        {
+            "id": f"obj_{index}_{i}",
+            "type": rng.choice(object_types),
+            "properties": {},
+            "position": [rng.uniform(-6, 6), rng.uniform(-3.5, 3.5), 0.0],
+            "color": {"name": rng.choice(["BLUE", "RED", "WHITE"]), "hex": None, "rgb": None},
+            "text_content": f"Text {i}",
+            "size": 1.0,
+            "opacity": 1.0,
+            "layer": i % 3
+        }
+        for i in range(num_objects)
+    ]
+    animations = [
+        {
+            "id": f"anim_{index}_{i}",
+            "type": rng.choice(animation_types),
+            "target_objects": [objects[i % num_objects]["id"]],
+            "duration": 1.0,
+            "delay": float(i),
+            "properties": {},
+            "easing": "smooth",
+            "from_object": None,
+            "to_object": None,
+            "target_position": None,
+            "offset": None
+        }
+        for i in range(num_animations)
+    ]
+    return {
+        "settings": {
+            "title": f"Scene {index}",
+            "description": "Synthetic benchmark scene",
+            "duration": 10.0,
+            "background_color": {"name": "BLACK", "hex": None, "rgb": None},
+            "camera_position": [0, 0, 0],
+            "quality": "medium_quality",
+            "resolution": "720p"
+        },
+        "objects": objects,
+        "animations": animations
+    }
+
+
+def time_it(label: str, func, payloads) -> float:
+    start = time.perf_counter()
+    for payload in payloads:
+        func(payload)
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<28} {elapsed:8.3f}s  ({len(payloads) / elapsed:,.0f} scenes/s)")
+    return elapsed
+
+
+def main(num_scenes: int = 20000):
+    rng = random.Random(42)
+    payloads = [make_scene_dict(rng, i) for i in range(num_scenes)]
+    print(f"=== Schema validation on {num_scenes:,} scene dicts ===")
+    
+    compiled = time_it("compiled validator", validate_scene_dict, payloads)
+    
+    try:
+        import jsonschema
+    except ImportError:
+        print("  jsonschema not installed; skipping comparison (pip install jsonschema)")
+        return
+    
+    validator = jsonschema.Draft7Validator(SCENE_STRUCTURE_SCHEMA)
+    naive = time_it("jsonschema iter_errors", lambda p: list(validator.iter_errors(p)), payloads)
+    print(f"  speedup: {naive / compiled:.1f}x")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
@@ -5,7 +5,19 @@ Converts structured scene descriptions into executable code.
 """
 
 from .manim_code_generator import ManimCodeGenerator, generate_manim_code
+from .scene_extractor import SceneExtractor, SceneExtractionError, extract_scene_structure
+from .code_validator import CodeValidator, ValidationResult, validate_code
+from .code_cascade import CodeGenerationCascade, CascadeFailedError, SceneEscalation
+from .code_cache import CodeCache, CachedCodeGenerator, CodeCacheStats, context_key
+from .snippet_index import SnippetIndex, Snippet, context_terms
 
-__all__ = ['ManimCodeGenerator', 'generate_manim_code']
+__all__ = [
+    'ManimCodeGenerator', 'generate_manim_code',
+    'SceneExtractor', 'SceneExtractionError', 'extract_scene_structure',
+    'CodeValidator', 'ValidationResult', 'validate_code',
+    'CodeGenerationCascade', 'CascadeFailedError', 'SceneEscalation',
+    'CodeCache', 'CachedCodeGenerator', 'CodeCacheStats', 'context_key',
+    'SnippetIndex', 'Snippet', 'context_terms'
+]
 
 
@@ -0,0 +1,279 @@
+"""
+Code Cache Module
+
+Caches generated scene code under a canonical form of the
+CodeGenerationContext, so structurally identical scenes skip the LLM even
+when their object ids, titles or wording differ.
+
+The key is data_processing.scene_dedup.canonical_context: positional ids
+and text reduced to its length bucket. A hit is re-bound to the new scene
+before it is returned. String literals holding the cached scene's texts
+and title are replaced by the new ones, and variable names equal to the
+old object ids are renamed to the new ids. If a changed text cannot be
+found in the cached code, the hit is treated as a miss rather than
+showing the old wording.
+"""
+
+import ast
+import hashlib
+import io
+import json
+import keyword
+import os
+import re
+import threading
+import tokenize
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from code_generation.code_validator import CodeValidator
+from data_processing.scene_dedup import canonical_context
+from data_processing.scene_parser import CodeGenerationContext
+
+
+@dataclass
+class CodeCacheStats:
+    """Lookups served by one cache."""
+    hits: int = 0
+    misses: int = 0
+    rebind_failures: int = 0
+    
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+    
+    def summary(self) -> str:
+        """Human-readable summary of the cache usage."""
+        return (f"{self.hits} hit(s), {self.misses} miss(es) ({100 * self.hit_rate:.0f}% hit rate), "
+                f"{self.rebind_failures} hit(s) could not be re-bound")
+
+
+def context_key(context: CodeGenerationContext) -> str:
+    """
+    Cache key of a context.
+
+    Args:
+        context: Parsed scene context
+
+    Returns:
+        Hex digest equal for scenes with the same canonical form
+    """
+    payload = json.dumps(canonical_context(context), sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def context_bindings(context: CodeGenerationContext) -> Dict[str, Any]:
+    """Concrete ids, texts and title a cached code body is bound to."""
+    return {
+        "title": context.scene_title,
+        "ids": [obj.id for obj in context.objects] + [anim.id for anim in context.animations],
+        "texts": [obj.text_content for obj in context.objects],
+    }
+
+
+def _string_literal(token: str, value: str) -> str:
+    """New literal for `value`, keeping the prefix and quotes of `token` where possible."""
+    prefix = re.match(r"[A-Za-z]*", token).group(0)
+    body = token[len(prefix):]
+    quote = body[:3] if body[:3] in ('"""', "'''") else body[0]
+    literal = f"{prefix}{quote}{value}{quote}"
+    try:
+        if ast.literal_eval(literal) == value:
+            return literal
+    except (ValueError, SyntaxError):
+        pass
+    return json.dumps(value, ensure_ascii=False)
+
+
+def rebind_code(code: str, old: Dict[str, Any], new: Dict[str, Any]) -> Optional[str]:
+    """
+    Re-bind cached code from one scene's ids and texts to another's.
+
+    Args:
+        code: Cached code generated for the `old` bindings
+        old: context_bindings of the cached scene
+        new: context_bindings of the requested scene
+
+    Returns:
+        Re-bound code, or None if a changed text is missing from the code
+    """
+    texts: Dict[str, str] = {}
+    for before, after in zip(old["texts"] + [old["title"]], new["texts"] + [new["title"]]):
+        if not before or before == after:
+            continue
+        if texts.setdefault(before, after or "") != (after or ""):
+            return None  # one cached text would need two different replacements
+    required = set(texts) - {old["title"]}
+    
+    ids = {
+        before: after for before, after in zip(old["ids"], new["ids"])
+        if before != after and before.isidentifier() and after.isidentifier() and not keyword.iskeyword(after)
+    }
+    
+    try:
+        tokens = list(tokenize.generate_tokens(io.StringIO(code).readline))
+    except (tokenize.TokenError, SyntaxError):
+        return None
+    names = {tok.string for tok in tokens if tok.type == tokenize.NAME}
+    if (names - set(ids)) & set(ids.values()):
+        ids = {}  # a new id would shadow another name; keep the cached variable names
+    
+    edits: List[Tuple[Tuple[int, int], Tuple[int, int], str]] = []
+    found = set()
+    for tok in tokens:
+        if tok.type == tokenize.STRING:
+            try:
+                value = ast.literal_eval(tok.string)
+            except (ValueError, SyntaxError):
+                continue
+            if isinstance(value, str) and value in texts:
+                found.add(value)
+                edits.append((tok.start, tok.end, _string_literal(tok.string, texts[value])))
+        elif tok.type == tokenize.NAME and tok.string in ids:
+            edits.append((tok.start, tok.end, ids[tok.string]))
+    
+    if required - found:
+        return None
+    
+    lines = code.splitlines(keepends=True)
+    for (start_row, start_col), (end_row, end_col), text in reversed(edits):
+        # String tokens can span lines (triple quotes); splice by (row, col)
+        head = lines[start_row - 1][:start_col]
+        tail = lines[end_row - 1][end_col:]
+        lines[start_row - 1:end_row] = [head + text + tail]
+    return "".join(lines)
+
+
+class CodeCache:
+    """LRU cache of generated code keyed by canonical scene context."""
+    
+    def __init__(self, cache_dir: Optional[str] = None, max_entries: int = 512):
+        """
+        Initialize the cache.
+
+        Args:
+            cache_dir: Directory persisting entries across runs (memory only if None)
+            max_entries: Entries kept in memory
+        """
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        if self.cache_dir:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+        self.stats = CodeCacheStats()
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, context: CodeGenerationContext) -> Optional[str]:
+        """
+        Cached code re-bound to this context, if any.
+
+        Args:
+            context: Parsed scene context
+
+        Returns:
+            Code for the context, or None on a miss
+        """
+        key = context_key(context)
+        entry = self._load(key)
+        code = rebind_code(entry["code"], entry["bindings"], context_bindings(context)) if entry else None
+        
+        with self._lock:
+            if code is not None:
+                self.stats.hits += 1
+            else:
+                self.stats.misses += 1
+                if entry:
+                    self.stats.rebind_failures += 1
+        return code
+    
+    def put(self, context: CodeGenerationContext, code: str):
+        """
+        Store code generated for a context.
+
+        Args:
+            context: Parsed scene context the code was generated from
+            code: Generated code
+        """
+        key = context_key(context)
+        entry = {"code": code, "bindings": context_bindings(context)}
+        self._remember(key, entry)
+        
+        if self.cache_dir:
+            path = self.cache_dir / f"{key}.json"
+            temp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+            temp_path.write_text(json.dumps(entry), encoding="utf-8")
+            os.replace(temp_path, path)
+    
+    def _load(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return entry
+        
+        if self.cache_dir:
+            path = self.cache_dir / f"{key}.json"
+            if path.exists():
+                try:
+                    entry = json.loads(path.read_text(encoding="utf-8"))
+                except (OSError, ValueError):
+                    return None
+                self._remember(key, entry)
+                return entry
+        return None
+    
+    def _remember(self, key: str, entry: Dict[str, Any]):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+class CachedCodeGenerator:
+    """Wraps a code generator (or cascade) so repeated scene shapes skip the LLM."""
+    
+    def __init__(self, generator: Any, cache: CodeCache, validator: Optional[CodeValidator] = None):
+        """
+        Initialize the wrapper.
+
+        Args:
+            generator: ManimCodeGenerator or CodeGenerationCascade
+            cache: Cache consulted before the generator
+            validator: Only code it accepts is cached (static checks if None)
+        """
+        self.generator = generator
+        self.cache = cache
+        self.validator = validator or CodeValidator()
+    
+    def generate_code(self, context: CodeGenerationContext) -> str:
+        """
+        Generate Manim code, reusing cached code for the same scene shape.
+
+        Args:
+            context: Parsed scene context containing objects and animations
+
+        Returns:
+            Complete Python code string ready to execute with Manim
+        """
+        code = self.cache.get(context)
+        if code is not None:
+            print(f"♻️ Reused cached code for scene: {context.scene_title}")
+            return code
+        
+        code = self.generator.generate_code(context)
+        # A broken body would be replayed for every later scene of this shape
+        if self.validator.validate(code).ok:
+            self.cache.put(context, code)
+        return code
+    
+    def generate_code_from_content(self, content: str, title: str = "", description: str = "") -> str:
+        """Direct generation has no scene context to key on, so it is not cached."""
+        return self.generator.generate_code_from_content(content, title, description)
+    
+    def close(self):
+        """Close the wrapped generator."""
+        self.generator.close()
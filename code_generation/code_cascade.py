@@ -0,0 +1,188 @@
+"""
+Code Cascade Module
+
+Generates scene code with a cheap model first and escalates to a stronger
+model only when the code fails validation.
+
+Each tier is a ManimCodeGenerator. A scene goes to the first tier; if the
+call fails or the CodeValidator rejects the code, the next tier is asked
+again with the validation errors appended to its prompt. Every scene gets
+a SceneEscalation record, so the escalation rate shows whether the cheap
+model is good enough for a document.
+"""
+
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from code_generation.code_validator import CodeValidator
+from code_generation.manim_code_generator import ManimCodeGenerator
+from data_processing.scene_parser import CodeGenerationContext
+from models.llm import BaseLLM
+
+
+class CascadeFailedError(RuntimeError):
+    """Raised when no tier produced code that passed validation."""
+
+
+@dataclass
+class SceneEscalation:
+    """Cascade outcome for one scene."""
+    scene: str
+    attempts: List[str] = field(default_factory=list)  # tier names, in order
+    errors: Dict[str, List[str]] = field(default_factory=dict)
+    accepted_tier: Optional[str] = None
+    seconds: float = 0.0
+    
+    @property
+    def ok(self) -> bool:
+        return self.accepted_tier is not None
+    
+    @property
+    def escalated(self) -> bool:
+        return len(self.attempts) > 1
+
+
+class CodeGenerationCascade:
+    """Drop-in replacement for ManimCodeGenerator that escalates on validation failure."""
+    
+    DEFAULT_MODELS = ("gemini-2.5-flash", "gemini-2.5-pro")
+    
+    def __init__(self, tiers: Sequence[Tuple[str, ManimCodeGenerator]],
+                 validator: Optional[CodeValidator] = None):
+        """
+        Initialize the cascade.
+
+        Args:
+            tiers: (name, generator) pairs from cheapest to strongest
+            validator: Validator deciding whether to escalate (static checks if None)
+        """
+        if not tiers:
+            raise ValueError("At least one tier is required")
+        self.tiers = list(tiers)
+        self.validator = validator or CodeValidator()
+        self.records: List[SceneEscalation] = []
+        self._lock = threading.Lock()
+    
+    @classmethod
+    def from_models(cls, api_key: Optional[str] = None,
+                    models: Sequence[str] = DEFAULT_MODELS,
+                    local_llm: Optional[BaseLLM] = None,
+                    dry_run: bool = False,
+                    **generator_kwargs) -> "CodeGenerationCascade":
+        """
+        Build a cascade of Gemini models, optionally led by a local model.
+
+        Args:
+            api_key: Gemini API key
+            models: Gemini model names from cheapest to strongest
+            local_llm: Model tried before the Gemini tiers (e.g. a LocalLLM)
+            dry_run: Also dry-run the code with Manim before accepting it
+            **generator_kwargs: Passed to every ManimCodeGenerator
+
+        Returns:
+            CodeGenerationCascade
+        """
+        tiers = []
+        if local_llm is not None:
+            tiers.append(("local", ManimCodeGenerator(api_key=api_key, llm=local_llm, **generator_kwargs)))
+        for model in models:
+            tiers.append((model, ManimCodeGenerator(api_key=api_key, model_name=model, **generator_kwargs)))
+        return cls(tiers, validator=CodeValidator(dry_run=dry_run))
+    
+    def generate_code(self, context: CodeGenerationContext) -> str:
+        """
+        Generate validated Manim code from a CodeGenerationContext.
+
+        Args:
+            context: Parsed scene context containing objects and animations
+
+        Returns:
+            Code from the cheapest tier that passed validation
+
+        Raises:
+            CascadeFailedError: If every tier failed
+        """
+        return self._run(context.scene_title,
+                         lambda generator, feedback: generator.generate_code(context, feedback=feedback))
+    
+    def generate_code_from_content(self, content: str, title: str = "", description: str = "") -> str:
+        """
+        Generate validated Manim code straight from source text.
+
+        Args:
+            content: Text the scene should explain
+            title: Scene title
+            description: Optional extra context (e.g. position in a series)
+
+        Returns:
+            Code from the cheapest tier that passed validation
+
+        Raises:
+            CascadeFailedError: If every tier failed
+        """
+        return self._run(title, lambda generator, feedback: generator.generate_code_from_content(
+            content, title, description, feedback=feedback))
+    
+    def _run(self, scene: str, generate: Callable[[ManimCodeGenerator, Optional[List[str]]], str]) -> str:
+        record = SceneEscalation(scene=scene)
+        start = time.perf_counter()
+        feedback: Optional[List[str]] = None
+        code = None
+        
+        for name, generator in self.tiers:
+            record.attempts.append(name)
+            try:
+                candidate = generate(generator, feedback)
+            except Exception as e:
+                record.errors[name] = [str(e)]
+                continue
+            
+            result = self.validator.validate(candidate)
+            if result.ok:
+                record.accepted_tier = name
+                code = candidate
+                break
+            record.errors[name] = result.errors
+            feedback = result.errors
+            if len(record.attempts) < len(self.tiers):
+                print(f"⚠️ Scene '{scene}' failed validation on {name} ({result.errors[0]}); escalating")
+        
+        record.seconds = time.perf_counter() - start
+        with self._lock:
+            self.records.append(record)
+        
+        if code is None:
+            last = record.attempts[-1]
+            raise CascadeFailedError(f"All tiers failed for scene '{scene}': {'; '.join(record.errors[last])}")
+        return code
+    
+    def stats(self) -> Dict[str, object]:
+        """Escalation statistics over every scene generated so far."""
+        with self._lock:
+            records = list(self.records)
+        accepted = {name: 0 for name, _ in self.tiers}
+        for record in records:
+            if record.ok:
+                accepted[record.accepted_tier] += 1
+        escalated = sum(record.escalated for record in records)
+        return {
+            "scenes": len(records),
+            "accepted_by_tier": accepted,
+            "escalated": escalated,
+            "failed": sum(not record.ok for record in records),
+            "escalation_rate": escalated / len(records) if records else 0.0,
+        }
+    
+    def summary(self) -> str:
+        """Human-readable escalation summary."""
+        stats = self.stats()
+        tiers = ", ".join(f"{count} on {name}" for name, count in stats["accepted_by_tier"].items())
+        return (f"{stats['scenes']} scene(s): {tiers}; {stats['escalated']} escalated "
+                f"({100 * stats['escalation_rate']:.0f}%), {stats['failed']} failed")
+    
+    def close(self):
+        """Delete the provider caches of every tier."""
+        for _, generator in self.tiers:
+            generator.close()
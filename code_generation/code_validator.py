@@ -0,0 +1,209 @@
+"""
+Code Validator Module
+
+Cheap checks that decide whether generated Manim code is worth rendering:
+
+1. syntax: the code compiles
+2. structure: it defines a Scene subclass with a construct method
+3. symbols: every name it reads is defined in the code, a builtin or part
+   of the Manim namespace, no deprecated Manim names are used, and every
+   self.<method>() call exists on Scene
+4. dry run (optional): `manim render --dry_run` when Manim is installed
+
+The Manim namespace is taken from the installed package when available,
+otherwise from a bundled list of the commonly used names.
+"""
+
+import ast
+import builtins
+import os
+import shutil
+import subprocess
+import tempfile
+from dataclasses import dataclass, field
+from typing import List, Set
+
+try:
+    import manim
+    MANIM_AVAILABLE = True
+except ImportError:
+    MANIM_AVAILABLE = False
+
+
+# Names from `from manim import *` that generated scenes commonly use
+MANIM_NAMES = frozenset("""
+Scene MovingCameraScene ThreeDScene ZoomedScene VectorScene Mobject VMobject VGroup Group
+Text MarkupText Paragraph Tex MathTex SingleStringMathTex Title BulletedList Code
+Integer DecimalNumber Variable Circle Dot Dot3D Ellipse Annulus Arc ArcBetweenPoints Sector
+AnnularSector Square Rectangle RoundedRectangle Triangle Polygon RegularPolygon Star Line
+DashedLine Arrow DoubleArrow Vector CurvedArrow TangentLine Elbow Angle RightAngle Brace
+BraceBetweenPoints BraceLabel SurroundingRectangle BackgroundRectangle Cross Underline
+Axes ThreeDAxes NumberLine NumberPlane ComplexPlane PolarPlane FunctionGraph
+ParametricFunction ImplicitFunction ImageMobject SVGMobject Table MathTable Matrix
+DecimalMatrix IntegerMatrix BarChart ValueTracker ComplexValueTracker always_redraw
+Sphere Cube Prism Cone Cylinder Surface Torus Arrow3D Line3D
+Animation Create Uncreate Write Unwrite DrawBorderThenFill ShowIncreasingSubsets
+AddTextLetterByLetter FadeIn FadeOut FadeTransform Transform ReplacementTransform
+TransformFromCopy TransformMatchingTex TransformMatchingShapes ClockwiseTransform
+CounterclockwiseTransform MoveToTarget ApplyMethod ApplyFunction ApplyMatrix Rotate Rotating
+GrowFromCenter GrowFromPoint GrowFromEdge GrowArrow SpinInFromNothing ShrinkToCenter
+Indicate Flash Circumscribe Wiggle FocusOn ShowPassingFlash ApplyWave Succession
+AnimationGroup LaggedStart LaggedStartMap Wait MoveAlongPath Homotopy Restore ScaleInPlace
+SpiralIn Broadcast ChangeDecimalToValue CyclicReplace Swap
+UP DOWN LEFT RIGHT IN OUT ORIGIN UL UR DL DR PI TAU DEGREES X_AXIS Y_AXIS Z_AXIS
+SMALL_BUFF MED_SMALL_BUFF MED_LARGE_BUFF LARGE_BUFF DEFAULT_MOBJECT_TO_EDGE_BUFFER
+DEFAULT_MOBJECT_TO_MOBJECT_BUFFER config np rate_functions
+linear smooth rush_into rush_from there_and_back double_smooth lingering wiggle
+ManimColor color_gradient interpolate_color rgb_to_color
+WHITE BLACK GRAY GREY LIGHT_GRAY LIGHT_GREY DARK_GRAY DARK_GREY LIGHTER_GRAY DARKER_GRAY
+GRAY_A GRAY_B GRAY_C GRAY_D GRAY_E BLUE BLUE_A BLUE_B BLUE_C BLUE_D BLUE_E DARK_BLUE
+RED RED_A RED_B RED_C RED_D RED_E PURE_RED GREEN GREEN_A GREEN_B GREEN_C GREEN_D GREEN_E
+PURE_GREEN PURE_BLUE YELLOW YELLOW_A YELLOW_B YELLOW_C YELLOW_D YELLOW_E GOLD GOLD_A GOLD_B
+GOLD_C GOLD_D GOLD_E TEAL TEAL_A TEAL_B TEAL_C TEAL_D TEAL_E MAROON MAROON_A MAROON_B
+MAROON_C MAROON_D MAROON_E PURPLE PURPLE_A PURPLE_B PURPLE_C PURPLE_D PURPLE_E PINK
+LIGHT_PINK ORANGE DARK_BROWN LIGHT_BROWN
+""".split())
+
+# Names removed from Manim Community or banned by the code generation prompt
+DEPRECATED_NAMES = frozenset({
+    "ShowCreation", "TextMobject", "TexMobject", "GraphScene",
+    "DEFAULT_FONT_SIZE", "FRAME_WIDTH", "FRAME_HEIGHT",
+})
+
+# Scene methods generated code may call on self
+SCENE_METHODS = frozenset({
+    "play", "wait", "add", "remove", "clear", "bring_to_front", "bring_to_back",
+    "add_foreground_mobject", "add_foreground_mobjects", "remove_foreground_mobject",
+    "add_sound", "add_subcaption", "wait_until", "pause", "next_section",
+    "set_camera_orientation", "move_camera", "begin_ambient_camera_rotation",
+    "stop_ambient_camera_rotation", "add_fixed_in_frame_mobjects", "get_top_level_mobjects",
+    "construct", "setup", "tear_down", "replace", "get_mobject_family_members",
+})
+
+
+@dataclass
+class ValidationResult:
+    """Outcome of validating one piece of generated code."""
+    errors: List[str] = field(default_factory=list)
+    stage: str = "symbols"  # last stage reached
+    
+    @property
+    def ok(self) -> bool:
+        return not self.errors
+
+
+class CodeValidator:
+    """Static (and optionally dry-run) validation of generated Manim code."""
+    
+    def __init__(self, dry_run: bool = False, timeout: int = 60):
+        """
+        Initialize the validator.
+
+        Args:
+            dry_run: Also run `manim render --dry_run` when Manim is installed
+            timeout: Dry-run timeout in seconds
+        """
+        self.dry_run = dry_run
+        self.timeout = timeout
+        self.known_names: Set[str] = set(dir(builtins))
+        self.known_names |= set(dir(manim)) if MANIM_AVAILABLE else set(MANIM_NAMES)
+        self.known_names -= DEPRECATED_NAMES
+    
+    def validate(self, code: str) -> ValidationResult:
+        """
+        Validate generated code.
+
+        Args:
+            code: Manim Python source
+
+        Returns:
+            ValidationResult; ok is False if any stage found errors
+        """
+        try:
+            tree = ast.parse(code)
+            compile(tree, "<generated>", "exec")
+        except SyntaxError as e:
+            return ValidationResult([f"SyntaxError: {e.msg} (line {e.lineno})"], stage="syntax")
+        
+        scene_classes = [
+            node for node in tree.body
+            if isinstance(node, ast.ClassDef) and node.bases
+            and any(isinstance(item, ast.FunctionDef) and item.name == "construct" for item in node.body)
+        ]
+        if not scene_classes:
+            return ValidationResult(["No Scene subclass with a construct method"], stage="structure")
+        
+        errors = self._check_symbols(tree, scene_classes)
+        if errors:
+            return ValidationResult(errors, stage="symbols")
+        
+        if self.dry_run and shutil.which("manim"):
+            return self._dry_run(code, scene_classes[0].name)
+        return ValidationResult()
+    
+    def _check_symbols(self, tree: ast.Module, scene_classes: List[ast.ClassDef]) -> List[str]:
+        bound: Set[str] = set()
+        used = {}
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Name):
+                if isinstance(node.ctx, (ast.Store, ast.Del)):
+                    bound.add(node.id)
+                else:
+                    used.setdefault(node.id, node.lineno)
+            elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                bound.add(node.name)
+            elif isinstance(node, ast.arg):
+                bound.add(node.arg)
+            elif isinstance(node, ast.alias):
+                bound.add((node.asname or node.name).split(".")[0])
+            elif isinstance(node, ast.ExceptHandler) and node.name:
+                bound.add(node.name)
+        
+        errors = []
+        for name, line in sorted(used.items(), key=lambda item: item[1]):
+            if name in DEPRECATED_NAMES:
+                errors.append(f"Deprecated Manim name '{name}' (line {line})")
+            elif name not in bound and name not in self.known_names:
+                errors.append(f"Undefined name '{name}' (line {line})")
+        
+        for scene_class in scene_classes:
+            own_methods = {item.name for item in scene_class.body if isinstance(item, ast.FunctionDef)}
+            for node in ast.walk(scene_class):
+                if (isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute)
+                        and isinstance(node.func.value, ast.Name) and node.func.value.id == "self"
+                        and node.func.attr not in SCENE_METHODS and node.func.attr not in own_methods):
+                    errors.append(f"Unknown Scene method 'self.{node.func.attr}' (line {node.lineno})")
+        return errors
+    
+    def _dry_run(self, code: str, scene_name: str) -> ValidationResult:
+        with tempfile.NamedTemporaryFile("w", suffix=".py", delete=False) as handle:
+            handle.write(code)
+            path = handle.name
+        try:
+            result = subprocess.run(
+                ["manim", "render", "--dry_run", "-v", "ERROR", path, scene_name],
+                capture_output=True, text=True, timeout=self.timeout
+            )
+        except subprocess.TimeoutExpired:
+            return ValidationResult([f"Dry run timed out after {self.timeout} seconds"], stage="dry_run")
+        finally:
+            os.unlink(path)
+        
+        if result.returncode != 0:
+            lines = (result.stderr or result.stdout).strip().splitlines()
+            return ValidationResult([lines[-1] if lines else f"Dry run failed ({result.returncode})"], stage="dry_run")
+        return ValidationResult(stage="dry_run")
+
+
+def validate_code(code: str, dry_run: bool = False) -> ValidationResult:
+    """
+    Convenience function to validate generated Manim code.
+
+    Args:
+        code: Manim Python source
+        dry_run: Also run `manim render --dry_run` when Manim is installed
+
+    Returns:
+        ValidationResult
+    """
+    return CodeValidator(dry_run=dry_run).validate(code)
@@ -14,9 +14,13 @@ from dataclasses import asdict
 # Add parent directory to path to import modules
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from data_processing.scene_parser import CodeGenerationContext, SceneParser
-from data_processing.scene_structure import SceneStructure, ObjectType, AnimationType
-from models.llm import LLM
+from data_processing.scene_parser import CodeGenerationContext, SceneParser, DependencyCycleError
+from data_processing.scene_structure import SceneStructure, SceneObject, AnimationStep, ObjectType, AnimationType, Position
+from data_processing.layout import LayoutSolver
+from data_processing.text_metrics import TextMetrics, default_text_metrics, REFERENCE_FONT_SIZE
+from models.llm import LLM, BaseLLM, LLMRouter
+from code_generation.code_validator import CodeValidator
+from code_generation.snippet_index import SnippetIndex
 
 
 class ManimCodeGenerator:
@@ -60,24 +64,66 @@ class ManimCodeGenerator:
         AnimationType.CIRCUMSCRIBE: "Circumscribe"
     }
     
-    def __init__(self, api_key: Optional[str] = None, model_name: str = "gemini-2.5-pro"):
+    PROMPT_FORMATS = ("compact", "verbose")
+    
+    # Widest text that fits the [-6, 6] safe area
+    SAFE_TEXT_WIDTH = 12
+    
+    def __init__(self, api_key: Optional[str] = None, model_name: str = "gemini-2.5-pro",
+                 max_idle_gap: Optional[float] = None, prompt_format: str = "compact",
+                 router: Optional[LLMRouter] = None, llm: Optional[BaseLLM] = None,
+                 snippet_index: Optional[SnippetIndex] = None, few_shot_k: int = 2,
+                 solve_layout: bool = True, text_metrics: Optional[TextMetrics] = None):
         """
         Initialize the ManimCodeGenerator.
         
         Args:
             api_key: Gemini API key. If None, will try to get from GOOGLE_API_KEY env var.
             model_name: Gemini model to use for code generation
+            max_idle_gap: If set, idle gaps in the animation timeline longer than
+                this many seconds are shortened to it (shorter videos)
+            prompt_format: "compact" sends unindented scene data without the
+                duplicated timeline; "verbose" sends the indented form
+            router: Routes code generation across providers instead of
+                using model_name directly
+            llm: Pre-built model (e.g. a LocalLLM) used instead of model_name
+            snippet_index: Index of validated scene code; the few_shot_k most
+                similar snippets are added to each prompt, and code that
+                validates is added to the index
+            few_shot_k: Snippets added per prompt
+            solve_layout: Resolve overlapping objects before the scene data
+                is sent, so the LLM receives collision-free positions
+            text_metrics: Measures text widths for layout and overflow
+                fixes (the shared instance if None)
         """
+        if prompt_format not in self.PROMPT_FORMATS:
+            raise ValueError(f"prompt_format must be one of {self.PROMPT_FORMATS}")
+        
         self.api_key = api_key or os.getenv("GOOGLE_API_KEY")
-        if not self.api_key:
+        if not self.api_key and router is None and llm is None:
             raise ValueError("Gemini API key is required. Set GOOGLE_API_KEY environment variable or pass api_key parameter.")
         
-        self.llm = LLM(
-            provider="google_genai",
-            model_name=model_name,
-            api_key=self.api_key,
-            temperature=0.1  # Lower temperature for more consistent code generation
-        )
+        # Only a model created here is closed with the generator
+        self._owns_llm = llm is None and router is None
+        if llm is not None:
+            self.llm = llm
+        elif router is not None:
+            self.llm = router.for_task("code")
+        else:
+            self.llm = LLM(
+                provider="google_genai",
+                model_name=model_name,
+                api_key=self.api_key,
+                temperature=0.1  # Lower temperature for more consistent code generation
+            )
+        self.parser = SceneParser()
+        self.max_idle_gap = max_idle_gap
+        self.prompt_format = prompt_format
+        self.snippet_index = snippet_index
+        self.few_shot_k = few_shot_k
+        self.validator = CodeValidator()
+        self.text_metrics = text_metrics or default_text_metrics()
+        self.layout_solver = LayoutSolver(text_metrics=self.text_metrics) if solve_layout else None
         
         self.system_prompt = """You are an expert Manim code generator. Given structured scene data, generate complete, runnable Python code using the Manim Community Edition library.
 
@@ -218,23 +264,124 @@ IMPORTANT:
 - Use self.wait() for delays and final wait
 - Use run_time parameter for animation durations
 - NEVER use deprecated constants like DEFAULT_FONT_SIZE or FRAME_WIDTH"""
+        
+        if prompt_format == "compact":
+            # Stated once here (and cached with the system prompt) instead of per object and animation
+            self.system_prompt += "\n\nSCENE DATA TYPES -> MANIM:\n" + "\n".join([
+                "objects: " + ", ".join(f"{t.value}={c}" for t, c in self.OBJECT_TYPE_MAPPING.items()),
+                "animations: " + ", ".join(f"{t.value}={m}" for t, m in self.ANIMATION_TYPE_MAPPING.items()),
+                "Fields left out of an object or animation take their defaults "
+                "(opacity 1.0, duration 1.0, delay 0.0, no color/size/target position)."
+            ])
 
-    def generate_code(self, context: CodeGenerationContext) -> str:
+    def generate_code(self, context: CodeGenerationContext, feedback: Optional[List[str]] = None) -> str:
         """
         Generate Manim Python code from a CodeGenerationContext.
         
         Args:
             context: Parsed scene context containing objects and animations
+            feedback: Validation errors of a previous attempt to avoid repeating
             
         Returns:
             Complete Python code string ready to execute with Manim
         """
+        examples = self.snippet_index.search(context, self.few_shot_k) if self.snippet_index else []
+        
         try:
-            # Prepare structured data for the LLM
-            scene_data = self._prepare_scene_data(context)
+            user_prompt = self.build_user_prompt(context)
+            if examples:
+                user_prompt += self.snippet_index.prompt_section(examples)
+            user_prompt += self._feedback_section(feedback)
+            
+            # Generate code using LLM; the static system prompt is sent through the provider cache
+            chat = self.llm.create_cached_chat(self.system_prompt)
+            response = chat.invoke([("user", user_prompt)])
+            
+            # Extract code from response
+            raw_code = response.content if hasattr(response, 'content') else str(response)
+            
+            # Clean up the code
+            cleaned_code = self._clean_code(raw_code)
             
-            # Create the prompt
-            user_prompt = f"""Generate complete Manim code for this scene:
+        except Exception as e:
+            if self.snippet_index is not None:
+                self.snippet_index.record(context, bool(examples), ok=False)
+            raise RuntimeError(f"Failed to generate Manim code: {str(e)}") from e
+        
+        if self.snippet_index is not None:
+            valid = self.validator.validate(cleaned_code).ok
+            self.snippet_index.record(context, bool(examples), ok=valid)
+            if valid:
+                self.snippet_index.add(context, cleaned_code)
+        
+        return cleaned_code
+    
+    def generate_code_from_content(self, content: str, title: str = "", description: str = "",
+                                   feedback: Optional[List[str]] = None) -> str:
+        """
+        Generate Manim code straight from source text in a single LLM call.
+        
+        Skips the intermediate scene JSON; the model plans the objects and
+        timeline itself under the same system prompt.
+        
+        Args:
+            content: Text the scene should explain
+            title: Scene title
+            description: Optional extra context (e.g. position in a series)
+            feedback: Validation errors of a previous attempt to avoid repeating
+            
+        Returns:
+            Complete Python code string ready to execute with Manim
+        """
+        user_prompt = f"""Create an educational Manim animation (30-60 seconds) for this content:
+
+Scene Title: {title}
+{f"Context: {description}" if description else ""}
+Content:
+{content}
+
+Choose the key ideas, formulas and diagrams to show, lay out the objects without overlap, and time the animations.
+
+Generate complete, runnable Python code using Manim.""" + self._feedback_section(feedback)
+        
+        try:
+            chat = self.llm.create_cached_chat(self.system_prompt)
+            response = chat.invoke([("user", user_prompt)])
+            raw_code = response.content if hasattr(response, 'content') else str(response)
+            return self._clean_code(raw_code)
+        except Exception as e:
+            raise RuntimeError(f"Failed to generate Manim code: {str(e)}") from e
+    
+    def close(self):
+        """Save new text measurements and delete the provider caches of the model this generator created."""
+        self.text_metrics.flush()
+        if self._owns_llm:
+            self.llm.close()
+    
+    @staticmethod
+    def _feedback_section(feedback: Optional[List[str]]) -> str:
+        if not feedback:
+            return ""
+        return ("\n\nA previous attempt was rejected by validation:\n"
+                + "\n".join(f"- {error}" for error in feedback)
+                + "\nFix these problems in the new code.")
+    
+    def build_user_prompt(self, context: CodeGenerationContext) -> str:
+        """
+        Build the per-scene prompt in the configured prompt format.
+        
+        Args:
+            context: Parsed scene context
+            
+        Returns:
+            User prompt text (the system prompt is sent separately)
+        """
+        scene_data = self._prepare_scene_data(context)
+        
+        if self.prompt_format == "compact":
+            return self._compact_user_prompt(context, scene_data)
+        
+        user_prompt = f"""Generate complete Manim code for this scene:
 
 Scene Title: {context.scene_title}
 Description: {context.scene_description}
@@ -250,27 +397,59 @@ Animations (in chronological order):
 Animation Timeline:
 {json.dumps(scene_data['timeline'], indent=2)}
 
+Play Groups (issue each group as a single self.play call; an animation with a non-zero offset starts that many seconds after its group, e.g. Succession(Wait(run_time=offset), animation)):
+{json.dumps(scene_data['play_groups'], indent=2)}
+
+Object Creation Batches (objects in one batch do not depend on each other; introduce each batch with a single self.play call, in this order):
+{json.dumps(scene_data['creation_batches'])}
+
 Generate complete, runnable Python code using Manim."""
-            
-            # Generate code using LLM
-            chat = self.llm.create_chat()
-            messages = [
-                ("system", self.system_prompt),
-                ("user", user_prompt)
-            ]
-            
-            response = chat.invoke(messages)
-            
-            # Extract code from response
-            raw_code = response.content if hasattr(response, 'content') else str(response)
-            
-            # Clean up the code
-            cleaned_code = self._clean_code(raw_code)
-            
-            return cleaned_code
-            
-        except Exception as e:
-            raise RuntimeError(f"Failed to generate Manim code: {str(e)}") from e
+        
+        return user_prompt + self._conflicts_section(scene_data)
+    
+    def _compact_user_prompt(self, context: CodeGenerationContext, scene_data: Dict[str, Any]) -> str:
+        """
+        Prompt without indentation, Manim class names or default values.
+        
+        The animations are listed in start-time order with their absolute
+        start in "delay", which makes the separate timeline redundant.
+        """
+        def dumps(value: Any) -> str:
+            return json.dumps(value, separators=(",", ":"))
+        
+        objects = [
+            {
+                key: value for key, value in obj.items()
+                if key != "manim_class" and value is not None and not (key == "opacity" and value == 1.0)
+            }
+            for obj in scene_data['objects']
+        ]
+        animations = [
+            {
+                key: value for key, value in anim.items()
+                if key != "manim_method" and value is not None
+                and not (key == "duration" and value == 1.0) and not (key == "delay" and value == 0.0)
+            }
+            for anim in sorted(scene_data['animations'], key=lambda anim: anim['delay'])
+        ]
+        
+        user_prompt = f"""Generate complete Manim code for this scene:
+Scene Title: {context.scene_title}
+Description: {context.scene_description}
+Duration: {context.total_duration}s
+Background: {context.background_color}
+Objects: {dumps(objects)}
+Animations (by start time; delay is the absolute start time): {dumps(animations)}
+Play Groups (one self.play call per group; a non-zero offset starts that many seconds after the group, e.g. Succession(Wait(run_time=offset), animation)): {dumps(scene_data['play_groups'])}
+Object Creation Batches (independent objects per batch; one self.play call per batch, in order): {dumps(scene_data['creation_batches'])}"""
+        
+        return user_prompt + self._conflicts_section(scene_data)
+    
+    def _conflicts_section(self, scene_data: Dict[str, Any]) -> str:
+        if not scene_data['conflicts']:
+            return ""
+        return ("\n\nTiming conflicts to resolve (overlapping animations on the same object):\n"
+                + "\n".join(f"- {conflict}" for conflict in scene_data['conflicts']))
     
     def generate_code_template(self, context: CodeGenerationContext) -> str:
         """
@@ -300,10 +479,7 @@ Generate complete, runnable Python code using Manim."""
         ]
         
         # Add object creation
-        all_objects = (context.text_objects + context.shape_objects + 
-                      context.math_objects + context.line_objects + context.graph_objects)
-        
-        for obj in all_objects:
+        for obj in self._creation_order(context):
             manim_class = self.OBJECT_TYPE_MAPPING.get(obj.type, "Text")
             
             if obj.type in [ObjectType.MATHTEXT, ObjectType.FORMULA]:
@@ -331,57 +507,88 @@ Generate complete, runnable Python code using Manim."""
             "        # Animations"
         ])
         
-        # Add animations in timeline order
-        for start_time, anim in context.animation_timeline:
-            if start_time > 0:
-                code_lines.append(f"        self.wait({start_time})  # delay")
-            
-            anim_method = self.ANIMATION_TYPE_MAPPING.get(anim.type, "Create")
-            target_obj = anim.target_objects[0] if anim.target_objects else "obj"
+        # Add animations, one self.play call per group of overlapping animations
+        timeline = self.parser.get_animation_timeline(context, self.max_idle_gap)
+        for conflict in timeline.conflicts():
+            code_lines.append(f"        # WARNING: {conflict.first.id} and {conflict.second.id} both animate {conflict.target}")
+        
+        current_time = 0.0
+        for group in timeline.groups():
+            if group.start - current_time > timeline.tolerance:
+                code_lines.append(f"        self.wait({round(group.start - current_time, 3)})  # delay")
             
-            if anim.type in [AnimationType.MOVE_TO, AnimationType.SHIFT, AnimationType.ROTATE, AnimationType.SCALE]:
-                # These use .animate
-                code_lines.append(f"        self.play({target_obj}.animate.{anim_method}(...), run_time={anim.duration})")
+            if len(group.entries) == 1:
+                anim = group.entries[0][1]
+                code_lines.append(f"        self.play({self._animation_expression(anim)}, run_time={anim.duration})")
             else:
-                # These are animation classes
-                code_lines.append(f"        self.play({anim_method}({target_obj}), run_time={anim.duration})")
+                parts = []
+                for offset, anim in group.entries:
+                    expression = self._animation_expression(anim, run_time=anim.duration)
+                    if offset:
+                        expression = f"Succession(Wait(run_time={round(offset, 3)}), {expression})"
+                    parts.append(expression)
+                code_lines.append(f"        self.play({', '.join(parts)})")
+            current_time = group.end
         
         code_lines.append("        self.wait()  # final wait")
         
         return "\n".join(code_lines)
     
+    def _animation_expression(self, anim: AnimationStep, run_time: Optional[float] = None) -> str:
+        """Manim expression for one animation, optionally with its own run_time."""
+        anim_method = self.ANIMATION_TYPE_MAPPING.get(anim.type, "Create")
+        target_obj = anim.target_objects[0] if anim.target_objects else "obj"
+        
+        if anim.type in [AnimationType.MOVE_TO, AnimationType.SHIFT, AnimationType.ROTATE, AnimationType.SCALE]:
+            # These use .animate
+            animate = f"animate(run_time={run_time})" if run_time is not None else "animate"
+            return f"{target_obj}.{animate}.{anim_method}(...)"
+        # These are animation classes
+        if run_time is not None:
+            return f"{anim_method}({target_obj}, run_time={run_time})"
+        return f"{anim_method}({target_obj})"
+    
+    def _solved_positions(self, context: CodeGenerationContext) -> Dict[str, Position]:
+        """Collision-free object positions (the requested ones if layout solving is off)."""
+        if self.layout_solver is None:
+            return {}
+        report = self.layout_solver.solve(context.objects, context.animations)
+        if report.moved:
+            print(f"✓ {report.summary()}")
+        return report.positions
+    
     def _prepare_scene_data(self, context: CodeGenerationContext) -> Dict[str, Any]:
         """Prepare scene data for LLM consumption."""
-        # Collect all objects
-        all_objects = (context.text_objects + context.shape_objects + 
-                      context.math_objects + context.line_objects + context.graph_objects)
+        creation_batches = self._creation_batches(context)
+        positions = self._solved_positions(context)
         
         objects_data = []
-        for obj in all_objects:
+        for obj in (obj for batch in creation_batches for obj in batch):
+            pos = positions.get(obj.id, obj.position)
             objects_data.append({
                 "id": obj.id,
                 "type": obj.type.value,
                 "manim_class": self.OBJECT_TYPE_MAPPING.get(obj.type, "Text"),
                 "text_content": obj.text_content,
-                "position": [obj.position.x, obj.position.y, obj.position.z],
+                "position": [pos.x, pos.y, pos.z],
                 "color": obj.color.name if obj.color and obj.color.name else None,
                 "size": obj.size,
                 "opacity": obj.opacity
             })
         
-        # Collect all animations
-        all_animations = (context.creation_animations + context.transformation_animations + 
-                         context.movement_animations + context.style_animations)
+        # Start times after optional idle-gap compaction
+        timeline = self.parser.get_animation_timeline(context, self.max_idle_gap)
+        start_times = {anim.id: anim.delay for anim in timeline.animations}
         
         animations_data = []
-        for anim in all_animations:
+        for anim in context.all_animations:
             animations_data.append({
                 "id": anim.id,
                 "type": anim.type.value,
                 "manim_method": self.ANIMATION_TYPE_MAPPING.get(anim.type, "Create"),
                 "target_objects": anim.target_objects,
                 "duration": anim.duration,
-                "delay": anim.delay,
+                "delay": start_times.get(anim.id, anim.delay),
                 "target_position": [anim.target_position.x, anim.target_position.y, anim.target_position.z] if anim.target_position else None,
                 "from_object": anim.from_object,
                 "to_object": anim.to_object
@@ -389,21 +596,50 @@ Generate complete, runnable Python code using Manim."""
         
         # Timeline data
         timeline_data = []
-        for start_time, anim in context.animation_timeline:
+        for anim in timeline.animations:
             timeline_data.append({
-                "start_time": start_time,
+                "start_time": anim.delay,
                 "animation_id": anim.id,
                 "animation_type": anim.type.value,
                 "targets": anim.target_objects,
                 "duration": anim.duration
             })
         
+        play_groups = [
+            {
+                "start_time": round(group.start, 3),
+                "duration": round(group.duration, 3),
+                "animations": [{"id": anim.id, "offset": round(offset, 3)} for offset, anim in group.entries]
+            }
+            for group in timeline.groups()
+        ]
+        conflicts = [
+            f"{conflict.first.id} and {conflict.second.id} both animate {conflict.target} "
+            f"for {conflict.overlap:.2f}s"
+            for conflict in timeline.conflicts()
+        ]
+        
         return {
             "objects": objects_data,
             "animations": animations_data,
-            "timeline": timeline_data
+            "timeline": timeline_data,
+            "play_groups": play_groups,
+            "conflicts": conflicts,
+            "creation_batches": [[obj.id for obj in batch] for batch in creation_batches]
         }
     
+    def _creation_batches(self, context: CodeGenerationContext) -> List[List[SceneObject]]:
+        """Dependency-ordered creation batches, or one batch if the dependencies are cyclic."""
+        try:
+            return self.parser.get_creation_batches(context)
+        except DependencyCycleError as e:
+            print(f"⚠️ {str(e)}; falling back to layer order")
+            return [sorted(context.all_objects, key=lambda obj: (obj.layer, obj.id))]
+    
+    def _creation_order(self, context: CodeGenerationContext) -> List[SceneObject]:
+        """Objects in creation order, flattened from the creation batches."""
+        return [obj for batch in self._creation_batches(context) for obj in batch]
+    
     def _clean_code(self, raw_code: str) -> str:
         """Clean up generated code by removing markdown and extra formatting."""
         code = raw_code.strip()
@@ -726,10 +962,12 @@ Generate complete, runnable Python code using Manim."""
                 
                 # Extract text content and font size
                 text_content_match = re.search(r'(?:Text|MathTex)\([r]?["\']([^"\']+)["\']', line)
-                text_length = len(text_content_match.group(1)) if text_content_match else 0
+                text_content = text_content_match.group(1) if text_content_match else ""
+                text_length = len(text_content)
                 
                 font_size_match = re.search(r'font_size\s*=\s*(\d+)', line)
-                font_size = int(font_size_match.group(1)) if font_size_match else 24
+                # Manim renders text without an explicit font_size at DEFAULT_FONT_SIZE (48)
+                font_size = int(font_size_match.group(1)) if font_size_match else int(REFERENCE_FONT_SIZE)
                 
                 # Initialize tracking
                 text_objects[obj_name] = {
@@ -749,19 +987,11 @@ Generate complete, runnable Python code using Manim."""
                         text_objects[obj_name]['has_max_width'] = True
                         break
                 
-                # Add .set_max_width() if missing
-                if not has_max_width and text_length > 0:
-                    # Determine max_width based on text length and font size
-                    if text_length > 60 or font_size > 32:
-                        max_width = 9
-                    elif text_length > 40 or font_size > 28:
-                        max_width = 10
-                    elif text_length > 20:
-                        max_width = 11
-                    else:
-                        max_width = 12
-                    
-                    fixed_lines.append(f"{spacing}{obj_name}.set_max_width({max_width})")
+                # Add .set_max_width() if missing and the measured text is wider than the safe area
+                kind = "math" if text_match.group(2) == "MathTex" else "text"
+                width = self.text_metrics.width(text_content, font_size, kind) if text_length > 0 else 0.0
+                if not has_max_width and width > self.SAFE_TEXT_WIDTH:
+                    fixed_lines.append(f"{spacing}{obj_name}.set_max_width({self.SAFE_TEXT_WIDTH})")
                     text_objects[obj_name]['has_max_width'] = True
                 
                 continue
@@ -769,7 +999,9 @@ Generate complete, runnable Python code using Manim."""
             fixed_lines.append(line)
             i += 1
         
-        # Second pass: Fix positioning to prevent overlap and ensure safe bounds
+        # Second pass: Fix positioning to prevent overlap and ensure safe bounds.
+        # With layout solving on, positions are already collision-free and only
+        # the bounds are enforced (the y-only check below ignores x).
         final_lines = []
         i = 0
         
@@ -796,7 +1028,13 @@ Generate complete, runnable Python code using Manim."""
                     y_pos = -3.5
                 
                 # Adjust y position to prevent overlap with other text objects
-                if obj_name in text_objects:
+                if obj_name in text_objects and self.layout_solver is not None:
+                    line = re.sub(
+                        r'(\w+)\.move_to\(\[([-\d.]+),\s*([-\d.]+)',
+                        f'{obj_name}.move_to([{x_pos:.2f}, {y_pos:.2f}',
+                        line
+                    )
+                elif obj_name in text_objects:
                     min_spacing = 0.8
                     adjusted_y = y_pos
                     
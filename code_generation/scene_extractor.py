@@ -0,0 +1,371 @@
+"""
+Scene Extractor Module
+
+Recovers a SceneStructure summary from generated Manim code without running
+it. The construct method of the Scene subclass is walked with the ast
+module:
+
+- assignments such as `title = Text("...")` become objects, with positions
+  from move_to/shift calls and colors from set_color or color= arguments
+- self.play calls become animations; run_time and self.wait calls advance
+  a timeline clock so each animation gets its start time
+
+Numbers, Manim direction constants (UP, LEFT, ...) and simple arithmetic
+on them are evaluated; anything else is ignored. The result is a summary
+for durations and statistics, not a faithful reconstruction of the scene.
+"""
+
+import ast
+from typing import Any, Dict, List, Optional
+
+from data_processing.scene_structure import (
+    SceneStructure, SceneObject, AnimationStep, SceneSettings, Position, Color,
+    ObjectType, AnimationType
+)
+
+
+class SceneExtractionError(ValueError):
+    """Raised when code cannot be parsed or contains no Scene subclass."""
+
+
+# Manim classes -> ObjectType (several classes map to one type)
+CLASS_OBJECT_TYPES = {
+    "Text": ObjectType.TEXT,
+    "Paragraph": ObjectType.TEXT,
+    "MarkupText": ObjectType.TEXT,
+    "MathTex": ObjectType.MATHTEXT,
+    "Tex": ObjectType.MATHTEXT,
+    "Circle": ObjectType.CIRCLE,
+    "Dot": ObjectType.CIRCLE,
+    "Square": ObjectType.SQUARE,
+    "Rectangle": ObjectType.RECTANGLE,
+    "RoundedRectangle": ObjectType.RECTANGLE,
+    "Line": ObjectType.LINE,
+    "DashedLine": ObjectType.LINE,
+    "Arrow": ObjectType.ARROW,
+    "Vector": ObjectType.ARROW,
+    "Polygon": ObjectType.POLYGON,
+    "Triangle": ObjectType.POLYGON,
+    "RegularPolygon": ObjectType.POLYGON,
+    "Axes": ObjectType.AXES,
+    "NumberPlane": ObjectType.AXES,
+    "FunctionGraph": ObjectType.GRAPH,
+    "ImageMobject": ObjectType.IMAGE,
+    "VGroup": ObjectType.GROUP,
+    "Group": ObjectType.GROUP,
+}
+
+# Manim animation classes -> AnimationType
+CLASS_ANIMATION_TYPES = {
+    "Create": AnimationType.CREATE,
+    "ShowCreation": AnimationType.SHOW_CREATION,
+    "Write": AnimationType.WRITE,
+    "DrawBorderThenFill": AnimationType.DRAW_BORDER_THEN_FILL,
+    "FadeIn": AnimationType.FADE_IN,
+    "FadeOut": AnimationType.FADE_OUT,
+    "Transform": AnimationType.TRANSFORM,
+    "ReplacementTransform": AnimationType.REPLACE_TRANSFORM,
+    "TransformMatchingTex": AnimationType.TRANSFORM,
+    "Uncreate": AnimationType.UNCREATE,
+    "Wiggle": AnimationType.WIGGLE,
+    "Indicate": AnimationType.INDICATE,
+    "Flash": AnimationType.FLASH,
+    "Circumscribe": AnimationType.CIRCUMSCRIBE,
+}
+
+# `.animate.<method>(...)` -> AnimationType
+ANIMATE_METHOD_TYPES = {
+    "move_to": AnimationType.MOVE_TO,
+    "shift": AnimationType.SHIFT,
+    "rotate": AnimationType.ROTATE,
+    "scale": AnimationType.SCALE,
+}
+
+DIRECTIONS = {
+    "ORIGIN": (0.0, 0.0, 0.0),
+    "UP": (0.0, 1.0, 0.0),
+    "DOWN": (0.0, -1.0, 0.0),
+    "LEFT": (-1.0, 0.0, 0.0),
+    "RIGHT": (1.0, 0.0, 0.0),
+    "OUT": (0.0, 0.0, 1.0),
+    "IN": (0.0, 0.0, -1.0),
+    "UL": (-1.0, 1.0, 0.0),
+    "UR": (1.0, 1.0, 0.0),
+    "DL": (-1.0, -1.0, 0.0),
+    "DR": (1.0, -1.0, 0.0),
+}
+
+DEFAULT_RUN_TIME = 1.0
+
+
+class _Evaluator:
+    """Evaluates numeric and direction-vector expressions; None when unknown."""
+    
+    def __init__(self):
+        self.names: Dict[str, Any] = dict(DIRECTIONS)
+    
+    def eval(self, node: ast.AST) -> Any:
+        if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)) and not isinstance(node.value, bool):
+            return float(node.value)
+        if isinstance(node, ast.Name):
+            return self.names.get(node.id)
+        if isinstance(node, (ast.List, ast.Tuple)) and len(node.elts) in (2, 3):
+            values = [self.eval(element) for element in node.elts]
+            if all(isinstance(value, float) for value in values):
+                return tuple(values + [0.0] * (3 - len(values)))
+            return None
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.USub):
+            value = self.eval(node.operand)
+            return self._apply(lambda a, b: a * b, value, -1.0)
+        if isinstance(node, ast.BinOp):
+            left, right = self.eval(node.left), self.eval(node.right)
+            operations = {
+                ast.Add: lambda a, b: a + b,
+                ast.Sub: lambda a, b: a - b,
+                ast.Mult: lambda a, b: a * b,
+                ast.Div: lambda a, b: a / b if b else None,
+            }
+            operation = operations.get(type(node.op))
+            if operation is None:
+                return None
+            return self._apply(operation, left, right)
+        if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id in ("max", "min"):
+            values = [self.eval(arg) for arg in node.args]
+            if values and all(isinstance(value, float) for value in values):
+                return max(values) if node.func.id == "max" else min(values)
+        return None
+    
+    @staticmethod
+    def _apply(operation, left: Any, right: Any) -> Any:
+        if left is None or right is None:
+            return None
+        if isinstance(left, float) and isinstance(right, float):
+            return operation(left, right)
+        if isinstance(left, tuple) and isinstance(right, tuple):
+            values = [operation(a, b) for a, b in zip(left, right)]
+        elif isinstance(left, tuple):
+            values = [operation(a, right) for a in left]
+        else:
+            values = [operation(left, b) for b in right]
+        return None if None in values else tuple(values)
+
+
+class SceneExtractor:
+    """Builds a SceneStructure summary from Manim code."""
+    
+    def extract(self, code: str, title: str = "", description: str = "") -> SceneStructure:
+        """
+        Extract the objects and timed animations of the first Scene subclass.
+
+        Args:
+            code: Manim Python source
+            title: Scene title (the class docstring or name if empty)
+            description: Scene description
+
+        Returns:
+            SceneStructure summary
+
+        Raises:
+            SceneExtractionError: If the code does not parse or has no Scene subclass
+        """
+        try:
+            tree = ast.parse(code)
+        except SyntaxError as e:
+            raise SceneExtractionError(f"Generated code does not parse: {e}") from e
+        
+        scene_class = next((node for node in tree.body if isinstance(node, ast.ClassDef) and node.bases), None)
+        construct = None
+        if scene_class is not None:
+            construct = next((node for node in scene_class.body
+                              if isinstance(node, ast.FunctionDef) and node.name == "construct"), None)
+        if construct is None:
+            raise SceneExtractionError("No Scene subclass with a construct method found")
+        
+        self._evaluator = _Evaluator()
+        self._objects: Dict[str, SceneObject] = {}
+        self._animations: List[AnimationStep] = []
+        self._time = 0.0
+        self._walk(construct.body)
+        
+        docstring = ast.get_docstring(scene_class) or ""
+        settings = SceneSettings(
+            title=title or (docstring.strip().splitlines()[0] if docstring.strip() else scene_class.name),
+            description=description,
+            duration=round(max(self._time, 0.0), 3)
+        )
+        return SceneStructure(settings=settings, objects=list(self._objects.values()), animations=self._animations)
+    
+    def _walk(self, statements: List[ast.stmt]):
+        for statement in statements:
+            if isinstance(statement, ast.Assign):
+                self._assignment(statement)
+            elif isinstance(statement, ast.Expr) and isinstance(statement.value, ast.Call):
+                self._call(statement.value)
+            elif isinstance(statement, (ast.If, ast.For, ast.While, ast.With)):
+                # Conditional waits (`if t > current_time: self.wait(...)`) are assumed to run once
+                self._walk(statement.body)
+    
+    def _assignment(self, statement: ast.Assign):
+        if len(statement.targets) != 1 or not isinstance(statement.targets[0], ast.Name):
+            return
+        name = statement.targets[0].id
+        value = statement.value
+        
+        if isinstance(value, ast.Call):
+            manim_class = self._call_name(value)
+            if manim_class in CLASS_OBJECT_TYPES:
+                self._objects[name] = self._new_object(name, manim_class, value)
+                return
+            # Chained construction, e.g. Text("a").move_to(UP)
+            base = self._chain_base(value)
+            if base is not None and self._call_name(base) in CLASS_OBJECT_TYPES:
+                self._objects[name] = self._new_object(name, self._call_name(base), base)
+                self._apply_method_chain(name, value)
+                return
+        
+        evaluated = self._evaluator.eval(value)
+        if evaluated is not None:
+            self._evaluator.names[name] = evaluated
+    
+    def _new_object(self, name: str, manim_class: str, call: ast.Call) -> SceneObject:
+        text = None
+        if call.args and isinstance(call.args[0], ast.Constant) and isinstance(call.args[0].value, str):
+            text = call.args[0].value
+        color = None
+        for keyword in call.keywords:
+            if keyword.arg == "color" and isinstance(keyword.value, ast.Name):
+                color = Color(name=keyword.value.id)
+        return SceneObject(id=name, type=CLASS_OBJECT_TYPES[manim_class], text_content=text, color=color)
+    
+    def _call(self, call: ast.Call):
+        func = call.func
+        if not isinstance(func, ast.Attribute):
+            return
+        
+        if isinstance(func.value, ast.Name) and func.value.id == "self":
+            if func.attr == "play":
+                self._play(call)
+            elif func.attr == "wait":
+                duration = self._evaluator.eval(call.args[0]) if call.args else DEFAULT_RUN_TIME
+                if isinstance(duration, float) and duration > 0:
+                    self._time += duration
+            return
+        
+        target = self._chain_target(call)
+        if target in self._objects:
+            self._apply_method_chain(target, call)
+    
+    def _play(self, call: ast.Call):
+        run_time = self._keyword(call, "run_time")
+        run_time = run_time if isinstance(run_time, float) else None
+        
+        steps = []
+        for arg in call.args:
+            step = self._animation(arg, len(self._animations) + len(steps) + 1)
+            if step is not None:
+                steps.append(step)
+        
+        longest = 0.0
+        for step in steps:
+            if run_time is not None:
+                step.duration = run_time
+            step.delay = round(self._time, 3)
+            longest = max(longest, step.duration)
+            self._animations.append(step)
+        self._time += run_time if run_time is not None else (longest or DEFAULT_RUN_TIME)
+    
+    def _animation(self, node: ast.AST, number: int) -> Optional[AnimationStep]:
+        if not isinstance(node, ast.Call):
+            return None
+        name = self._call_name(node)
+        own_run_time = self._keyword(node, "run_time")
+        duration = own_run_time if isinstance(own_run_time, float) else DEFAULT_RUN_TIME
+        
+        if name in CLASS_ANIMATION_TYPES:
+            anim_type = CLASS_ANIMATION_TYPES[name]
+            targets = [arg.id for arg in node.args if isinstance(arg, ast.Name)]
+            step = AnimationStep(id=f"anim_{number}", type=anim_type, target_objects=targets[:1], duration=duration)
+            if anim_type in (AnimationType.TRANSFORM, AnimationType.REPLACE_TRANSFORM) and len(targets) >= 2:
+                step.from_object, step.to_object = targets[0], targets[1]
+            return step
+        
+        # obj.animate.move_to(...), obj.animate(run_time=2).shift(...)
+        func = node.func
+        if isinstance(func, ast.Attribute) and func.attr in ANIMATE_METHOD_TYPES:
+            animate = func.value
+            if isinstance(animate, ast.Call):
+                run_time = self._keyword(animate, "run_time")
+                duration = run_time if isinstance(run_time, float) else duration
+                animate = animate.func
+            if isinstance(animate, ast.Attribute) and animate.attr == "animate" and isinstance(animate.value, ast.Name):
+                target = animate.value.id
+                step = AnimationStep(id=f"anim_{number}", type=ANIMATE_METHOD_TYPES[func.attr],
+                                     target_objects=[target], duration=duration)
+                if func.attr in ("move_to", "shift") and node.args:
+                    vector = self._evaluator.eval(node.args[0])
+                    if isinstance(vector, tuple):
+                        step.target_position = Position(*vector) if func.attr == "move_to" else None
+                        step.offset = Position(*vector) if func.attr == "shift" else None
+                return step
+        return None
+    
+    def _apply_method_chain(self, target: str, call: ast.Call):
+        """Apply move_to/shift/set_color calls in a chain like obj.move_to(UP).set_color(RED)."""
+        calls = []
+        node: ast.AST = call
+        while isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute):
+            calls.append(node)
+            node = node.func.value
+        obj = self._objects[target]
+        for method_call in reversed(calls):
+            method = method_call.func.attr
+            argument = self._evaluator.eval(method_call.args[0]) if method_call.args else None
+            if method == "move_to" and isinstance(argument, tuple):
+                obj.position = Position(*argument)
+            elif method == "shift" and isinstance(argument, tuple):
+                position = obj.position
+                obj.position = Position(position.x + argument[0], position.y + argument[1], position.z + argument[2])
+            elif method == "set_color" and method_call.args and isinstance(method_call.args[0], ast.Name):
+                obj.color = Color(name=method_call.args[0].id)
+            elif method == "set_opacity" and isinstance(argument, float):
+                obj.opacity = argument
+    
+    def _chain_base(self, call: ast.Call) -> Optional[ast.Call]:
+        """Innermost call of a method chain, e.g. Text("a") in Text("a").move_to(UP)."""
+        node: ast.AST = call
+        while isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute):
+            node = node.func.value
+        return node if isinstance(node, ast.Call) and node is not call else None
+    
+    @staticmethod
+    def _chain_target(call: ast.Call) -> Optional[str]:
+        """Variable at the root of a method chain, e.g. title in title.move_to(UP)."""
+        node: ast.AST = call
+        while isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute):
+            node = node.func.value
+        return node.id if isinstance(node, ast.Name) else None
+    
+    @staticmethod
+    def _call_name(call: ast.Call) -> Optional[str]:
+        return call.func.id if isinstance(call.func, ast.Name) else None
+    
+    def _keyword(self, call: ast.Call, name: str) -> Any:
+        for keyword in call.keywords:
+            if keyword.arg == name:
+                return self._evaluator.eval(keyword.value)
+        return None
+
+
+def extract_scene_structure(code: str, title: str = "", description: str = "") -> SceneStructure:
+    """
+    Convenience function to summarize Manim code as a SceneStructure.
+
+    Args:
+        code: Manim Python source
+        title: Scene title
+        description: Scene description
+
+    Returns:
+        SceneStructure summary
+    """
+    return SceneExtractor().extract(code, title, description)
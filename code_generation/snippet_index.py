@@ -0,0 +1,218 @@
+"""
+Snippet Index Module
+
+Local retrieval index of validated (context, code) pairs for few-shot
+prompting.
+
+Each scene is indexed as a bag of terms: its object types, animation types
+and the words of its texts and title. BM25 ranks the stored scenes against
+a new context, and the top-k codes are added to the code generation prompt
+as examples. Entries can be persisted to a JSONL file so the index grows
+across runs.
+
+The index also records each generation call: whether examples were used,
+whether the code validated, and how many calls each scene needed.
+report() compares success and retry rates with and without examples.
+"""
+
+import json
+import math
+import re
+import threading
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from code_generation.code_cache import context_key
+from data_processing.scene_parser import CodeGenerationContext
+
+
+_WORD = re.compile(r"[a-z][a-z0-9]{2,}")
+
+
+def context_terms(context: CodeGenerationContext) -> List[str]:
+    """
+    Terms a scene is indexed and searched by.
+
+    Args:
+        context: Parsed scene context
+
+    Returns:
+        Object type, animation type and word terms (with repeats)
+    """
+    terms = [f"obj:{obj.type.value}" for obj in context.objects]
+    terms += [f"anim:{anim.type.value}" for anim in context.animations]
+    texts = [context.scene_title] + [obj.text_content or "" for obj in context.objects]
+    terms += [f"word:{word}" for text in texts for word in _WORD.findall(text.lower())]
+    return terms
+
+
+@dataclass
+class Snippet:
+    """One search result."""
+    title: str
+    code: str
+    score: float
+
+
+class SnippetIndex:
+    """BM25 index of validated scene code."""
+    
+    def __init__(self, path: Optional[str] = None, k1: float = 1.5, b: float = 0.75,
+                 max_snippet_chars: int = 1500):
+        """
+        Initialize the index.
+
+        Args:
+            path: JSONL file the entries are loaded from and appended to (memory only if None)
+            k1: BM25 term frequency saturation
+            b: BM25 document length normalization
+            max_snippet_chars: Longer codes are cut when added to a prompt
+        """
+        self.path = Path(path) if path else None
+        self.k1 = k1
+        self.b = b
+        self.max_snippet_chars = max_snippet_chars
+        self._docs: Dict[str, Dict] = {}  # context key -> {"title", "code", "terms"}
+        self._df: Counter = Counter()
+        self._total_length = 0
+        self._calls: List[Dict] = []
+        self._lock = threading.Lock()
+        
+        if self.path and self.path.exists():
+            for line in self.path.read_text(encoding="utf-8").splitlines():
+                if line.strip():
+                    entry = json.loads(line)
+                    self._store(entry["key"], entry["title"], entry["code"], entry["terms"])
+    
+    def __len__(self) -> int:
+        return len(self._docs)
+    
+    def add(self, context: CodeGenerationContext, code: str):
+        """
+        Index code that passed validation for a context.
+
+        Args:
+            context: Parsed scene context the code was generated from
+            code: Validated code
+        """
+        key, terms = context_key(context), context_terms(context)
+        with self._lock:
+            self._store(key, context.scene_title, code, terms)
+            if self.path:
+                with open(self.path, "a", encoding="utf-8") as handle:
+                    handle.write(json.dumps({"key": key, "title": context.scene_title,
+                                             "code": code, "terms": terms}) + "\n")
+    
+    def _store(self, key: str, title: str, code: str, terms: List[str]):
+        old = self._docs.pop(key, None)
+        if old:
+            self._df.subtract(set(old["terms"]))
+            self._total_length -= sum(old["terms"].values())
+        self._docs[key] = {"title": title, "code": code, "terms": Counter(terms)}
+        self._df.update(set(terms))
+        self._total_length += len(terms)
+    
+    def search(self, context: CodeGenerationContext, k: int = 2) -> List[Snippet]:
+        """
+        Most similar indexed scenes.
+
+        Args:
+            context: Scene about to be generated
+            k: Number of results
+
+        Returns:
+            Up to k snippets, best first (only those sharing a term)
+        """
+        query = set(context_terms(context))
+        with self._lock:
+            count = len(self._docs)
+            if not count or not query:
+                return []
+            average = self._total_length / count
+            scored = []
+            for doc in self._docs.values():
+                length = sum(doc["terms"].values())
+                score = 0.0
+                for term in query:
+                    frequency = doc["terms"].get(term, 0)
+                    if not frequency:
+                        continue
+                    df = self._df[term]
+                    idf = math.log(1 + (count - df + 0.5) / (df + 0.5))
+                    score += idf * frequency * (self.k1 + 1) / (
+                        frequency + self.k1 * (1 - self.b + self.b * length / average))
+                if score > 0:
+                    scored.append(Snippet(doc["title"], doc["code"], score))
+        scored.sort(key=lambda snippet: -snippet.score)
+        return scored[:k]
+    
+    def prompt_section(self, snippets: List[Snippet]) -> str:
+        """Prompt text presenting snippets as validated examples."""
+        if not snippets:
+            return ""
+        parts = ["\n\nVALIDATED CODE FROM SIMILAR SCENES (follow their structure and API usage; "
+                 "do not copy their text):"]
+        for snippet in snippets:
+            code = snippet.code
+            if len(code) > self.max_snippet_chars:
+                code = code[:self.max_snippet_chars] + "\n# ..."
+            parts.append(f"# Scene: {snippet.title}\n{code}")
+        return "\n\n".join(parts)
+    
+    def record(self, context: CodeGenerationContext, used_examples: bool, ok: bool):
+        """
+        Record one generation call.
+
+        Args:
+            context: Scene that was generated
+            used_examples: Whether the prompt included snippets
+            ok: Whether the code passed validation
+        """
+        with self._lock:
+            self._calls.append({"scene": context_key(context) + context.scene_title,
+                                "examples": used_examples, "ok": ok})
+    
+    def report(self) -> Dict[str, Dict[str, float]]:
+        """
+        Success and retry rates of the recorded calls, with and without examples.
+
+        A scene counts for the group of its first call; a retry is any
+        further call for the same scene.
+
+        Returns:
+            {"with_examples": {...}, "without_examples": {...}} with calls,
+            scenes, success_rate and retry_rate
+        """
+        with self._lock:
+            calls = list(self._calls)
+        groups = {}
+        first_group: Dict[str, str] = {}
+        for call in calls:
+            name = first_group.setdefault(call["scene"], "with_examples" if call["examples"] else "without_examples")
+            group = groups.setdefault(name, {"calls": 0, "ok": 0, "scenes": set()})
+            group["calls"] += 1
+            group["ok"] += call["ok"]
+            group["scenes"].add(call["scene"])
+        
+        report = {}
+        for name in ("with_examples", "without_examples"):
+            group = groups.get(name, {"calls": 0, "ok": 0, "scenes": set()})
+            scenes = len(group["scenes"])
+            report[name] = {
+                "calls": group["calls"],
+                "scenes": scenes,
+                "success_rate": group["ok"] / group["calls"] if group["calls"] else 0.0,
+                "retry_rate": (group["calls"] - scenes) / scenes if scenes else 0.0,
+            }
+        return report
+    
+    def summary(self) -> str:
+        """Human-readable comparison of the recorded calls."""
+        report = self.report()
+        return "; ".join(
+            f"{name.replace('_', ' ')}: {group['calls']} call(s), "
+            f"{100 * group['success_rate']:.0f}% valid, {group['retry_rate']:.2f} retries/scene"
+            for name, group in report.items()
+        )
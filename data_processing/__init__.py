@@ -5,13 +5,34 @@ Handles input processing, scene structure, and parsing for code generation.
 """
 
 from .input_processor import InputProcessor, process_input
+from .boilerplate import BoilerplateStripper, BoilerplateReport, strip_boilerplate
 from .scene_structure import SceneStructure, SceneObject, AnimationStep, ObjectType, AnimationType
-from .scene_parser import SceneParser, CodeGenerationContext, parse_scene
-from .multi_scene_processor import MultiSceneProcessor, DocumentChunker, MultiSceneStructure, DocumentChunk, process_large_document
+from .schema_validator import compile_schema, SchemaValidationError
+from .stream_parser import IncrementalSceneParser, StreamingParseError
+from .scene_columns import SceneColumns, scene_columns
+from .timeline import AnimationTimeline, TimelineGroup, TimelineConflict
+from .scene_parser import SceneParser, CodeGenerationContext, DependencyCycleError, parse_scene
+from .multi_scene_processor import MultiSceneProcessor, DocumentChunker, MultiSceneStructure, DocumentChunk, SceneCodeResult, process_large_document
+from .scene_dedup import scene_fingerprint, deduplicate_scenes, DeduplicationReport
+from .chunk_dedup import ChunkDeduplicator, ChunkDedupReport, deduplicate_chunks
+from .text_metrics import TextMetrics, measure_text
+from .layout import LayoutSolver, LayoutReport, solve_layout
+from .scene_codec import encode_scene, decode_scene, encode_multi_scene, decode_multi_scene, write_multi_scene, MultiSceneReader, SceneCodecError
 
 __all__ = [
     'InputProcessor', 'process_input',
+    'BoilerplateStripper', 'BoilerplateReport', 'strip_boilerplate',
     'SceneStructure', 'SceneObject', 'AnimationStep', 'ObjectType', 'AnimationType', 
-    'SceneParser', 'CodeGenerationContext', 'parse_scene',
-    'MultiSceneProcessor', 'DocumentChunker', 'MultiSceneStructure', 'DocumentChunk', 'process_large_document'
+    'compile_schema', 'SchemaValidationError',
+    'IncrementalSceneParser', 'StreamingParseError',
+    'SceneColumns', 'scene_columns',
+    'AnimationTimeline', 'TimelineGroup', 'TimelineConflict',
+    'SceneParser', 'CodeGenerationContext', 'DependencyCycleError', 'parse_scene',
+    'MultiSceneProcessor', 'DocumentChunker', 'MultiSceneStructure', 'DocumentChunk', 'SceneCodeResult', 'process_large_document',
+    'scene_fingerprint', 'deduplicate_scenes', 'DeduplicationReport',
+    'ChunkDeduplicator', 'ChunkDedupReport', 'deduplicate_chunks',
+    'TextMetrics', 'measure_text',
+    'LayoutSolver', 'LayoutReport', 'solve_layout',
+    'encode_scene', 'decode_scene', 'encode_multi_scene', 'decode_multi_scene', 'write_multi_scene',
+    'MultiSceneReader', 'SceneCodecError'
 ]
@@ -0,0 +1,162 @@
+"""
+Boilerplate Module
+
+Removes running headers, footers and page numbers from extracted PDF text.
+
+A line counts as boilerplate when a line with the same normalized text
+appears at the same position (counted from the top or the bottom of the
+page) on enough pages. Normalization lowercases the line, collapses
+whitespace and replaces digit runs with '#', so "Page 3 of 40" and
+"Page 4 of 40" compare equal.
+
+Pages are processed as a stream. The first `warmup` pages are buffered to
+learn the repeated lines and then released. After that each page is
+cleaned as soon as it arrives, using the counts seen so far, so memory
+stays bounded by the warmup window whatever the document length.
+"""
+
+import re
+from collections import Counter, deque
+from dataclasses import dataclass
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from models.llm import estimate_tokens
+
+
+_DIGITS = re.compile(r"\d+")
+_WHITESPACE = re.compile(r"\s+")
+
+
+@dataclass
+class BoilerplateReport:
+    """Savings from stripping one document."""
+    pages: int = 0
+    lines_removed: int = 0
+    bytes_before: int = 0
+    bytes_after: int = 0
+    tokens_before: int = 0
+    tokens_after: int = 0
+    
+    @property
+    def bytes_saved(self) -> int:
+        return self.bytes_before - self.bytes_after
+    
+    @property
+    def tokens_saved(self) -> int:
+        return self.tokens_before - self.tokens_after
+    
+    def summary(self) -> str:
+        """Human-readable summary of the savings."""
+        percent = 100.0 * self.bytes_saved / self.bytes_before if self.bytes_before else 0.0
+        return (f"Stripped {self.lines_removed} boilerplate line(s) from {self.pages} page(s): "
+                f"{self.bytes_saved:,} bytes ({percent:.1f}%), ~{self.tokens_saved:,} tokens saved")
+
+
+class BoilerplateStripper:
+    """Streaming detector for lines repeated across PDF pages."""
+    
+    def __init__(self,
+                 edge_lines: int = 3,
+                 min_repeats: int = 3,
+                 min_ratio: float = 0.5,
+                 warmup: int = 8):
+        """
+        Initialize the stripper.
+
+        Args:
+            edge_lines: Lines at the top and at the bottom of each page that
+                may be header or footer lines
+            min_repeats: Pages a line must appear on before it is removed
+            min_ratio: During warmup, fraction of the buffered pages a line
+                must appear on
+            warmup: Pages buffered before the first page is released
+        """
+        self.edge_lines = edge_lines
+        self.min_repeats = min_repeats
+        self.min_ratio = min_ratio
+        self.warmup = warmup
+        self.report = BoilerplateReport()
+    
+    @staticmethod
+    def normalize(line: str) -> str:
+        """Normalized form used to compare lines across pages."""
+        return _WHITESPACE.sub(" ", _DIGITS.sub("#", line.lower())).strip()
+    
+    def _edge_keys(self, lines: List[str]) -> List[Tuple[int, Tuple[str, int, str]]]:
+        """(line index, key) for the header and footer candidates of a page."""
+        content = [index for index, line in enumerate(lines) if line.strip()]
+        edge = self.edge_lines
+        keyed = {}
+        for rank, index in enumerate(content[:edge]):
+            keyed[index] = ("top", rank, self.normalize(lines[index]))
+        for rank, index in enumerate(reversed(content[-edge:])):
+            # Lines in both zones (short pages) keep their header key
+            keyed.setdefault(index, ("bottom", rank, self.normalize(lines[index])))
+        return sorted(keyed.items())
+    
+    def strip(self, pages: Iterable[str]) -> Iterator[str]:
+        """
+        Yield the pages with boilerplate lines removed.
+
+        The report on self.report is complete once the iterator is exhausted.
+
+        Args:
+            pages: Page texts in document order
+
+        Yields:
+            Cleaned page texts
+        """
+        self.report = BoilerplateReport()
+        counts: Counter = Counter()
+        buffer: deque = deque()
+        seen = 0
+        
+        for page in pages:
+            page = page or ""
+            lines = page.split("\n")
+            keys = self._edge_keys(lines)
+            counts.update(set(key for _, key in keys))
+            seen += 1
+            
+            if seen <= self.warmup:
+                buffer.append((page, lines, keys))
+                continue
+            
+            # Warmup over: release the buffered pages, then stream
+            while buffer:
+                yield self._clean(*buffer.popleft(), counts, seen)
+            yield self._clean(page, lines, keys, counts, seen)
+        
+        while buffer:
+            yield self._clean(*buffer.popleft(), counts, seen)
+    
+    def _clean(self, page: str, lines: List[str], keys, counts: Counter, seen: int) -> str:
+        threshold = max(self.min_repeats, self.min_ratio * min(seen, self.warmup))
+        drop = {index for index, key in keys if key[2] and counts[key] >= threshold}
+        cleaned = "\n".join(line for index, line in enumerate(lines) if index not in drop)
+        
+        report = self.report
+        report.pages += 1
+        report.lines_removed += len(drop)
+        report.bytes_before += len(page.encode("utf-8"))
+        report.bytes_after += len(cleaned.encode("utf-8"))
+        report.tokens_before += estimate_tokens(page)
+        report.tokens_after += estimate_tokens(cleaned)
+        return cleaned
+
+
+def strip_boilerplate(pages: Iterable[Optional[str]],
+                      stripper: Optional[BoilerplateStripper] = None) -> Tuple[str, BoilerplateReport]:
+    """
+    Convenience function to strip boilerplate and join the pages.
+
+    Args:
+        pages: Page texts in document order (None entries are treated as empty)
+        stripper: Configured stripper (default settings if None)
+
+    Returns:
+        Tuple of (joined text, report)
+    """
+    stripper = stripper or BoilerplateStripper()
+    text = "\n".join(page for page in stripper.strip(page or "" for page in pages) if page)
+    return text, stripper.report
@@ -0,0 +1,258 @@
+"""
+Chunk Deduplication Module
+
+Detects near-duplicate DocumentChunks before scene generation, so that
+overlapping sections from the LLM chunker or repeated PDF boilerplate do
+not each cost a scene-generation call.
+
+Each chunk is reduced to a set of hashed word shingles and summarised by a
+MinHash signature. Locality-sensitive hashing over signature bands finds
+candidate pairs without comparing every pair of chunks, and candidates are
+confirmed with the exact Jaccard similarity of their shingle sets.
+Confirmed pairs are grouped with union-find, and each group is either
+merged into its first chunk or reduced to that chunk alone.
+
+The cost is linear in the total number of shingles plus the number of
+candidate pairs.
+"""
+
+import re
+import zlib
+from dataclasses import dataclass, field, replace
+from typing import TYPE_CHECKING, Dict, List, Tuple
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from .multi_scene_processor import DocumentChunk
+
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64(0xFFFFFFFF)
+_SHINGLE_BASE = np.uint64(1_000_003)
+_WORD_PATTERN = re.compile(r"\w+")
+
+
+@dataclass
+class ChunkDedupReport:
+    """Outcome of a chunk deduplication pass."""
+    total_chunks: int
+    groups: List[List[str]] = field(default_factory=list)  # ids of near-duplicate chunks, kept chunk first
+    chunks_removed: int = 0
+    chars_removed: int = 0
+    
+    def summary(self) -> str:
+        if not self.groups:
+            return f"No near-duplicate chunks among {self.total_chunks}"
+        return (f"Removed {self.chunks_removed} near-duplicate chunk(s) of {self.total_chunks} "
+                f"({self.chars_removed:,} chars) in {len(self.groups)} group(s)")
+
+
+class _UnionFind:
+    def __init__(self, size: int):
+        self.parent = list(range(size))
+    
+    def find(self, item: int) -> int:
+        parent = self.parent
+        while parent[item] != item:
+            parent[item] = parent[parent[item]]
+            item = parent[item]
+        return item
+    
+    def union(self, a: int, b: int):
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a != root_b:
+            # Keep the earlier chunk as the root so it becomes the kept chunk
+            if root_b < root_a:
+                root_a, root_b = root_b, root_a
+            self.parent[root_b] = root_a
+
+
+class ChunkDeduplicator:
+    """MinHash/LSH near-duplicate detection for document chunks."""
+    
+    MODES = ("merge", "drop")
+    
+    def __init__(self,
+                 threshold: float = 0.85,
+                 num_perm: int = 128,
+                 shingle_size: int = 5,
+                 mode: str = "merge",
+                 seed: int = 1):
+        """
+        Initialize the deduplicator.
+
+        Args:
+            threshold: Jaccard similarity of word shingles at which two chunks
+                count as near-duplicates (0-1)
+            num_perm: Number of MinHash permutations (signature length)
+            shingle_size: Words per shingle
+            mode: "merge" appends paragraphs unique to the duplicates to the
+                kept chunk; "drop" discards the duplicates
+            seed: Seed for the permutation coefficients
+        """
+        if not 0.0 < threshold <= 1.0:
+            raise ValueError("threshold must be in (0, 1]")
+        if mode not in self.MODES:
+            raise ValueError(f"mode must be one of {self.MODES}")
+        
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.mode = mode
+        self.bands, self.rows = self._optimal_bands(threshold, num_perm)
+        
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, int(_MERSENNE_PRIME), size=num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, int(_MERSENNE_PRIME), size=num_perm, dtype=np.uint64)
+    
+    @staticmethod
+    def _optimal_bands(threshold: float, num_perm: int) -> Tuple[int, int]:
+        """Pick bands x rows whose LSH S-curve midpoint is closest to the threshold."""
+        best = (num_perm, 1)
+        best_error = float("inf")
+        for rows in range(1, num_perm + 1):
+            bands = num_perm // rows
+            if bands == 0:
+                break
+            # A slightly lower midpoint favours recall; candidates are verified exactly
+            midpoint = (1.0 / bands) ** (1.0 / rows)
+            error = abs(midpoint - (threshold - 0.05))
+            if error < best_error:
+                best, best_error = (bands, rows), error
+        return best
+    
+    def shingles(self, text: str) -> np.ndarray:
+        """Sorted unique 32-bit hashes of the word shingles of text."""
+        words = _WORD_PATTERN.findall(text.lower())
+        if not words:
+            return np.empty(0, dtype=np.uint64)
+        
+        tokens = np.fromiter((zlib.crc32(word.encode("utf-8")) for word in words),
+                             dtype=np.uint64, count=len(words))
+        k = min(self.shingle_size, len(tokens))
+        hashes = np.zeros(len(tokens) - k + 1, dtype=np.uint64)
+        for offset in range(k):
+            hashes = hashes * _SHINGLE_BASE + tokens[offset:len(tokens) - k + 1 + offset]
+        return np.unique(hashes & _MAX_HASH)
+    
+    def signature(self, shingles: np.ndarray) -> np.ndarray:
+        """MinHash signature (num_perm values) of a shingle set."""
+        if len(shingles) == 0:
+            return np.full(self.num_perm, _MAX_HASH, dtype=np.uint64)
+        # Universal hashing h(x) = (a*x + b) mod p, truncated to 32 bits
+        permuted = (np.outer(self._a, shingles) + self._b[:, None]) % _MERSENNE_PRIME & _MAX_HASH
+        return permuted.min(axis=1)
+    
+    def find_groups(self, texts: List[str]) -> List[List[int]]:
+        """
+        Group the indices of near-duplicate texts.
+
+        Args:
+            texts: Texts to compare
+
+        Returns:
+            Groups (each with two or more indices, ascending) in order of their first index
+        """
+        shingle_sets = [self.shingles(text) for text in texts]
+        signatures = [self.signature(shingles) for shingles in shingle_sets]
+        
+        candidates = set()
+        for band in range(self.bands):
+            start = band * self.rows
+            buckets: Dict[bytes, List[int]] = {}
+            for index, signature in enumerate(signatures):
+                if len(shingle_sets[index]) == 0:
+                    continue
+                key = signature[start:start + self.rows].tobytes()
+                buckets.setdefault(key, []).append(index)
+            for members in buckets.values():
+                for i in range(len(members)):
+                    for j in range(i + 1, len(members)):
+                        candidates.add((members[i], members[j]))
+        
+        union_find = _UnionFind(len(texts))
+        for i, j in candidates:
+            if self.jaccard(shingle_sets[i], shingle_sets[j]) >= self.threshold:
+                union_find.union(i, j)
+        
+        groups: Dict[int, List[int]] = {}
+        for index in range(len(texts)):
+            groups.setdefault(union_find.find(index), []).append(index)
+        return [members for _, members in sorted(groups.items()) if len(members) > 1]
+    
+    @staticmethod
+    def jaccard(a: np.ndarray, b: np.ndarray) -> float:
+        """Exact Jaccard similarity of two sorted unique hash arrays."""
+        if len(a) == 0 and len(b) == 0:
+            return 1.0
+        intersection = len(np.intersect1d(a, b, assume_unique=True))
+        return intersection / (len(a) + len(b) - intersection)
+    
+    def deduplicate(self, chunks: List["DocumentChunk"]) -> Tuple[List["DocumentChunk"], ChunkDedupReport]:
+        """
+        Remove near-duplicate chunks, keeping the first chunk of each group.
+
+        Args:
+            chunks: Chunks in document order
+
+        Returns:
+            Tuple of (remaining chunks in document order, report)
+        """
+        report = ChunkDedupReport(total_chunks=len(chunks))
+        groups = self.find_groups([chunk.content for chunk in chunks])
+        
+        removed = set()
+        replacements = {}
+        for members in groups:
+            kept = chunks[members[0]]
+            duplicates = [chunks[index] for index in members[1:]]
+            removed.update(members[1:])
+            report.groups.append([kept.id] + [chunk.id for chunk in duplicates])
+            report.chars_removed += sum(len(chunk.content) for chunk in duplicates)
+            if self.mode == "merge":
+                replacements[members[0]] = self._merge(kept, duplicates)
+        
+        report.chunks_removed = len(removed)
+        result = [
+            replacements.get(index, chunk)
+            for index, chunk in enumerate(chunks)
+            if index not in removed
+        ]
+        return result, report
+    
+    def _merge(self, kept: "DocumentChunk", duplicates: List["DocumentChunk"]) -> "DocumentChunk":
+        """Append paragraphs that only appear in the duplicates to the kept chunk."""
+        paragraphs = [p.strip() for p in re.split(r"\n\s*\n", kept.content) if p.strip()]
+        seen = {" ".join(_WORD_PATTERN.findall(p.lower())) for p in paragraphs}
+        
+        for duplicate in duplicates:
+            for paragraph in re.split(r"\n\s*\n", duplicate.content):
+                paragraph = paragraph.strip()
+                key = " ".join(_WORD_PATTERN.findall(paragraph.lower()))
+                if paragraph and key not in seen:
+                    seen.add(key)
+                    paragraphs.append(paragraph)
+        
+        page_numbers = None
+        if kept.page_numbers or any(d.page_numbers for d in duplicates):
+            page_numbers = sorted(set(kept.page_numbers or []).union(*(d.page_numbers or [] for d in duplicates)))
+        
+        return replace(kept, content="\n\n".join(paragraphs), page_numbers=page_numbers)
+
+
+def deduplicate_chunks(chunks: List["DocumentChunk"],
+                       threshold: float = 0.85,
+                       mode: str = "merge") -> Tuple[List["DocumentChunk"], ChunkDedupReport]:
+    """
+    Convenience function to drop or merge near-duplicate chunks.
+
+    Args:
+        chunks: Chunks in document order
+        threshold: Jaccard similarity at which chunks count as near-duplicates
+        mode: "merge" or "drop"
+
+    Returns:
+        Tuple of (remaining chunks, report)
+    """
+    return ChunkDeduplicator(threshold=threshold, mode=mode).deduplicate(chunks)
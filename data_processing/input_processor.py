@@ -6,16 +6,19 @@ structured prompts suitable for Manim scene generation.
 """
 
 import os
-from typing import Optional
+from typing import List, Optional, Callable
 from io import BytesIO
 import sys
 import json
+import re
 
 # Add parent directory to path to import models
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from models.llm import LLM
-from .scene_structure import SceneStructure, ObjectType, AnimationType
+from models.llm import LLM, LLMRouter
+from .scene_structure import SceneStructure, SceneObject, AnimationStep, ObjectType, AnimationType, SCENE_STRUCTURE_SCHEMA
+from .stream_parser import IncrementalSceneParser, StreamingParseError
+from .boilerplate import BoilerplateReport, strip_boilerplate
 
 try:
     import PyPDF2
@@ -32,27 +35,57 @@ else:
     PDF_LIBRARY = 'PyPDF2'
 
 
+# Messages of provider errors that reject the response schema itself
+_SCHEMA_REJECTION = re.compile(r"schema|structured output|response_format|json mode|invalid.?argument|"
+                               r"not supported|unsupported", re.IGNORECASE)
+
+
+def is_schema_rejection(error: Exception) -> bool:
+    """Whether a provider error rejects the structured output request itself (not a transient failure)."""
+    code = getattr(error, "code", None) or getattr(error, "status_code", None)
+    if code is None and getattr(error, "response", None) is not None:
+        code = getattr(error.response, "status_code", None)
+    if code == 400 or type(error).__name__ in ("InvalidArgument", "BadRequestError"):
+        return True
+    return bool(_SCHEMA_REJECTION.search(str(error)))
+
+
 class InputProcessor:
     """Processes various input types and converts them to structured prompts."""
     
-    def __init__(self, api_key: Optional[str] = None, model_name: str = "gemini-2.5-flash"):
+    def __init__(self, api_key: Optional[str] = None, model_name: str = "gemini-2.5-flash",
+                 use_structured_output: bool = True, remove_boilerplate: bool = True,
+                 router: Optional[LLMRouter] = None):
         """
         Initialize the InputProcessor.
         
         Args:
             api_key: Gemini API key. If None, will try to get from GOOGLE_API_KEY env var.
             model_name: Gemini model to use (default: gemini-pro)
+            use_structured_output: Enforce SCENE_STRUCTURE_SCHEMA through the provider's
+                native structured output instead of parsing free-form text
+            remove_boilerplate: Strip running headers, footers and page numbers
+                from extracted PDF text
+            router: Routes scene JSON requests across providers instead of
+                using model_name directly
         """
         self.api_key = api_key or os.getenv("GOOGLE_API_KEY")
-        if not self.api_key:
+        if not self.api_key and router is None:
             raise ValueError("Gemini API key is required. Set GOOGLE_API_KEY environment variable or pass api_key parameter.")
         
-        self.llm = LLM(
-            provider="google_genai",
-            model_name=model_name,
-            api_key=self.api_key,
-            temperature=0.7
-        )
+        if router is not None:
+            self.llm = router.for_task("scene_json")
+        else:
+            self.llm = LLM(
+                provider="google_genai",
+                model_name=model_name,
+                api_key=self.api_key,
+                temperature=0.7
+            )
+        self.use_structured_output = use_structured_output
+        self._structured_output_verified = False  # set once a structured request has succeeded
+        self.remove_boilerplate = remove_boilerplate
+        self.boilerplate_report: Optional[BoilerplateReport] = None
         
         self.system_prompt = """You are a content analyzer specialized in extracting visual and animation elements from text content for Manim animation generation.
 
@@ -114,6 +147,33 @@ IMPORTANT: Return ONLY valid JSON following this exact structure. No explanation
         
         return self._create_structured_prompt(text)
     
+    def stream_text_input(self,
+                          text: str,
+                          on_object: Optional[Callable[[SceneObject], None]] = None,
+                          on_animation: Optional[Callable[[AnimationStep], None]] = None,
+                          max_attempts: int = 2) -> SceneStructure:
+        """
+        Process plain text input while streaming the Gemini response.
+        
+        Each element of the `objects` and `animations` arrays is passed to the
+        callbacks as soon as it is complete. If the response stops being valid
+        JSON mid-stream, generation is abandoned and a new attempt starts
+        immediately; callbacks fire again for the elements of the new attempt.
+        
+        Args:
+            text: Raw text input from user
+            on_object: Called with each SceneObject as soon as it is parsed
+            on_animation: Called with each AnimationStep as soon as it is parsed
+            max_attempts: Maximum number of streamed generations to try
+            
+        Returns:
+            SceneStructure object suitable for Manim code generation
+        """
+        if not text or not text.strip():
+            raise ValueError("Text input cannot be empty")
+        
+        return self._create_structured_prompt_streaming(text, on_object, on_animation, max_attempts)
+    
     def process_pdf_input(self, pdf_path: str) -> SceneStructure:
         """
         Extract text from PDF and process it to create a structured scene description.
@@ -186,7 +246,7 @@ IMPORTANT: Return ONLY valid JSON following this exact structure. No explanation
             pdf_reader = PyPDF2.PdfReader(file)
             for page in pdf_reader.pages:
                 text_parts.append(page.extract_text())
-        return "\n".join(text_parts)
+        return self._join_pages(text_parts)
     
     def _extract_with_pypdf2_bytes(self, pdf_bytes: BytesIO) -> str:
         """Extract text from bytes using PyPDF2."""
@@ -195,7 +255,7 @@ IMPORTANT: Return ONLY valid JSON following this exact structure. No explanation
         pdf_reader = PyPDF2.PdfReader(pdf_bytes)
         for page in pdf_reader.pages:
             text_parts.append(page.extract_text())
-        return "\n".join(text_parts)
+        return self._join_pages(text_parts)
     
     def _extract_with_pdfplumber(self, pdf_path: str) -> str:
         """Extract text using pdfplumber."""
@@ -206,7 +266,7 @@ IMPORTANT: Return ONLY valid JSON following this exact structure. No explanation
                 text = page.extract_text()
                 if text:
                     text_parts.append(text)
-        return "\n".join(text_parts)
+        return self._join_pages(text_parts)
     
     def _extract_with_pdfplumber_bytes(self, pdf_bytes: BytesIO) -> str:
         """Extract text from bytes using pdfplumber."""
@@ -218,7 +278,17 @@ IMPORTANT: Return ONLY valid JSON following this exact structure. No explanation
                 text = page.extract_text()
                 if text:
                     text_parts.append(text)
-        return "\n".join(text_parts)
+        return self._join_pages(text_parts)
+    
+    def _join_pages(self, pages: List[Optional[str]]) -> str:
+        """Join extracted page texts, stripping repeated headers and footers."""
+        if not self.remove_boilerplate:
+            return "\n".join(page or "" for page in pages)
+        
+        text, self.boilerplate_report = strip_boilerplate(pages)
+        if self.boilerplate_report.lines_removed:
+            print(f"🧹 {self.boilerplate_report.summary()}")
+        return text
     
     def _create_structured_prompt(self, raw_content: str) -> SceneStructure:
         """
@@ -234,10 +304,28 @@ IMPORTANT: Return ONLY valid JSON following this exact structure. No explanation
             chat = self.llm.create_chat()
             
             # Create messages for the chat
-            messages = [
-                ("system", self.system_prompt),
-                ("user", f"Analyze the following content and create a structured scene description:\n\n{raw_content}")
-            ]
+            messages = self._build_messages(raw_content)
+            
+            # Fast path: let the provider enforce the schema
+            if self.use_structured_output:
+                try:
+                    structured_chat = self.llm.create_structured_chat(SCENE_STRUCTURE_SCHEMA)
+                except (NotImplementedError, ValueError) as e:
+                    print(f"Structured output unavailable ({e}), falling back to JSON prompting")
+                    self.use_structured_output = False
+                else:
+                    try:
+                        response = structured_chat.invoke(messages)
+                    except Exception as e:
+                        # Rate limits, timeouts and network errors are not a verdict on the schema
+                        if self._structured_output_verified or not is_schema_rejection(e):
+                            raise
+                        # Some providers only reject the schema once the request is made
+                        print(f"Structured output request failed ({e}), falling back to JSON prompting")
+                        self.use_structured_output = False
+                    else:
+                        self._structured_output_verified = True
+                        return self._parse_structured_response(response)
             
             # Invoke the LLM
             response = chat.invoke(messages)
@@ -270,7 +358,7 @@ IMPORTANT: Return ONLY valid JSON following this exact structure. No explanation
             # Parse JSON and create SceneStructure
             try:
                 scene_data = json.loads(json_str)
-                scene_structure = SceneStructure.from_dict(scene_data)
+                scene_structure = SceneStructure.from_dict(scene_data, validate=True)
                 return scene_structure
             except json.JSONDecodeError as e:
                 raise ValueError(f"Failed to parse JSON response from Gemini API: {str(e)}\nResponse: {json_str[:500]}...") from e
@@ -279,6 +367,83 @@ IMPORTANT: Return ONLY valid JSON following this exact structure. No explanation
             
         except Exception as e:
             raise RuntimeError(f"Failed to create structured prompt using Gemini API: {str(e)}") from e
+    
+    def _create_structured_prompt_streaming(self,
+                                            raw_content: str,
+                                            on_object: Optional[Callable[[SceneObject], None]],
+                                            on_animation: Optional[Callable[[AnimationStep], None]],
+                                            max_attempts: int) -> SceneStructure:
+        """
+        Streaming variant of _create_structured_prompt.
+        
+        Args:
+            raw_content: Raw text content to be structured
+            on_object: Callback for completed objects
+            on_animation: Callback for completed animations
+            max_attempts: Maximum number of streamed generations to try
+            
+        Returns:
+            SceneStructure object containing the parsed scene description
+        """
+        chat = self.llm.create_chat()
+        messages = self._build_messages(raw_content)
+        last_error = None
+        
+        for attempt in range(1, max_attempts + 1):
+            parser = IncrementalSceneParser(on_object=on_object, on_animation=on_animation)
+            stream = chat.stream(messages)
+            
+            try:
+                for chunk in stream:
+                    parser.feed(self._chunk_text(chunk))
+                return parser.close()
+            except StreamingParseError as e:
+                last_error = e
+                print(f"Streaming attempt {attempt}/{max_attempts} aborted: {e}")
+            except Exception as e:
+                raise RuntimeError(f"Failed to stream structured prompt using Gemini API: {str(e)}") from e
+            finally:
+                # Stop generation early when the stream is abandoned mid-way
+                if hasattr(stream, 'close'):
+                    stream.close()
+        
+        raise RuntimeError(f"Failed to stream a valid scene description after {max_attempts} attempts: {last_error}")
+    
+    def _parse_structured_response(self, scene_data) -> SceneStructure:
+        """
+        Convert a schema-constrained response straight into a SceneStructure.
+        
+        The provider has already produced parsed JSON, so no fence stripping
+        or json.loads is needed; the payload only goes through the compiled
+        schema validator.
+        
+        Args:
+            scene_data: Parsed response from the structured chat
+            
+        Returns:
+            SceneStructure object containing the parsed scene description
+        """
+        return SceneStructure.from_dict(scene_data, validate=True)
+    
+    def _build_messages(self, raw_content: str) -> list:
+        """Create the chat messages for structuring raw content."""
+        return [
+            ("system", self.system_prompt),
+            ("user", f"Analyze the following content and create a structured scene description:\n\n{raw_content}")
+        ]
+    
+    def _chunk_text(self, chunk) -> str:
+        """Extract the text from a streamed message chunk."""
+        content = chunk.content if hasattr(chunk, 'content') else chunk
+        if isinstance(content, str):
+            return content
+        if isinstance(content, list):
+            # Some providers stream content as a list of parts
+            return "".join(
+                part if isinstance(part, str) else part.get("text", "")
+                for part in content
+            )
+        return str(content)
 
 
 def process_input(input_type: str, input_data: str, api_key: Optional[str] = None) -> SceneStructure:
@@ -0,0 +1,266 @@
+"""
+Layout Module
+
+Resolves overlapping objects in a scene before code generation, so the LLM
+receives collision-free coordinates instead of the code being patched
+afterwards.
+
+Every object gets an estimated bounding box from its shape properties, or
+for text from its measured extent (see text_metrics), and a visibility interval from the
+animations that introduce and remove it. Two objects conflict when their
+boxes (plus a gap) intersect while both are on screen. At least one of
+them must be text, and a text fully inside a shape (a label in a box) is
+not a conflict. Objects that are transformed into each other never
+conflict.
+
+Conflicts are computed with NumPy broadcasting over all objects at once.
+They are resolved by a sweep from the top of the frame down: shapes stay
+where they are, and each text is pushed below (or, at the bottom of the
+frame, above) whatever it collides with, checking against all placed
+objects in one vectorized step.
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .scene_structure import SceneObject, AnimationStep, AnimationType, ObjectType, Position
+from .text_metrics import TextMetrics, default_text_metrics
+
+
+# Visible Manim frame is about 14.2 x 8 units
+FRAME_HALF_WIDTH = 7.1
+FRAME_HALF_HEIGHT = 4.0
+
+TEXT_TYPES = frozenset({ObjectType.TEXT, ObjectType.MATHTEXT, ObjectType.FORMULA})
+
+APPEAR_TYPES = frozenset({AnimationType.CREATE, AnimationType.WRITE, AnimationType.DRAW_BORDER_THEN_FILL,
+                          AnimationType.FADE_IN, AnimationType.SHOW_CREATION})
+REMOVE_TYPES = frozenset({AnimationType.FADE_OUT, AnimationType.UNCREATE})
+TRANSFORM_TYPES = frozenset({AnimationType.TRANSFORM, AnimationType.REPLACE_TRANSFORM})
+
+
+@dataclass
+class LayoutReport:
+    """Outcome of solving one scene's layout."""
+    positions: Dict[str, Position] = field(default_factory=dict)
+    moved: List[str] = field(default_factory=list)
+    overlaps_before: int = 0
+    overlaps_after: int = 0
+    
+    def summary(self) -> str:
+        """Human-readable summary of the changes."""
+        return (f"Layout: {self.overlaps_before} overlap(s) before, {self.overlaps_after} after; "
+                f"moved {len(self.moved)} object(s)")
+
+
+@dataclass
+class _Boxes:
+    """Per-solve arrays (kept off the solver so one solver can be shared across threads)."""
+    w: np.ndarray
+    h: np.ndarray
+    text: np.ndarray
+    start: np.ndarray
+    end: np.ndarray
+    allowed: np.ndarray
+
+
+class LayoutSolver:
+    """Overlap detection and resolution on SceneObject positions."""
+    
+    def __init__(self,
+                 gap: float = 0.25,
+                 margin: float = 0.5,
+                 max_text_width: float = 12.0,
+                 default_font_size: float = 36.0,
+                 text_metrics: Optional[TextMetrics] = None):
+        """
+        Initialize the solver.
+
+        Args:
+            gap: Minimum free space between conflicting boxes
+            margin: Distance kept from the frame edges
+            max_text_width: Widest text (generated code caps text with set_max_width)
+            default_font_size: Font size assumed when a text does not set one
+            text_metrics: Measures text extents (the shared instance if None)
+        """
+        self.gap = gap
+        self.margin = margin
+        self.max_text_width = max_text_width
+        self.default_font_size = default_font_size
+        self.text_metrics = text_metrics or default_text_metrics()
+    
+    def estimate_size(self, obj: SceneObject) -> Tuple[float, float]:
+        """
+        Estimated (width, height) of an object in Manim units.
+
+        Args:
+            obj: Scene object
+
+        Returns:
+            Bounding box size
+        """
+        props = obj.properties or {}
+        if obj.type in TEXT_TYPES:
+            font_size = props.get("font_size") or (obj.size if obj.size and obj.size >= 8 else self.default_font_size)
+            kind = "text" if obj.type == ObjectType.TEXT else "math"
+            width, height = self.text_metrics.measure(obj.text_content or "", float(font_size), kind)
+            if width > self.max_text_width:
+                height *= self.max_text_width / width
+                width = self.max_text_width
+            return width, height
+        
+        size = float(obj.size) if obj.size else None
+        if obj.type == ObjectType.CIRCLE:
+            diameter = 2 * float(props.get("radius", size or 1.0))
+            return diameter, diameter
+        if obj.type == ObjectType.SQUARE:
+            side = float(props.get("side_length", size or 2.0))
+            return side, side
+        if obj.type == ObjectType.RECTANGLE:
+            return float(props.get("width", 4.0)), float(props.get("height", 2.0))
+        if obj.type in (ObjectType.LINE, ObjectType.ARROW):
+            start, end = props.get("start"), props.get("end")
+            if isinstance(start, list) and isinstance(end, list) and len(start) >= 2 and len(end) >= 2:
+                return max(abs(end[0] - start[0]), 0.2), max(abs(end[1] - start[1]), 0.2)
+            return size or 2.0, 0.2
+        if obj.type == ObjectType.AXES:
+            return float(props.get("x_length", 10.0)), float(props.get("y_length", 6.0))
+        if obj.type == ObjectType.GRAPH:
+            return 6.0, 4.0
+        side = size or (3.0 if obj.type == ObjectType.IMAGE else 2.0)
+        return side, side
+    
+    def solve(self, objects: Sequence[SceneObject], animations: Sequence[AnimationStep]) -> LayoutReport:
+        """
+        Compute collision-free positions.
+
+        Args:
+            objects: Scene objects with their requested positions
+            animations: Scene animations (for visibility intervals and transform pairs)
+
+        Returns:
+            LayoutReport with a position for every object
+        """
+        report = LayoutReport()
+        count = len(objects)
+        if not count:
+            return report
+        
+        index = {obj.id: i for i, obj in enumerate(objects)}
+        sizes = np.array([self.estimate_size(obj) for obj in objects], dtype=float).reshape(count, 2)
+        text = np.array([obj.type in TEXT_TYPES for obj in objects])
+        active = np.array([obj.type != ObjectType.GROUP for obj in objects])
+        start, end = self._visibility(objects, animations, index)
+        
+        # Pairs that never conflict: groups, and objects transformed into each other
+        allowed = active[:, None] & active[None, :] & (text[:, None] | text[None, :])
+        np.fill_diagonal(allowed, False)
+        for anim in animations:
+            if anim.type in TRANSFORM_TYPES and anim.from_object in index and anim.to_object in index:
+                i, j = index[anim.from_object], index[anim.to_object]
+                allowed[i, j] = allowed[j, i] = False
+        boxes = _Boxes(sizes[:, 0], sizes[:, 1], text, start, end, allowed)
+        
+        requested = np.array([[obj.position.x, obj.position.y] for obj in objects], dtype=float)
+        report.overlaps_before = int(np.triu(self._conflicts(boxes, requested[:, 0], requested[:, 1])).sum())
+        
+        # Keep every box inside the frame
+        half_w = np.maximum(FRAME_HALF_WIDTH - self.margin - boxes.w / 2, 0.0)
+        half_h = np.maximum(FRAME_HALF_HEIGHT - self.margin - boxes.h / 2, 0.0)
+        cx = np.clip(requested[:, 0], -half_w, half_w)
+        cy = np.clip(requested[:, 1], -half_h, half_h)
+        
+        # Sweep texts from the top of the frame down; shapes are fixed anchors
+        placed = ~text & active
+        for i in np.lexsort((cx, -cy)):
+            if not text[i]:
+                continue
+            direction = -1.0
+            for _ in range(count + 2):
+                hits = placed & self._conflict_row(boxes, i, cx, cy)
+                if not hits.any():
+                    break
+                offset = (boxes.h[hits] + boxes.h[i]) / 2 + self.gap
+                target = (cy[hits] - offset).min() if direction < 0 else (cy[hits] + offset).max()
+                if abs(target) > half_h[i]:
+                    if direction > 0:
+                        break  # no room either way; leave the overlap
+                    direction = 1.0
+                    continue
+                cy[i] = target
+            placed[i] = True
+        
+        report.overlaps_after = int(np.triu(self._conflicts(boxes, cx, cy)).sum())
+        for i, obj in enumerate(objects):
+            x, y = round(float(cx[i]), 3), round(float(cy[i]), 3)
+            if (x, y) != (obj.position.x, obj.position.y):
+                report.moved.append(obj.id)
+                report.positions[obj.id] = Position(x, y, obj.position.z)
+            else:
+                report.positions[obj.id] = obj.position
+        return report
+    
+    def _visibility(self, objects: Sequence[SceneObject], animations: Sequence[AnimationStep],
+                    index: Dict[str, int]) -> Tuple[np.ndarray, np.ndarray]:
+        """Start and end time each object is on screen (0 and inf when not animated)."""
+        start = np.full(len(objects), np.inf)
+        end = np.full(len(objects), np.inf)
+        for anim in animations:
+            finish = anim.delay + anim.duration
+            if anim.type in APPEAR_TYPES:
+                for target in anim.target_objects:
+                    if target in index:
+                        start[index[target]] = min(start[index[target]], anim.delay)
+            elif anim.type in REMOVE_TYPES:
+                for target in anim.target_objects:
+                    if target in index:
+                        end[index[target]] = min(end[index[target]], finish)
+            elif anim.type in TRANSFORM_TYPES:
+                if anim.to_object in index:
+                    start[index[anim.to_object]] = min(start[index[anim.to_object]], anim.delay)
+                if anim.type == AnimationType.REPLACE_TRANSFORM and anim.from_object in index:
+                    end[index[anim.from_object]] = min(end[index[anim.from_object]], finish)
+        start[np.isinf(start)] = 0.0
+        return start, end
+    
+    def _conflicts(self, boxes: _Boxes, cx: np.ndarray, cy: np.ndarray) -> np.ndarray:
+        """N x N matrix of conflicting pairs."""
+        w, h, text = boxes.w, boxes.h, boxes.text
+        dx = np.abs(cx[:, None] - cx[None, :])
+        dy = np.abs(cy[:, None] - cy[None, :])
+        overlap = ((dx < (w[:, None] + w[None, :]) / 2 + self.gap - 1e-9)
+                   & (dy < (h[:, None] + h[None, :]) / 2 + self.gap - 1e-9))
+        together = (boxes.start[:, None] < boxes.end[None, :]) & (boxes.start[None, :] < boxes.end[:, None])
+        # A text entirely inside a shape is a label, not a collision
+        inside = ((dx + w[:, None] / 2 <= w[None, :] / 2)
+                  & (dy + h[:, None] / 2 <= h[None, :] / 2)
+                  & text[:, None] & ~text[None, :])
+        return overlap & together & boxes.allowed & ~inside & ~inside.T
+    
+    def _conflict_row(self, boxes: _Boxes, i: int, cx: np.ndarray, cy: np.ndarray) -> np.ndarray:
+        """Objects conflicting with object i (one row of _conflicts)."""
+        w, h, text = boxes.w, boxes.h, boxes.text
+        dx = np.abs(cx - cx[i])
+        dy = np.abs(cy - cy[i])
+        overlap = (dx < (w + w[i]) / 2 + self.gap - 1e-9) & (dy < (h + h[i]) / 2 + self.gap - 1e-9)
+        together = (boxes.start < boxes.end[i]) & (boxes.start[i] < boxes.end)
+        inside_shape = (dx + w[i] / 2 <= w / 2) & (dy + h[i] / 2 <= h / 2) & ~text
+        return overlap & together & boxes.allowed[i] & ~(text[i] & inside_shape)
+
+
+def solve_layout(objects: Sequence[SceneObject], animations: Sequence[AnimationStep],
+                 solver: Optional[LayoutSolver] = None) -> LayoutReport:
+    """
+    Convenience function to resolve overlaps in a scene.
+
+    Args:
+        objects: Scene objects
+        animations: Scene animations
+        solver: Configured solver (default settings if None)
+
+    Returns:
+        LayoutReport with collision-free positions
+    """
+    return (solver or LayoutSolver()).solve(objects, animations)
@@ -9,6 +9,9 @@ import os
 import sys
 import json
 import re
+import textwrap
+import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Optional, Tuple, Any
 from dataclasses import dataclass
 from io import BytesIO
@@ -16,13 +19,15 @@ from io import BytesIO
 # Add parent directory to path to import modules
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from models.llm import LLM
+from models.llm import LLM, LLMRouter
 from .input_processor import InputProcessor
 from .scene_parser import SceneParser, CodeGenerationContext
 from .scene_structure import SceneStructure, SceneSettings, Color
+from .scene_dedup import deduplicate_scenes, DeduplicationReport
+from .chunk_dedup import ChunkDeduplicator, ChunkDedupReport
 
 
-@dataclass
+@dataclass(slots=True)
 class DocumentChunk:
     """Represents a chunk of document content."""
     id: str
@@ -33,7 +38,23 @@ class DocumentChunk:
     priority: int = 0  # For ordering scenes
 
 
-@dataclass
+@dataclass(slots=True)
+class SceneCodeResult:
+    """Outcome of generating the code for one scene."""
+    index: int
+    title: str
+    code: Optional[str] = None
+    error: Optional[str] = None
+    seconds: float = 0.0
+    duplicate_of: Optional[int] = None  # index of the identical scene whose code is reused
+    validation_errors: Optional[List[str]] = None  # set when the scene was replaced by its fallback
+    
+    @property
+    def ok(self) -> bool:
+        return self.code is not None or self.duplicate_of is not None
+
+
+@dataclass(slots=True)
 class MultiSceneStructure:
     """Contains multiple scenes that form a complete video."""
     title: str
@@ -42,23 +63,79 @@ class MultiSceneStructure:
     scenes: List[SceneStructure]
     scene_order: List[str]  # List of scene IDs in order
     transitions: Dict[str, str] = None  # Optional transition types between scenes
+    
+    def to_dict(self) -> Dict:
+        """Convert to dictionary."""
+        return {
+            "title": self.title,
+            "description": self.description,
+            "total_duration": self.total_duration,
+            "scenes": [scene.to_dict() for scene in self.scenes],
+            "scene_order": self.scene_order,
+            "transitions": self.transitions
+        }
+    
+    def to_json(self) -> str:
+        """Convert to JSON string."""
+        return json.dumps(self.to_dict(), indent=2, default=str)
+    
+    def to_bytes(self) -> bytes:
+        """Convert to the compact binary format (see scene_codec)."""
+        from .scene_codec import encode_multi_scene
+        return encode_multi_scene(self)
+    
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'MultiSceneStructure':
+        """Create MultiSceneStructure from dictionary."""
+        return cls(
+            title=data.get("title", ""),
+            description=data.get("description", ""),
+            total_duration=data.get("total_duration", 0.0),
+            scenes=[SceneStructure.from_dict(scene_data) for scene_data in data.get("scenes", [])],
+            scene_order=data.get("scene_order", []),
+            transitions=data.get("transitions")
+        )
+    
+    @classmethod
+    def from_json(cls, json_str: str) -> 'MultiSceneStructure':
+        """Create MultiSceneStructure from JSON string."""
+        return cls.from_dict(json.loads(json_str))
+    
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'MultiSceneStructure':
+        """Create MultiSceneStructure from the compact binary format."""
+        from .scene_codec import decode_multi_scene
+        return decode_multi_scene(data)
 
 
 class DocumentChunker:
     """Intelligently splits large documents into logical chunks."""
     
-    def __init__(self, api_key: Optional[str] = None, max_chunk_size: int = 2000):
+    def __init__(self, api_key: Optional[str] = None, max_chunk_size: int = 2000,
+                 dedup_threshold: Optional[float] = 0.85, dedup_mode: str = "merge",
+                 router: Optional[LLMRouter] = None):
         """
         Initialize the document chunker.
         
         Args:
             api_key: Gemini API key for intelligent chunking
             max_chunk_size: Maximum characters per chunk
+            dedup_threshold: Shingle similarity at which chunks count as
+                near-duplicates (None disables deduplication)
+            dedup_mode: "merge" folds duplicates into the first chunk, "drop" discards them
+            router: Routes chunking requests across providers instead of
+                using Gemini Flash directly; titles of size-based chunks are
+                only generated when it has chunk_titling routes (e.g. a local
+                model added with add_local_model)
         """
         self.api_key = api_key or os.getenv("GOOGLE_API_KEY")
         self.max_chunk_size = max_chunk_size
+        self.deduplicator = ChunkDeduplicator(threshold=dedup_threshold, mode=dedup_mode) if dedup_threshold is not None else None
+        self.dedup_report: Optional[ChunkDedupReport] = None
         
-        if self.api_key:
+        if router is not None:
+            self.llm = router.for_task("chunking")
+        elif self.api_key:
             self.llm = LLM(
                 provider="google_genai",
                 model_name="gemini-2.5-flash",
@@ -67,6 +144,10 @@ class DocumentChunker:
             )
         else:
             self.llm = None
+        
+        self.title_llm = None
+        if router is not None and router.routes.get("chunk_titling"):
+            self.title_llm = router.for_task("chunk_titling")
     
     def chunk_document(self, content: str, document_title: str = "") -> List[DocumentChunk]:
         """
@@ -79,15 +160,59 @@ class DocumentChunker:
         Returns:
             List of DocumentChunk objects
         """
+        chunks = None
+        
         # First try intelligent chunking with LLM
         if self.llm and len(content) > self.max_chunk_size:
             try:
-                return self._intelligent_chunking(content, document_title)
+                chunks = self._intelligent_chunking(content, document_title)
             except Exception as e:
                 print(f"Intelligent chunking failed: {e}, falling back to simple chunking")
         
         # Fallback to simple chunking
-        return self._simple_chunking(content, document_title)
+        if chunks is None:
+            # Size-based chunks only get generic titles; name them once duplicates are gone
+            return self._title_chunks(self._deduplicate(self._simple_chunking(content, document_title)))
+        
+        return self._deduplicate(chunks)
+    
+    def _deduplicate(self, chunks: List[DocumentChunk]) -> List[DocumentChunk]:
+        """Merge or drop near-duplicate chunks so each one is not turned into a scene."""
+        if self.deduplicator is None or len(chunks) < 2:
+            self.dedup_report = None
+            return chunks
+        
+        chunks, self.dedup_report = self.deduplicator.deduplicate(chunks)
+        if self.dedup_report.chunks_removed:
+            print(f"♻️ {self.dedup_report.summary()}")
+        return chunks
+    
+    def _title_chunks(self, chunks: List[DocumentChunk]) -> List[DocumentChunk]:
+        """Replace the generic titles of size-based chunks, in one batch on the titling model."""
+        if self.title_llm is None or not chunks:
+            return chunks
+        
+        requests = [
+            [
+                ("system", "Write a short, descriptive title (at most 8 words) for this section of a "
+                           "document. Reply with the title only."),
+                ("user", chunk.content[:1500])
+            ]
+            for chunk in chunks
+        ]
+        try:
+            responses = self.title_llm.batch_invoke(requests, return_exceptions=True)
+        except Exception as e:
+            print(f"Chunk titling failed: {e}, keeping generic titles")
+            return chunks
+        
+        for chunk, response in zip(chunks, responses):
+            if isinstance(response, Exception):
+                continue
+            title = (response.content if hasattr(response, 'content') else str(response)).strip().strip('"')
+            if title:
+                chunk.title = title.splitlines()[0][:80]
+        return chunks
     
     def _intelligent_chunking(self, content: str, document_title: str) -> List[DocumentChunk]:
         """Use LLM to intelligently split content into logical sections."""
@@ -228,20 +353,56 @@ Return the sections as a JSON array."""
 class MultiSceneProcessor:
     """Processes large documents into multiple coordinated scenes."""
     
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None,
+                 router: Optional[LLMRouter] = None,
+                 max_workers: int = 4,
+                 cascade: bool = False,
+                 code_cache: Optional[Any] = None,
+                 snippet_index: Optional[Any] = None,
+                 scene_validator: Optional[Any] = None):
         """
         Initialize the multi-scene processor.
         
         Args:
             api_key: Gemini API key for processing
+            router: Routes chunking, chunk titling, scene JSON and code requests
+                across providers from live latency, error-rate and budget
+                statistics (LLMRouter.add_local_model sends the cheap tasks to
+                a small local model)
+            max_workers: Scenes whose code is generated concurrently
+            cascade: Generate code with gemini-2.5-flash first and escalate to
+                gemini-2.5-pro only for scenes that fail validation (the
+                cascade calls Gemini directly, so it cannot be combined with
+                a router)
+            code_cache: CodeCache consulted before generating a scene's code;
+                scenes with the same shape reuse re-bound cached code
+            snippet_index: SnippetIndex of validated scene code used for
+                few-shot prompts (and grown with each validated scene)
+            scene_validator: CodeValidator each scene method is checked with in
+                isolation before assembly (static checks if None; pass
+                CodeValidator(dry_run=True) to also dry-run each scene)
         """
         self.api_key = api_key or os.getenv("GOOGLE_API_KEY")
-        if not self.api_key:
+        if not self.api_key and router is None:
             raise ValueError("Gemini API key is required. Set GOOGLE_API_KEY environment variable or pass api_key parameter.")
+        if cascade and router is not None:
+            raise ValueError("cascade and router cannot be combined; the cascade's Gemini tiers would bypass the router")
         
-        self.chunker = DocumentChunker(api_key=self.api_key)
-        self.processor = InputProcessor(api_key=self.api_key)
+        self.router = router
+        self.chunker = DocumentChunker(api_key=self.api_key, router=router)
+        self.processor = InputProcessor(api_key=self.api_key, router=router)
         self.parser = SceneParser()
+        
+        self.max_workers = max_workers
+        self.cascade = cascade
+        self.code_cascade = None  # CodeGenerationCascade of the most recent run
+        self.code_cache = code_cache
+        self.snippet_index = snippet_index
+        self.scene_validator = scene_validator
+        
+        # Reports from the most recent generate_combined_code call
+        self.dedup_report: Optional[DeduplicationReport] = None
+        self.code_results: List[SceneCodeResult] = []
     
     def process_combined_input(self, 
                              pdf_path: Optional[str] = None,
@@ -260,29 +421,7 @@ class MultiSceneProcessor:
         Returns:
             MultiSceneStructure containing all generated scenes
         """
-        # Step 1: Extract and combine content
-        combined_content = ""
-        
-        if pdf_path or pdf_bytes:
-            if pdf_path:
-                pdf_text = self.processor._extract_text_from_pdf(pdf_path)
-            else:
-                pdf_text = self.processor._extract_text_from_pdf_bytes(pdf_bytes)
-            combined_content += pdf_text
-        
-        if text_input:
-            if combined_content:
-                combined_content += f"\n\n--- Additional Instructions ---\n{text_input}"
-            else:
-                combined_content = text_input
-        
-        if not combined_content.strip():
-            raise ValueError("No content provided (PDF and text input are both empty)")
-        
-        # Step 2: Split into logical chunks
-        print(f"Splitting document into chunks (total length: {len(combined_content)} chars)")
-        chunks = self.chunker.chunk_document(combined_content, document_title)
-        print(f"Created {len(chunks)} chunks")
+        chunks = self._load_chunks(pdf_path, pdf_bytes, text_input, document_title)
         
         # Step 3: Process each chunk into a scene
         scenes = []
@@ -293,15 +432,7 @@ class MultiSceneProcessor:
             print(f"Processing chunk {i+1}/{len(chunks)}: {chunk.title}")
             
             try:
-                # Create enhanced content with context
-                enhanced_content = f"Title: {chunk.title}\n\nContent: {chunk.content}"
-                if i > 0:
-                    enhanced_content = f"This is part {i+1} of a {len(chunks)}-part series. " + enhanced_content
-                
-                # Add instruction to create a simpler scene for multi-scene video
-                enhanced_content += "\n\nNote: Create a focused, concise scene suitable for a multi-part video. Keep it simple and clear."
-                
-                scene = self.processor.process_text_input(enhanced_content)
+                scene = self.processor.process_text_input(self._chunk_prompt(chunk, i, len(chunks)))
                 
                 # Update scene metadata
                 scene.settings.title = chunk.title
@@ -336,49 +467,220 @@ class MultiSceneProcessor:
         
         return multi_scene
     
-    def generate_combined_code(self, multi_scene: MultiSceneStructure) -> str:
+    def generate_code_direct(self,
+                             pdf_path: Optional[str] = None,
+                             pdf_bytes: Optional[BytesIO] = None,
+                             text_input: str = "",
+                             document_title: str = "") -> Tuple[str, MultiSceneStructure]:
         """
-        Generate Manim code that combines multiple scenes into one video.
+        Generate combined Manim code with one LLM call per chunk.
+        
+        Skips the scene JSON stage: each chunk goes straight to code, and
+        the SceneStructure of every scene is recovered from its code by
+        the AST extractor for the returned MultiSceneStructure (durations
+        and statistics). There is no structure before the call to key on,
+        so scene deduplication and the code cache do not apply here.
         
         Args:
-            multi_scene: MultiSceneStructure containing all scenes
+            pdf_path: Path to PDF file
+            pdf_bytes: PDF file as BytesIO object
+            text_input: Additional text input
+            document_title: Title for the document
             
         Returns:
-            Combined Manim Python code
+            Tuple of (combined Manim code, MultiSceneStructure extracted from the code)
         """
-        from code_generation.manim_code_generator import ManimCodeGenerator
+        from code_generation.scene_extractor import SceneExtractionError, extract_scene_structure
         
-        generator = ManimCodeGenerator(api_key=self.api_key)
+        chunks = self._load_chunks(pdf_path, pdf_bytes, text_input, document_title)
+        generator = self._code_generator()
+        try:
+            results = self._run_generation(
+                [chunk.title for chunk in chunks],
+                lambda index: generator.generate_code_from_content(
+                    self._chunk_prompt(chunks[index], index, len(chunks)), title=chunks[index].title)
+            )
+            
+            scenes = []
+            for i, (chunk, result) in enumerate(zip(chunks, results)):
+                description = f"Part {i+1} of {len(chunks)}: {chunk.title}"
+                scene = None
+                if result.ok:
+                    try:
+                        scene = extract_scene_structure(result.code, chunk.title, description)
+                    except SceneExtractionError as e:
+                        print(f"⚠️ Could not summarize scene {i+1}: {e}")
+                if scene is None:
+                    scene = SceneStructure(settings=SceneSettings(title=chunk.title, description=description))
+                scene.settings.duration = max(scene.settings.duration, 3.0)  # Minimum 3 seconds per scene
+                scenes.append(scene)
+            
+            if not any(result.ok for result in results):
+                raise RuntimeError("Failed to generate any scenes from the provided content")
+            
+            multi_scene = MultiSceneStructure(
+                title=document_title or "Generated Video",
+                description=f"Multi-scene video with {len(scenes)} parts",
+                total_duration=sum(scene.settings.duration for scene in scenes),
+                scenes=scenes,
+                scene_order=[chunk.id for chunk in chunks]
+            )
+            contexts = [self.parser.parse(scene) for scene in scenes]
+            combined_code = self._create_combined_scene_code(multi_scene, contexts, generator, results=results,
+                                                             chunks=chunks)
+            
+            return combined_code, multi_scene
+        finally:
+            generator.close()
+    
+    def _code_generator(self):
+        """Code generator for one run: a model cascade or a single generator, behind the code cache if set."""
+        if self.cascade:
+            from code_generation.code_cascade import CodeGenerationCascade
+            self.code_cascade = CodeGenerationCascade.from_models(api_key=self.api_key,
+                                                                  snippet_index=self.snippet_index)
+            generator = self.code_cascade
+        else:
+            from code_generation.manim_code_generator import ManimCodeGenerator
+            self.code_cascade = None
+            generator = ManimCodeGenerator(api_key=self.api_key, router=self.router,
+                                           snippet_index=self.snippet_index)
         
-        # Generate code for each individual scene
-        scene_contexts = []
-        for scene in multi_scene.scenes:
-            context = self.parser.parse(scene)
-            scene_contexts.append(context)
+        if self.code_cache is not None:
+            from code_generation.code_cache import CachedCodeGenerator
+            return CachedCodeGenerator(generator, self.code_cache, validator=self.scene_validator)
+        return generator
+    
+    def _load_chunks(self,
+                     pdf_path: Optional[str],
+                     pdf_bytes: Optional[BytesIO],
+                     text_input: str,
+                     document_title: str) -> List[DocumentChunk]:
+        """Extract and combine the PDF and text input, then split it into chunks."""
+        # Step 1: Extract and combine content
+        combined_content = ""
         
-        # Create combined scene code
-        combined_code = self._create_combined_scene_code(multi_scene, scene_contexts, generator)
+        if pdf_path or pdf_bytes:
+            if pdf_path:
+                pdf_text = self.processor._extract_text_from_pdf(pdf_path)
+            else:
+                pdf_text = self.processor._extract_text_from_pdf_bytes(pdf_bytes)
+            combined_content += pdf_text
         
-        return combined_code
+        if text_input:
+            if combined_content:
+                combined_content += f"\n\n--- Additional Instructions ---\n{text_input}"
+            else:
+                combined_content = text_input
+        
+        if not combined_content.strip():
+            raise ValueError("No content provided (PDF and text input are both empty)")
+        
+        # Step 2: Split into logical chunks
+        print(f"Splitting document into chunks (total length: {len(combined_content)} chars)")
+        chunks = self.chunker.chunk_document(combined_content, document_title)
+        print(f"Created {len(chunks)} chunks")
+        
+        return chunks
+    
+    def _chunk_prompt(self, chunk: DocumentChunk, index: int, total: int) -> str:
+        """Chunk content with its position in the series, as sent to the scene or code LLM."""
+        # Create enhanced content with context
+        enhanced_content = f"Title: {chunk.title}\n\nContent: {chunk.content}"
+        if index > 0:
+            enhanced_content = f"This is part {index+1} of a {total}-part series. " + enhanced_content
+        
+        # Add instruction to create a simpler scene for multi-scene video
+        enhanced_content += "\n\nNote: Create a focused, concise scene suitable for a multi-part video. Keep it simple and clear."
+        return enhanced_content
+    
+    def generate_combined_code(self, multi_scene: MultiSceneStructure) -> str:
+        """
+        Generate Manim code that combines multiple scenes into one video.
+        
+        Args:
+            multi_scene: MultiSceneStructure containing all scenes
+            
+        Returns:
+            Combined Manim Python code
+        """
+        generator = self._code_generator()
+        try:
+            # Generate code for each individual scene
+            scene_contexts = []
+            for scene in multi_scene.scenes:
+                context = self.parser.parse(scene)
+                scene_contexts.append(context)
+            
+            # Structurally identical scenes share the code of the first occurrence
+            self.dedup_report = deduplicate_scenes(multi_scene.scenes)
+            
+            # Create combined scene code
+            combined_code = self._create_combined_scene_code(multi_scene, scene_contexts, generator,
+                                                             self.dedup_report.duplicates)
+            print(f"Scene deduplication: {self.dedup_report.summary()}")
+            
+            return combined_code
+        finally:
+            generator.close()
     
     def _create_combined_scene_code(self, 
                                    multi_scene: MultiSceneStructure, 
                                    contexts: List[CodeGenerationContext],
-                                   generator: Any) -> str:
-        """Create Manim code that combines multiple scenes."""
+                                   generator: Any,
+                                   duplicates: Optional[Dict[int, int]] = None,
+                                   results: Optional[List[SceneCodeResult]] = None,
+                                   chunks: Optional[List[DocumentChunk]] = None) -> str:
+        """
+        Create Manim code that combines multiple scenes.
+        
+        Scenes listed in `duplicates` (index -> index of an identical earlier
+        scene) reuse that scene's method instead of generating new code, so
+        they also replay the same (cached) animations when rendering.
+        Code already generated per scene can be passed as `results`.
+        
+        Every generated scene method is validated in isolation before it is
+        assembled. Scenes that fail generation or validation are replaced by
+        a fallback showing their title and text (from `chunks` when given),
+        so one broken scene cannot fail the whole render.
+        """
+        duplicates = duplicates or {}
+        
+        # Generate the code of all unique scenes concurrently
+        if results is None:
+            results = self.generate_scene_codes(contexts, generator, duplicates)
+        self.code_results = results
         
         # Generate individual scene methods
         scene_methods = []
+        generated = []  # indices of scene methods built from generated code
         imports_needed = set(["from manim import *"])
         
         for i, (scene, context) in enumerate(zip(multi_scene.scenes, contexts)):
             method_name = f"scene_{i+1}"
+            result = self.code_results[i]
             
-            # Generate code for this scene
-            individual_code = generator.generate_code(context)
+            if result.duplicate_of is not None:
+                original = result.duplicate_of
+                source = self.code_results[original].code
+                rebound = self._rebind_duplicate(source, contexts[original], context) if source else None
+                if rebound is None:
+                    scene_methods.append(f'''    def {method_name}(self):
+        """Scene {i+1}: {context.scene_title} (identical to scene {original + 1})"""
+        self.scene_{original + 1}()''')
+                    if self.dedup_report is not None:
+                        self.dedup_report.record_replay(i, scene.settings.duration)
+                    continue
+                # The reused code draws the original's title or description; give this scene its own
+                result.code = rebound
+            
+            if not result.ok:
+                # Keep the video renderable: show the scene title in place of the failed scene
+                scene_methods.append(self._fallback_scene_method(i, context, chunks, "code generation failed"))
+                continue
             
             # Extract the construct method content
-            method_content = self._extract_construct_content(individual_code)
+            method_content = self._extract_construct_content(result.code)
             
             # Create scene method
             scene_method = f'''    def {method_name}(self):
@@ -393,6 +695,7 @@ class MultiSceneProcessor:
         self.wait(0.5)'''
             
             scene_methods.append(scene_method)
+            generated.append(i)
             
             # Collect imports
             if context.math_objects:
@@ -400,6 +703,14 @@ class MultiSceneProcessor:
         
         # Create the combined class with proper import formatting
         imports_str = '\n'.join(sorted(imports_needed))
+        
+        # Fail fast: check every generated scene on its own before assembling the video
+        for i, errors in self._validate_scene_methods(imports_str, scene_methods, generated).items():
+            result = self.code_results[i]
+            result.validation_errors = errors
+            print(f"✗ Scene {i + 1} failed validation, using fallback: {'; '.join(errors[:3])}")
+            scene_methods[i] = self._fallback_scene_method(i, contexts[i], chunks, "validation failed")
+        
         combined_code = f'''{imports_str}
 
 class CombinedVideo(Scene):
@@ -414,7 +725,7 @@ class CombinedVideo(Scene):
     def construct(self):
         """Main video construction with multiple scenes."""
         # Title card
-        title = Text("{multi_scene.title}", font_size=48)
+        title = Text({json.dumps(multi_scene.title)}, font_size=48)
         self.play(Write(title))
         self.wait(1)
         self.play(FadeOut(title))
@@ -431,6 +742,172 @@ class CombinedVideo(Scene):
         
         return combined_code
     
+    def _rebind_duplicate(self,
+                          code: str,
+                          original: CodeGenerationContext,
+                          duplicate: CodeGenerationContext) -> Optional[str]:
+        """
+        Code of an identical earlier scene re-bound to a duplicate's own title and description.
+        
+        Returns:
+            The re-bound code, or None if the code shows neither (the
+            original method can then be replayed as is)
+        """
+        from code_generation.code_cache import rebind_code
+        
+        rebound = code
+        for before, after in ((original.scene_title, duplicate.scene_title),
+                              (original.scene_description, duplicate.scene_description)):
+            rebound = rebind_code(rebound, {"title": before, "ids": [], "texts": []},
+                                  {"title": after, "ids": [], "texts": []}) or rebound
+        return rebound if rebound != code else None
+    
+    def _validate_scene_methods(self,
+                                imports: str,
+                                scene_methods: List[str],
+                                indices: List[int]) -> Dict[int, List[str]]:
+        """
+        Validate scene methods in isolation, up to max_workers at a time.
+        
+        Each method is turned into the same standalone scene the repair
+        loop renders (execution.scene_repair.segment_code), with the
+        combined imports, so errors in one scene cannot hide or cause
+        errors in another.
+        
+        Args:
+            imports: Import lines of the combined code
+            scene_methods: Source of every scene method, in scene order
+            indices: Scenes to validate
+            
+        Returns:
+            Validation errors of the failing scenes, by scene index
+        """
+        if not indices:
+            return {}
+        from execution.scene_repair import segment_code
+        
+        if self.scene_validator is None:
+            from code_generation.code_validator import CodeValidator
+            self.scene_validator = CodeValidator()
+        
+        def validate(index: int) -> Tuple[int, List[str]]:
+            try:
+                code = segment_code(f"{imports}\n\nclass CombinedVideo(Scene):\n{scene_methods[index]}\n",
+                                    f"scene_{index + 1}")
+            except SyntaxError as e:
+                return index, [f"SyntaxError: {e.msg} (line {e.lineno})"]
+            try:
+                return index, self.scene_validator.validate(code).errors
+            except Exception as e:
+                return index, [f"Validation error: {e}"]
+        
+        workers = max(1, min(self.max_workers, len(indices)))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            return {index: errors for index, errors in pool.map(validate, indices) if errors}
+    
+    def _fallback_scene_method(self,
+                               index: int,
+                               context: CodeGenerationContext,
+                               chunks: Optional[List[DocumentChunk]],
+                               reason: str,
+                               max_lines: int = 6) -> str:
+        """Deterministic scene method showing a scene's title and text, used in place of broken code."""
+        chunk = chunks[index] if chunks and index < len(chunks) else None
+        title = chunk.title if chunk else context.scene_title
+        if chunk:
+            text = chunk.content
+        else:
+            text = " ".join(obj.text_content for obj in context.text_objects if obj.text_content)
+            text = text or context.scene_description
+        
+        lines = textwrap.wrap(" ".join(text.split()), width=60)
+        if len(lines) > max_lines:
+            lines = lines[:max_lines - 1] + [lines[max_lines - 1].rstrip() + " ..."]
+        
+        method = [
+            f"    def scene_{index + 1}(self):",
+            f"        \"\"\"Scene {index + 1} ({reason})\"\"\"",
+            "        self.clear()",
+            f"        heading = Text({json.dumps(title or f'Part {index + 1}')}, font_size=36)",
+            "        heading.set_max_width(11)",
+            "        heading.to_edge(UP)",
+            "        self.play(FadeIn(heading))",
+        ]
+        if lines:
+            method += [
+                f"        body = Text({json.dumps(chr(10).join(lines))}, font_size=24)",
+                "        body.set_max_width(12)",
+                "        body.next_to(heading, DOWN, buff=0.5)",
+                "        self.play(FadeIn(body))",
+            ]
+        method.append(f"        self.wait({max(context.total_duration - 1.0, 1.0)})")
+        return "\n".join(method)
+    
+    def generate_scene_codes(self,
+                             contexts: List[CodeGenerationContext],
+                             generator: Any,
+                             duplicates: Optional[Dict[int, int]] = None) -> List[SceneCodeResult]:
+        """
+        Generate the code of every scene, up to max_workers at a time.
+        
+        Failures are captured per scene instead of aborting the others.
+        
+        Args:
+            contexts: Parsed scenes in playback order
+            generator: Object with generate_code(context) -> str
+            duplicates: Scene index -> index of an identical earlier scene;
+                these scenes are not generated
+            
+        Returns:
+            One SceneCodeResult per scene, in scene order
+        """
+        return self._run_generation(
+            [context.scene_title for context in contexts],
+            lambda index: generator.generate_code(contexts[index]),
+            duplicates
+        )
+    
+    def _run_generation(self,
+                        titles: List[str],
+                        generate_code: Any,
+                        duplicates: Optional[Dict[int, int]] = None) -> List[SceneCodeResult]:
+        """Call generate_code(index) for every non-duplicate scene on a bounded thread pool."""
+        duplicates = duplicates or {}
+        results: List[Optional[SceneCodeResult]] = [None] * len(titles)
+        for index, original in duplicates.items():
+            results[index] = SceneCodeResult(index, titles[index], duplicate_of=original)
+        
+        def generate(index: int) -> SceneCodeResult:
+            start = time.perf_counter()
+            try:
+                code = generate_code(index)
+            except Exception as e:
+                return SceneCodeResult(index, titles[index], error=str(e),
+                                       seconds=time.perf_counter() - start)
+            return SceneCodeResult(index, titles[index], code=code,
+                                   seconds=time.perf_counter() - start)
+        
+        pending = [index for index in range(len(titles)) if results[index] is None]
+        workers = max(1, min(self.max_workers, len(pending)))
+        print(f"Generating code for {len(pending)} scene(s) with {workers} worker(s)")
+        
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for result in pool.map(generate, pending):
+                results[result.index] = result
+                if result.ok:
+                    print(f"✓ Generated code for scene {result.index + 1}: {result.title} ({result.seconds:.1f}s)")
+                else:
+                    print(f"✗ Code generation failed for scene {result.index + 1}: {result.error}")
+        
+        if self.code_cascade is not None:
+            print(f"Model cascade: {self.code_cascade.summary()}")
+        if self.code_cache is not None:
+            print(f"Code cache: {self.code_cache.stats.summary()}")
+        if self.snippet_index is not None:
+            print(f"Few-shot snippets: {self.snippet_index.summary()}")
+        
+        return results
+    
     def _extract_construct_content(self, manim_code: str) -> str:
         """Extract content from construct method of generated code."""
         lines = manim_code.split('\n')
@@ -531,7 +1008,8 @@ def process_large_document(pdf_path: Optional[str] = None,
                           pdf_bytes: Optional[BytesIO] = None,
                           text_input: str = "",
                           document_title: str = "",
-                          api_key: Optional[str] = None) -> Tuple[MultiSceneStructure, str]:
+                          api_key: Optional[str] = None,
+                          direct: bool = False) -> Tuple[MultiSceneStructure, str]:
     """
     Convenience function to process a large document into a multi-scene video.
     
@@ -541,12 +1019,23 @@ def process_large_document(pdf_path: Optional[str] = None,
         text_input: Additional text instructions
         document_title: Title for the document
         api_key: Gemini API key
+        direct: Generate code straight from the chunks (one LLM call per scene
+            instead of two); the scenes are then recovered from the code
         
     Returns:
         Tuple of (MultiSceneStructure, generated_manim_code)
     """
     processor = MultiSceneProcessor(api_key=api_key)
     
+    if direct:
+        combined_code, multi_scene = processor.generate_code_direct(
+            pdf_path=pdf_path,
+            pdf_bytes=pdf_bytes,
+            text_input=text_input,
+            document_title=document_title
+        )
+        return multi_scene, combined_code
+    
     # Process into multiple scenes
     multi_scene = processor.process_combined_input(
         pdf_path=pdf_path,
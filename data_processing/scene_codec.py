@@ -0,0 +1,439 @@
+"""
+Scene Codec Module
+
+Compact binary serialization for SceneStructure and MultiSceneStructure.
+
+Payloads use the MessagePack wire format. Records are positional arrays
+rather than keyed maps, and enum members are stored as the stable integer
+codes of scene_structure's OBJECT_TYPE_CODES and ANIMATION_TYPE_CODES.
+Every payload starts with a header: a magic string, the schema version and
+a kind byte. Multi-scene files store each scene as its own length-prefixed
+record, so MultiSceneReader can stream scenes from a file one at a time
+without loading the whole course.
+
+The `msgpack` package is used when installed (`pip install .[codec]`);
+otherwise a pure-Python encoder/decoder for the same format is used. On
+the 2,000-scene course of benchmarks/bench_scene_codec.py the payload is
+about 17% of the JSON size with either backend. With msgpack, encoding is
+about 11x and decoding about 1.7x faster than the JSON path; the
+pure-Python fallback encodes 2-4x faster but decodes at roughly JSON speed
+(0.8-1.2x across runs).
+"""
+
+import struct
+from io import BytesIO
+from typing import Any, BinaryIO, Iterator, List, Optional
+
+from .scene_structure import (
+    SceneStructure, SceneObject, AnimationStep, SceneSettings, Position, Color,
+    OBJECT_TYPE_CODES, ANIMATION_TYPE_CODES, OBJECT_TYPES, ANIMATION_TYPES
+)
+from .multi_scene_processor import MultiSceneStructure
+
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
+
+
+MAGIC = b"EVZ"
+SCHEMA_VERSION = 1  # record layout; enum codes follow scene_structure.TYPE_CODES_VERSION 1
+
+KIND_SCENE = ord("S")
+KIND_MULTI_SCENE = ord("M")
+
+_HEADER = struct.Struct(">3sBB")
+_RECORD_LENGTH = struct.Struct(">I")
+
+
+class SceneCodecError(ValueError):
+    """Raised when a payload is not a valid encoded scene."""
+    pass
+
+
+# MessagePack subset (nil, bool, int, float64, str, array, map)
+
+def _pack(obj: Any, out: List[bytes]):
+    """Append the MessagePack encoding of obj to out."""
+    if obj is None:
+        out.append(b"\xc0")
+    elif obj is True:
+        out.append(b"\xc3")
+    elif obj is False:
+        out.append(b"\xc2")
+    elif isinstance(obj, int):
+        if 0 <= obj < 0x80:
+            out.append(struct.pack("B", obj))
+        elif -32 <= obj < 0:
+            out.append(struct.pack("b", obj))
+        elif 0 <= obj <= 0xFFFFFFFF:
+            out.append(struct.pack(">BI", 0xCE, obj))
+        elif -0x80000000 <= obj < 0:
+            out.append(struct.pack(">Bi", 0xD2, obj))
+        else:
+            out.append(struct.pack(">Bq", 0xD3, obj))
+    elif isinstance(obj, float):
+        out.append(struct.pack(">Bd", 0xCB, obj))
+    elif isinstance(obj, str):
+        data = obj.encode("utf-8")
+        n = len(data)
+        if n < 32:
+            out.append(struct.pack("B", 0xA0 | n))
+        elif n <= 0xFF:
+            out.append(struct.pack("BB", 0xD9, n))
+        elif n <= 0xFFFF:
+            out.append(struct.pack(">BH", 0xDA, n))
+        else:
+            out.append(struct.pack(">BI", 0xDB, n))
+        out.append(data)
+    elif isinstance(obj, (list, tuple)):
+        n = len(obj)
+        if n < 16:
+            out.append(struct.pack("B", 0x90 | n))
+        elif n <= 0xFFFF:
+            out.append(struct.pack(">BH", 0xDC, n))
+        else:
+            out.append(struct.pack(">BI", 0xDD, n))
+        for item in obj:
+            _pack(item, out)
+    elif isinstance(obj, dict):
+        n = len(obj)
+        if n < 16:
+            out.append(struct.pack("B", 0x80 | n))
+        elif n <= 0xFFFF:
+            out.append(struct.pack(">BH", 0xDE, n))
+        else:
+            out.append(struct.pack(">BI", 0xDF, n))
+        for key, value in obj.items():
+            _pack(key, out)
+            _pack(value, out)
+    else:
+        raise SceneCodecError(f"Cannot encode value of type {type(obj).__name__}")
+
+
+def _unpack(data: bytes, pos: int):
+    """Decode one value starting at pos; returns (value, new_pos)."""
+    b = data[pos]
+    pos += 1
+    if b < 0x80:
+        return b, pos
+    if b >= 0xE0:
+        return b - 0x100, pos
+    if 0xA0 <= b <= 0xBF:
+        n = b & 0x1F
+        return data[pos:pos + n].decode("utf-8"), pos + n
+    if 0x90 <= b <= 0x9F:
+        return _unpack_array(data, pos, b & 0x0F)
+    if 0x80 <= b <= 0x8F:
+        return _unpack_map(data, pos, b & 0x0F)
+    if b == 0xC0:
+        return None, pos
+    if b == 0xC2:
+        return False, pos
+    if b == 0xC3:
+        return True, pos
+    if b == 0xCB:
+        return struct.unpack_from(">d", data, pos)[0], pos + 8
+    if b == 0xCA:
+        return struct.unpack_from(">f", data, pos)[0], pos + 4
+    if b in _INT_FORMATS:
+        fmt, size = _INT_FORMATS[b]
+        return struct.unpack_from(fmt, data, pos)[0], pos + size
+    if b in (0xD9, 0xDA, 0xDB):
+        fmt, size = _LENGTH_FORMATS[b]
+        n = struct.unpack_from(fmt, data, pos)[0]
+        pos += size
+        return data[pos:pos + n].decode("utf-8"), pos + n
+    if b in (0xDC, 0xDD):
+        fmt, size = _LENGTH_FORMATS[b]
+        return _unpack_array(data, pos + size, struct.unpack_from(fmt, data, pos)[0])
+    if b in (0xDE, 0xDF):
+        fmt, size = _LENGTH_FORMATS[b]
+        return _unpack_map(data, pos + size, struct.unpack_from(fmt, data, pos)[0])
+    raise SceneCodecError(f"Unsupported MessagePack type byte 0x{b:02x}")
+
+
+def _unpack_array(data: bytes, pos: int, n: int):
+    items = []
+    for _ in range(n):
+        item, pos = _unpack(data, pos)
+        items.append(item)
+    return items, pos
+
+
+def _unpack_map(data: bytes, pos: int, n: int):
+    result = {}
+    for _ in range(n):
+        key, pos = _unpack(data, pos)
+        value, pos = _unpack(data, pos)
+        result[key] = value
+    return result, pos
+
+
+_INT_FORMATS = {
+    0xCC: (">B", 1), 0xCD: (">H", 2), 0xCE: (">I", 4), 0xCF: (">Q", 8),
+    0xD0: (">b", 1), 0xD1: (">h", 2), 0xD2: (">i", 4), 0xD3: (">q", 8),
+}
+_LENGTH_FORMATS = {
+    0xD9: (">B", 1), 0xDA: (">H", 2), 0xDB: (">I", 4),
+    0xDC: (">H", 2), 0xDD: (">I", 4),
+    0xDE: (">H", 2), 0xDF: (">I", 4),
+}
+
+
+def packb(obj: Any) -> bytes:
+    """Encode a value as MessagePack."""
+    if MSGPACK_AVAILABLE:
+        return msgpack.packb(obj, use_bin_type=True)
+    out: List[bytes] = []
+    _pack(obj, out)
+    return b"".join(out)
+
+
+def unpackb(data: bytes) -> Any:
+    """Decode a single MessagePack value."""
+    if MSGPACK_AVAILABLE:
+        try:
+            return msgpack.unpackb(data, raw=False)
+        except ValueError as e:
+            raise SceneCodecError(f"Truncated or corrupt payload: {str(e)}") from e
+    try:
+        value, pos = _unpack(data, 0)
+    except (IndexError, struct.error, UnicodeDecodeError) as e:
+        raise SceneCodecError(f"Truncated or corrupt payload: {str(e)}") from e
+    if pos != len(data):
+        raise SceneCodecError(f"Trailing data after payload ({len(data) - pos} bytes)")
+    return value
+
+
+# Scene records
+
+def _position_record(position: Optional[Position]):
+    return None if position is None else (position.x, position.y, position.z)
+
+
+def _color_record(color: Optional[Color]):
+    return None if color is None else (color.name, color.hex, color.rgb)
+
+
+def _position_from_record(record) -> Optional[Position]:
+    return None if record is None else Position.from_list(record)
+
+
+def _color_from_record(record) -> Optional[Color]:
+    if record is None:
+        return None
+    return Color.from_dict({"name": record[0], "hex": record[1], "rgb": record[2]})
+
+
+def _member(members: list, code: int):
+    """Enum member for a type code (rejecting codes outside the table)."""
+    if not isinstance(code, int) or not 0 <= code < len(members):
+        raise ValueError(f"unknown type code {code!r}")
+    return members[code]
+
+
+def scene_to_record(scene: SceneStructure) -> list:
+    """Convert a SceneStructure into its positional record."""
+    settings = scene.settings
+    return [
+        [
+            settings.title, settings.description, settings.duration,
+            _color_record(settings.background_color), _position_record(settings.camera_position),
+            settings.quality, settings.resolution
+        ],
+        [
+            [
+                obj.id, OBJECT_TYPE_CODES[obj.type], obj.properties, _position_record(obj.position),
+                _color_record(obj.color), obj.text_content, obj.size, obj.opacity, obj.layer
+            ]
+            for obj in scene.objects
+        ],
+        [
+            [
+                anim.id, ANIMATION_TYPE_CODES[anim.type], anim.target_objects, anim.duration, anim.delay,
+                anim.properties, anim.easing, anim.from_object, anim.to_object,
+                _position_record(anim.target_position), _position_record(anim.offset)
+            ]
+            for anim in scene.animations
+        ]
+    ]
+
+
+def scene_from_record(record: list) -> SceneStructure:
+    """Rebuild a SceneStructure from its positional record."""
+    try:
+        settings_rec, objects_rec, animations_rec = record
+        title, description, duration, bg_color, camera, quality, resolution = settings_rec
+        settings = SceneSettings(
+            title=title,
+            description=description,
+            duration=duration,
+            background_color=_color_from_record(bg_color),
+            camera_position=_position_from_record(camera),
+            quality=quality,
+            resolution=resolution
+        )
+        objects = [
+            SceneObject(
+                id=r[0], type=_member(OBJECT_TYPES, r[1]), properties=r[2], position=_position_from_record(r[3]),
+                color=_color_from_record(r[4]), text_content=r[5], size=r[6], opacity=r[7], layer=r[8]
+            )
+            for r in objects_rec
+        ]
+        animations = [
+            AnimationStep(
+                id=r[0], type=_member(ANIMATION_TYPES, r[1]), target_objects=r[2], duration=r[3], delay=r[4],
+                properties=r[5], easing=r[6], from_object=r[7], to_object=r[8],
+                target_position=_position_from_record(r[9]), offset=_position_from_record(r[10])
+            )
+            for r in animations_rec
+        ]
+    except (TypeError, ValueError, IndexError) as e:
+        raise SceneCodecError(f"Malformed scene record: {str(e)}") from e
+    return SceneStructure(settings=settings, objects=objects, animations=animations)
+
+
+def _multi_scene_header_record(multi_scene: MultiSceneStructure) -> list:
+    return [
+        multi_scene.title, multi_scene.description, multi_scene.total_duration,
+        multi_scene.scene_order, multi_scene.transitions, len(multi_scene.scenes)
+    ]
+
+
+# Public API
+
+def _header(kind: int) -> bytes:
+    return _HEADER.pack(MAGIC, SCHEMA_VERSION, kind)
+
+
+def _check_header(data: bytes, kind: int):
+    if len(data) < _HEADER.size:
+        raise SceneCodecError("Payload is too short to contain a header")
+    magic, version, found_kind = _HEADER.unpack_from(data, 0)
+    if magic != MAGIC:
+        raise SceneCodecError("Not an encoded scene payload (bad magic)")
+    if version != SCHEMA_VERSION:
+        raise SceneCodecError(f"Unsupported schema version {version} (expected {SCHEMA_VERSION})")
+    if found_kind != kind:
+        raise SceneCodecError(f"Unexpected payload kind {chr(found_kind)!r} (expected {chr(kind)!r})")
+
+
+def encode_scene(scene: SceneStructure) -> bytes:
+    """
+    Encode a single scene.
+
+    Args:
+        scene: SceneStructure to encode
+
+    Returns:
+        Versioned binary payload
+    """
+    return _header(KIND_SCENE) + packb(scene_to_record(scene))
+
+
+def decode_scene(data: bytes) -> SceneStructure:
+    """
+    Decode a payload produced by encode_scene.
+
+    Args:
+        data: Binary payload
+
+    Returns:
+        The decoded SceneStructure
+
+    Raises:
+        SceneCodecError: If the payload is corrupt or has an unsupported version
+    """
+    _check_header(data, KIND_SCENE)
+    return scene_from_record(unpackb(data[_HEADER.size:]))
+
+
+def write_multi_scene(multi_scene: MultiSceneStructure, fp: BinaryIO):
+    """
+    Write a multi-scene structure to a binary stream.
+
+    The header record is followed by one length-prefixed record per scene,
+    which lets MultiSceneReader decode scenes one at a time.
+
+    Args:
+        multi_scene: MultiSceneStructure to write
+        fp: Writable binary file object
+    """
+    fp.write(_header(KIND_MULTI_SCENE))
+    for record in [_multi_scene_header_record(multi_scene)] + [scene_to_record(s) for s in multi_scene.scenes]:
+        payload = packb(record)
+        fp.write(_RECORD_LENGTH.pack(len(payload)))
+        fp.write(payload)
+
+
+def encode_multi_scene(multi_scene: MultiSceneStructure) -> bytes:
+    """Encode a multi-scene structure to bytes."""
+    buffer = BytesIO()
+    write_multi_scene(multi_scene, buffer)
+    return buffer.getvalue()
+
+
+class MultiSceneReader:
+    """Streams scenes from a multi-scene binary file."""
+    
+    def __init__(self, fp: BinaryIO):
+        """
+        Read the file header and course metadata.
+
+        Args:
+            fp: Readable binary file object positioned at the start of the payload
+        """
+        self.fp = fp
+        _check_header(fp.read(_HEADER.size), KIND_MULTI_SCENE)
+        
+        header = self._read_record()
+        if header is None:
+            raise SceneCodecError("Missing multi-scene header record")
+        try:
+            (self.title, self.description, self.total_duration,
+             self.scene_order, self.transitions, self.scene_count) = header
+        except ValueError as e:
+            raise SceneCodecError(f"Malformed multi-scene header: {str(e)}") from e
+        self._consumed = False
+    
+    def _read_record(self):
+        prefix = self.fp.read(_RECORD_LENGTH.size)
+        if not prefix:
+            return None
+        if len(prefix) != _RECORD_LENGTH.size:
+            raise SceneCodecError("Truncated record length")
+        (length,) = _RECORD_LENGTH.unpack(prefix)
+        payload = self.fp.read(length)
+        if len(payload) != length:
+            raise SceneCodecError("Truncated scene record")
+        return unpackb(payload)
+    
+    def __iter__(self) -> Iterator[SceneStructure]:
+        """Yield scenes in file order, decoding each one lazily."""
+        if self._consumed:
+            raise SceneCodecError("MultiSceneReader can only be iterated once")
+        self._consumed = True
+        
+        for index in range(self.scene_count):
+            record = self._read_record()
+            if record is None:
+                raise SceneCodecError(f"File ended after {index} of {self.scene_count} scenes")
+            yield scene_from_record(record)
+    
+    def read_all(self) -> MultiSceneStructure:
+        """Read the remaining scenes into a MultiSceneStructure."""
+        return MultiSceneStructure(
+            title=self.title,
+            description=self.description,
+            total_duration=self.total_duration,
+            scenes=list(self),
+            scene_order=self.scene_order,
+            transitions=self.transitions
+        )
+
+
+def decode_multi_scene(data: bytes) -> MultiSceneStructure:
+    """Decode a payload produced by encode_multi_scene."""
+    return MultiSceneReader(BytesIO(data)).read_all()
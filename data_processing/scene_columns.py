@@ -0,0 +1,341 @@
+"""
+Scene Columns Module
+
+Columnar (struct-of-arrays) view over a batch of SceneStructures for
+course-wide and library-wide analytics. Objects and animations from all
+scenes are flattened into NumPy arrays: enum type codes, an Nx3 position
+array, layers, animation delays and durations, plus the index of the scene
+each row belongs to. Aggregates such as type histograms, duration
+distributions and timeline density are then computed with vectorized
+NumPy operations rather than Python loops over the scene objects.
+
+Columns can optionally be exported as Apache Arrow tables when `pyarrow`
+is installed.
+"""
+
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+
+from .scene_structure import (
+    SceneStructure, OBJECT_TYPE_CODES, ANIMATION_TYPE_CODES, OBJECT_TYPES, ANIMATION_TYPES
+)
+
+try:
+    import pyarrow as pa
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+
+class SceneColumns:
+    """Flattened NumPy columns for the objects and animations of many scenes."""
+    
+    def __init__(self,
+                 scene_titles: List[str],
+                 scene_durations: np.ndarray,
+                 object_scene: np.ndarray,
+                 object_type: np.ndarray,
+                 object_position: np.ndarray,
+                 object_layer: np.ndarray,
+                 animation_scene: np.ndarray,
+                 animation_type: np.ndarray,
+                 animation_delay: np.ndarray,
+                 animation_duration: np.ndarray):
+        """
+        Initialize from prebuilt columns; use from_scenes() to build from scenes.
+
+        Args:
+            scene_titles: Title of each scene
+            scene_durations: float64 array with one duration per scene
+            object_scene: int32 scene index of each object
+            object_type: uint8 object type code (index into OBJECT_TYPES)
+            object_position: float64 array of shape (num_objects, 3)
+            object_layer: int32 layer of each object
+            animation_scene: int32 scene index of each animation
+            animation_type: uint8 animation type code (index into ANIMATION_TYPES)
+            animation_delay: float64 start time of each animation within its scene
+            animation_duration: float64 duration of each animation
+        """
+        self.scene_titles = scene_titles
+        self.scene_durations = scene_durations
+        self.object_scene = object_scene
+        self.object_type = object_type
+        self.object_position = object_position
+        self.object_layer = object_layer
+        self.animation_scene = animation_scene
+        self.animation_type = animation_type
+        self.animation_delay = animation_delay
+        self.animation_duration = animation_duration
+    
+    @classmethod
+    def from_scenes(cls, scenes: Iterable[SceneStructure]) -> 'SceneColumns':
+        """
+        Build columns from scene structures in a single pass.
+
+        Args:
+            scenes: Scenes to flatten (e.g. multi_scene.scenes or a MultiSceneReader)
+
+        Returns:
+            SceneColumns holding every object and animation of the scenes
+        """
+        scene_titles: List[str] = []
+        scene_durations: List[float] = []
+        object_counts: List[int] = []
+        animation_counts: List[int] = []
+        object_types: List[int] = []
+        positions: List[Tuple[float, float, float]] = []
+        layers: List[int] = []
+        animation_types: List[int] = []
+        delays: List[float] = []
+        durations: List[float] = []
+        
+        object_codes = OBJECT_TYPE_CODES
+        animation_codes = ANIMATION_TYPE_CODES
+        for scene in scenes:
+            scene_titles.append(scene.settings.title)
+            scene_durations.append(scene.settings.duration)
+            object_counts.append(len(scene.objects))
+            animation_counts.append(len(scene.animations))
+            
+            for obj in scene.objects:
+                object_types.append(object_codes[obj.type])
+                position = obj.position
+                positions.append((position.x, position.y, position.z))
+                layers.append(obj.layer)
+            
+            for anim in scene.animations:
+                animation_types.append(animation_codes[anim.type])
+                delays.append(anim.delay)
+                durations.append(anim.duration)
+        
+        scene_index = np.arange(len(scene_titles), dtype=np.int32)
+        return cls(
+            scene_titles=scene_titles,
+            scene_durations=np.asarray(scene_durations, dtype=np.float64),
+            object_scene=np.repeat(scene_index, object_counts),
+            object_type=np.asarray(object_types, dtype=np.uint8),
+            object_position=np.asarray(positions, dtype=np.float64).reshape(-1, 3),
+            object_layer=np.asarray(layers, dtype=np.int32),
+            animation_scene=np.repeat(scene_index, animation_counts),
+            animation_type=np.asarray(animation_types, dtype=np.uint8),
+            animation_delay=np.asarray(delays, dtype=np.float64),
+            animation_duration=np.asarray(durations, dtype=np.float64)
+        )
+    
+    @classmethod
+    def concat(cls, parts: List['SceneColumns']) -> 'SceneColumns':
+        """
+        Concatenate column batches (e.g. one per course) into a library view.
+
+        Args:
+            parts: Column batches to combine, in order
+
+        Returns:
+            SceneColumns with scene indices renumbered across batches
+        """
+        offsets = np.cumsum([0] + [part.num_scenes for part in parts[:-1]], dtype=np.int32)
+        return cls(
+            scene_titles=[title for part in parts for title in part.scene_titles],
+            scene_durations=np.concatenate([part.scene_durations for part in parts] or [np.empty(0)]),
+            object_scene=np.concatenate(
+                [part.object_scene + offset for part, offset in zip(parts, offsets)] or [np.empty(0, np.int32)]
+            ),
+            object_type=np.concatenate([part.object_type for part in parts] or [np.empty(0, np.uint8)]),
+            object_position=np.concatenate([part.object_position for part in parts] or [np.empty((0, 3))]),
+            object_layer=np.concatenate([part.object_layer for part in parts] or [np.empty(0, np.int32)]),
+            animation_scene=np.concatenate(
+                [part.animation_scene + offset for part, offset in zip(parts, offsets)] or [np.empty(0, np.int32)]
+            ),
+            animation_type=np.concatenate([part.animation_type for part in parts] or [np.empty(0, np.uint8)]),
+            animation_delay=np.concatenate([part.animation_delay for part in parts] or [np.empty(0)]),
+            animation_duration=np.concatenate([part.animation_duration for part in parts] or [np.empty(0)])
+        )
+    
+    @property
+    def num_scenes(self) -> int:
+        return len(self.scene_titles)
+    
+    @property
+    def num_objects(self) -> int:
+        return len(self.object_type)
+    
+    @property
+    def num_animations(self) -> int:
+        return len(self.animation_type)
+    
+    @property
+    def total_duration(self) -> float:
+        return float(self.scene_durations.sum())
+    
+    def objects_per_scene(self) -> np.ndarray:
+        """Number of objects in each scene."""
+        return np.bincount(self.object_scene, minlength=self.num_scenes)
+    
+    def animations_per_scene(self) -> np.ndarray:
+        """Number of animations in each scene."""
+        return np.bincount(self.animation_scene, minlength=self.num_scenes)
+    
+    def object_type_histogram(self) -> Dict[str, int]:
+        """Count objects of each ObjectType."""
+        counts = np.bincount(self.object_type, minlength=len(OBJECT_TYPES))
+        return {t.value: int(c) for t, c in zip(OBJECT_TYPES, counts)}
+    
+    def animation_type_histogram(self) -> Dict[str, int]:
+        """Count animations of each AnimationType."""
+        counts = np.bincount(self.animation_type, minlength=len(ANIMATION_TYPES))
+        return {t.value: int(c) for t, c in zip(ANIMATION_TYPES, counts)}
+    
+    def duration_stats(self) -> Dict[str, float]:
+        """
+        Summarize the distribution of animation durations.
+
+        Returns:
+            Dictionary with count, mean, std, min, p50, p90, p99 and max
+        """
+        durations = self.animation_duration
+        if len(durations) == 0:
+            return {"count": 0}
+        p50, p90, p99 = np.percentile(durations, [50, 90, 99])
+        return {
+            "count": int(len(durations)),
+            "mean": float(durations.mean()),
+            "std": float(durations.std()),
+            "min": float(durations.min()),
+            "p50": float(p50),
+            "p90": float(p90),
+            "p99": float(p99),
+            "max": float(durations.max())
+        }
+    
+    def duration_histogram(self, bins: int = 10) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Histogram of animation durations.
+
+        Args:
+            bins: Number of equal-width bins
+
+        Returns:
+            Tuple of (counts, bin_edges) as returned by numpy.histogram
+        """
+        return np.histogram(self.animation_duration, bins=bins)
+    
+    def scene_start_times(self) -> np.ndarray:
+        """Start time of each scene when the scenes are played back to back."""
+        return np.concatenate(([0.0], np.cumsum(self.scene_durations)[:-1]))
+    
+    def timeline_density(self, bin_size: float = 0.5, course_time: bool = False) -> np.ndarray:
+        """
+        Count the animations running during each time bin.
+
+        An animation counts towards every bin its [delay, delay + duration)
+        interval overlaps. Intervals are accumulated with a difference array,
+        so the cost is linear in the number of animations plus bins.
+
+        Args:
+            bin_size: Width of each time bin in seconds
+            course_time: If True, offset each scene by its start time so the
+                result covers the whole course played back to back; otherwise
+                all scenes are overlaid on a shared scene-relative timeline
+
+        Returns:
+            int64 array with the number of active animations per bin
+        """
+        if bin_size <= 0:
+            raise ValueError("bin_size must be positive")
+        
+        starts = self.animation_delay
+        if course_time and self.num_animations:
+            starts = starts + self.scene_start_times()[self.animation_scene]
+        ends = starts + self.animation_duration
+        if len(starts) == 0:
+            return np.zeros(0, dtype=np.int64)
+        
+        start_bins = np.floor(starts / bin_size).astype(np.int64)
+        end_bins = np.maximum(np.ceil(ends / bin_size).astype(np.int64), start_bins + 1)
+        
+        deltas = np.zeros(int(end_bins.max()) + 1, dtype=np.int64)
+        np.add.at(deltas, start_bins, 1)
+        np.add.at(deltas, end_bins, -1)
+        return np.cumsum(deltas)[:-1]
+    
+    def position_extent(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Minimum and maximum object coordinates as two length-3 arrays."""
+        if self.num_objects == 0:
+            return np.zeros(3), np.zeros(3)
+        return self.object_position.min(axis=0), self.object_position.max(axis=0)
+    
+    def summary(self) -> Dict:
+        """
+        Compute the standard set of aggregates.
+
+        Returns:
+            Dictionary of scalar statistics and type histograms
+        """
+        num_scenes = max(self.num_scenes, 1)
+        total_duration = self.total_duration
+        density = self.timeline_density()
+        return {
+            "num_scenes": self.num_scenes,
+            "num_objects": self.num_objects,
+            "num_animations": self.num_animations,
+            "total_duration": total_duration,
+            "avg_scene_duration": total_duration / num_scenes,
+            "avg_objects_per_scene": self.num_objects / num_scenes,
+            "avg_animations_per_scene": self.num_animations / num_scenes,
+            "scenes_per_minute": self.num_scenes / (total_duration / 60) if total_duration else 0.0,
+            "peak_concurrent_animations": int(density.max()) if len(density) else 0,
+            "object_types": self.object_type_histogram(),
+            "animation_types": self.animation_type_histogram(),
+            "animation_durations": self.duration_stats()
+        }
+    
+    def to_arrow(self) -> Dict[str, "pa.Table"]:
+        """
+        Export the columns as Apache Arrow tables.
+
+        Returns:
+            Dictionary with "scenes", "objects" and "animations" tables. Type
+            columns are dictionary-encoded with the enum values.
+
+        Raises:
+            RuntimeError: If pyarrow is not installed
+        """
+        if not PYARROW_AVAILABLE:
+            raise RuntimeError("pyarrow is required for Arrow export. Install with: pip install pyarrow")
+        
+        object_type_values = pa.array([t.value for t in OBJECT_TYPES])
+        animation_type_values = pa.array([t.value for t in ANIMATION_TYPES])
+        return {
+            "scenes": pa.table({
+                "title": pa.array(self.scene_titles, type=pa.string()),
+                "duration": self.scene_durations
+            }),
+            "objects": pa.table({
+                "scene": self.object_scene,
+                "type": pa.DictionaryArray.from_arrays(self.object_type.astype(np.int8), object_type_values),
+                "x": self.object_position[:, 0],
+                "y": self.object_position[:, 1],
+                "z": self.object_position[:, 2],
+                "layer": self.object_layer
+            }),
+            "animations": pa.table({
+                "scene": self.animation_scene,
+                "type": pa.DictionaryArray.from_arrays(self.animation_type.astype(np.int8), animation_type_values),
+                "delay": self.animation_delay,
+                "duration": self.animation_duration
+            })
+        }
+
+
+def scene_columns(scenes: Iterable[SceneStructure]) -> SceneColumns:
+    """
+    Convenience function to build a columnar view over scenes.
+
+    Args:
+        scenes: Scenes to flatten
+
+    Returns:
+        SceneColumns for the scenes
+    """
+    return SceneColumns.from_scenes(scenes)
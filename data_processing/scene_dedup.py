@@ -0,0 +1,249 @@
+"""
+Scene Deduplication Module
+
+Canonical structural hashing for SceneStructure. Two scenes hash equal when
+they would render the same frames, regardless of how their objects are
+named: object ids are replaced by canonical names assigned from the
+objects' content, and every reference to an id (animation targets,
+from/to objects, string values in properties) is rewritten accordingly.
+Scene title and description are excluded, so a course's recurring scene
+shapes (title cards, recaps) still match. They are usually drawn by the
+generated code, though: MultiSceneProcessor re-binds a duplicate's reused
+code to its own title and description instead of replaying the original.
+
+Duplicate scenes in a course can then share one generated code body and
+one rendered segment.
+
+canonical_context is a looser, positional form of a CodeGenerationContext
+used as a code cache key: ids become positional names and text content is
+reduced to its kind and length bucket, so scenes that differ only in
+wording still share generated code.
+"""
+
+import hashlib
+import json
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from .scene_structure import SceneStructure, SceneObject, Position, Color
+from .scene_parser import CodeGenerationContext
+
+
+# Digits kept when rounding floats, so 0.30000000000000004 hashes like 0.3
+FLOAT_PRECISION = 6
+
+# Text lengths are compared in buckets of this many characters (layout depends on length, not wording)
+TEXT_LENGTH_BUCKET = 8
+
+
+@dataclass
+class DeduplicationReport:
+    """Result of deduplicating the scenes of a course."""
+    total_scenes: int
+    fingerprints: List[str]
+    duplicates: Dict[int, int] = field(default_factory=dict)  # duplicate index -> first identical index
+    # Duplicates that replay the original's method unchanged, and their duration; recorded by
+    # the caller that assembles the video (a re-bound duplicate is rendered on its own)
+    replayed: List[int] = field(default_factory=list)
+    render_seconds_saved: float = 0.0
+    
+    @property
+    def unique_scenes(self) -> int:
+        return self.total_scenes - len(self.duplicates)
+    
+    @property
+    def llm_calls_saved(self) -> int:
+        """Code generation calls skipped (one per duplicate scene)."""
+        return len(self.duplicates)
+    
+    def summary(self) -> str:
+        """Human-readable summary of the work saved."""
+        if not self.duplicates:
+            return f"No duplicate scenes among {self.total_scenes}"
+        pairs = ", ".join(f"{dup + 1}→{orig + 1}" for dup, orig in sorted(self.duplicates.items()))
+        text = (f"{len(self.duplicates)} of {self.total_scenes} scenes are duplicates ({pairs}); "
+                f"saved {self.llm_calls_saved} code generation call(s)")
+        if self.replayed:
+            text += f" and {self.render_seconds_saved:.1f}s of rendering ({len(self.replayed)} replayed)"
+        return text
+    
+    def record_replay(self, index: int, seconds: float):
+        """Record a duplicate whose video replays the original scene unchanged."""
+        self.replayed.append(index)
+        self.render_seconds_saved += seconds
+
+
+def _round(value: Any) -> Any:
+    """Normalize numbers to rounded floats so 2, 2.0 and 2.0000000001 hash alike."""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return round(float(value), FLOAT_PRECISION)
+    return value
+
+
+def _position(position: Optional[Position]) -> Optional[List[float]]:
+    if position is None:
+        return None
+    return [_round(position.x), _round(position.y), _round(position.z)]
+
+
+def _color(color: Optional[Color]) -> Optional[List[Any]]:
+    if color is None:
+        return None
+    rgb = [_round(c) for c in color.rgb] if color.rgb else None
+    return [color.name, color.hex.lower() if color.hex else None, rgb]
+
+
+def _canonical_value(value: Any, id_map: Dict[str, str]) -> Any:
+    """Round floats and rename object id references inside property values."""
+    if isinstance(value, str):
+        return id_map.get(value, value)
+    if isinstance(value, (int, float)):
+        return _round(value)
+    if isinstance(value, (list, tuple)):
+        return [_canonical_value(item, id_map) for item in value]
+    if isinstance(value, dict):
+        return {key: _canonical_value(item, id_map) for key, item in value.items()}
+    return value
+
+
+def _properties(properties: Dict, id_map: Dict[str, str]) -> str:
+    return json.dumps(_canonical_value(properties, id_map), sort_keys=True, default=str)
+
+
+def _object_signature(obj: SceneObject) -> list:
+    """Everything that defines an object's appearance, without its id."""
+    return [
+        obj.type.value, _position(obj.position), _color(obj.color), obj.text_content,
+        _round(obj.size), _round(obj.opacity), obj.layer
+    ]
+
+
+def canonical_scene(scene: SceneStructure) -> Dict:
+    """
+    Build the id-independent canonical form of a scene.
+
+    Objects are ordered by their content and renamed o0, o1, ...;
+    animations are ordered by their canonical content.
+
+    Args:
+        scene: SceneStructure to canonicalize
+
+    Returns:
+        JSON-serializable canonical dictionary
+    """
+    # Order objects by content; id references inside properties are masked so names cannot affect the order
+    masked = {obj.id: "<ref>" for obj in scene.objects}
+    keyed = [
+        (json.dumps(_object_signature(obj) + [_properties(obj.properties, masked)], default=str), index)
+        for index, obj in enumerate(scene.objects)
+    ]
+    order = [index for _, index in sorted(keyed)]
+    id_map = {scene.objects[index].id: f"o{rank}" for rank, index in enumerate(order)}
+    
+    objects = [
+        _object_signature(scene.objects[index]) + [_properties(scene.objects[index].properties, id_map)]
+        for index in order
+    ]
+    
+    animations = []
+    for anim in scene.animations:
+        animations.append([
+            _round(anim.delay), anim.type.value,
+            [id_map.get(target, target) for target in anim.target_objects],
+            _round(anim.duration), anim.easing,
+            id_map.get(anim.from_object, anim.from_object),
+            id_map.get(anim.to_object, anim.to_object),
+            _position(anim.target_position), _position(anim.offset),
+            _properties(anim.properties, id_map)
+        ])
+    animations.sort(key=lambda item: json.dumps(item, default=str))
+    
+    settings = scene.settings
+    return {
+        "settings": [
+            _round(settings.duration), _color(settings.background_color),
+            _position(settings.camera_position), settings.quality, settings.resolution
+        ],
+        "objects": objects,
+        "animations": animations
+    }
+
+
+def canonical_context(context: CodeGenerationContext) -> Dict:
+    """
+    Build the positional canonical form of a code generation context.
+
+    Objects and animations are renamed o0, o1, ... and a0, a1, ... in scene
+    order; text content is replaced by its length bucket. The scene title
+    and description are left out.
+
+    Args:
+        context: Parsed scene context
+
+    Returns:
+        JSON-serializable canonical dictionary
+    """
+    id_map = {obj.id: f"o{index}" for index, obj in enumerate(context.objects)}
+    id_map.update({anim.id: f"a{index}" for index, anim in enumerate(context.animations)})
+    
+    objects = []
+    for obj in context.objects:
+        signature = _object_signature(obj)
+        signature[3] = None if obj.text_content is None else len(obj.text_content) // TEXT_LENGTH_BUCKET
+        objects.append(signature + [_properties(obj.properties, id_map)])
+    
+    animations = [
+        [
+            _round(anim.delay), anim.type.value,
+            [id_map.get(target, target) for target in anim.target_objects],
+            _round(anim.duration), anim.easing,
+            id_map.get(anim.from_object, anim.from_object),
+            id_map.get(anim.to_object, anim.to_object),
+            _position(anim.target_position), _position(anim.offset),
+            _properties(anim.properties, id_map)
+        ]
+        for anim in context.animations
+    ]
+    
+    return {
+        "settings": [_round(context.total_duration), context.background_color],
+        "objects": objects,
+        "animations": animations
+    }
+
+
+def scene_fingerprint(scene: SceneStructure) -> str:
+    """
+    Compute the structural hash of a scene.
+
+    Args:
+        scene: SceneStructure to hash
+
+    Returns:
+        Hex digest that is equal for structurally identical scenes
+    """
+    payload = json.dumps(canonical_scene(scene), sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def deduplicate_scenes(scenes: List[SceneStructure]) -> DeduplicationReport:
+    """
+    Find scenes that are structurally identical to an earlier scene.
+
+    Args:
+        scenes: Scenes in playback order
+
+    Returns:
+        DeduplicationReport mapping each duplicate to the first identical scene
+    """
+    fingerprints = [scene_fingerprint(scene) for scene in scenes]
+    first_seen: Dict[str, int] = {}
+    report = DeduplicationReport(total_scenes=len(scenes), fingerprints=fingerprints)
+    
+    for index, fingerprint in enumerate(fingerprints):
+        if fingerprint in first_seen:
+            report.duplicates[index] = first_seen[fingerprint]
+        else:
+            first_seen[fingerprint] = index
+    
+    return report
@@ -6,9 +6,21 @@ Manim code generation. Provides convenient methods to access scene elements
 in a format optimized for code generation.
 """
 
+import heapq
+from functools import cached_property
+from operator import itemgetter
 from typing import List, Dict, Any, Optional, Tuple
 from dataclasses import dataclass
 from .scene_structure import SceneStructure, SceneObject, AnimationStep, ObjectType, AnimationType
+from .timeline import AnimationTimeline
+
+
+class DependencyCycleError(ValueError):
+    """Raised when object dependencies form a cycle and cannot be ordered."""
+    
+    def __init__(self, cycle: List[str]):
+        self.cycle = cycle
+        super().__init__(f"Object dependency cycle: {' -> '.join(cycle)}")
 
 
 @dataclass 
@@ -28,23 +40,109 @@ class CodeGenerationContext:
     line_objects: List[SceneObject]   # lines, arrows
     graph_objects: List[SceneObject]  # axes, graphs
     
-    # Animations grouped by type and sorted by timing
+    # Animations grouped by type
     creation_animations: List[AnimationStep]
     transformation_animations: List[AnimationStep]
     movement_animations: List[AnimationStep]
     style_animations: List[AnimationStep]  # fade, scale, etc.
     
-    # Timing information
-    animation_timeline: List[Tuple[float, AnimationStep]]  # (start_time, animation)
+    # Source elements in scene order (derived fields below are computed from these)
+    objects: List[SceneObject]
+    animations: List[AnimationStep]
+    
+    @cached_property
+    def all_objects(self) -> List[SceneObject]:
+        """Grouped objects concatenated in code generation order."""
+        return (self.text_objects + self.shape_objects + 
+                self.math_objects + self.line_objects + self.graph_objects)
+    
+    @cached_property
+    def all_animations(self) -> List[AnimationStep]:
+        """Grouped animations concatenated in code generation order."""
+        return (self.creation_animations + self.transformation_animations + 
+                self.movement_animations + self.style_animations)
+    
+    @cached_property
+    def animation_timeline(self) -> List[Tuple[float, AnimationStep]]:
+        """(start_time, animation) pairs sorted by start time."""
+        return sorted(((anim.delay, anim) for anim in self.animations), key=itemgetter(0))
     
-    # Object dependencies and relationships
-    object_dependencies: Dict[str, List[str]]  # object_id -> [dependent_object_ids]
-    transformation_chains: List[List[str]]     # chains of object transformations
+    @cached_property
+    def object_dependencies(self) -> Dict[str, List[str]]:
+        """object_id -> [object_ids it is transformed from]."""
+        dependencies = {obj.id: [] for obj in self.objects}
+        for anim in self.transformation_animations:
+            if anim.from_object and anim.to_object:
+                # to_object depends on from_object
+                dependencies.setdefault(anim.to_object, []).append(anim.from_object)
+        return dependencies
+    
+    @cached_property
+    def transformation_chains(self) -> List[List[str]]:
+        """Chains of object transformations (each chain has at least two ids)."""
+        transform_map = {}
+        for anim in self.transformation_animations:
+            if anim.from_object and anim.to_object:
+                transform_map[anim.from_object] = anim.to_object
+        
+        chains = []
+        visited = set()
+        for obj_id in transform_map:
+            if obj_id not in visited:
+                chain = []
+                current = obj_id
+                while current and current not in visited:
+                    chain.append(current)
+                    visited.add(current)
+                    current = transform_map.get(current)
+                
+                if len(chain) > 1:
+                    chains.append(chain)
+        
+        return chains
 
 
 class SceneParser:
     """Parses SceneStructure objects for code generation."""
     
+    # Object type -> CodeGenerationContext bucket
+    OBJECT_BUCKETS = {
+        ObjectType.TEXT: "text_objects",
+        ObjectType.MATHTEXT: "math_objects",
+        ObjectType.FORMULA: "math_objects",
+        ObjectType.CIRCLE: "shape_objects",
+        ObjectType.SQUARE: "shape_objects",
+        ObjectType.RECTANGLE: "shape_objects",
+        ObjectType.POLYGON: "shape_objects",
+        ObjectType.LINE: "line_objects",
+        ObjectType.ARROW: "line_objects",
+        ObjectType.AXES: "graph_objects",
+        ObjectType.GRAPH: "graph_objects",
+    }
+    
+    # Animation type -> CodeGenerationContext bucket
+    ANIMATION_BUCKETS = {
+        AnimationType.CREATE: "creation_animations",
+        AnimationType.WRITE: "creation_animations",
+        AnimationType.SHOW_CREATION: "creation_animations",
+        AnimationType.DRAW_BORDER_THEN_FILL: "creation_animations",
+        AnimationType.TRANSFORM: "transformation_animations",
+        AnimationType.REPLACE_TRANSFORM: "transformation_animations",
+        AnimationType.MOVE_TO: "movement_animations",
+        AnimationType.SHIFT: "movement_animations",
+        AnimationType.FADE_IN: "style_animations",
+        AnimationType.FADE_OUT: "style_animations",
+        AnimationType.SCALE: "style_animations",
+        AnimationType.ROTATE: "style_animations",
+        AnimationType.WIGGLE: "style_animations",
+        AnimationType.INDICATE: "style_animations",
+        AnimationType.FLASH: "style_animations",
+        AnimationType.CIRCUMSCRIBE: "style_animations",
+    }
+    
+    _OBJECT_BUCKET_NAMES = tuple(dict.fromkeys(OBJECT_BUCKETS.values()))
+    _ANIMATION_BUCKET_NAMES = tuple(dict.fromkeys(ANIMATION_BUCKETS.values()))
+    
     def __init__(self):
         """Initialize the parser."""
         pass
@@ -53,81 +151,39 @@ class SceneParser:
         """
         Parse a SceneStructure into a CodeGenerationContext.
         
+        Objects and animations are bucketed in a single pass each through
+        the type dispatch tables. The timeline, dependencies and
+        transformation chains are computed lazily on first access.
+        
         Args:
             scene: SceneStructure object to parse
             
         Returns:
             CodeGenerationContext with organized data for code generation
         """
-        # Extract scene metadata
-        scene_title = scene.settings.title or "Generated Scene"
-        scene_description = scene.settings.description or ""
-        total_duration = scene.settings.duration
-        background_color = self._parse_color(scene.settings.background_color)
-        
-        # Group objects by type
-        text_objects = []
-        shape_objects = []
-        math_objects = []
-        line_objects = []
-        graph_objects = []
+        buckets = {name: [] for name in self._OBJECT_BUCKET_NAMES + self._ANIMATION_BUCKET_NAMES}
         
+        # Types without a bucket (e.g. IMAGE, GROUP, UNCREATE) are not grouped
+        object_appenders = {t: buckets[name].append for t, name in self.OBJECT_BUCKETS.items()}
         for obj in scene.objects:
-            if obj.type in [ObjectType.TEXT]:
-                text_objects.append(obj)
-            elif obj.type in [ObjectType.MATHTEXT, ObjectType.FORMULA]:
-                math_objects.append(obj)
-            elif obj.type in [ObjectType.CIRCLE, ObjectType.SQUARE, ObjectType.RECTANGLE, ObjectType.POLYGON]:
-                shape_objects.append(obj)
-            elif obj.type in [ObjectType.LINE, ObjectType.ARROW]:
-                line_objects.append(obj)
-            elif obj.type in [ObjectType.AXES, ObjectType.GRAPH]:
-                graph_objects.append(obj)
-        
-        # Group animations by type
-        creation_animations = []
-        transformation_animations = []
-        movement_animations = []
-        style_animations = []
-        
-        for anim in scene.animations:
-            if anim.type in [AnimationType.CREATE, AnimationType.WRITE, AnimationType.SHOW_CREATION, AnimationType.DRAW_BORDER_THEN_FILL]:
-                creation_animations.append(anim)
-            elif anim.type in [AnimationType.TRANSFORM, AnimationType.REPLACE_TRANSFORM]:
-                transformation_animations.append(anim)
-            elif anim.type in [AnimationType.MOVE_TO, AnimationType.SHIFT]:
-                movement_animations.append(anim)
-            elif anim.type in [AnimationType.FADE_IN, AnimationType.FADE_OUT, AnimationType.SCALE, AnimationType.ROTATE, AnimationType.WIGGLE, AnimationType.INDICATE, AnimationType.FLASH, AnimationType.CIRCUMSCRIBE]:
-                style_animations.append(anim)
+            append = object_appenders.get(obj.type)
+            if append is not None:
+                append(obj)
         
-        # Create animation timeline
-        animation_timeline = []
+        animation_appenders = {t: buckets[name].append for t, name in self.ANIMATION_BUCKETS.items()}
         for anim in scene.animations:
-            start_time = anim.delay
-            animation_timeline.append((start_time, anim))
-        animation_timeline.sort(key=lambda x: x[0])  # Sort by start time
-        
-        # Analyze object dependencies and transformation chains
-        object_dependencies = self._analyze_dependencies(scene)
-        transformation_chains = self._find_transformation_chains(scene)
+            append = animation_appenders.get(anim.type)
+            if append is not None:
+                append(anim)
         
         return CodeGenerationContext(
-            scene_title=scene_title,
-            scene_description=scene_description,
-            total_duration=total_duration,
-            background_color=background_color,
-            text_objects=text_objects,
-            shape_objects=shape_objects,
-            math_objects=math_objects,
-            line_objects=line_objects,
-            graph_objects=graph_objects,
-            creation_animations=creation_animations,
-            transformation_animations=transformation_animations,
-            movement_animations=movement_animations,
-            style_animations=style_animations,
-            animation_timeline=animation_timeline,
-            object_dependencies=object_dependencies,
-            transformation_chains=transformation_chains
+            scene_title=scene.settings.title or "Generated Scene",
+            scene_description=scene.settings.description or "",
+            total_duration=scene.settings.duration,
+            background_color=self._parse_color(scene.settings.background_color),
+            objects=scene.objects,
+            animations=scene.animations,
+            **buckets
         )
     
     def get_imports_needed(self, context: CodeGenerationContext) -> List[str]:
@@ -153,42 +209,133 @@ class SceneParser:
     
     def get_object_creation_order(self, context: CodeGenerationContext) -> List[SceneObject]:
         """
-        Get the optimal order for creating objects based on dependencies.
+        Get the order for creating objects based on dependencies.
+        
+        Objects are scheduled with Kahn's algorithm: an object is only
+        created after every object it depends on. Among the objects that
+        are ready at the same time, lower layers come first, then ids.
         
         Args:
             context: Parsed scene context
             
         Returns:
             List of objects in creation order
+            
+        Raises:
+            DependencyCycleError: If the object dependencies contain a cycle
+        """
+        order, _ = self._schedule(context)
+        return order
+    
+    def get_creation_batches(self, context: CodeGenerationContext) -> List[List[SceneObject]]:
+        """
+        Group objects into batches that can be created in a single self.play call.
+        
+        An object's batch is the length of the longest dependency chain
+        leading to it, so no object depends on anything in its own or a later
+        batch. Objects inside a batch are ordered by (layer, id).
+        
+        Args:
+            context: Parsed scene context
+            
+        Returns:
+            List of object batches in creation order
+            
+        Raises:
+            DependencyCycleError: If the object dependencies contain a cycle
+        """
+        order, levels = self._schedule(context)
+        batches: List[List[SceneObject]] = []
+        for obj in order:
+            level = levels[obj.id]
+            while len(batches) <= level:
+                batches.append([])
+            batches[level].append(obj)
+        
+        for batch in batches:
+            batch.sort(key=lambda obj: (obj.layer, obj.id))
+        return batches
+    
+    def _schedule(self, context: CodeGenerationContext) -> Tuple[List[SceneObject], Dict[str, int]]:
+        """Topologically sort the objects; returns the order and each object's batch level."""
+        objects = {obj.id: obj for obj in context.all_objects}
+        
+        # Edges point from an object to the objects that depend on it
+        dependents: Dict[str, List[str]] = {obj_id: [] for obj_id in objects}
+        in_degree = dict.fromkeys(objects, 0)
+        for obj_id, requires in context.object_dependencies.items():
+            if obj_id not in objects:
+                continue
+            for required in set(requires):
+                # Unknown ids and self-transforms do not constrain the order
+                if required in objects and required != obj_id:
+                    dependents[required].append(obj_id)
+                    in_degree[obj_id] += 1
+        
+        ready = [(obj.layer, obj.id) for obj in objects.values() if in_degree[obj.id] == 0]
+        heapq.heapify(ready)
+        
+        order: List[SceneObject] = []
+        levels = dict.fromkeys(objects, 0)
+        while ready:
+            _, obj_id = heapq.heappop(ready)
+            order.append(objects[obj_id])
+            for dependent in dependents[obj_id]:
+                levels[dependent] = max(levels[dependent], levels[obj_id] + 1)
+                in_degree[dependent] -= 1
+                if in_degree[dependent] == 0:
+                    heapq.heappush(ready, (objects[dependent].layer, dependent))
+        
+        if len(order) < len(objects):
+            remaining = {obj_id for obj_id, degree in in_degree.items() if degree > 0}
+            raise DependencyCycleError(self._find_cycle(remaining, context.object_dependencies))
+        
+        return order, levels
+    
+    def _find_cycle(self, remaining: set, dependencies: Dict[str, List[str]]) -> List[str]:
+        """Walk dependency edges among unscheduled objects until an id repeats."""
+        current = min(remaining)
+        path: List[str] = []
+        seen: Dict[str, int] = {}
+        while current not in seen:
+            seen[current] = len(path)
+            path.append(current)
+            current = min(dep for dep in dependencies[current] if dep in remaining and dep != current)
+        return path[seen[current]:] + [current]
+    
+    def get_animation_timeline(self, context: CodeGenerationContext,
+                               max_idle_gap: Optional[float] = None) -> AnimationTimeline:
         """
-        # Simple topological sort based on dependencies
-        all_objects = (context.text_objects + context.shape_objects + 
-                      context.math_objects + context.line_objects + context.graph_objects)
+        Build the interval timeline of the scene's animations.
         
-        # For now, return objects sorted by layer then by creation time
-        # In the future, this could implement proper dependency resolution
-        return sorted(all_objects, key=lambda obj: (obj.layer, obj.id))
+        Args:
+            context: Parsed scene context
+            max_idle_gap: If set, idle gaps longer than this (seconds) are shortened
+            
+        Returns:
+            AnimationTimeline over all animations of the scene
+        """
+        timeline = AnimationTimeline(context.animations)
+        if max_idle_gap is not None:
+            timeline = timeline.compact(max_idle_gap)
+        return timeline
     
-    def get_animation_groups(self, context: CodeGenerationContext) -> List[List[AnimationStep]]:
+    def get_animation_groups(self, context: CodeGenerationContext,
+                             max_idle_gap: Optional[float] = None) -> List[List[AnimationStep]]:
         """
         Group animations that can be played simultaneously.
         
+        Animations whose [delay, delay + duration) intervals overlap, or
+        whose start times match within the timeline tolerance, share a group.
+        
         Args:
             context: Parsed scene context
+            max_idle_gap: If set, idle gaps longer than this (seconds) are shortened
             
         Returns:
             List of animation groups (each group can be played together)
         """
-        # Group animations by their start time (delay)
-        time_groups = {}
-        for anim in context.creation_animations + context.transformation_animations + context.movement_animations + context.style_animations:
-            start_time = anim.delay
-            if start_time not in time_groups:
-                time_groups[start_time] = []
-            time_groups[start_time].append(anim)
-        
-        # Return groups sorted by time
-        return [time_groups[time] for time in sorted(time_groups.keys())]
+        return [group.animations for group in self.get_animation_timeline(context, max_idle_gap).groups()]
     
     def _parse_color(self, color) -> str:
         """Parse color object to Manim color string."""
@@ -200,48 +347,6 @@ class SceneParser:
             return f"rgb_to_color({color.rgb})"
         else:
             return "WHITE"
-    
-    def _analyze_dependencies(self, scene: SceneStructure) -> Dict[str, List[str]]:
-        """Analyze object dependencies based on animations."""
-        dependencies = {obj.id: [] for obj in scene.objects}
-        
-        # Find dependencies from transformation animations
-        for anim in scene.animations:
-            if anim.type in [AnimationType.TRANSFORM, AnimationType.REPLACE_TRANSFORM]:
-                if anim.from_object and anim.to_object:
-                    # to_object depends on from_object
-                    if anim.to_object not in dependencies:
-                        dependencies[anim.to_object] = []
-                    dependencies[anim.to_object].append(anim.from_object)
-        
-        return dependencies
-    
-    def _find_transformation_chains(self, scene: SceneStructure) -> List[List[str]]:
-        """Find chains of object transformations."""
-        chains = []
-        
-        # Track transformation relationships
-        transform_map = {}
-        for anim in scene.animations:
-            if anim.type in [AnimationType.TRANSFORM, AnimationType.REPLACE_TRANSFORM]:
-                if anim.from_object and anim.to_object:
-                    transform_map[anim.from_object] = anim.to_object
-        
-        # Find chains
-        visited = set()
-        for obj_id in transform_map:
-            if obj_id not in visited:
-                chain = []
-                current = obj_id
-                while current and current not in visited:
-                    chain.append(current)
-                    visited.add(current)
-                    current = transform_map.get(current)
-                
-                if len(chain) > 1:
-                    chains.append(chain)
-        
-        return chains
 
 
 def parse_scene(scene: SceneStructure) -> CodeGenerationContext:
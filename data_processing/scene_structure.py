@@ -3,12 +3,21 @@ Scene Structure Definitions
 
 Defines the standardized structure for scene descriptions that bridge
 input processing and Manim code generation.
+
+All scene dataclasses use __slots__ so large course libraries do not pay for
+a per-instance __dict__. Position and Color are frozen value objects: the
+origin position and plain named colors are shared instances, and color and
+setting names are interned when parsed.
 """
 
 from typing import List, Dict, Optional, Union, Literal
 from dataclasses import dataclass, field
 from enum import Enum
+from functools import lru_cache
 import json
+import sys
+
+from .schema_validator import compile_schema, SchemaValidationError
 
 
 class ObjectType(str, Enum):
@@ -48,8 +57,54 @@ class AnimationType(str, Enum):
     FLASH = "flash"
     CIRCUMSCRIBE = "circumscribe"
 
+# Stable integer codes used by the binary formats (scene_codec, scene_columns).
+# They are part of the on-disk format: give a new member the next free code and
+# never renumber or reuse one. If an existing code ever has to change, bump
+# TYPE_CODES_VERSION along with the codec's SCHEMA_VERSION.
+TYPE_CODES_VERSION = 1
+
+OBJECT_TYPE_CODES: Dict[ObjectType, int] = {
+    ObjectType.TEXT: 0,
+    ObjectType.CIRCLE: 1,
+    ObjectType.SQUARE: 2,
+    ObjectType.RECTANGLE: 3,
+    ObjectType.LINE: 4,
+    ObjectType.ARROW: 5,
+    ObjectType.POLYGON: 6,
+    ObjectType.AXES: 7,
+    ObjectType.GRAPH: 8,
+    ObjectType.MATHTEXT: 9,
+    ObjectType.FORMULA: 10,
+    ObjectType.IMAGE: 11,
+    ObjectType.GROUP: 12
+}
+
+ANIMATION_TYPE_CODES: Dict[AnimationType, int] = {
+    AnimationType.CREATE: 0,
+    AnimationType.WRITE: 1,
+    AnimationType.DRAW_BORDER_THEN_FILL: 2,
+    AnimationType.FADE_IN: 3,
+    AnimationType.FADE_OUT: 4,
+    AnimationType.TRANSFORM: 5,
+    AnimationType.REPLACE_TRANSFORM: 6,
+    AnimationType.MOVE_TO: 7,
+    AnimationType.SHIFT: 8,
+    AnimationType.ROTATE: 9,
+    AnimationType.SCALE: 10,
+    AnimationType.SHOW_CREATION: 11,
+    AnimationType.UNCREATE: 12,
+    AnimationType.WIGGLE: 13,
+    AnimationType.INDICATE: 14,
+    AnimationType.FLASH: 15,
+    AnimationType.CIRCUMSCRIBE: 16
+}
+
+# Members indexed by their code (codes are contiguous from 0)
+OBJECT_TYPES: List[ObjectType] = sorted(OBJECT_TYPE_CODES, key=OBJECT_TYPE_CODES.get)
+ANIMATION_TYPES: List[AnimationType] = sorted(ANIMATION_TYPE_CODES, key=ANIMATION_TYPE_CODES.get)
+
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Position:
     """3D position in Manim coordinate system."""
     x: float = 0.0
@@ -58,31 +113,86 @@ class Position:
     
     def to_list(self) -> List[float]:
         return [self.x, self.y, self.z]
+    
+    @classmethod
+    def from_list(cls, values: List[float]) -> 'Position':
+        """Create Position from an [x, y, z] list, sharing the origin instance."""
+        x, y, z = values[0], values[1], values[2]
+        if x == 0 and y == 0 and z == 0:
+            return ORIGIN
+        return cls(x, y, z)
 
 
-@dataclass
+# Shared immutable default position
+ORIGIN = Position()
+
+
+@dataclass(frozen=True, slots=True)
 class Color:
     """Color specification."""
     name: Optional[str] = None  # e.g., "BLUE", "RED"
     hex: Optional[str] = None   # e.g., "#FF0000"
     rgb: Optional[List[float]] = None  # e.g., [1.0, 0.0, 0.0]
+    
+    @classmethod
+    def from_dict(cls, color_data: Dict) -> 'Color':
+        """Create Color from dictionary, sharing instances of plain named colors."""
+        name = color_data.get("name")
+        hex_value = color_data.get("hex")
+        rgb = color_data.get("rgb")
+        if isinstance(name, str) and name and hex_value is None and rgb is None:
+            return _named_color(sys.intern(name))
+        return cls(name=_intern(name), hex=hex_value, rgb=rgb)
+
 
+def _intern(value):
+    """Intern a string field; anything else (e.g. an explicit null) is kept as given."""
+    return sys.intern(value) if isinstance(value, str) else value
 
-@dataclass
+
+@lru_cache(maxsize=None)
+def _named_color(name: str) -> Color:
+    """Return the shared Color instance for a plain color name."""
+    return Color(name=name)
+
+
+@dataclass(slots=True)
 class SceneObject:
     """Represents a single object in the scene."""
     id: str  # Unique identifier for the object
     type: ObjectType
     properties: Dict[str, Union[str, float, List[float], bool]] = field(default_factory=dict)
-    position: Position = field(default_factory=Position)
+    position: Position = ORIGIN
     color: Optional[Color] = None
     text_content: Optional[str] = None  # For text/mathtext objects
     size: Optional[float] = None
     opacity: float = 1.0
     layer: int = 0  # Z-index for layering
+    
+    @classmethod
+    def from_dict(cls, obj_data: Dict) -> 'SceneObject':
+        """Create SceneObject from dictionary."""
+        position = Position.from_list(obj_data.get("position", [0, 0, 0]))
+        
+        color = None
+        color_data = obj_data.get("color")
+        if color_data:
+            color = Color.from_dict(color_data)
+        
+        return cls(
+            id=obj_data["id"],
+            type=ObjectType(obj_data["type"]),
+            properties=obj_data.get("properties", {}),
+            position=position,
+            color=color,
+            text_content=obj_data.get("text_content"),
+            size=obj_data.get("size"),
+            opacity=obj_data.get("opacity", 1.0),
+            layer=obj_data.get("layer", 0)
+        )
 
 
-@dataclass
+@dataclass(slots=True)
 class AnimationStep:
     """Represents a single animation step."""
     id: str  # Unique identifier for the animation
@@ -100,21 +210,46 @@ class AnimationStep:
     # For movement animations
     target_position: Optional[Position] = None
     offset: Optional[Position] = None
+    
+    @classmethod
+    def from_dict(cls, anim_data: Dict) -> 'AnimationStep':
+        """Create AnimationStep from dictionary."""
+        target_pos = None
+        if anim_data.get("target_position"):
+            target_pos = Position.from_list(anim_data["target_position"])
+        
+        offset = None
+        if anim_data.get("offset"):
+            offset = Position.from_list(anim_data["offset"])
+        
+        return cls(
+            id=anim_data["id"],
+            type=AnimationType(anim_data["type"]),
+            target_objects=anim_data["target_objects"],
+            duration=anim_data.get("duration", 1.0),
+            delay=anim_data.get("delay", 0.0),
+            properties=anim_data.get("properties", {}),
+            easing=_intern(anim_data.get("easing", "smooth")),
+            from_object=anim_data.get("from_object"),
+            to_object=anim_data.get("to_object"),
+            target_position=target_pos,
+            offset=offset
+        )
 
 
-@dataclass
+@dataclass(slots=True)
 class SceneSettings:
     """Overall scene configuration."""
     title: str = ""
     description: str = ""
     duration: float = 10.0  # Total scene duration in seconds
-    background_color: Color = field(default_factory=lambda: Color(name="BLACK"))
-    camera_position: Position = field(default_factory=Position)
+    background_color: Color = _named_color("BLACK")
+    camera_position: Position = ORIGIN
     quality: str = "medium_quality"  # low_quality, medium_quality, high_quality
     resolution: str = "720p"  # 480p, 720p, 1080p, 4k
 
 
-@dataclass
+@dataclass(slots=True)
 class SceneStructure:
     """Complete structured scene description."""
     settings: SceneSettings = field(default_factory=SceneSettings)
@@ -125,6 +260,17 @@ class SceneStructure:
         """Convert to JSON string."""
         return json.dumps(self.to_dict(), indent=2, default=str)
     
+    def to_bytes(self) -> bytes:
+        """Convert to the compact binary format (see scene_codec)."""
+        from .scene_codec import encode_scene
+        return encode_scene(self)
+    
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'SceneStructure':
+        """Create SceneStructure from the compact binary format."""
+        from .scene_codec import decode_scene
+        return decode_scene(data)
+    
     def to_dict(self) -> Dict:
         """Convert to dictionary."""
         return {
@@ -184,18 +330,27 @@ class SceneStructure:
         return cls.from_dict(data)
     
     @classmethod
-    def from_dict(cls, data: Dict) -> 'SceneStructure':
-        """Create SceneStructure from dictionary."""
+    def from_dict(cls, data: Dict, validate: bool = False) -> 'SceneStructure':
+        """
+        Create SceneStructure from dictionary.
+        
+        Args:
+            data: Scene dictionary following SCENE_STRUCTURE_SCHEMA
+            validate: Check the payload against the schema first and report
+                every violation at once instead of failing on the first lookup
+                
+        Raises:
+            SchemaValidationError: If validate is True and the payload is invalid
+        """
+        if validate:
+            errors = validate_scene_dict(data)
+            if errors:
+                raise SchemaValidationError(errors)
+        
         # Parse settings
         settings_data = data.get("settings", {})
-        bg_color_data = settings_data.get("background_color", {})
-        bg_color = Color(
-            name=bg_color_data.get("name"),
-            hex=bg_color_data.get("hex"),
-            rgb=bg_color_data.get("rgb")
-        )
-        cam_pos = settings_data.get("camera_position", [0, 0, 0])
-        camera_position = Position(cam_pos[0], cam_pos[1], cam_pos[2])
+        bg_color = Color.from_dict(settings_data.get("background_color", {}))
+        camera_position = Position.from_list(settings_data.get("camera_position", [0, 0, 0]))
         
         settings = SceneSettings(
             title=settings_data.get("title", ""),
@@ -203,71 +358,21 @@ class SceneStructure:
             duration=settings_data.get("duration", 10.0),
             background_color=bg_color,
             camera_position=camera_position,
-            quality=settings_data.get("quality", "medium_quality"),
-            resolution=settings_data.get("resolution", "720p")
+            quality=_intern(settings_data.get("quality", "medium_quality")),
+            resolution=_intern(settings_data.get("resolution", "720p"))
         )
         
-        # Parse objects
-        objects = []
-        for obj_data in data.get("objects", []):
-            pos_data = obj_data.get("position", [0, 0, 0])
-            position = Position(pos_data[0], pos_data[1], pos_data[2])
-            
-            color = None
-            color_data = obj_data.get("color")
-            if color_data:
-                color = Color(
-                    name=color_data.get("name"),
-                    hex=color_data.get("hex"),
-                    rgb=color_data.get("rgb")
-                )
-            
-            obj = SceneObject(
-                id=obj_data["id"],
-                type=ObjectType(obj_data["type"]),
-                properties=obj_data.get("properties", {}),
-                position=position,
-                color=color,
-                text_content=obj_data.get("text_content"),
-                size=obj_data.get("size"),
-                opacity=obj_data.get("opacity", 1.0),
-                layer=obj_data.get("layer", 0)
-            )
-            objects.append(obj)
-        
-        # Parse animations
-        animations = []
-        for anim_data in data.get("animations", []):
-            target_pos = None
-            if anim_data.get("target_position"):
-                pos_data = anim_data["target_position"]
-                target_pos = Position(pos_data[0], pos_data[1], pos_data[2])
-            
-            offset = None
-            if anim_data.get("offset"):
-                offset_data = anim_data["offset"]
-                offset = Position(offset_data[0], offset_data[1], offset_data[2])
-            
-            anim = AnimationStep(
-                id=anim_data["id"],
-                type=AnimationType(anim_data["type"]),
-                target_objects=anim_data["target_objects"],
-                duration=anim_data.get("duration", 1.0),
-                delay=anim_data.get("delay", 0.0),
-                properties=anim_data.get("properties", {}),
-                easing=anim_data.get("easing", "smooth"),
-                from_object=anim_data.get("from_object"),
-                to_object=anim_data.get("to_object"),
-                target_position=target_pos,
-                offset=offset
-            )
-            animations.append(anim)
+        # Parse objects and animations
+        objects = [SceneObject.from_dict(obj_data) for obj_data in data.get("objects", [])]
+        animations = [AnimationStep.from_dict(anim_data) for anim_data in data.get("animations", [])]
         
         return cls(settings=settings, objects=objects, animations=animations)
 
 
 # JSON Schema for validation
 SCENE_STRUCTURE_SCHEMA = {
+    "title": "SceneStructure",
+    "description": "Structured description of a Manim scene",
     "type": "object",
     "required": ["settings", "objects", "animations"],
     "properties": {
@@ -337,3 +442,7 @@ SCENE_STRUCTURE_SCHEMA = {
         }
     }
 }
+
+
+# Compiled once at import; returns the list of all schema violations in a payload
+validate_scene_dict = compile_schema(SCENE_STRUCTURE_SCHEMA, "validate_scene_dict")
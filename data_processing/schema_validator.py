@@ -0,0 +1,205 @@
+"""
+Schema Validator Module
+
+Compiles a JSON schema into a specialised Python validation function. The
+function source is generated once from the schema and compiled with
+compile(), so validating a payload is a single pass of plain attribute and
+type checks with no per-call schema interpretation. All violations are
+collected and reported together instead of failing on the first one.
+
+Supported keywords: type, required, properties, items, enum, minimum,
+maximum, minItems, maxItems. Other keywords (title, description, ...) are
+ignored.
+"""
+
+from typing import Any, Callable, Dict, List
+
+
+class SchemaValidationError(ValueError):
+    """Raised when a payload does not match its schema."""
+    
+    def __init__(self, errors: List[str]):
+        self.errors = errors
+        summary = "\n".join(f"  - {error}" for error in errors)
+        super().__init__(f"{len(errors)} schema validation error(s):\n{summary}")
+
+
+# Python types accepted for each JSON schema type
+_JSON_TYPES = {
+    "string": ("str",),
+    "number": ("int", "float"),
+    "integer": ("int",),
+    "boolean": ("bool",),
+    "null": ("NoneType",),
+    "object": ("dict",),
+    "array": ("list",),
+}
+
+
+class _ValidatorCompiler:
+    """Generates the source code of a validator function for one schema."""
+    
+    def __init__(self, name: str):
+        self.name = name
+        self.lines: List[str] = []
+        self.constants: Dict[str, Any] = {}
+        self._counter = 0
+    
+    def compile(self, schema: Dict) -> Callable[[Any], List[str]]:
+        self.lines = [
+            f"def {self.name}(data):",
+            "    errors = []",
+            "    append = errors.append",
+        ]
+        self._emit_node(schema, "data", "'$'", 1)
+        self.lines.append("    return errors")
+        
+        source = "\n".join(self.lines)
+        namespace = dict(self.constants)
+        namespace["NoneType"] = type(None)
+        namespace["_MISSING"] = _MISSING
+        exec(compile(source, f"<schema validator {self.name}>", "exec"), namespace)
+        
+        validator = namespace[self.name]
+        validator.source = source
+        return validator
+    
+    def _new_name(self, prefix: str) -> str:
+        self._counter += 1
+        return f"{prefix}{self._counter}"
+    
+    def _constant(self, value: Any) -> str:
+        name = self._new_name("_C")
+        self.constants[name] = value
+        return name
+    
+    def _emit(self, depth: int, line: str):
+        self.lines.append("    " * depth + line)
+    
+    def _emit_node(self, schema: Dict, var: str, path: str, depth: int):
+        """Emit checks for one schema node; `path` is evaluated only on error."""
+        types = schema.get("type")
+        if isinstance(types, str):
+            types = [types]
+        
+        if types:
+            py_types = []
+            for json_type in types:
+                for py_type in _JSON_TYPES[json_type]:
+                    if py_type not in py_types:
+                        py_types.append(py_type)
+            # bool is a subclass of int, so exact type matching is required
+            type_set = "(" + ", ".join(py_types) + ",)"
+            self._emit(depth, f"if type({var}) not in {type_set}:")
+            self._emit(depth + 1, f"append({path} + ': expected {'/'.join(types)}, got ' + type({var}).__name__)")
+            self._emit(depth, "else:")
+            body_start = len(self.lines)
+            self._emit_typed_checks(schema, types, var, path, depth + 1)
+            if len(self.lines) == body_start:
+                # Nothing beyond the type check; drop the empty else branch
+                self.lines.pop()
+        else:
+            self._emit_typed_checks(schema, None, var, path, depth)
+    
+    def _guard(self, types, json_types, var: str, depth: int) -> int:
+        """Open a type guard when the node allows several types."""
+        if types is None or set(types) - set(json_types):
+            py_types = sorted({t for json_type in json_types for t in _JSON_TYPES[json_type]})
+            self._emit(depth, f"if type({var}) in ({', '.join(py_types)},):")
+            return depth + 1
+        return depth
+    
+    def _emit_typed_checks(self, schema: Dict, types, var: str, path: str, depth: int):
+        if "enum" in schema:
+            values = schema["enum"]
+            try:
+                container = self._constant(frozenset(values))
+            except TypeError:
+                container = self._constant(tuple(values))
+            self._emit(depth, f"if {var} not in {container}:")
+            message = repr(f" is not one of {values!r}")
+            self._emit(depth + 1, f"append({path} + ': ' + repr({var}) + {message})")
+        
+        if "minimum" in schema or "maximum" in schema:
+            inner = self._guard(types, ["number"], var, depth)
+            if "minimum" in schema:
+                self._emit(inner, f"if {var} < {schema['minimum']!r}:")
+                self._emit(inner + 1, f"append({path} + ': ' + repr({var}) + ' is less than {schema['minimum']!r}')")
+            if "maximum" in schema:
+                self._emit(inner, f"if {var} > {schema['maximum']!r}:")
+                self._emit(inner + 1, f"append({path} + ': ' + repr({var}) + ' is greater than {schema['maximum']!r}')")
+        
+        if "required" in schema or "properties" in schema:
+            inner = self._guard(types, ["object"], var, depth)
+            self._emit_object(schema, var, path, inner)
+        
+        if "items" in schema or "minItems" in schema or "maxItems" in schema:
+            inner = self._guard(types, ["array"], var, depth)
+            self._emit_array(schema, var, path, inner)
+    
+    def _emit_object(self, schema: Dict, var: str, path: str, depth: int):
+        required = schema.get("required", [])
+        properties = schema.get("properties", {})
+        
+        for key in required:
+            if key not in properties:
+                self._emit(depth, f"if {key!r} not in {var}:")
+                self._emit(depth + 1, f"append({path} + {repr(': missing required property ' + repr(key))})")
+        
+        for key, sub_schema in properties.items():
+            child = self._new_name("v")
+            child_path = f"{path} + {('.' + key)!r}"
+            self._emit(depth, f"{child} = {var}.get({key!r}, _MISSING)")
+            if key in required:
+                self._emit(depth, f"if {child} is _MISSING:")
+                self._emit(depth + 1, f"append({path} + {repr(': missing required property ' + repr(key))})")
+                self._emit(depth, "else:")
+            else:
+                self._emit(depth, f"if {child} is not _MISSING:")
+            body_start = len(self.lines)
+            self._emit_node(sub_schema, child, child_path, depth + 1)
+            if len(self.lines) == body_start:
+                self._emit(depth + 1, "pass")
+    
+    def _emit_array(self, schema: Dict, var: str, path: str, depth: int):
+        if "minItems" in schema:
+            self._emit(depth, f"if len({var}) < {schema['minItems']}:")
+            self._emit(depth + 1, f"append({path} + ': expected at least {schema['minItems']} items, got ' + str(len({var})))")
+        if "maxItems" in schema:
+            self._emit(depth, f"if len({var}) > {schema['maxItems']}:")
+            self._emit(depth + 1, f"append({path} + ': expected at most {schema['maxItems']} items, got ' + str(len({var})))")
+        
+        if "items" in schema:
+            index = self._new_name("i")
+            item = self._new_name("v")
+            self._emit(depth, f"for {index}, {item} in enumerate({var}):")
+            body_start = len(self.lines)
+            self._emit_node(schema["items"], item, f"{path} + '[' + str({index}) + ']'", depth + 1)
+            if len(self.lines) == body_start:
+                self._emit(depth + 1, "pass")
+
+
+class _Missing:
+    """Sentinel for absent object properties."""
+    
+    def __repr__(self):
+        return "<missing>"
+
+
+_MISSING = _Missing()
+
+
+def compile_schema(schema: Dict, name: str = "validate") -> Callable[[Any], List[str]]:
+    """
+    Compile a JSON schema into a validation function.
+
+    Args:
+        schema: JSON schema dictionary
+        name: Name of the generated function (shows up in tracebacks)
+
+    Returns:
+        Function taking a payload and returning a list of error messages
+        (empty when the payload is valid). The generated source is available
+        as the function's `source` attribute.
+    """
+    return _ValidatorCompiler(name).compile(schema)
@@ -0,0 +1,240 @@
+"""
+Stream Parser Module
+
+Incrementally parses scene JSON while an LLM response is still being
+generated. Completed elements of the `objects` and `animations` arrays are
+converted to SceneObject/AnimationStep instances and handed downstream as
+soon as their closing brace arrives, and malformed output is detected
+mid-stream so the caller can abandon the response and retry early.
+"""
+
+import json
+import re
+from typing import Callable, List, Optional
+
+from .scene_structure import SceneStructure, SceneObject, AnimationStep
+
+
+class StreamingParseError(ValueError):
+    """Raised as soon as a streamed response can no longer be valid scene JSON."""
+    pass
+
+
+class IncrementalSceneParser:
+    """Scans a streamed scene JSON response one chunk at a time."""
+    
+    # Top-level arrays whose elements are emitted as soon as they complete
+    STREAMED_ARRAYS = ("objects", "animations")
+    
+    # Characters that may appear outside strings as part of numbers/literals
+    LITERAL_CHARS = frozenset("-+.0123456789eEtruefalsn")
+    LITERAL_PATTERN = re.compile(r'-?\d+(\.\d+)?([eE][+-]?\d+)?|true|false|null')
+    
+    def __init__(self,
+                 on_object: Optional[Callable[[SceneObject], None]] = None,
+                 on_animation: Optional[Callable[[AnimationStep], None]] = None):
+        """
+        Initialize the incremental parser.
+
+        Args:
+            on_object: Called with each SceneObject as soon as it is complete
+            on_animation: Called with each AnimationStep as soon as it is complete
+        """
+        self.on_object = on_object
+        self.on_animation = on_animation
+        
+        self.objects: List[SceneObject] = []
+        self.animations: List[AnimationStep] = []
+        
+        self._text = ""
+        self._pos = 0
+        
+        # Scanner state
+        self._in_fence = False
+        self._json_start: Optional[int] = None
+        self._json_end: Optional[int] = None
+        self._stack: List[str] = []
+        self._in_string = False
+        self._escape = False
+        self._string_start = 0
+        self._literal_start: Optional[int] = None
+        
+        # Key tracking at the top level of the scene object
+        self._last_string: Optional[str] = None
+        self._current_key: Optional[str] = None
+        self._array_key: Optional[str] = None
+        self._element_start: Optional[int] = None
+    
+    @property
+    def finished(self) -> bool:
+        """Whether the top-level JSON object has been closed."""
+        return self._json_end is not None
+    
+    def feed(self, chunk: str) -> None:
+        """
+        Consume the next chunk of the response.
+
+        Args:
+            chunk: Newly generated text
+
+        Raises:
+            StreamingParseError: If the response can no longer be valid JSON
+        """
+        if not chunk:
+            return
+        
+        self._text += chunk
+        text = self._text
+        
+        for i in range(self._pos, len(text)):
+            c = text[i]
+            
+            if self._json_start is None:
+                self._scan_preamble(c, i)
+                continue
+            
+            if self._json_end is not None:
+                if not c.isspace() and c != '`':
+                    raise StreamingParseError(f"Unexpected content after JSON object: {c!r}")
+                continue
+            
+            if self._in_string:
+                self._scan_string(c, i)
+                continue
+            
+            if c in self.LITERAL_CHARS:
+                if self._literal_start is None:
+                    self._literal_start = i
+                continue
+            
+            if self._literal_start is not None:
+                self._check_literal(i)
+            
+            if c.isspace():
+                continue
+            elif c == '"':
+                self._in_string = True
+                self._string_start = i
+            elif c == '{' or c == '[':
+                self._open(c, i)
+            elif c == '}' or c == ']':
+                self._close(c, i)
+            elif c == ':':
+                if len(self._stack) == 1:
+                    self._current_key = self._last_string
+            elif c == ',':
+                if len(self._stack) == 1:
+                    self._current_key = None
+            else:
+                raise StreamingParseError(f"Unexpected character {c!r} at offset {i}")
+        
+        self._pos = len(text)
+    
+    def close(self) -> SceneStructure:
+        """
+        Finish parsing once the stream has ended.
+
+        Returns:
+            The complete SceneStructure, reusing the already emitted elements
+
+        Raises:
+            StreamingParseError: If the response ended before the JSON was complete
+        """
+        if self._json_end is None:
+            raise StreamingParseError("Response ended before the JSON object was closed")
+        
+        try:
+            data = json.loads(self._text[self._json_start:self._json_end])
+        except json.JSONDecodeError as e:
+            raise StreamingParseError(f"Failed to parse streamed JSON: {str(e)}") from e
+        
+        try:
+            scene = SceneStructure.from_dict({**data, "objects": [], "animations": []})
+        except Exception as e:
+            raise StreamingParseError(f"Invalid scene settings: {str(e)}") from e
+        
+        scene.objects = list(self.objects)
+        scene.animations = list(self.animations)
+        return scene
+    
+    def _scan_preamble(self, c: str, i: int) -> None:
+        """Skip whitespace and markdown fences before the opening brace."""
+        if self._in_fence:
+            if c == '\n':
+                self._in_fence = False
+        elif c == '`':
+            self._in_fence = True
+        elif c == '{':
+            self._json_start = i
+            self._stack.append(c)
+        elif not c.isspace():
+            raise StreamingParseError(f"Expected '{{' at start of response, got {c!r}")
+    
+    def _scan_string(self, c: str, i: int) -> None:
+        """Advance through a JSON string literal."""
+        if self._escape:
+            self._escape = False
+        elif c == '\\':
+            self._escape = True
+        elif c == '"':
+            self._in_string = False
+            if len(self._stack) == 1:
+                self._last_string = self._text[self._string_start + 1:i]
+        elif c < ' ':
+            raise StreamingParseError(f"Unescaped control character in string at offset {i}")
+    
+    def _check_literal(self, end: int) -> None:
+        """Validate a completed bare literal (number, true, false, null)."""
+        literal = self._text[self._literal_start:end]
+        self._literal_start = None
+        if not self.LITERAL_PATTERN.fullmatch(literal):
+            raise StreamingParseError(f"Invalid literal {literal!r} at offset {end - len(literal)}")
+    
+    def _open(self, c: str, i: int) -> None:
+        """Handle an opening bracket."""
+        depth = len(self._stack)
+        if c == '[' and depth == 1 and self._current_key in self.STREAMED_ARRAYS:
+            self._array_key = self._current_key
+        elif c == '{' and depth == 2 and self._array_key:
+            self._element_start = i
+        self._stack.append(c)
+    
+    def _close(self, c: str, i: int) -> None:
+        """Handle a closing bracket, emitting completed array elements."""
+        expected = '{' if c == '}' else '['
+        if not self._stack or self._stack[-1] != expected:
+            raise StreamingParseError(f"Mismatched {c!r} at offset {i}")
+        self._stack.pop()
+        
+        depth = len(self._stack)
+        if c == '}' and depth == 2 and self._element_start is not None:
+            self._emit(self._text[self._element_start:i + 1])
+            self._element_start = None
+        elif c == ']' and depth == 1:
+            self._array_key = None
+        elif depth == 0:
+            self._json_end = i + 1
+    
+    def _emit(self, element_json: str) -> None:
+        """Convert a completed array element and pass it downstream."""
+        try:
+            element_data = json.loads(element_json)
+        except json.JSONDecodeError as e:
+            raise StreamingParseError(f"Malformed {self._array_key} element: {str(e)}") from e
+        
+        try:
+            if self._array_key == "objects":
+                element = SceneObject.from_dict(element_data)
+            else:
+                element = AnimationStep.from_dict(element_data)
+        except Exception as e:
+            raise StreamingParseError(f"Invalid {self._array_key} element: {str(e)}") from e
+        
+        if self._array_key == "objects":
+            self.objects.append(element)
+            if self.on_object:
+                self.on_object(element)
+        else:
+            self.animations.append(element)
+            if self.on_animation:
+                self.on_animation(element)
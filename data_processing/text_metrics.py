@@ -0,0 +1,246 @@
+"""
+Text Metrics Module
+
+Predicts the rendered size of Text and MathTex strings without rendering
+a scene.
+
+Each unique string is measured once at a reference font size and scaled
+linearly to other sizes. Manim's Pango backend measures Text, and TeX
+measures MathTex. Results are kept in an LRU and can be persisted to a
+JSON file, so later runs look them up instead of measuring again. When
+Manim (or LaTeX) is not available, sizes are estimated from character
+counts. Estimates are never persisted, so a later run with Manim replaces
+them with real measurements.
+"""
+
+import atexit
+import importlib.util
+import json
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Optional, Tuple
+
+# Manim is only imported when a string is actually measured
+MANIM_AVAILABLE = importlib.util.find_spec("manim") is not None
+
+# Mobject construction is not thread-safe; real measurements are made one at a time
+_MEASURE_LOCK = threading.Lock()
+
+
+REFERENCE_FONT_SIZE = 48.0
+TEXT_KINDS = ("text", "math")
+
+# Character-count estimate at the reference font size (Manim units)
+CHAR_WIDTH = {"text": 0.28, "math": 0.2}
+LINE_HEIGHT = 0.6
+
+
+def estimate_extent(kind: str, text: str) -> Tuple[float, float]:
+    """
+    Estimated (width, height) of a string at the reference font size.
+
+    Args:
+        kind: "text" for Text, "math" for MathTex
+        text: String content
+
+    Returns:
+        Estimated size in Manim units
+    """
+    lines = (text or "").split("\n")
+    return max(len(line) for line in lines) * CHAR_WIDTH[kind], len(lines) * LINE_HEIGHT
+
+
+def manim_extent(kind: str, text: str) -> Tuple[float, float]:
+    """
+    Measured (width, height) of a string at the reference font size.
+
+    Args:
+        kind: "text" for Text, "math" for MathTex
+        text: String content
+
+    Returns:
+        Size of the Manim mobject in Manim units
+    """
+    from manim import MathTex, Text
+    
+    mobject = (MathTex if kind == "math" else Text)(text, font_size=REFERENCE_FONT_SIZE)
+    return float(mobject.width), float(mobject.height)
+
+
+@dataclass
+class TextMetricsStats:
+    """Lookups served by one TextMetrics."""
+    hits: int = 0
+    measured: int = 0
+    estimated: int = 0
+    
+    def summary(self) -> str:
+        """Human-readable summary of the lookups."""
+        return f"{self.hits} cached, {self.measured} measured, {self.estimated} estimated"
+
+
+class TextMetrics:
+    """Cached text measurement backed by a persistent LRU."""
+    
+    def __init__(self,
+                 cache_path: Optional[str] = None,
+                 max_entries: int = 4096,
+                 measurer: Optional[Callable[[str, str], Tuple[float, float]]] = None,
+                 save_every: int = 32):
+        """
+        Initialize the text metrics.
+
+        Args:
+            cache_path: JSON file persisting measurements across runs (memory only if None)
+            max_entries: Measurements kept (least recently used are dropped)
+            measurer: Function (kind, text) -> (width, height) at the reference
+                font size; Manim when installed, otherwise none (estimates only)
+            save_every: New measurements between automatic saves
+        """
+        self.cache_path = Path(cache_path) if cache_path else None
+        self.max_entries = max_entries
+        self.measurer = measurer or (manim_extent if MANIM_AVAILABLE else None)
+        self.save_every = save_every
+        self.stats = TextMetricsStats()
+        self._entries: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self._estimates: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self._unsaved = 0
+        self._lock = threading.Lock()
+        
+        if self.cache_path and self.cache_path.exists():
+            try:
+                stored = json.loads(self.cache_path.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                stored = {}
+            for key, extent in stored.items():
+                self._entries[key] = (float(extent[0]), float(extent[1]))
+            self._trim(self._entries)
+    
+    def measure(self, text: str, font_size: float = REFERENCE_FONT_SIZE, kind: str = "text") -> Tuple[float, float]:
+        """
+        Rendered size of a string.
+
+        Args:
+            text: String content
+            font_size: Font size the string is rendered at
+            kind: "text" for Text, "math" for MathTex
+
+        Returns:
+            (width, height) in Manim units
+        """
+        if kind not in TEXT_KINDS:
+            raise ValueError(f"kind must be one of {TEXT_KINDS}")
+        width, height = self._reference_extent(kind, text or "")
+        scale = float(font_size) / REFERENCE_FONT_SIZE
+        return width * scale, height * scale
+    
+    def width(self, text: str, font_size: float = REFERENCE_FONT_SIZE, kind: str = "text") -> float:
+        """Rendered width of a string (see measure)."""
+        return self.measure(text, font_size, kind)[0]
+    
+    def _reference_extent(self, kind: str, text: str) -> Tuple[float, float]:
+        key = f"{kind}|{text}"
+        extent = self._cached(key)
+        if extent is not None:
+            return extent
+        
+        if self.measurer is not None and text.strip():
+            with _MEASURE_LOCK:
+                # Another thread may have measured the string while this one waited
+                extent = self._cached(key)
+                if extent is not None:
+                    return extent
+                try:
+                    extent = self.measurer(kind, text)
+                except Exception as e:
+                    # Missing LaTeX or fonts; fall back to the estimate for this string
+                    print(f"⚠️ Could not measure {kind} {text[:30]!r}: {e}")
+        
+        with self._lock:
+            if extent is not None:
+                self.stats.measured += 1
+                self._entries[key] = extent
+                self._trim(self._entries)
+                self._unsaved += 1
+                save = self.cache_path is not None and self._unsaved >= self.save_every
+            else:
+                self.stats.estimated += 1
+                extent = estimate_extent(kind, text)
+                self._estimates[key] = extent
+                self._trim(self._estimates)
+                save = False
+        if save:
+            self.save()
+        return extent
+    
+    def _cached(self, key: str) -> Optional[Tuple[float, float]]:
+        with self._lock:
+            for entries in (self._entries, self._estimates):
+                extent = entries.get(key)
+                if extent is not None:
+                    entries.move_to_end(key)
+                    self.stats.hits += 1
+                    return extent
+        return None
+    
+    def _trim(self, entries: OrderedDict):
+        while len(entries) > self.max_entries:
+            entries.popitem(last=False)
+    
+    def save(self):
+        """Write the measurements to cache_path (no-op for a memory-only cache)."""
+        if not self.cache_path:
+            return
+        with self._lock:
+            payload = json.dumps({key: list(extent) for key, extent in self._entries.items()})
+            self._unsaved = 0
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = self.cache_path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        temp_path.write_text(payload, encoding="utf-8")
+        os.replace(temp_path, self.cache_path)
+    
+    def flush(self):
+        """Save measurements made since the last save (called when a run ends)."""
+        with self._lock:
+            pending = self._unsaved > 0
+        if pending:
+            self.save()
+
+
+_default_metrics: Optional[TextMetrics] = None
+
+
+def default_text_metrics() -> TextMetrics:
+    """
+    Shared TextMetrics instance.
+
+    Persists to the file named by the EDUVIZ_TEXT_METRICS_CACHE environment
+    variable, or stays in memory if it is not set. Unsaved measurements are
+    flushed when the process exits.
+
+    Returns:
+        Process-wide TextMetrics
+    """
+    global _default_metrics
+    if _default_metrics is None:
+        _default_metrics = TextMetrics(cache_path=os.getenv("EDUVIZ_TEXT_METRICS_CACHE"))
+        atexit.register(_default_metrics.flush)
+    return _default_metrics
+
+
+def measure_text(text: str, font_size: float = REFERENCE_FONT_SIZE, kind: str = "text") -> Tuple[float, float]:
+    """
+    Convenience function to measure a string with the shared TextMetrics.
+
+    Args:
+        text: String content
+        font_size: Font size the string is rendered at
+        kind: "text" for Text, "math" for MathTex
+
+    Returns:
+        (width, height) in Manim units
+    """
+    return default_text_metrics().measure(text, font_size, kind)
@@ -0,0 +1,298 @@
+"""
+Timeline Module
+
+Interval-based scheduling for the animations of a scene. Each
+AnimationStep occupies the half-open interval [delay, delay + duration).
+The timeline indexes these intervals in a centered interval tree and
+provides:
+
+- play groups: maximal sets of animations connected by overlap, each of
+  which can be issued as a single self.play call
+- conflicts: overlapping animations that act on the same object
+- compaction: shortening idle gaps where nothing is animating
+
+Start times closer than `tolerance` seconds are treated as equal, so
+near-equal floats from the LLM (1.9999 vs 2.0) land in the same group.
+"""
+
+from dataclasses import dataclass, replace
+from typing import List, Optional, Tuple
+
+from .scene_structure import AnimationStep
+
+
+# Default tolerance (seconds) when comparing start and end times
+DEFAULT_TOLERANCE = 1e-3
+
+
+@dataclass
+class TimelineGroup:
+    """Animations that overlap in time and can be played in one call."""
+    start: float
+    end: float
+    entries: List[Tuple[float, AnimationStep]]  # (offset from group start, animation)
+    
+    @property
+    def animations(self) -> List[AnimationStep]:
+        return [anim for _, anim in self.entries]
+    
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+
+@dataclass
+class TimelineConflict:
+    """Two overlapping animations that act on the same object."""
+    target: str
+    first: AnimationStep
+    second: AnimationStep
+    overlap: float  # seconds both animations are running
+
+
+class _IntervalNode:
+    """Node of a centered interval tree."""
+    
+    __slots__ = ("center", "by_start", "by_end", "left", "right")
+    
+    def __init__(self, center: float, intervals: List[Tuple[float, float, int]]):
+        self.center = center
+        self.by_start = sorted(intervals)
+        self.by_end = sorted(intervals, key=lambda item: item[1], reverse=True)
+        self.left: Optional[_IntervalNode] = None
+        self.right: Optional[_IntervalNode] = None
+
+
+class IntervalTree:
+    """Static centered interval tree over (start, end, index) triples."""
+    
+    def __init__(self, intervals: List[Tuple[float, float, int]]):
+        """
+        Build the tree.
+
+        Args:
+            intervals: (start, end, index) triples with start <= end
+        """
+        self.root = self._build(intervals)
+    
+    def _build(self, intervals: List[Tuple[float, float, int]]) -> Optional[_IntervalNode]:
+        if not intervals:
+            return None
+        
+        # The median start is itself an endpoint, so at least one interval stays at the node
+        center = sorted(start for start, _, _ in intervals)[len(intervals) // 2]
+        left, here, right = [], [], []
+        for interval in intervals:
+            start, end, _ = interval
+            if end < center:
+                left.append(interval)
+            elif start > center:
+                right.append(interval)
+            else:
+                here.append(interval)
+        
+        node = _IntervalNode(center, here)
+        node.left = self._build(left)
+        node.right = self._build(right)
+        return node
+    
+    def query(self, start: float, end: float) -> List[int]:
+        """
+        Find intervals intersecting the closed range [start, end].
+
+        Args:
+            start: Range start
+            end: Range end
+
+        Returns:
+            Indices of the matching intervals (unordered)
+        """
+        found: List[int] = []
+        node = self.root
+        stack = [node] if node else []
+        while stack:
+            node = stack.pop()
+            if end < node.center:
+                for item_start, _, index in node.by_start:
+                    if item_start > end:
+                        break
+                    found.append(index)
+                if node.left:
+                    stack.append(node.left)
+            elif start > node.center:
+                for _, item_end, index in node.by_end:
+                    if item_end < start:
+                        break
+                    found.append(index)
+                if node.right:
+                    stack.append(node.right)
+            else:
+                found.extend(index for _, _, index in node.by_start)
+                if node.left:
+                    stack.append(node.left)
+                if node.right:
+                    stack.append(node.right)
+        return found
+
+
+class AnimationTimeline:
+    """Interval view over the animations of a scene."""
+    
+    def __init__(self, animations: List[AnimationStep], tolerance: float = DEFAULT_TOLERANCE):
+        """
+        Initialize the timeline.
+
+        Args:
+            animations: Animations of a scene; `delay` is the absolute start time
+            tolerance: Start/end times closer than this are treated as equal
+        """
+        self.tolerance = tolerance
+        # Stable sort keeps the scene order for animations starting together
+        self.animations = sorted(animations, key=lambda anim: anim.delay)
+        self._tree: Optional[IntervalTree] = None
+    
+    @property
+    def start(self) -> float:
+        """Start time of the first animation (0.0 for an empty timeline)."""
+        return self.animations[0].delay if self.animations else 0.0
+    
+    @property
+    def end(self) -> float:
+        """Time at which the last animation finishes."""
+        return max((anim.delay + anim.duration for anim in self.animations), default=0.0)
+    
+    @property
+    def tree(self) -> IntervalTree:
+        """Interval tree over the animations, built on first use."""
+        if self._tree is None:
+            self._tree = IntervalTree([
+                (anim.delay, anim.delay + anim.duration, index)
+                for index, anim in enumerate(self.animations)
+            ])
+        return self._tree
+    
+    def overlapping(self, start: float, end: float) -> List[AnimationStep]:
+        """
+        Animations running at some point in [start, end).
+
+        Args:
+            start: Window start time
+            end: Window end time
+
+        Returns:
+            Matching animations in start-time order
+        """
+        indices = [
+            index for index in self.tree.query(start, end)
+            if self._intervals_overlap(self.animations[index], start, end)
+        ]
+        return [self.animations[index] for index in sorted(indices)]
+    
+    def active_at(self, time: float) -> List[AnimationStep]:
+        """Animations running at the given time."""
+        tol = self.tolerance
+        indices = [
+            index for index in self.tree.query(time, time)
+            if self.animations[index].delay - tol <= time < self.animations[index].delay + self.animations[index].duration - tol
+        ]
+        return [self.animations[index] for index in sorted(indices)]
+    
+    def groups(self) -> List[TimelineGroup]:
+        """
+        Split the timeline into maximal groups of overlapping animations.
+
+        Animations join the current group when they start before it ends or
+        at (within tolerance) the same time as the previous animation, so
+        a group can be issued as a single self.play call that lasts from the
+        group start to the group end.
+
+        Returns:
+            Groups in time order
+        """
+        tol = self.tolerance
+        groups: List[TimelineGroup] = []
+        current: Optional[TimelineGroup] = None
+        last_start = None
+        
+        for anim in self.animations:
+            start = anim.delay
+            end = start + anim.duration
+            if current is not None and (start < current.end - tol or start - last_start <= tol):
+                offset = start - current.start
+                current.entries.append((0.0 if offset <= tol else offset, anim))
+                current.end = max(current.end, end)
+            else:
+                current = TimelineGroup(start=start, end=end, entries=[(0.0, anim)])
+                groups.append(current)
+            last_start = start
+        
+        return groups
+    
+    def conflicts(self) -> List[TimelineConflict]:
+        """
+        Find overlapping animations that share a target object.
+
+        Returns:
+            Conflicts ordered by the start time of the earlier animation
+        """
+        conflicts: List[TimelineConflict] = []
+        for index, anim in enumerate(self.animations):
+            start = anim.delay
+            end = start + anim.duration
+            targets = set(anim.target_objects)
+            if not targets:
+                continue
+            for other_index in sorted(self.tree.query(start, end)):
+                # Report each pair once, from the animation that sorts first
+                if other_index <= index:
+                    continue
+                other = self.animations[other_index]
+                if not self._intervals_overlap(other, start, end):
+                    continue
+                overlap = min(end, other.delay + other.duration) - max(start, other.delay)
+                for target in other.target_objects:
+                    if target in targets:
+                        conflicts.append(TimelineConflict(target, anim, other, overlap))
+        return conflicts
+    
+    def idle_gaps(self) -> List[Tuple[float, float]]:
+        """(start, end) of every period with no running animation, from time 0."""
+        gaps = []
+        cursor = 0.0
+        for group in self.groups():
+            if group.start - cursor > self.tolerance:
+                gaps.append((cursor, group.start))
+            cursor = max(cursor, group.end)
+        return gaps
+    
+    def compact(self, max_gap: float = 0.0) -> 'AnimationTimeline':
+        """
+        Shorten idle gaps so that none is longer than max_gap.
+
+        Groups keep their internal timing; later groups are shifted earlier
+        by the time removed from the gaps before them. The animations are
+        copied, the originals are left untouched.
+
+        Args:
+            max_gap: Longest idle period (seconds) to keep, including the
+                lead-in before the first animation
+
+        Returns:
+            New AnimationTimeline with adjusted delays
+        """
+        compacted: List[AnimationStep] = []
+        shift = 0.0
+        cursor = 0.0
+        for group in self.groups():
+            gap = group.start - cursor
+            if gap > max_gap:
+                shift += gap - max_gap
+            cursor = max(cursor, group.end)
+            for anim in group.animations:
+                compacted.append(replace(anim, delay=anim.delay - shift) if shift else anim)
+        return AnimationTimeline(compacted, tolerance=self.tolerance)
+    
+    def _intervals_overlap(self, anim: AnimationStep, start: float, end: float) -> bool:
+        """Whether anim's interval overlaps [start, end) by more than the tolerance."""
+        tol = self.tolerance
+        return anim.delay < end - tol and start < anim.delay + anim.duration - tol
@@ -5,7 +5,13 @@ Handles execution of generated Manim code to produce MP4 videos.
 """
 
 from .manim_executor import ManimExecutor, ExecutionResult, execute_manim_code
+from .scene_repair import SceneRepairLoop, RepairReport, locate_failing_scene, repair_and_render
+from .render_cost import RenderCostAnalyzer, SceneCost, CourseCost, analyze_render_cost
 
-__all__ = ['ManimExecutor', 'ExecutionResult', 'execute_manim_code']
+__all__ = [
+    'ManimExecutor', 'ExecutionResult', 'execute_manim_code',
+    'SceneRepairLoop', 'RepairReport', 'locate_failing_scene', 'repair_and_render',
+    'RenderCostAnalyzer', 'SceneCost', 'CourseCost', 'analyze_render_cost'
+]
 
 
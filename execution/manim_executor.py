@@ -18,6 +18,8 @@ from dataclasses import dataclass
 # Add parent directory to path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from execution.render_cost import RenderCostAnalyzer, CourseCost
+
 
 @dataclass
 class ExecutionResult:
@@ -48,7 +50,8 @@ class ManimExecutor:
                  temp_dir: Optional[str] = None,
                  default_quality: str = "medium",
                  timeout: int = 300,
-                 simulation_mode: bool = False):
+                 simulation_mode: bool = False,
+                 max_render_seconds: Optional[float] = None):
         """
         Initialize the Manim executor.
         
@@ -58,12 +61,18 @@ class ManimExecutor:
             default_quality: Default video quality ('low', 'medium', 'high', 'ultra')
             timeout: Maximum execution time in seconds
             simulation_mode: If True, simulate execution without running Manim
+            max_render_seconds: Render time budget checked against a static
+                estimate before rendering; over-budget code is downscaled to
+                the best quality that fits, or rejected
         """
         self.output_dir = Path(output_dir)
         self.temp_dir = temp_dir
         self.default_quality = default_quality
         self.timeout = timeout
         self.simulation_mode = simulation_mode
+        self.max_render_seconds = max_render_seconds
+        self.cost_analyzer = RenderCostAnalyzer()
+        self.last_cost: Optional[CourseCost] = None
         
         # Create output directory if it doesn't exist
         self.output_dir.mkdir(parents=True, exist_ok=True)
@@ -78,7 +87,8 @@ class ManimExecutor:
                     manim_code: str, 
                     scene_name: str = "CombinedVideo",
                     quality: Optional[str] = None,
-                    video_name: Optional[str] = None) -> ExecutionResult:
+                    video_name: Optional[str] = None,
+                    script_name: Optional[str] = None) -> ExecutionResult:
         """
         Execute Manim code and generate video.
         
@@ -87,11 +97,27 @@ class ManimExecutor:
             scene_name: Name of the Scene class to render
             quality: Video quality ('low', 'medium', 'high', 'ultra')
             video_name: Custom name for the output video
+            script_name: File name (without .py) the code is rendered from.
+                Manim keeps its partial-movie cache per script name, so
+                renders sharing one reuse the animations that did not
+                change (random if None, which never hits the cache)
             
         Returns:
             ExecutionResult with success status and video path
         """
         quality = quality or self.default_quality
+        
+        if self.max_render_seconds is not None:
+            quality = self._budget_quality(manim_code, scene_name, quality)
+            if quality is None:
+                low = self.last_cost.total.render_seconds['low']
+                return ExecutionResult(
+                    success=False,
+                    error_message=f"Estimated render time {low:.0f}s at low quality exceeds "
+                                  f"the {self.max_render_seconds:.0f}s budget",
+                    temp_files=[]
+                )
+        
         quality_flag = self.QUALITY_SETTINGS.get(quality, '-qm')
         
         start_time = time.time()
@@ -99,7 +125,7 @@ class ManimExecutor:
         
         try:
             # Create temporary Python file
-            temp_file = self._create_temp_file(manim_code)
+            temp_file = self._create_temp_file(manim_code, script_name)
             temp_files.append(temp_file)
             
             # Generate unique output filename
@@ -223,6 +249,20 @@ class ManimExecutor:
                 error_message=f"Failed to read code file: {str(e)}"
             )
     
+    def _budget_quality(self, manim_code: str, scene_name: str, quality: str) -> Optional[str]:
+        """Best quality up to `quality` whose estimated render time fits the budget (None if none does)."""
+        try:
+            self.last_cost = self.cost_analyzer.analyze(manim_code, scene_name)
+        except ValueError:
+            return quality  # let Manim report the problem
+        
+        affordable = self.last_cost.total.affordable_quality(quality, self.max_render_seconds)
+        if affordable is not None and affordable != quality:
+            estimate = self.last_cost.total.render_seconds.get(quality, 0.0)
+            print(f"⚠️ Estimated render time {estimate:.0f}s at {quality} exceeds the "
+                  f"{self.max_render_seconds:.0f}s budget; rendering at {affordable}")
+        return affordable
+    
     def cleanup_temp_files(self, temp_files: List[str]):
         """Clean up temporary files."""
         for temp_file in temp_files:
@@ -232,15 +272,15 @@ class ManimExecutor:
             except Exception as e:
                 print(f"Warning: Could not remove temp file {temp_file}: {e}")
     
-    def _create_temp_file(self, manim_code: str) -> str:
+    def _create_temp_file(self, manim_code: str, script_name: Optional[str] = None) -> str:
         """Create temporary Python file with Manim code."""
         if self.temp_dir:
             temp_dir = self.temp_dir
         else:
             temp_dir = tempfile.gettempdir()
         
-        # Create unique filename
-        temp_filename = f"manim_scene_{uuid.uuid4().hex[:8]}.py"
+        # Create unique filename unless a stable one keeps the partial-movie cache
+        temp_filename = f"{script_name or f'manim_scene_{uuid.uuid4().hex[:8]}'}.py"
         temp_path = os.path.join(temp_dir, temp_filename)
         
         with open(temp_path, 'w') as f:
@@ -0,0 +1,342 @@
+"""
+Render Cost Module
+
+Static estimate of how expensive generated Manim code is to render, made
+before ManimExecutor spends minutes on it.
+
+The analyzer walks the AST of the scene class. For each method it counts
+self.play calls (summing run_time, default 1s), self.wait calls (summing
+their durations), Tex/Text/graph constructions, and updaters. Loops over
+range(<literal>) or literal sequences multiply their bodies. Calls to
+other methods of the class (construct -> scene_N, duplicate scenes
+replaying an earlier scene) are followed, so the course total matches
+what construct() actually plays.
+
+From the video duration it estimates frames and render seconds for each
+ManimExecutor quality level. A scheduler can then reject a pathological
+scene, or downscale it to the best quality that fits a budget.
+"""
+
+import ast
+import math
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+
+# ManimExecutor quality -> (width, height, fps)
+QUALITY_PROFILES = {
+    'low': (854, 480, 15),
+    'medium': (1280, 720, 30),
+    'high': (1920, 1080, 60),
+    'production': (2560, 1440, 60),
+    'ultra': (3840, 2160, 60),
+}
+QUALITY_ORDER = ['low', 'medium', 'high', 'production', 'ultra']
+
+TEX_CLASSES = frozenset({"MathTex", "Tex", "SingleStringMathTex", "MathTable", "Matrix",
+                         "DecimalMatrix", "IntegerMatrix", "BulletedList", "Title"})
+TEXT_CLASSES = frozenset({"Text", "MarkupText", "Paragraph", "Code", "Table"})
+GRAPH_CLASSES = frozenset({"Axes", "ThreeDAxes", "NumberPlane", "ComplexPlane", "PolarPlane",
+                           "FunctionGraph", "ParametricFunction", "ImplicitFunction", "Surface", "BarChart"})
+GRAPH_METHODS = frozenset({"plot", "plot_parametric_curve", "plot_implicit_curve", "get_graph",
+                           "get_area", "get_riemann_rectangles"})
+
+DEFAULT_RUN_TIME = 1.0
+DEFAULT_WAIT = 1.0
+
+
+@dataclass
+class SceneCost:
+    """Static cost of one scene method (including the methods it calls)."""
+    name: str
+    play_calls: int = 0
+    wait_calls: int = 0
+    animation_seconds: float = 0.0
+    wait_seconds: float = 0.0
+    tex_objects: int = 0
+    text_objects: int = 0
+    graph_objects: int = 0
+    updaters: int = 0
+    dynamic: bool = False  # a loop count or duration could not be read statically
+    frames: Dict[str, int] = field(default_factory=dict)
+    render_seconds: Dict[str, float] = field(default_factory=dict)
+    
+    @property
+    def duration(self) -> float:
+        return self.animation_seconds + self.wait_seconds
+    
+    def add(self, other: "SceneCost", times: int = 1):
+        """Accumulate the counts of another cost `times` times."""
+        self.play_calls += other.play_calls * times
+        self.wait_calls += other.wait_calls * times
+        self.animation_seconds += other.animation_seconds * times
+        self.wait_seconds += other.wait_seconds * times
+        self.tex_objects += other.tex_objects * times
+        self.text_objects += other.text_objects * times
+        self.graph_objects += other.graph_objects * times
+        self.updaters += other.updaters * times
+        self.dynamic = self.dynamic or other.dynamic
+    
+    def affordable_quality(self, requested: str, max_render_seconds: float) -> Optional[str]:
+        """
+        Best quality up to `requested` whose estimate fits the budget.
+
+        Args:
+            requested: Quality asked for
+            max_render_seconds: Render time budget
+
+        Returns:
+            Quality name, or None if even the lowest quality is over budget
+        """
+        allowed = QUALITY_ORDER[:QUALITY_ORDER.index(requested) + 1] if requested in QUALITY_ORDER else QUALITY_ORDER
+        for quality in reversed(allowed):
+            if self.render_seconds.get(quality, math.inf) <= max_render_seconds:
+                return quality
+        return None
+
+
+@dataclass
+class CourseCost:
+    """Static cost of a whole generated video."""
+    total: SceneCost
+    scenes: List[SceneCost] = field(default_factory=list)
+    
+    def pathological(self, max_scene_seconds: float = 180.0,
+                     max_render_seconds: Optional[float] = None,
+                     quality: str = 'medium') -> List[SceneCost]:
+        """
+        Scenes that are too long, or too slow to render at `quality`.
+
+        Args:
+            max_scene_seconds: Longest acceptable scene (video seconds)
+            max_render_seconds: Render time budget per scene at `quality` (unchecked if None)
+            quality: Quality the render budget applies to
+
+        Returns:
+            Offending scenes
+        """
+        return [
+            scene for scene in self.scenes
+            if scene.duration > max_scene_seconds
+            or (max_render_seconds is not None and scene.render_seconds.get(quality, 0.0) > max_render_seconds)
+        ]
+    
+    def summary(self, quality: str = 'medium') -> str:
+        """Human-readable per-scene and total report."""
+        lines = [f"{'scene':<14} {'plays':>5} {'video s':>8} {'tex':>4} {'text':>4} {'graph':>5} "
+                 f"{'frames':>7} {'render s':>9}"]
+        for cost in self.scenes + [self.total]:
+            flag = " *" if cost.dynamic else ""
+            lines.append(f"{cost.name:<14} {cost.play_calls:>5} {cost.duration:>8.1f} {cost.tex_objects:>4} "
+                         f"{cost.text_objects:>4} {cost.graph_objects:>5} {cost.frames.get(quality, 0):>7} "
+                         f"{cost.render_seconds.get(quality, 0.0):>9.1f}{flag}")
+        lines.append(f"(estimates at {quality} quality; * = contains loops or durations not known statically)")
+        return "\n".join(lines)
+
+
+class RenderCostAnalyzer:
+    """Estimates frames and render time of generated Manim code."""
+    
+    def __init__(self,
+                 seconds_per_megapixel_frame: float = 0.01,
+                 tex_seconds: float = 0.8,
+                 text_seconds: float = 0.1,
+                 play_overhead_seconds: float = 0.2,
+                 updater_factor: float = 1.5):
+        """
+        Initialize the analyzer.
+
+        The defaults are rough figures for Cairo rendering on one core;
+        adjust them to measured renders.
+
+        Args:
+            seconds_per_megapixel_frame: Rasterizing cost per frame and megapixel
+            tex_seconds: LaTeX compilation per Tex/MathTex construction
+            text_seconds: Pango layout per Text construction
+            play_overhead_seconds: Partial movie file setup per play/wait call
+            updater_factor: Frame cost multiplier for scenes with updaters
+        """
+        self.seconds_per_megapixel_frame = seconds_per_megapixel_frame
+        self.tex_seconds = tex_seconds
+        self.text_seconds = text_seconds
+        self.play_overhead_seconds = play_overhead_seconds
+        self.updater_factor = updater_factor
+    
+    def analyze(self, code: str, scene_name: Optional[str] = None) -> CourseCost:
+        """
+        Analyze generated code.
+
+        Args:
+            code: Manim Python source
+            scene_name: Scene class to analyze (first class with construct if None)
+
+        Returns:
+            CourseCost with one entry per scene_N method (or the construct
+            method for single-scene code) and the construct() total
+
+        Raises:
+            ValueError: If the code does not parse or has no such scene class
+        """
+        try:
+            tree = ast.parse(code)
+        except SyntaxError as e:
+            raise ValueError(f"Cannot analyze code with a syntax error: {e.msg} (line {e.lineno})") from e
+        
+        classes = [
+            node for node in tree.body
+            if isinstance(node, ast.ClassDef)
+            and any(isinstance(item, ast.FunctionDef) and item.name == "construct" for item in node.body)
+        ]
+        scene_class = next((node for node in classes if scene_name in (None, node.name)), None)
+        if scene_class is None:
+            raise ValueError(f"No scene class {scene_name or 'with a construct method'} found")
+        
+        methods = {item.name: item for item in scene_class.body if isinstance(item, ast.FunctionDef)}
+        own: Dict[str, SceneCost] = {}
+        calls: Dict[str, Counter] = {}
+        for name, method in methods.items():
+            own[name], calls[name] = SceneCost(name), Counter()
+            for statement in method.body:
+                self._walk(statement, 1, own[name], calls[name], set(methods))
+        
+        totals: Dict[str, SceneCost] = {}
+        
+        def total(name: str, active: frozenset) -> SceneCost:
+            if name in totals:
+                return totals[name]
+            cost = SceneCost(name)
+            cost.add(own[name])
+            for callee, times in calls[name].items():
+                if callee in active:
+                    cost.dynamic = True  # recursion: count once
+                    continue
+                cost.add(total(callee, active | {callee}), times)
+            self._estimate(cost)
+            totals[name] = cost
+            return cost
+        
+        scene_methods = sorted((name for name in methods if name.startswith("scene_") and name[6:].isdigit()),
+                               key=lambda name: int(name[6:]))
+        scenes = [total(name, frozenset({name})) for name in scene_methods] or [total("construct", frozenset({"construct"}))]
+        course = total("construct", frozenset({"construct"}))
+        course = SceneCost(scene_class.name, **{k: v for k, v in vars(course).items() if k != "name"})
+        return CourseCost(total=course, scenes=scenes)
+    
+    def _walk(self, node: ast.AST, times: int, cost: SceneCost, calls: Counter, methods: set):
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.Lambda, ast.ClassDef)):
+            # Nested functions run as updaters or callbacks; count what they construct once
+            for child in ast.walk(node):
+                if isinstance(child, ast.Call):
+                    self._count_construction(child, 1, cost)
+            return
+        
+        if isinstance(node, ast.For):
+            iterations = self._iterations(node.iter)
+            if iterations is None:
+                cost.dynamic = True
+                iterations = 1
+            self._walk(node.iter, times, cost, calls, methods)
+            for child in node.body:
+                self._walk(child, times * iterations, cost, calls, methods)
+            for child in node.orelse:
+                self._walk(child, times, cost, calls, methods)
+            return
+        
+        if isinstance(node, ast.While):
+            cost.dynamic = True
+        
+        if isinstance(node, ast.Call):
+            self._count_call(node, times, cost, calls, methods)
+        
+        for child in ast.iter_child_nodes(node):
+            self._walk(child, times, cost, calls, methods)
+    
+    def _count_call(self, node: ast.Call, times: int, cost: SceneCost, calls: Counter, methods: set):
+        func = node.func
+        if isinstance(func, ast.Attribute) and isinstance(func.value, ast.Name) and func.value.id == "self":
+            if func.attr == "play":
+                cost.play_calls += times
+                cost.animation_seconds += times * self._play_seconds(node, cost)
+            elif func.attr == "wait":
+                cost.wait_calls += times
+                argument = node.args[0] if node.args else self._keyword(node, "duration")
+                cost.wait_seconds += times * self._seconds(argument, DEFAULT_WAIT, cost)
+            elif func.attr in methods:
+                calls[func.attr] += times
+            return
+        self._count_construction(node, times, cost)
+    
+    def _count_construction(self, node: ast.Call, times: int, cost: SceneCost):
+        func = node.func
+        name = func.id if isinstance(func, ast.Name) else func.attr if isinstance(func, ast.Attribute) else None
+        if name in TEX_CLASSES:
+            cost.tex_objects += times
+        elif name in TEXT_CLASSES:
+            cost.text_objects += times
+        elif name in GRAPH_CLASSES or (isinstance(func, ast.Attribute) and name in GRAPH_METHODS):
+            cost.graph_objects += times
+        elif name in ("add_updater", "always_redraw"):
+            cost.updaters += times
+    
+    def _play_seconds(self, node: ast.Call, cost: SceneCost) -> float:
+        run_time = self._keyword(node, "run_time")
+        if run_time is not None:
+            return self._seconds(run_time, DEFAULT_RUN_TIME, cost)
+        # Without a play-level run_time the longest animation sets the duration
+        durations = [
+            self._seconds(self._keyword(arg, "run_time"), DEFAULT_RUN_TIME, cost)
+            for arg in node.args if isinstance(arg, ast.Call)
+        ]
+        return max(durations, default=DEFAULT_RUN_TIME)
+    
+    @staticmethod
+    def _keyword(node: ast.Call, name: str) -> Optional[ast.AST]:
+        return next((keyword.value for keyword in node.keywords if keyword.arg == name), None)
+    
+    @staticmethod
+    def _seconds(node: Optional[ast.AST], default: float, cost: SceneCost) -> float:
+        if node is None:
+            return default
+        try:
+            value = ast.literal_eval(node)
+        except (ValueError, SyntaxError, TypeError):
+            cost.dynamic = True
+            return default
+        return float(value) if isinstance(value, (int, float)) and not isinstance(value, bool) else default
+    
+    @staticmethod
+    def _iterations(node: ast.AST) -> Optional[int]:
+        if isinstance(node, (ast.List, ast.Tuple, ast.Set)):
+            return len(node.elts)
+        if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id == "range":
+            try:
+                return len(range(*[ast.literal_eval(arg) for arg in node.args]))
+            except (ValueError, SyntaxError, TypeError):
+                return None
+        return None
+    
+    def _estimate(self, cost: SceneCost):
+        """Fill in frames and render seconds for every quality."""
+        fixed = (cost.tex_objects * self.tex_seconds + cost.text_objects * self.text_seconds
+                 + (cost.play_calls + cost.wait_calls) * self.play_overhead_seconds)
+        factor = self.updater_factor if cost.updaters else 1.0
+        for quality, (width, height, fps) in QUALITY_PROFILES.items():
+            frames = math.ceil(cost.duration * fps)
+            cost.frames[quality] = frames
+            cost.render_seconds[quality] = round(
+                fixed + frames * (width * height / 1e6) * self.seconds_per_megapixel_frame * factor, 2)
+
+
+def analyze_render_cost(code: str, scene_name: Optional[str] = None) -> CourseCost:
+    """
+    Convenience function to estimate the render cost of generated code.
+
+    Args:
+        code: Manim Python source
+        scene_name: Scene class to analyze (first class with construct if None)
+
+    Returns:
+        CourseCost report
+    """
+    return RenderCostAnalyzer().analyze(code, scene_name)
@@ -0,0 +1,389 @@
+"""
+Scene Repair Module
+
+Repairs a failed CombinedVideo render one scene at a time.
+
+When `manim render` fails, the traceback is traced back to the scene_N
+method of CombinedVideo that raised. Only that method and its error are
+sent to the LLM for a fix. The patched scene is re-validated and
+rendered on its own (a copy of the scene class holding only that method)
+before the full video is rendered again. The full renders all use the
+same script name (the video name), and Manim keeps its partial-movie
+cache per script name, so the re-render reuses the animations that did
+not change. A caller that made the failed render itself gets this only
+if it rendered a script of that name with caching enabled (the Gradio
+app does). The number of LLM fix attempts is bounded per scene and per
+video.
+"""
+
+import ast
+import os
+import re
+import sys
+import textwrap
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from code_generation.code_validator import CodeValidator
+from execution.manim_executor import ManimExecutor, ExecutionResult
+from models.llm import LLM, BaseLLM, LLMRouter
+
+
+SCENE_METHOD = re.compile(r"^scene_\d+$")
+
+# Python and rich (Manim) traceback frame formats
+_PYTHON_FRAME = re.compile(r'File "(?P<file>[^"]+)", line (?P<line>\d+), in (?P<func>\w+)')
+_RICH_FRAME = re.compile(r"(?P<file>[^\s│]+\.py):(?P<line>\d+) in (?P<func>\w+)")
+
+
+@dataclass
+class RepairAttempt:
+    """One LLM fix of one scene method."""
+    scene: str
+    error: str
+    stage: str = ""  # "validation" or "segment" when the fix was rejected
+    ok: bool = False
+
+
+@dataclass
+class RepairReport:
+    """Everything the repair loop did for one video."""
+    attempts: List[RepairAttempt] = field(default_factory=list)
+    repaired_scenes: List[str] = field(default_factory=list)
+    note: str = ""
+    
+    def summary(self) -> str:
+        """Human-readable summary of the repairs."""
+        if not self.attempts:
+            return self.note or "No repairs attempted"
+        text = (f"{len(self.attempts)} repair attempt(s), "
+                f"{len(self.repaired_scenes)} scene(s) repaired: {', '.join(self.repaired_scenes) or 'none'}")
+        return f"{text} ({self.note})" if self.note else text
+
+
+def scene_method_ranges(code: str, class_name: str = "CombinedVideo") -> Dict[str, Tuple[int, int]]:
+    """
+    Line ranges (1-based, inclusive) of the methods of a scene class.
+
+    Args:
+        code: Combined Manim code
+        class_name: Scene class holding the methods
+
+    Returns:
+        Mapping of method name to (first line, last line)
+    """
+    tree = ast.parse(code)
+    for node in tree.body:
+        if isinstance(node, ast.ClassDef) and node.name == class_name:
+            return {
+                item.name: (item.lineno, item.end_lineno)
+                for item in node.body if isinstance(item, ast.FunctionDef)
+            }
+    return {}
+
+
+def locate_failing_scene(code: str, traceback_text: str, class_name: str = "CombinedVideo") -> Optional[str]:
+    """
+    Find the scene method a render traceback points into.
+
+    Frames named scene_N are used first (the innermost one wins); otherwise
+    the line numbers of frames outside installed packages are mapped onto
+    the method line ranges of the code.
+
+    Args:
+        code: Combined Manim code that was rendered
+        traceback_text: stderr/stdout of the failed render
+        class_name: Scene class holding the methods
+
+    Returns:
+        Method name such as "scene_3", or None if no frame matches
+    """
+    frames = [
+        (match.group("file"), int(match.group("line")), match.group("func"))
+        for pattern in (_PYTHON_FRAME, _RICH_FRAME)
+        for match in pattern.finditer(traceback_text)
+    ]
+    ranges = scene_method_ranges(code, class_name)
+    scene_ranges = {name: span for name, span in ranges.items() if SCENE_METHOD.match(name)}
+    
+    named = [func for _, _, func in frames if func in scene_ranges]
+    if named:
+        return named[-1]
+    
+    for path, line, _ in reversed(frames):
+        if "site-packages" in path or "dist-packages" in path:
+            continue
+        for name, (start, end) in scene_ranges.items():
+            if start <= line <= end:
+                return name
+    return None
+
+
+def extract_method(code: str, method: str, class_name: str = "CombinedVideo") -> str:
+    """Source of one method, dedented to column zero."""
+    start, end = scene_method_ranges(code, class_name)[method]
+    return textwrap.dedent("\n".join(code.split("\n")[start - 1:end]))
+
+
+def replace_method(code: str, method: str, new_source: str, class_name: str = "CombinedVideo") -> str:
+    """
+    Replace one method of the scene class.
+
+    Args:
+        code: Combined Manim code
+        method: Name of the method to replace
+        new_source: Replacement (a full `def`, or only the method body)
+        class_name: Scene class holding the method
+
+    Returns:
+        Code with the method replaced
+    """
+    start, end = scene_method_ranges(code, class_name)[method]
+    source = textwrap.dedent(new_source).strip("\n")
+    if not source.lstrip().startswith("def "):
+        source = f"def {method}(self):\n" + textwrap.indent(source, "    ")
+    lines = code.split("\n")
+    return "\n".join(lines[:start - 1] + textwrap.indent(source, "    ").split("\n") + lines[end:])
+
+
+def segment_code(code: str, method: str, class_name: str = "CombinedVideo") -> str:
+    """
+    Standalone code that plays a single scene method.
+
+    Keeps the module header (imports), then a scene class with only a
+    construct() calling the method and the method itself, so errors in
+    other scenes cannot fail its validation or render.
+
+    Args:
+        code: Combined Manim code
+        method: Scene method to keep
+        class_name: Scene class holding the method
+
+    Returns:
+        Manim code with a `class_name` scene
+    """
+    tree = ast.parse(code)
+    scene_class = next(node for node in tree.body if isinstance(node, ast.ClassDef) and node.name == class_name)
+    bases = ", ".join(ast.unparse(base) for base in scene_class.bases) or "Scene"
+    header = "\n".join(code.split("\n")[:scene_class.lineno - 1]).rstrip()
+    body = textwrap.indent(extract_method(code, method, class_name), "    ")
+    return (f"{header}\n\nclass {class_name}({bases}):\n"
+            f"    def construct(self):\n        self.{method}()\n\n{body}\n")
+
+
+class SceneRepairLoop:
+    """Re-renders a failed video by repairing only the scenes that fail."""
+    
+    def __init__(self,
+                 executor: ManimExecutor,
+                 api_key: Optional[str] = None,
+                 model_name: str = "gemini-2.5-pro",
+                 llm: Optional[BaseLLM] = None,
+                 router: Optional[LLMRouter] = None,
+                 validator: Optional[CodeValidator] = None,
+                 max_attempts_per_scene: int = 2,
+                 max_total_attempts: int = 4,
+                 segment_quality: str = "low"):
+        """
+        Initialize the repair loop.
+
+        Args:
+            executor: Executor used for the segment and full renders
+            api_key: Gemini API key. If None, will try to get from GOOGLE_API_KEY env var.
+            model_name: Gemini model asked for the fixes
+            llm: Pre-built model used instead of model_name
+            router: Routes fix requests across providers ("code" task)
+            validator: Validator run on the patched scene before rendering it
+            max_attempts_per_scene: LLM fixes allowed for one scene
+            max_total_attempts: LLM fixes allowed for the whole video
+            segment_quality: Quality of the single-scene check renders
+        """
+        if llm is None:
+            if router is not None:
+                llm = router.for_task("code")
+            else:
+                api_key = api_key or os.getenv("GOOGLE_API_KEY")
+                if not api_key:
+                    raise ValueError("Gemini API key is required. Set GOOGLE_API_KEY environment variable or pass api_key parameter.")
+                llm = LLM(provider="google_genai", model_name=model_name, api_key=api_key, temperature=0.1)
+        
+        self.executor = executor
+        self.llm = llm
+        self.validator = validator or CodeValidator()
+        self.max_attempts_per_scene = max_attempts_per_scene
+        self.max_total_attempts = max_total_attempts
+        self.segment_quality = segment_quality
+        self.report = RepairReport()
+        
+        self.system_prompt = """You fix one method of a Manim Community Edition scene that failed to render.
+
+Return ONLY the corrected method as Python code, starting with its `def` line.
+Keep the method name, its signature and what it shows; change only what is needed to fix the error.
+Use the modern Manim API (Create, not ShowCreation; font_size in constructors; no set_font_size)."""
+
+    def render(self,
+               code: str,
+               scene_name: str = "CombinedVideo",
+               quality: Optional[str] = None,
+               video_name: Optional[str] = None) -> Tuple[ExecutionResult, str]:
+        """
+        Render the video, repairing failing scenes as needed.
+
+        Args:
+            code: Combined Manim code
+            scene_name: Scene class to render
+            quality: Video quality for the full render
+            video_name: Custom name for the output video
+
+        Returns:
+            Tuple of (result of the last full render, code that was rendered)
+        """
+        result = self.executor.execute_code(code, scene_name, quality, video_name,
+                                            script_name=self._script_name(scene_name, video_name))
+        return self.repair(code, result, scene_name, quality, video_name)
+    
+    def repair(self,
+               code: str,
+               result: ExecutionResult,
+               scene_name: str = "CombinedVideo",
+               quality: Optional[str] = None,
+               video_name: Optional[str] = None) -> Tuple[ExecutionResult, str]:
+        """
+        Repair a video whose full render already failed.
+
+        Args:
+            code: Combined Manim code that failed
+            result: The failed ExecutionResult
+            scene_name: Scene class to render
+            quality: Video quality for the full render
+            video_name: Custom name for the output video
+
+        Returns:
+            Tuple of (result of the last full render, code that was rendered)
+        """
+        self.report = RepairReport()
+        
+        while not result.success:
+            error = self._error_text(result)
+            scene = locate_failing_scene(code, error, scene_name)
+            if scene is None:
+                self.report.note = "failure could not be traced to a scene"
+                break
+            
+            fixed = self._repair_scene(code, scene, error, scene_name)
+            if fixed is None:
+                break
+            
+            code = fixed
+            print(f"♻️ Scene {scene} repaired; re-rendering the video")
+            result = self.executor.execute_code(code, scene_name, quality, video_name,
+                                                script_name=self._script_name(scene_name, video_name))
+        
+        print(f"Scene repair: {self.report.summary()}")
+        return result, code
+    
+    def _repair_scene(self, code: str, scene: str, error: str, scene_name: str) -> Optional[str]:
+        """Fix one scene until its segment renders; None if the budget runs out."""
+        scene_attempts = sum(attempt.scene == scene for attempt in self.report.attempts)
+        
+        while scene_attempts < self.max_attempts_per_scene:
+            if len(self.report.attempts) >= self.max_total_attempts:
+                self.report.note = "attempt budget exhausted"
+                return None
+            
+            attempt = RepairAttempt(scene=scene, error=error.strip().splitlines()[-1] if error.strip() else "")
+            self.report.attempts.append(attempt)
+            scene_attempts += 1
+            
+            try:
+                candidate = replace_method(code, scene, self._ask_fix(extract_method(code, scene, scene_name), error),
+                                           scene_name)
+            except Exception as e:
+                error = f"Fix could not be applied: {e}"
+                attempt.stage = "validation"
+                continue
+            
+            try:
+                segment_source = segment_code(candidate, scene, scene_name)
+            except SyntaxError as e:
+                error = f"The previous fix does not parse: SyntaxError: {e.msg} (line {e.lineno})"
+                attempt.stage = "validation"
+                continue
+            except (StopIteration, KeyError) as e:
+                error = f"Fix could not be applied: {e!r}"
+                attempt.stage = "validation"
+                continue
+            validation = self.validator.validate(segment_source)
+            if not validation.ok:
+                error = "\n".join(validation.errors)
+                attempt.stage = "validation"
+                continue
+            
+            segment = self.executor.execute_code(segment_source, scene_name,
+                                                 self.segment_quality, f"repair_check_{scene}")
+            self._discard(segment)
+            code = candidate
+            if segment.success:
+                attempt.ok = True
+                self.report.repaired_scenes.append(scene)
+                return code
+            error = self._error_text(segment)
+            attempt.stage = "segment"
+        
+        if not self.report.note:
+            self.report.note = f"{scene} still fails after {self.max_attempts_per_scene} attempt(s)"
+        return None
+    
+    def _ask_fix(self, method_source: str, error: str) -> str:
+        prompt = f"""This scene method fails when rendering the video:
+
+```python
+{method_source}
+```
+
+Error:
+{error[-3000:]}
+
+Return the corrected method."""
+        response = self.llm.create_cached_chat(self.system_prompt).invoke([("user", prompt)])
+        content = response.content if hasattr(response, "content") else str(response)
+        return re.sub(r"^```(?:python)?\s*|\s*```\s*$", "", content.strip())
+    
+    @staticmethod
+    def _script_name(scene_name: str, video_name: Optional[str]) -> str:
+        """Script name shared by the full renders of one video, so they share Manim's cache."""
+        return video_name or f"{scene_name.lower()}_repair"
+    
+    def _error_text(self, result: ExecutionResult) -> str:
+        return "\n".join(part for part in (result.stderr, result.stdout, result.error_message) if part)
+    
+    def _discard(self, result: ExecutionResult):
+        """Remove the files of a check render."""
+        self.executor.cleanup_temp_files(result.temp_files or [])
+        if result.video_path and os.path.exists(result.video_path):
+            os.remove(result.video_path)
+
+
+def repair_and_render(code: str,
+                      executor: Optional[ManimExecutor] = None,
+                      api_key: Optional[str] = None,
+                      quality: Optional[str] = None,
+                      video_name: Optional[str] = None) -> Tuple[ExecutionResult, str]:
+    """
+    Convenience function to render combined code with scene repair.
+
+    Args:
+        code: Combined Manim code
+        executor: Executor to use (default settings if None)
+        api_key: Optional Gemini API key
+        quality: Video quality
+        video_name: Custom name for the video
+
+    Returns:
+        Tuple of (ExecutionResult, code that was rendered)
+    """
+    loop = SceneRepairLoop(executor or ManimExecutor(), api_key=api_key)
+    return loop.render(code, quality=quality, video_name=video_name)
@@ -31,6 +31,12 @@ except ImportError:
     pass
 
 from data_processing.multi_scene_processor import process_large_document, MultiSceneStructure
+from data_processing.scene_columns import SceneColumns
+from execution.manim_executor import ManimExecutor, ExecutionResult
+from execution.scene_repair import SceneRepairLoop
+
+# Frontend quality labels -> ManimExecutor quality names
+EXECUTOR_QUALITY = {"480p15": "low", "720p30": "medium", "1080p60": "high"}
 
 
 class ManimPipelineFrontend:
@@ -124,26 +130,38 @@ class ManimPipelineFrontend:
             stats = f"📊 Detailed Video Statistics:\n"
             stats += f"{'='*50}\n\n"
             
+            # Columnar view for vectorized statistics
+            columns = SceneColumns.from_scenes(multi_scene.scenes)
+            objects_per_scene = columns.objects_per_scene()
+            animations_per_scene = columns.animations_per_scene()
+            summary = columns.summary()
+            
             # Scene breakdown
             stats += f"🎥 Scene Breakdown:\n"
-            for i, scene in enumerate(multi_scene.scenes, 1):
-                stats += f"  Scene {i:2d}: {scene.settings.title}\n"
-                stats += f"    ⏱️ Duration: {scene.settings.duration:4.1f}s\n"
-                stats += f"    🎯 Objects: {len(scene.objects):2d}\n"
-                stats += f"    🎬 Animations: {len(scene.animations):2d}\n"
+            for i, title in enumerate(columns.scene_titles):
+                stats += f"  Scene {i + 1:2d}: {title}\n"
+                stats += f"    ⏱️ Duration: {columns.scene_durations[i]:4.1f}s\n"
+                stats += f"    🎯 Objects: {objects_per_scene[i]:2d}\n"
+                stats += f"    🎬 Animations: {animations_per_scene[i]:2d}\n"
                 stats += f"\n"
             
-            # Calculate additional statistics
-            avg_duration = multi_scene.total_duration / len(multi_scene.scenes)
-            total_objects = sum(len(scene.objects) for scene in multi_scene.scenes)
-            total_animations = sum(len(scene.animations) for scene in multi_scene.scenes)
-            
             stats += f"📈 Analysis:\n"
-            stats += f"  📊 Average scene duration: {avg_duration:.1f} seconds\n"
-            stats += f"  🎯 Total objects created: {total_objects}\n"
-            stats += f"  🎬 Total animations: {total_animations}\n"
-            stats += f"  📱 Scenes per minute: {len(multi_scene.scenes) / (multi_scene.total_duration / 60):.1f}\n"
-            stats += f"  ⚡ Objects per scene (avg): {total_objects / len(multi_scene.scenes):.1f}\n"
+            stats += f"  📊 Average scene duration: {summary['avg_scene_duration']:.1f} seconds\n"
+            stats += f"  🎯 Total objects created: {summary['num_objects']}\n"
+            stats += f"  🎬 Total animations: {summary['num_animations']}\n"
+            stats += f"  📱 Scenes per minute: {summary['scenes_per_minute']:.1f}\n"
+            stats += f"  ⚡ Objects per scene (avg): {summary['avg_objects_per_scene']:.1f}\n"
+            stats += f"  🔀 Peak concurrent animations: {summary['peak_concurrent_animations']}\n"
+            
+            durations = summary['animation_durations']
+            if durations['count']:
+                stats += f"  ⏳ Animation duration: median {durations['p50']:.1f}s, p90 {durations['p90']:.1f}s, max {durations['max']:.1f}s\n"
+            
+            used_types = {name: count for name, count in summary['object_types'].items() if count}
+            if used_types:
+                stats += f"  🧩 Object types: " + ", ".join(
+                    f"{name} {count}" for name, count in sorted(used_types.items(), key=lambda item: -item[1])
+                ) + "\n"
             
             # Generate video if requested
             video_file_path = None
@@ -168,13 +186,12 @@ class ManimPipelineFrontend:
                     elif quality == "1080p60":
                         quality_flag = "-pqh"  # high quality
                     
-                    # Run manim command
+                    # Run manim command (with caching, so a scene repair re-render reuses the partial movies)
                     cmd = [
                         "manim", 
                         str(temp_filepath), 
                         "CombinedVideo", 
-                        quality_flag,
-                        "--disable_caching"
+                        quality_flag
                     ]
                     
                     print(f"Running command: {' '.join(cmd)}")
@@ -201,7 +218,26 @@ class ManimPipelineFrontend:
                                 status_msg += f"\n🎬 Video found: {Path(video_file_path).name}"
                     else:
                         print(f"⚠️ Video generation failed: {result.stderr}")
-                        status_msg += f"\n⚠️ Video generation failed. Code generated successfully."
+                        
+                        # Fix only the failing scene(s) and re-render
+                        repair_loop = SceneRepairLoop(
+                            ManimExecutor(output_dir=str(project_root / "media")),
+                            api_key=used_api_key
+                        )
+                        failed = ExecutionResult(success=False, stdout=result.stdout, stderr=result.stderr)
+                        repaired, generated_code = repair_loop.repair(
+                            generated_code, failed,
+                            quality=EXECUTOR_QUALITY.get(quality, "low"),
+                            video_name=temp_filename[:-3]
+                        )
+                        
+                        if repaired.success:
+                            video_file_path = repaired.video_path
+                            status_msg = status_msg.replace("📝 Generated Code:", "🎥 Video Generated!")
+                            status_msg += f"\n♻️ {repair_loop.report.summary()}"
+                            status_msg += f"\n🎬 Video saved to: {Path(video_file_path).name}"
+                        else:
+                            status_msg += f"\n⚠️ Video generation failed ({repair_loop.report.summary()}). Code generated successfully."
                         
                     # Clean up temp file
                     if temp_filepath.exists():
@@ -1,8 +1,14 @@
 from abc import ABC, abstractmethod
 from langchain_openai import ChatOpenAI
 from langchain_google_genai import ChatGoogleGenerativeAI
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
 import os
 import getpass
+import threading
+import time
 
 
 '''
@@ -11,12 +17,119 @@ import getpass
 
 #TODO: Add support for other LLM providers
 
+# Rough characters-per-token ratio for English text and code
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate token count of text (about four characters per token)."""
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def is_missing_cache_error(error: Exception) -> bool:
+    """Whether a provider error says the referenced context cache no longer exists."""
+    code = getattr(error, "code", None) or getattr(error, "status_code", None)
+    message = str(error).lower()
+    return code == 404 or "not found" in message or "not_found" in message
+
+
+class CachedPromptChat:
+    """
+    Chat client bound to a static system prompt.
+    
+    Callers pass only the per-request messages. When the provider holds the
+    system prompt in an explicit context cache (cache_name is set), it is not
+    sent again; otherwise it is prepended unchanged to every request so the
+    provider's automatic prefix caching can reuse it.
+    
+    An explicit cache lives until expires_at (time.monotonic seconds). It is
+    recreated through renew shortly before then, or when the provider
+    reports it missing, and deleted through delete on close.
+    """
+    
+    # Seconds before expires_at at which the cache is recreated
+    renew_margin = 60.0
+    
+    def __init__(self, client, system_prompt: str, cache_name: Optional[str] = None,
+                 expires_at: Optional[float] = None,
+                 renew: Optional[Callable[[], tuple]] = None,
+                 delete: Optional[Callable[[str], None]] = None):
+        """
+        Args:
+            client: Chat client (bound to the cache when cache_name is set)
+            system_prompt (str): System prompt shared by every request
+            cache_name (Optional[str]): Provider context cache holding the prompt
+            expires_at (Optional[float]): When the cache lapses (time.monotonic)
+            renew (Optional[Callable[[], tuple]]): Creates a new cache and
+                returns (client, cache_name, expires_at); cache_name is None
+                when the prompt has to be sent with every request again
+            delete (Optional[Callable[[str], None]]): Deletes a cache by name
+        """
+        self.client = client
+        self.system_prompt = system_prompt
+        self.cache_name = cache_name
+        self.expires_at = expires_at
+        self._renew = renew
+        self._delete = delete
+        self._closed = False
+        self._lock = threading.Lock()
+    
+    def invoke(self, messages: List, **kwargs):
+        """Invoke the client with the per-request messages."""
+        with self._lock:
+            if (self.cache_name is not None and self.expires_at is not None
+                    and time.monotonic() >= self.expires_at - self.renew_margin):
+                self._recreate(self.cache_name)
+            client, cache_name = self.client, self.cache_name
+        
+        try:
+            return client.invoke(self._request(messages, cache_name), **kwargs)
+        except Exception as e:
+            if cache_name is None or self._renew is None or not is_missing_cache_error(e):
+                raise
+            print(f"⚠️ Context cache {cache_name} is gone ({e}), recreating it")
+            with self._lock:
+                self._recreate(cache_name)
+                client, cache_name = self.client, self.cache_name
+            return client.invoke(self._request(messages, cache_name), **kwargs)
+    
+    def close(self):
+        """Delete the provider cache; a later invoke creates a new one."""
+        with self._lock:
+            if self.cache_name is not None and self._delete is not None:
+                self._delete(self.cache_name)
+                self._closed = True
+                self.expires_at = float("-inf")
+    
+    def _request(self, messages: List, cache_name: Optional[str]) -> List:
+        if cache_name is None:
+            return [("system", self.system_prompt)] + list(messages)
+        return list(messages)
+    
+    def _recreate(self, stale_name: str):
+        # Another thread may have replaced the cache already (caller holds the lock)
+        if self.cache_name != stale_name or self._renew is None:
+            return
+        self.client, self.cache_name, self.expires_at = self._renew()
+        if self._delete is not None and not self._closed:
+            self._delete(stale_name)
+        self._closed = False
+
+
 class BaseLLM(ABC):
     """Abstract base class for LLM implementations."""
     
+    # LangChain method used to enforce a JSON schema on responses
+    structured_output_method = "json_schema"
+    
+    # Concurrent requests per batch_invoke call when not specified
+    default_max_concurrency = 4
+    
     def __init__(self, model_name: str, **kwargs):
         self.model_name = model_name
         self.config = kwargs
+        self._cached_chats: Dict[str, CachedPromptChat] = {}
+        self._cached_chats_lock = threading.Lock()
         self.client = self.create_llm()
     
     @abstractmethod
@@ -27,6 +140,71 @@ class BaseLLM(ABC):
     def create_chat(self):
         """Return the chat client."""
         return self.client
+    
+    def create_structured_chat(self, schema: Dict):
+        """
+        Return a chat client whose responses are constrained to a JSON schema.
+        
+        The provider's native structured output / JSON mode is used, so the
+        runnable returns parsed dictionaries instead of raw text.
+        
+        Args:
+            schema (Dict): JSON schema the response must follow (needs a 'title')
+            
+        Returns:
+            Runnable that returns a dict matching the schema
+        """
+        return self.client.with_structured_output(schema, method=self.structured_output_method)
+    
+    def create_cached_chat(self, system_prompt: str) -> CachedPromptChat:
+        """
+        Return a chat client for a static system prompt that the provider can cache.
+        
+        Clients are reused for the same prompt, so a provider cache is
+        created at most once per prompt (until close).
+        
+        Args:
+            system_prompt (str): System prompt shared by every request
+            
+        Returns:
+            CachedPromptChat that takes only the per-request messages
+        """
+        with self._cached_chats_lock:
+            if system_prompt not in self._cached_chats:
+                self._cached_chats[system_prompt] = self._create_cached_chat(system_prompt)
+            return self._cached_chats[system_prompt]
+    
+    def close(self):
+        """Delete the provider caches created for cached chats."""
+        with self._cached_chats_lock:
+            chats = list(self._cached_chats.values())
+            self._cached_chats.clear()
+        for chat in chats:
+            chat.close()
+    
+    def _create_cached_chat(self, system_prompt: str) -> CachedPromptChat:
+        """Default: rely on the provider's automatic caching of repeated prefixes."""
+        return CachedPromptChat(self.client, system_prompt)
+    
+    def batch_invoke(self, requests: List[List], max_concurrency: Optional[int] = None,
+                     return_exceptions: bool = False) -> List:
+        """
+        Invoke the chat client on several independent message lists.
+        
+        Args:
+            requests (List[List]): One message list per request
+            max_concurrency (Optional[int]): Requests in flight at once
+                (default_max_concurrency if None)
+            return_exceptions (bool): Return failures in place of their
+                responses instead of raising the first one
+            
+        Returns:
+            Responses in the order of the requests
+        """
+        if not requests:
+            return []
+        config = {"max_concurrency": max_concurrency or self.default_max_concurrency}
+        return self.client.batch(requests, config=config, return_exceptions=return_exceptions)
 
 class ChatOpenAILLM(BaseLLM):
     """ChatOpenAI implementation."""
@@ -40,12 +218,17 @@ class ChatOpenAILLM(BaseLLM):
             base_url=self.config['base_url'] if 'base_url' in self.config else "https://api.together.xyz/v1",
             model=self.model_name,
             api_key=self.api_key,
-            **{k: v for k, v in self.config.items() if k != 'model'}
+            **{k: v for k, v in self.config.items() if k not in ('model', 'base_url')}
         )
 
 class GoogleGenerativeAILLM(BaseLLM):
     """GoogleGenerativeAI implementation."""
     
+    # Gemini rejects explicit context caches smaller than this (tokens)
+    min_cached_prompt_tokens = 1024
+    # Lifetime of an explicit context cache (seconds)
+    cache_ttl = 3600
+    
     def __init__(self, model_name: str, api_key: str = None, **kwargs):
         self.api_key = api_key
         super().__init__(model_name, **kwargs)
@@ -56,6 +239,80 @@ class GoogleGenerativeAILLM(BaseLLM):
             model=self.model_name,
             **{k: v for k, v in self.config.items() if k != 'model'}
         )
+    
+    def _create_cached_chat(self, system_prompt: str) -> CachedPromptChat:
+        """Store the system prompt in a Gemini context cache when it is large enough."""
+        if estimate_tokens(system_prompt) < self.min_cached_prompt_tokens:
+            # Too small for an explicit cache; Gemini still caches repeated prefixes implicitly
+            return super()._create_cached_chat(system_prompt)
+        
+        client, cache_name, expires_at = self._create_context_cache(system_prompt)
+        return CachedPromptChat(client, system_prompt, cache_name=cache_name, expires_at=expires_at,
+                                renew=lambda: self._create_context_cache(system_prompt),
+                                delete=self._delete_context_cache)
+    
+    def _create_context_cache(self, system_prompt: str) -> tuple:
+        """Create a context cache; returns (client, cache_name, expires_at), the plain client on failure."""
+        try:
+            from google import genai
+            from google.genai import types
+            
+            expires_at = time.monotonic() + self.cache_ttl
+            cache = genai.Client(api_key=self.api_key).caches.create(
+                model=self.model_name,
+                config=types.CreateCachedContentConfig(system_instruction=system_prompt, ttl=f"{self.cache_ttl}s")
+            )
+        except Exception as e:
+            print(f"⚠️ Context cache unavailable ({e}), relying on implicit prefix caching")
+            return self.client, None, None
+        
+        client = ChatGoogleGenerativeAI(
+            google_api_key=self.api_key,
+            model=self.model_name,
+            cached_content=cache.name,
+            **{k: v for k, v in self.config.items() if k != 'model'}
+        )
+        return client, cache.name, expires_at
+    
+    def _delete_context_cache(self, cache_name: str):
+        try:
+            from google import genai
+            
+            genai.Client(api_key=self.api_key).caches.delete(name=cache_name)
+        except Exception as e:
+            # The cache lapses on its own at the end of its TTL
+            print(f"⚠️ Could not delete context cache {cache_name}: {e}")
+
+
+class LocalLLM(BaseLLM):
+    """
+    Local model served through an OpenAI-compatible endpoint.
+    
+    Works with llama.cpp's llama-server, Ollama, vLLM and similar servers, so
+    requests stay on the machine and are not billed per token. The endpoint
+    defaults to LOCAL_LLM_BASE_URL or llama-server's default address.
+    """
+    
+    DEFAULT_BASE_URL = "http://localhost:8080/v1"
+    
+    def __init__(self, model_name: str, api_key: str = None, parallel: int = 4, **kwargs):
+        """
+        Args:
+            model_name (str): Model name as known to the server
+            api_key (str): Key if the server requires one
+            parallel (int): Requests the server processes at once (llama-server --parallel)
+        """
+        self.api_key = api_key or os.getenv("LOCAL_LLM_API_KEY") or "not-needed"
+        self.default_max_concurrency = parallel
+        super().__init__(model_name, **kwargs)
+    
+    def create_llm(self):
+        return ChatOpenAI(
+            base_url=self.config.get('base_url') or os.getenv("LOCAL_LLM_BASE_URL") or self.DEFAULT_BASE_URL,
+            model=self.model_name,
+            api_key=self.api_key,
+            **{k: v for k, v in self.config.items() if k not in ('model', 'base_url')}
+        )
 
 
 class LLMFactory:
@@ -116,7 +373,446 @@ class LLM:
         """Return the chat client."""
         return self.llm.create_chat()
     
+    def create_structured_chat(self, schema: Dict):
+        """Return a chat client constrained to the given JSON schema."""
+        return self.llm.create_structured_chat(schema)
+    
+    def create_cached_chat(self, system_prompt: str) -> CachedPromptChat:
+        """Return a chat client for a static system prompt that the provider can cache."""
+        return self.llm.create_cached_chat(system_prompt)
+    
+    def close(self):
+        """Delete the provider caches created for cached chats."""
+        self.llm.close()
+    
+    def batch_invoke(self, requests: List[List], max_concurrency: Optional[int] = None,
+                     return_exceptions: bool = False) -> List:
+        """Invoke the chat client on several independent message lists."""
+        return self.llm.batch_invoke(requests, max_concurrency, return_exceptions)
+    
     def switch_provider(self, new_provider: str, **kwargs):
         """Switch to a different provider while keeping the same model name."""
         self.provider = new_provider
-        self.llm = LLMFactory.create_llm(new_provider, self.model_name, **kwargs)
\ No newline at end of file
+        self.llm.close()
+        self.llm = LLMFactory.create_llm(new_provider, self.model_name, **kwargs)
+
+
+class NoRouteAvailableError(RuntimeError):
+    """Raised when every route for a task failed or is over budget."""
+
+
+@dataclass
+class ModelRoute:
+    """A provider/model that can serve a task class, with its token prices."""
+    name: str
+    llm: Any  # LLM (or anything with the same create_* interface)
+    input_cost_per_mtok: float = 0.0  # USD per million input tokens
+    output_cost_per_mtok: float = 0.0  # USD per million output tokens
+    
+    @property
+    def is_free(self) -> bool:
+        return self.input_cost_per_mtok == 0 and self.output_cost_per_mtok == 0
+
+
+@dataclass
+class RouteStats:
+    """Live latency, error and spend statistics of one route."""
+    window: int = 20
+    calls: int = 0
+    failures: int = 0
+    consecutive_failures: int = 0
+    latency_ewma: Optional[float] = None  # seconds, successful calls only
+    spend: float = 0.0  # USD, estimated from token counts
+    last_failure: Optional[float] = None
+    recent: deque = field(default_factory=deque)  # True/False per recent call
+    
+    def record(self, ok: bool, latency: float, now: float, alpha: float = 0.3):
+        self.calls += 1
+        self.recent.append(ok)
+        if len(self.recent) > self.window:
+            self.recent.popleft()
+        if ok:
+            self.consecutive_failures = 0
+            self.latency_ewma = latency if self.latency_ewma is None else (
+                alpha * latency + (1 - alpha) * self.latency_ewma)
+        else:
+            self.failures += 1
+            self.consecutive_failures += 1
+            self.last_failure = now
+    
+    @property
+    def error_rate(self) -> float:
+        if not self.recent:
+            return 0.0
+        return 1.0 - sum(self.recent) / len(self.recent)
+
+
+class LLMRouter:
+    """
+    Chooses provider and model per task class from live statistics.
+    
+    Each task class ("chunking", "chunk_titling", "scene_json", "code") has
+    routes in order of preference. A call goes to the first route that is
+    not degraded, within budget and within the task's latency target, and
+    fails over to the next route when it raises. A route is degraded after
+    repeated failures or a high recent error rate, until a cooldown has
+    passed since its last failure; then it is tried again.
+    
+    A small local model (see add_local_model) is a free route placed first
+    for cheap, short-output tasks; code generation stays on the main models.
+    """
+    
+    TASKS = ("chunking", "chunk_titling", "scene_json", "code")
+    
+    # Cheap, short-output tasks a small local model serves first
+    LOCAL_MODEL_TASKS = ("chunking", "chunk_titling")
+    
+    def __init__(self,
+                 routes: Dict[str, List[ModelRoute]],
+                 budgets: Optional[Dict[str, float]] = None,
+                 latency_targets: Optional[Dict[str, float]] = None,
+                 error_threshold: float = 0.5,
+                 max_consecutive_failures: int = 3,
+                 cooldown: float = 60.0,
+                 min_samples: int = 4,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            routes (Dict[str, List[ModelRoute]]): Routes per task class, preferred first
+            budgets (Optional[Dict[str, float]]): USD per task class; once spent,
+                only free (e.g. local) routes serve the task
+            latency_targets (Optional[Dict[str, float]]): Seconds per task class; slower
+                routes are tried after faster ones
+            error_threshold (float): Recent error rate at which a route is degraded
+            max_consecutive_failures (int): Failures in a row at which a route is degraded
+            cooldown (float): Seconds a degraded route is skipped after its last failure
+            min_samples (int): Recent calls needed before the error rate is trusted
+            clock (Callable[[], float]): Time source (seconds)
+        """
+        self.routes = routes
+        self.budgets = budgets or {}
+        self.latency_targets = latency_targets or {}
+        self.error_threshold = error_threshold
+        self.max_consecutive_failures = max_consecutive_failures
+        self.cooldown = cooldown
+        self.min_samples = min_samples
+        self.clock = clock
+        self.stats: Dict[str, RouteStats] = {}
+        self._lock = threading.Lock()
+    
+    @classmethod
+    def from_defaults(cls, api_key: Optional[str] = None,
+                      fallback_api_key: Optional[str] = None,
+                      fallback_model: str = "meta-llama/Llama-3.3-70B-Instruct-Turbo",
+                      local_model: Optional[str] = None,
+                      **kwargs) -> 'LLMRouter':
+        """
+        Router for the models the pipeline uses, with an OpenAI-compatible fallback.
+        
+        Gemini Flash serves chunking and scene JSON, Gemini Pro serves code
+        with Flash as its first fallback. The ChatOpenAI route (Together by
+        default) is added to every task when a fallback key is available.
+        Prices are list prices per million tokens and only drive budgets.
+        
+        Args:
+            api_key (Optional[str]): Gemini API key (GOOGLE_API_KEY if None)
+            fallback_api_key (Optional[str]): Key for the OpenAI-compatible
+                provider (TOGETHER_API_KEY if None)
+            fallback_model (str): Model on the fallback provider
+            local_model (Optional[str]): Model on a local OpenAI-compatible
+                server to serve LOCAL_MODEL_TASKS first (none if None)
+            **kwargs: Passed to LLMRouter (budgets, latency_targets, ...)
+        """
+        api_key = api_key or os.getenv("GOOGLE_API_KEY")
+        fallback_api_key = fallback_api_key or os.getenv("TOGETHER_API_KEY")
+        
+        def gemini(model_name, temperature, input_cost, output_cost):
+            llm = LLM(provider="google_genai", model_name=model_name, api_key=api_key, temperature=temperature)
+            return ModelRoute(f"{model_name}@{temperature}", llm, input_cost, output_cost)
+        
+        routes = {
+            "chunking": [gemini("gemini-2.5-flash", 0.3, 0.30, 2.50)],
+            "scene_json": [gemini("gemini-2.5-flash", 0.7, 0.30, 2.50)],
+            "code": [gemini("gemini-2.5-pro", 0.1, 1.25, 10.0), gemini("gemini-2.5-flash", 0.1, 0.30, 2.50)],
+        }
+        if fallback_api_key:
+            for task, temperature in (("chunking", 0.3), ("scene_json", 0.7), ("code", 0.1)):
+                llm = LLM(provider="chatopenai", model_name=fallback_model,
+                          api_key=fallback_api_key, temperature=temperature)
+                routes[task].append(ModelRoute(f"{fallback_model}@{temperature}", llm, 0.88, 0.88))
+        
+        router = cls(routes, **kwargs)
+        if local_model:
+            router.add_local_model(local_model)
+        return router
+    
+    def add_local_model(self, model_name: str, tasks: Optional[List[str]] = None, **kwargs) -> 'LLMRouter':
+        """
+        Serve cheap tasks from a LocalLLM first, with the existing routes as fallbacks.
+        
+        Args:
+            model_name (str): Model name as known to the local server
+            tasks (Optional[List[str]]): Task classes for the local model
+                (LOCAL_MODEL_TASKS if None); a task without routes gets the
+                local model as its only route
+            **kwargs: Passed to LocalLLM (base_url, parallel, ...)
+            
+        Returns:
+            This router
+        """
+        route = ModelRoute(f"local:{model_name}", LLM(provider="local", model_name=model_name, **kwargs))
+        for task in self.LOCAL_MODEL_TASKS if tasks is None else tasks:
+            self.routes.setdefault(task, []).insert(0, route)
+        return self
+    
+    def for_task(self, task: str) -> 'RoutedLLM':
+        """
+        LLM-compatible handle whose calls are routed for a task class.
+        
+        Args:
+            task (str): Task class, one of the keys of routes
+            
+        Returns:
+            RoutedLLM usable wherever an LLM is expected
+        """
+        if task not in self.routes:
+            raise ValueError(f"No routes configured for task: {task}. Available: {list(self.routes)}")
+        return RoutedLLM(self, task)
+    
+    def _stats(self, task: str, route: ModelRoute) -> RouteStats:
+        key = f"{task}:{route.name}"
+        if key not in self.stats:
+            self.stats[key] = RouteStats()
+        return self.stats[key]
+    
+    def is_degraded(self, task: str, route: ModelRoute) -> bool:
+        """Whether a route should be skipped for a task right now."""
+        stats = self._stats(task, route)
+        if stats.last_failure is None or self.clock() - stats.last_failure >= self.cooldown:
+            return False
+        if stats.consecutive_failures >= self.max_consecutive_failures:
+            return True
+        return len(stats.recent) >= self.min_samples and stats.error_rate >= self.error_threshold
+    
+    def spend(self, task: str) -> float:
+        """Estimated USD spent on a task class so far."""
+        return sum(self._stats(task, route).spend for route in self.routes.get(task, []))
+    
+    def candidates(self, task: str) -> List[ModelRoute]:
+        """
+        Routes to try for a task, in order.
+        
+        Healthy routes come before degraded ones and routes within the
+        latency target before slower ones; otherwise the configured
+        preference holds. Paid routes are left out once the budget is spent.
+        """
+        with self._lock:
+            budget = self.budgets.get(task)
+            over_budget = budget is not None and self.spend(task) >= budget
+            target = self.latency_targets.get(task)
+            
+            ranked = []
+            for index, route in enumerate(self.routes[task]):
+                if over_budget and not route.is_free:
+                    continue
+                latency = self._stats(task, route).latency_ewma
+                too_slow = target is not None and latency is not None and latency > target
+                ranked.append(((self.is_degraded(task, route), too_slow, index), route))
+        
+        if not ranked:
+            if over_budget:
+                raise NoRouteAvailableError(
+                    f"Budget of ${budget:.2f} for '{task}' is spent and no free route is configured")
+            raise NoRouteAvailableError(f"No routes configured for '{task}'")
+        return [route for _, route in sorted(ranked, key=lambda item: item[0])]
+    
+    def call(self, task: str, make_client: Callable[[Any], Any], messages: List, **kwargs):
+        """
+        Invoke the best route for a task, failing over on errors.
+        
+        Args:
+            task (str): Task class
+            make_client (Callable[[Any], Any]): Builds the chat client from a route's LLM
+            messages (List): Messages for the chat client
+            **kwargs: Passed to the client's invoke
+            
+        Returns:
+            Response of the first route that succeeds
+            
+        Raises:
+            NoRouteAvailableError: If every route failed or is over budget
+        """
+        last_error = None
+        for route in self.candidates(task):
+            start = self.clock()
+            try:
+                response = make_client(route.llm).invoke(messages, **kwargs)
+            except Exception as e:
+                last_error = e
+                with self._lock:
+                    self._stats(task, route).record(False, self.clock() - start, self.clock())
+                print(f"⚠️ {route.name} failed for {task} ({e}), failing over")
+                continue
+            
+            with self._lock:
+                stats = self._stats(task, route)
+                stats.record(True, self.clock() - start, self.clock())
+                stats.spend += self._cost(route, messages, response)
+            return response
+        
+        raise NoRouteAvailableError(f"All routes failed for '{task}': {last_error}") from last_error
+    
+    def stream(self, task: str, make_client: Callable[[Any], Any], messages: List, **kwargs):
+        """
+        Stream from the best route for a task, failing over until the first chunk arrives.
+        
+        Once a route has yielded a chunk the caller has consumed part of its
+        response, so later errors are raised instead of failed over.
+        
+        Args:
+            task (str): Task class
+            make_client (Callable[[Any], Any]): Builds the chat client from a route's LLM
+            messages (List): Messages for the chat client
+            **kwargs: Passed to the client's stream
+            
+        Yields:
+            Chunks of the first route that starts responding
+            
+        Raises:
+            NoRouteAvailableError: If every route failed before its first chunk or is over budget
+        """
+        last_error = None
+        for route in self.candidates(task):
+            start = self.clock()
+            try:
+                chunks = iter(make_client(route.llm).stream(messages, **kwargs))
+                first = next(chunks, None)
+            except Exception as e:
+                last_error = e
+                with self._lock:
+                    self._stats(task, route).record(False, self.clock() - start, self.clock())
+                print(f"⚠️ {route.name} failed for {task} ({e}), failing over")
+                continue
+            
+            output = []
+            failed = False
+            try:
+                if first is not None:
+                    output.append(first.content if hasattr(first, 'content') else str(first))
+                    yield first
+                for chunk in chunks:
+                    output.append(chunk.content if hasattr(chunk, 'content') else str(chunk))
+                    yield chunk
+            except Exception:
+                failed = True
+                raise
+            finally:
+                # Also runs when the caller abandons the stream; stop the provider's stream too
+                if hasattr(chunks, 'close'):
+                    chunks.close()
+                with self._lock:
+                    stats = self._stats(task, route)
+                    stats.record(not failed, self.clock() - start, self.clock())
+                    stats.spend += self._cost(route, messages, "".join(str(text) for text in output))
+            return
+        
+        raise NoRouteAvailableError(f"All routes failed for '{task}': {last_error}") from last_error
+    
+    @staticmethod
+    def _cost(route: ModelRoute, messages: List, response: Any) -> float:
+        if route.is_free:
+            return 0.0
+        prompt = "".join(message[1] if isinstance(message, tuple) else str(message) for message in messages)
+        output = response.content if hasattr(response, 'content') else str(response)
+        return (estimate_tokens(prompt) * route.input_cost_per_mtok
+                + estimate_tokens(str(output)) * route.output_cost_per_mtok) / 1_000_000
+    
+    def report(self) -> str:
+        """One line per route with calls, error rate, latency and spend."""
+        lines = []
+        for task, routes in self.routes.items():
+            for route in routes:
+                stats = self._stats(task, route)
+                latency = f"{stats.latency_ewma:.2f}s" if stats.latency_ewma is not None else "-"
+                state = " (degraded)" if self.is_degraded(task, route) else ""
+                lines.append(f"{task:10} {route.name:40} calls={stats.calls:<4} errors={stats.error_rate:.0%} "
+                             f"latency={latency} spend=${stats.spend:.4f}{state}")
+        return "\n".join(lines)
+    
+    def close(self):
+        """Delete the provider caches held by every route's model."""
+        closed = set()
+        for routes in self.routes.values():
+            for route in routes:
+                if id(route.llm) not in closed and hasattr(route.llm, "close"):
+                    closed.add(id(route.llm))
+                    route.llm.close()
+
+
+class RoutedChat:
+    """Chat client whose invoke and stream are routed through an LLMRouter."""
+    
+    def __init__(self, router: LLMRouter, task: str, make_client: Callable[[Any], Any]):
+        self.router = router
+        self.task = task
+        self.make_client = make_client
+    
+    def invoke(self, messages: List, **kwargs):
+        return self.router.call(self.task, self.make_client, messages, **kwargs)
+    
+    def stream(self, messages: List, **kwargs):
+        return self.router.stream(self.task, self.make_client, messages, **kwargs)
+
+
+class RoutedLLM:
+    """LLM-compatible handle that routes every call for one task class."""
+    
+    # Concurrent requests per batch_invoke call when not specified
+    default_max_concurrency = 4
+    
+    def __init__(self, router: LLMRouter, task: str):
+        self.router = router
+        self.task = task
+    
+    def create_chat(self) -> RoutedChat:
+        return RoutedChat(self.router, self.task, lambda llm: llm.create_chat())
+    
+    def create_structured_chat(self, schema: Dict) -> RoutedChat:
+        return RoutedChat(self.router, self.task, lambda llm: llm.create_structured_chat(schema))
+    
+    def create_cached_chat(self, system_prompt: str) -> RoutedChat:
+        return RoutedChat(self.router, self.task, lambda llm: llm.create_cached_chat(system_prompt))
+    
+    def batch_invoke(self, requests: List[List], max_concurrency: Optional[int] = None,
+                     return_exceptions: bool = False) -> List:
+        """
+        Route each request separately so a failover only repeats the failed requests.
+        
+        Args:
+            requests (List[List]): One message list per request
+            max_concurrency (Optional[int]): Requests in flight at once
+                (default_max_concurrency if None)
+            return_exceptions (bool): Return failures in place of their
+                responses instead of raising the first one
+            
+        Returns:
+            Responses in the order of the requests
+        """
+        if not requests:
+            return []
+        chat = self.create_chat()
+        
+        def invoke(messages):
+            try:
+                return chat.invoke(messages)
+            except Exception as e:
+                if not return_exceptions:
+                    raise
+                return e
+        
+        workers = min(max_concurrency or self.default_max_concurrency, len(requests))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(invoke, requests))
+
+
+LLMFactory.register_implementation('local', LocalLLM)
\ No newline at end of file
@@ -0,0 +1,76 @@
+"""
+Test header/footer stripping for extracted PDF text.
+"""
+
+import sys
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from data_processing.boilerplate import BoilerplateStripper, strip_boilerplate
+
+
+TOPICS = ["forces", "motion", "energy", "momentum", "friction", "gravity", "waves", "heat"]
+
+
+def make_pages(count):
+    return [
+        f"Introduction to Physics - Chapter 2\n"
+        f"Section {n} discusses {TOPICS[n % len(TOPICS)]} in everyday situations.\n"
+        f"Worked example: a {TOPICS[(n * 3) % len(TOPICS)]} problem with {n + 1} steps.\n"
+        f"© 2024 Example Press. All rights reserved.\n"
+        f"Page {n} of {count}"
+        for n in range(1, count + 1)
+    ]
+
+
+def test_repeated_headers_footers_and_page_numbers_are_removed():
+    text, report = strip_boilerplate(make_pages(20))
+    
+    assert "Chapter 2" not in text
+    assert "Example Press" not in text
+    assert "of 20" not in text
+    assert "Section 1 discusses motion" in text
+    assert "Section 20 discusses friction" in text
+    assert report.pages == 20
+    assert report.lines_removed == 60
+    assert report.bytes_saved > 0
+    assert report.tokens_saved > 0
+    assert "60 boilerplate line(s)" in report.summary()
+
+
+def test_short_documents_and_unique_lines_are_kept():
+    pages = make_pages(2)
+    text, report = strip_boilerplate(pages)
+    assert text == "\n".join(pages)
+    assert report.lines_removed == 0
+
+
+def test_streaming_keeps_memory_to_the_warmup_window():
+    stripper = BoilerplateStripper(warmup=4)
+    released = []
+    
+    def pages():
+        for index, page in enumerate(make_pages(12)):
+            # Only the warmup window may be pending when the next page is read
+            assert index - len(released) <= 4
+            yield page
+    
+    for page in stripper.strip(pages()):
+        released.append(page)
+    
+    assert len(released) == 12
+    assert all("Example Press" not in page for page in released)
+
+
+def test_input_processor_strips_extracted_pages():
+    from data_processing.input_processor import InputProcessor
+    
+    processor = InputProcessor(api_key="test-key")
+    text = processor._join_pages(make_pages(10))
+    assert "Example Press" not in text
+    assert processor.boilerplate_report.lines_removed == 30
+    
+    processor.remove_boilerplate = False
+    assert "Example Press" in processor._join_pages(make_pages(10))
@@ -0,0 +1,85 @@
+"""
+Test MinHash/LSH near-duplicate chunk detection.
+"""
+
+import random
+import sys
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from data_processing.chunk_dedup import ChunkDeduplicator, deduplicate_chunks
+from data_processing.multi_scene_processor import DocumentChunk, DocumentChunker
+
+
+def paragraph(rng, words=80):
+    vocabulary = [f"term{i}" for i in range(2000)]
+    return " ".join(rng.choice(vocabulary) for _ in range(words)) + "."
+
+
+def test_near_duplicates_are_grouped_and_distinct_chunks_kept():
+    rng = random.Random(0)
+    base = paragraph(rng, 200)
+    edited = "Revised " + base.split(" ", 1)[1] + " A short trailing remark."
+    chunks = [
+        DocumentChunk(id="a", title="A", content=base, page_numbers=[1]),
+        DocumentChunk(id="b", title="B", content=paragraph(rng, 200)),
+        DocumentChunk(id="c", title="C", content=edited, page_numbers=[3]),
+    ]
+    
+    kept, report = deduplicate_chunks(chunks, threshold=0.8, mode="drop")
+    
+    assert [chunk.id for chunk in kept] == ["a", "b"]
+    assert report.groups == [["a", "c"]]
+    assert report.chunks_removed == 1
+    assert report.chars_removed == len(edited)
+
+
+def test_merge_keeps_unique_paragraphs_and_pages():
+    rng = random.Random(1)
+    shared = paragraph(rng, 300)
+    extra = "Extra note only found in the repeat."
+    chunks = [
+        DocumentChunk(id="a", title="A", content=shared, page_numbers=[1]),
+        DocumentChunk(id="b", title="B", content=f"{shared}\n\n{extra}", page_numbers=[2]),
+    ]
+    
+    kept, _ = deduplicate_chunks(chunks, threshold=0.8)
+    
+    assert len(kept) == 1
+    assert kept[0].id == "a"
+    assert kept[0].content == f"{shared}\n\n{extra}"
+    assert kept[0].page_numbers == [1, 2]
+
+
+def test_threshold_is_respected():
+    rng = random.Random(2)
+    first = paragraph(rng, 100)
+    # Half of the text replaced: roughly a third of the shingles are shared
+    second = " ".join(first.split()[:50]) + " " + paragraph(rng, 50)
+    texts = [first, second]
+    
+    assert ChunkDeduplicator(threshold=0.9).find_groups(texts) == []
+    assert ChunkDeduplicator(threshold=0.2).find_groups(texts) == [[0, 1]]
+
+
+def test_empty_and_short_chunks_are_not_merged():
+    groups = ChunkDeduplicator().find_groups(["", "", "Short text", "Different words"])
+    assert groups == []
+
+
+def test_chunker_deduplicates_by_default():
+    rng = random.Random(3)
+    body = paragraph(rng, 150)
+    content = "\n\n".join([body, body, paragraph(rng, 150)])
+    
+    chunker = DocumentChunker(api_key="", max_chunk_size=len(body) + 10)
+    chunker.llm = None
+    chunks = chunker.chunk_document(content, "Doc")
+    assert chunker.dedup_report.chunks_removed == 1
+    assert len(chunks) == 2
+    
+    disabled = DocumentChunker(api_key="", max_chunk_size=len(body) + 10, dedup_threshold=None)
+    disabled.llm = None
+    assert len(disabled.chunk_document(content, "Doc")) == 3
@@ -0,0 +1,106 @@
+"""
+Test the canonicalized code generation cache.
+"""
+
+import sys
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from code_generation.code_cache import CodeCache, CachedCodeGenerator, context_key, rebind_code, context_bindings
+from data_processing.scene_parser import SceneParser
+from data_processing.scene_structure import SceneStructure
+
+
+def context(title, heading_id, heading, formula_id, formula, duration=1.0):
+    structure = SceneStructure.from_dict({
+        "settings": {"title": title, "description": "", "duration": 4},
+        "objects": [
+            {"id": heading_id, "type": "text", "text_content": heading, "position": [0, 2, 0]},
+            {"id": formula_id, "type": "formula", "text_content": formula, "position": [0, 0, 0]}
+        ],
+        "animations": [
+            {"id": "show_" + heading_id, "type": "write", "target_objects": [heading_id], "duration": duration},
+            {"id": "show_" + formula_id, "type": "write", "target_objects": [formula_id], "delay": 1.0}
+        ]
+    })
+    return SceneParser().parse(structure)
+
+
+def code_for(title, heading_id, heading, formula_id, formula):
+    return f'''from manim import *
+
+class GeneratedScene(Scene):
+    def construct(self):
+        """{title}"""
+        {heading_id} = Text("{heading}", font_size=36).shift(UP * 2)
+        {formula_id} = MathTex(r"{formula}")
+        self.play(Write({heading_id}))
+        self.play(Write({formula_id}))
+'''
+
+
+NEWTON = ("Dynamics", "law_title", "Newton's Second Law", "law_eq", r"F = m a")
+HOOKE = ("Springs", "spring_title", "Hooke's Law Explained", "spring_eq", r"F = -kx")
+
+
+class CountingGenerator:
+    def __init__(self):
+        self.calls = 0
+    
+    def generate_code(self, context):
+        self.calls += 1
+        objects = context.objects
+        return code_for(context.scene_title, objects[0].id, objects[0].text_content,
+                        objects[1].id, objects[1].text_content)
+
+
+def test_key_ignores_ids_titles_and_wording_but_not_structure():
+    assert context_key(context(*NEWTON)) == context_key(context(*HOOKE))
+    assert context_key(context(*NEWTON)) != context_key(context(*NEWTON, duration=2.0))
+    longer = HOOKE[:2] + ("Hooke's Law for Springs and Elastic Materials",) + HOOKE[3:]
+    assert context_key(context(*NEWTON)) != context_key(context(*longer))
+
+
+def test_hit_is_rebound_to_the_new_ids_and_texts():
+    cache = CodeCache()
+    generator = CachedCodeGenerator(CountingGenerator(), cache)
+    
+    generator.generate_code(context(*NEWTON))
+    code = generator.generate_code(context(*HOOKE))
+    
+    assert generator.generator.calls == 1
+    assert code == code_for(*HOOKE)
+    compile(code, "<rebound>", "exec")
+    assert cache.stats.hits == 1 and cache.stats.misses == 1
+
+
+def test_code_that_fails_validation_is_not_cached(tmp_path):
+    class BrokenGenerator(CountingGenerator):
+        def generate_code(self, context):
+            return super().generate_code(context).replace("self.play(Write(", "self.play(Write((", 1)
+    
+    cache = CodeCache(cache_dir=str(tmp_path))
+    generator = CachedCodeGenerator(BrokenGenerator(), cache)
+    
+    generator.generate_code(context(*NEWTON))
+    generator.generate_code(context(*HOOKE))
+    
+    assert generator.generator.calls == 2
+    assert cache.stats.hits == 0
+    assert not list(tmp_path.iterdir())
+
+
+def test_missing_text_makes_the_hit_a_miss():
+    old, new = context_bindings(context(*NEWTON)), context_bindings(context(*HOOKE))
+    reworded = code_for(*NEWTON).replace('Text("Newton\'s Second Law"', 'Text("Newton II"')
+    
+    assert rebind_code(reworded, old, new) is None
+
+
+def test_entries_persist_across_cache_instances(tmp_path):
+    CodeCache(cache_dir=str(tmp_path)).put(context(*NEWTON), code_for(*NEWTON))
+    
+    fresh = CodeCache(cache_dir=str(tmp_path))
+    assert fresh.get(context(*HOOKE)) == code_for(*HOOKE)
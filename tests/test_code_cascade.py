@@ -0,0 +1,144 @@
+"""
+Test code validation and the cheap-to-strong model cascade.
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from code_generation.code_validator import CodeValidator
+from code_generation.code_cascade import CodeGenerationCascade, CascadeFailedError
+from code_generation.manim_code_generator import ManimCodeGenerator
+from models.llm import LLMRouter
+from data_processing.multi_scene_processor import MultiSceneProcessor
+from data_processing.scene_parser import SceneParser
+from data_processing.scene_structure import SceneStructure
+
+
+GOOD = """from manim import *
+
+class GeneratedScene(Scene):
+    def construct(self):
+        title = Text("Forces", font_size=36).to_edge(UP)
+        arrows = VGroup(*[Arrow(LEFT, RIGHT) for _ in range(3)]).arrange(DOWN, buff=MED_SMALL_BUFF)
+        self.play(Write(title), Create(arrows))
+        self.wait(1)
+"""
+
+UNDEFINED = GOOD.replace("Create(arrows)", "ShowCreation(arrows), Blink(title)")
+
+
+class FakeResponse:
+    def __init__(self, content):
+        self.content = content
+
+
+class FakeChat:
+    def __init__(self, model):
+        self.model = model
+    
+    def invoke(self, messages):
+        self.model.prompts.append(messages[-1][1])
+        return FakeResponse(self.model.replies.pop(0))
+
+
+class FakeModel:
+    """Returns canned replies in order and records the prompts it was sent."""
+    
+    def __init__(self, *replies):
+        self.replies = list(replies)
+        self.prompts = []
+    
+    def create_cached_chat(self, system_prompt):
+        return FakeChat(self)
+
+
+def context(title="Forces"):
+    structure = SceneStructure.from_dict({
+        "settings": {"title": title, "description": "", "duration": 3},
+        "objects": [{"id": "label", "type": "text", "text_content": "F = ma"}],
+        "animations": [{"id": "a1", "type": "write", "target_objects": ["label"]}]
+    })
+    return SceneParser().parse(structure)
+
+
+def cascade(cheap, strong):
+    return CodeGenerationCascade([
+        ("flash", ManimCodeGenerator(llm=cheap)),
+        ("pro", ManimCodeGenerator(llm=strong)),
+    ])
+
+
+def test_validator_accepts_idiomatic_scene():
+    assert CodeValidator().validate(GOOD).ok
+
+
+def test_validator_reports_syntax_structure_and_symbol_errors():
+    validator = CodeValidator()
+    
+    syntax = validator.validate("class A(Scene):\n    def construct(self)\n        pass\n")
+    assert syntax.stage == "syntax" and not syntax.ok
+    
+    structure = validator.validate("from manim import *\nx = Circle()\n")
+    assert structure.stage == "structure"
+    
+    symbols = validator.validate(UNDEFINED + "        self.play_all()\n")
+    assert symbols.stage == "symbols"
+    assert any("Deprecated Manim name 'ShowCreation'" in error for error in symbols.errors)
+    assert any("Undefined name 'Blink'" in error for error in symbols.errors)
+    assert any("self.play_all" in error for error in symbols.errors)
+
+
+def test_cheap_model_code_is_kept_when_it_validates():
+    cheap, strong = FakeModel(GOOD), FakeModel()
+    chain = cascade(cheap, strong)
+    
+    code = chain.generate_code(context())
+    
+    assert "class GeneratedScene" in code
+    assert strong.prompts == []
+    record = chain.records[0]
+    assert record.accepted_tier == "flash" and not record.escalated
+
+
+def test_invalid_code_escalates_with_validation_feedback():
+    cheap, strong = FakeModel(UNDEFINED), FakeModel(GOOD)
+    chain = cascade(cheap, strong)
+    
+    chain.generate_code(context("Momentum"))
+    
+    assert "Undefined name 'Blink'" in strong.prompts[0]
+    record = chain.records[0]
+    assert record.attempts == ["flash", "pro"] and record.accepted_tier == "pro"
+    assert record.errors["flash"]
+    assert chain.stats()["escalation_rate"] == 1.0
+
+
+def test_failure_on_every_tier_is_raised_and_counted():
+    chain = cascade(FakeModel("not python ("), FakeModel(UNDEFINED))
+    
+    with pytest.raises(CascadeFailedError):
+        chain.generate_code_from_content("Energy is conserved.", "Energy")
+    
+    stats = chain.stats()
+    assert stats["failed"] == 1 and stats["accepted_by_tier"] == {"flash": 0, "pro": 0}
+    assert "1 failed" in chain.summary()
+
+
+def test_cascade_cannot_be_combined_with_a_router():
+    with pytest.raises(ValueError, match="router"):
+        MultiSceneProcessor(api_key="test-key", router=LLMRouter({}), cascade=True)
+
+
+def test_a_run_without_the_cascade_drops_the_previous_cascade_summary():
+    processor = MultiSceneProcessor(api_key="test-key", cascade=True)
+    processor._code_generator().close()
+    assert processor.code_cascade is not None
+    
+    processor.cascade = False
+    processor._code_generator().close()
+    assert processor.code_cascade is None
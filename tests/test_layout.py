@@ -0,0 +1,78 @@
+"""
+Test the vectorized layout solver.
+"""
+
+import sys
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from data_processing.layout import LayoutSolver, solve_layout
+from data_processing.scene_structure import SceneStructure
+
+
+def scene(objects, animations=()):
+    return SceneStructure.from_dict({
+        "settings": {"title": "Layout", "duration": 5},
+        "objects": objects,
+        "animations": list(animations)
+    })
+
+
+def text(obj_id, content, y, x=0):
+    return {"id": obj_id, "type": "text", "text_content": content, "position": [x, y, 0]}
+
+
+def test_overlapping_texts_are_stacked_top_down():
+    structure = scene([text("title", "Newton's Laws", 2.0), text("law", "F = m a holds", 1.9),
+                       text("note", "for constant mass", 1.8)])
+    report = solve_layout(structure.objects, structure.animations)
+    
+    assert report.overlaps_before == 3 and report.overlaps_after == 0
+    ys = [report.positions[name].y for name in ("title", "law", "note")]
+    assert ys[0] == 2.0 and ys[0] > ys[1] > ys[2]
+    assert set(report.moved) == {"law", "note"}
+
+
+def test_side_by_side_texts_and_labels_inside_shapes_stay_put():
+    structure = scene([
+        text("left", "Before", 0, x=-4), text("right", "After", 0, x=4),
+        {"id": "box", "type": "rectangle", "position": [0, -2, 0], "properties": {"width": 4, "height": 2}},
+        text("label", "Mass", -2)
+    ])
+    report = solve_layout(structure.objects, structure.animations)
+    
+    assert report.overlaps_before == 0 and report.moved == []
+
+
+def test_objects_on_screen_at_different_times_may_share_a_spot():
+    structure = scene([text("first", "Step one", 0), text("second", "Step two", 0)], [
+        {"id": "a1", "type": "write", "target_objects": ["first"], "duration": 1},
+        {"id": "a2", "type": "fade_out", "target_objects": ["first"], "duration": 1, "delay": 1},
+        {"id": "a3", "type": "write", "target_objects": ["second"], "duration": 1, "delay": 2}
+    ])
+    report = solve_layout(structure.objects, structure.animations)
+    
+    assert report.overlaps_before == 0 and report.moved == []
+
+
+def test_positions_stay_in_frame_with_hundreds_of_objects():
+    objects = [text(f"t{i}", "Label", 0.01 * (i % 7), x=(i % 5) - 2) for i in range(300)]
+    structure = scene(objects)
+    solver = LayoutSolver()
+    report = solver.solve(structure.objects, structure.animations)
+    
+    assert report.overlaps_after < report.overlaps_before
+    assert all(abs(pos.y) <= 3.5 and abs(pos.x) <= 6.6 for pos in report.positions.values())
+
+
+def test_one_solver_can_be_shared_across_threads():
+    from concurrent.futures import ThreadPoolExecutor
+    
+    solver = LayoutSolver()
+    scenes = [scene([text(f"t{i}", "Label", 0.01 * i) for i in range(count)]) for count in (2, 40, 7, 90) * 10]
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        reports = list(pool.map(lambda s: solver.solve(s.objects, s.animations), scenes))
+    
+    assert [len(report.positions) for report in reports] == [len(s.objects) for s in scenes]
@@ -0,0 +1,292 @@
+"""
+Test the local provider, batch invocation, and cost/latency-aware routing
+with failover in LLMRouter.
+"""
+
+import json
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from models.llm import LLM, LLMFactory, LLMRouter, LocalLLM, ModelRoute, NoRouteAvailableError
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+    
+    def __call__(self):
+        return self.now
+
+
+class FakeResponse:
+    def __init__(self, content):
+        self.content = content
+
+
+class FakeLLM:
+    """LLM stand-in whose chat fails while `failing` is set and takes `latency` seconds."""
+    
+    def __init__(self, name, clock, latency=1.0):
+        self.name = name
+        self.clock = clock
+        self.latency = latency
+        self.failing = False
+        self.breaks_mid_stream = False
+        self.reply = f"{name} reply"
+        self.calls = 0
+    
+    def create_chat(self):
+        return self
+    
+    def create_structured_chat(self, schema):
+        return self
+    
+    def create_cached_chat(self, system_prompt):
+        return self
+    
+    def invoke(self, messages, **kwargs):
+        self.calls += 1
+        self.clock.now += self.latency
+        if self.failing:
+            raise ConnectionError(f"{self.name} unavailable")
+        return FakeResponse(self.reply)
+    
+    def stream(self, messages, **kwargs):
+        self.calls += 1
+        self.clock.now += self.latency
+        if self.failing:
+            raise ConnectionError(f"{self.name} unavailable")
+        for i in range(0, len(self.reply), 4):
+            if i and self.breaks_mid_stream:
+                raise ConnectionError(f"{self.name} dropped the stream")
+            yield FakeResponse(self.reply[i:i + 4])
+
+
+class TitlingLLM:
+    """Local model stand-in that titles each paragraph; fails on the ones in fail_on."""
+    
+    def __init__(self, fail_on=()):
+        self.fail_on = fail_on
+        self.titled = []
+    
+    def create_chat(self):
+        return self
+    
+    def invoke(self, messages, **kwargs):
+        index = int(messages[-1][1].split()[1])
+        self.titled.append(index)
+        if index in self.fail_on:
+            raise RuntimeError("server busy")
+        return FakeResponse(f'"Topic {index + 1}"\n')
+
+
+def make_router(**kwargs):
+    clock = FakeClock()
+    primary = FakeLLM("primary", clock)
+    secondary = FakeLLM("secondary", clock)
+    routes = {"code": [ModelRoute("primary", primary, 1.0, 10.0), ModelRoute("secondary", secondary, 0.5, 0.5)]}
+    return LLMRouter(routes, clock=clock, cooldown=30.0, **kwargs), clock, primary, secondary
+
+
+def ask(router, task="code"):
+    return router.for_task(task).create_chat().invoke([("user", "Generate code")]).content
+
+
+def test_local_provider_is_registered():
+    llm = LLM(provider="local", model_name="qwen2.5-1.5b-instruct", base_url="http://localhost:9000/v1", parallel=2)
+    assert isinstance(llm.llm, LocalLLM)
+    assert "local" in LLMFactory._implementations
+    assert llm.llm.client.openai_api_base == "http://localhost:9000/v1"
+    assert llm.llm.default_max_concurrency == 2
+
+
+def test_batch_invoke_passes_concurrency_to_client():
+    class RecordingClient:
+        def batch(self, requests, config=None, return_exceptions=False):
+            self.config = config
+            return [f"reply {len(messages)}" for messages in requests]
+    
+    llm = LLM(provider="local", model_name="small", parallel=3)
+    llm.llm.client = RecordingClient()
+    
+    assert llm.batch_invoke([[("user", "a")], [("user", "b")]]) == ["reply 1", "reply 1"]
+    assert llm.llm.client.config == {"max_concurrency": 3}
+    assert llm.batch_invoke([]) == []
+
+
+def test_local_model_is_tried_first_for_cheap_tasks_only():
+    router, _, primary, _ = make_router()
+    router.routes["chunking"] = [ModelRoute("primary", primary, 1.0, 10.0)]
+    
+    router.add_local_model("qwen2.5-1.5b-instruct", base_url="http://localhost:9000/v1")
+    
+    assert [route.name for route in router.candidates("chunking")] == ["local:qwen2.5-1.5b-instruct", "primary"]
+    assert [route.name for route in router.candidates("chunk_titling")] == ["local:qwen2.5-1.5b-instruct"]
+    assert isinstance(router.routes["chunk_titling"][0].llm.llm, LocalLLM)
+    assert [route.name for route in router.candidates("code")] == ["primary", "secondary"]
+
+
+def test_chunker_titles_size_based_chunks_through_the_router():
+    from data_processing.multi_scene_processor import DocumentChunker
+    
+    clock = FakeClock()
+    gemini = FakeLLM("gemini", clock)
+    gemini.failing = True  # intelligent chunking fails, so chunks are size-based
+    local = TitlingLLM(fail_on={1})
+    router = LLMRouter({"chunking": [ModelRoute("gemini", gemini, 0.3, 2.5)],
+                        "chunk_titling": [ModelRoute("local", local)]}, clock=clock)
+    chunker = DocumentChunker(api_key="", max_chunk_size=60, dedup_threshold=None, router=router)
+    content = "\n\n".join(f"Paragraph {i} explains a different idea in some detail." for i in range(3))
+    
+    chunks = chunker.chunk_document(content, "Notes")
+    
+    assert sorted(local.titled) == [0, 1, 2]
+    assert [chunk.title for chunk in chunks] == ["Topic 1", "Notes - Part 2", "Topic 3"]
+    # Without chunk_titling routes the generic titles are kept
+    del router.routes["chunk_titling"]
+    assert DocumentChunker(api_key="", router=router).title_llm is None
+
+
+def test_fails_over_and_skips_degraded_primary_until_cooldown():
+    router, clock, primary, secondary = make_router()
+    primary.failing = True
+    
+    assert [ask(router) for _ in range(3)] == ["secondary reply"] * 3
+    assert primary.calls == 3
+    
+    # Three failures in a row: the primary is skipped without being called
+    assert ask(router) == "secondary reply"
+    assert primary.calls == 3
+    assert "(degraded)" in router.report()
+    
+    # After the cooldown the primary is tried again and recovers
+    primary.failing = False
+    clock.now += 30.0
+    assert ask(router) == "primary reply"
+
+
+def test_raises_when_all_routes_fail():
+    router, _, primary, secondary = make_router()
+    primary.failing = secondary.failing = True
+    with pytest.raises(NoRouteAvailableError) as error:
+        ask(router)
+    assert isinstance(error.value.__cause__, ConnectionError)
+
+
+def test_slow_routes_are_tried_after_fast_ones():
+    router, _, primary, secondary = make_router(latency_targets={"code": 2.0})
+    primary.latency = 5.0
+    
+    assert ask(router) == "primary reply"
+    assert ask(router) == "secondary reply"
+
+
+def test_paid_routes_stop_when_budget_is_spent():
+    clock = FakeClock()
+    paid = FakeLLM("paid", clock)
+    local = FakeLLM("local", clock)
+    routes = {"chunking": [ModelRoute("paid", paid, 1_000_000.0, 0.0)]}
+    router = LLMRouter(routes, budgets={"chunking": 1.0}, clock=clock)
+    
+    assert ask(router, "chunking") == "paid reply"
+    assert router.spend("chunking") >= 1.0
+    with pytest.raises(NoRouteAvailableError):
+        ask(router, "chunking")
+    
+    routes["chunking"].append(ModelRoute("local", local))
+    assert ask(router, "chunking") == "local reply"
+
+
+def stream(router, task="code"):
+    return "".join(chunk.content for chunk in router.for_task(task).create_chat().stream([("user", "Explain")]))
+
+
+def test_stream_fails_over_before_the_first_chunk():
+    router, _, primary, secondary = make_router()
+    primary.failing = True
+    
+    assert stream(router) == "secondary reply"
+    assert router.stats["code:primary"].consecutive_failures == 1
+    assert router.stats["code:secondary"].calls == 1
+
+
+def test_stream_errors_after_the_first_chunk_are_raised():
+    router, _, primary, secondary = make_router()
+    primary.breaks_mid_stream = True
+    
+    with pytest.raises(ConnectionError):
+        stream(router)
+    assert secondary.calls == 0
+    assert router.stats["code:primary"].consecutive_failures == 1
+
+
+def test_input_processor_streams_through_the_router():
+    from data_processing.input_processor import InputProcessor
+    
+    router, _, primary, secondary = make_router()
+    router.routes["scene_json"] = router.routes["code"]
+    primary.failing = True
+    secondary.reply = json.dumps({
+        "settings": {"title": "Square"},
+        "objects": [{"id": "square", "type": "square", "position": [0, 0, 0]}],
+        "animations": [{"id": "draw", "type": "create", "target_objects": ["square"]}]
+    })
+    
+    emitted = []
+    scene = InputProcessor(router=router).stream_text_input("A square", on_object=lambda obj: emitted.append(obj.id))
+    
+    assert emitted == ["square"]
+    assert scene.settings.title == "Square"
+
+
+def test_batch_invoke_runs_requests_concurrently_up_to_the_limit():
+    class ConcurrentLLM:
+        def __init__(self):
+            self.lock = threading.Lock()
+            self.in_flight = self.peak = 0
+        
+        def create_chat(self):
+            return self
+        
+        def invoke(self, messages, **kwargs):
+            with self.lock:
+                self.in_flight += 1
+                self.peak = max(self.peak, self.in_flight)
+            time.sleep(0.02)
+            with self.lock:
+                self.in_flight -= 1
+            if messages[0][1] == "bad":
+                raise ValueError("bad request")
+            return FakeResponse(messages[0][1])
+    
+    llm = ConcurrentLLM()
+    router = LLMRouter({"chunking": [ModelRoute("local", llm)]}, max_consecutive_failures=100)
+    requests = [[("user", text)] for text in ["a", "b", "bad", "d", "e", "f"]]
+    
+    responses = router.for_task("chunking").batch_invoke(requests, max_concurrency=2, return_exceptions=True)
+    
+    assert [getattr(response, "content", None) for response in responses] == ["a", "b", None, "d", "e", "f"]
+    assert isinstance(responses[2], NoRouteAvailableError)
+    assert llm.peak == 2
+
+
+def test_pipeline_components_use_routed_models():
+    from code_generation.manim_code_generator import ManimCodeGenerator
+    from data_processing.input_processor import InputProcessor
+    from data_processing.multi_scene_processor import DocumentChunker
+    
+    router, _, _, _ = make_router()
+    router.routes["scene_json"] = router.routes["chunking"] = router.routes["code"]
+    
+    assert ManimCodeGenerator(router=router).llm.task == "code"
+    assert InputProcessor(router=router).llm.task == "scene_json"
+    assert DocumentChunker(router=router).llm.task == "chunking"
+    with pytest.raises(ValueError):
+        router.for_task("summaries")
@@ -0,0 +1,124 @@
+"""
+Test concurrent per-scene code generation in MultiSceneProcessor.
+"""
+
+import sys
+import threading
+import time
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from data_processing.multi_scene_processor import MultiSceneProcessor, MultiSceneStructure
+from data_processing.scene_structure import SceneStructure
+
+
+def scene(title, text):
+    return SceneStructure.from_dict({
+        "settings": {"title": title, "description": "", "duration": 3},
+        "objects": [{"id": "label", "type": "text", "text_content": text}],
+        "animations": [{"id": "a1", "type": "write", "target_objects": ["label"]}]
+    })
+
+
+class SlowGenerator:
+    """Takes `delay` seconds per scene and fails for titles in `failing`."""
+    
+    def __init__(self, delay=0.2, failing=()):
+        self.delay = delay
+        self.failing = failing
+        self.active = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+    
+    def generate_code(self, context):
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(self.delay)
+        with self.lock:
+            self.active -= 1
+        if context.scene_title in self.failing:
+            raise RuntimeError("Failed to generate Manim code: quota exceeded")
+        return f"from manim import *\n\nclass GeneratedScene(Scene):\n    def construct(self):\n        self.wait({context.scene_title[-1]})\n"
+
+
+def setup(count, max_workers):
+    processor = MultiSceneProcessor(api_key="test-key", max_workers=max_workers)
+    scenes = [scene(f"Part {i + 1}", f"Text {i + 1}") for i in range(count)]
+    multi = MultiSceneStructure(title="Course", description="", total_duration=3 * count,
+                                scenes=scenes, scene_order=[str(i) for i in range(count)])
+    return processor, multi, [processor.parser.parse(s) for s in scenes]
+
+
+def test_scenes_are_generated_concurrently_with_bounded_workers():
+    processor, _, contexts = setup(6, max_workers=3)
+    generator = SlowGenerator()
+    
+    start = time.perf_counter()
+    results = processor.generate_scene_codes(contexts, generator)
+    elapsed = time.perf_counter() - start
+    
+    assert generator.peak == 3
+    assert elapsed < 6 * generator.delay * 0.75
+    assert [result.index for result in results] == list(range(6))
+    assert all(result.ok for result in results)
+    assert "self.wait(4)" in results[3].code
+
+
+def test_failed_scene_does_not_abort_the_others():
+    processor, multi, contexts = setup(3, max_workers=3)
+    code = processor._create_combined_scene_code(multi, contexts, SlowGenerator(delay=0, failing={"Part 2"}))
+    
+    assert [result.ok for result in processor.code_results] == [True, False, True]
+    assert "quota exceeded" in processor.code_results[1].error
+    assert "(code generation failed)" in code.split("def scene_2(self):")[1]
+    assert "self.wait(3)" in code.split("def scene_3(self):")[1]
+    compile(code, "<combined>", "exec")
+
+
+def test_duplicates_are_not_generated():
+    processor, _, contexts = setup(3, max_workers=2)
+    generator = SlowGenerator(delay=0)
+    results = processor.generate_scene_codes(contexts, generator, duplicates={2: 0})
+    assert results[2].duplicate_of == 0
+    assert results[2].code is None and results[2].ok
+
+
+class BrokenGenerator:
+    """Returns code with a syntax error for "Part 2" and an undefined name for "Part 3"."""
+    
+    def generate_code(self, context):
+        body = {"Part 2": "self.play(Write(Text('oops')", "Part 3": "self.play(Write(undefined_label))"}
+        line = body.get(context.scene_title, "self.wait(1)")
+        return f"from manim import *\n\nclass GeneratedScene(Scene):\n    def construct(self):\n        {line}\n"
+
+
+def test_scenes_failing_validation_are_replaced_by_a_fallback():
+    from code_generation.code_validator import CodeValidator
+    
+    processor, multi, contexts = setup(3, max_workers=3)
+    code = processor._create_combined_scene_code(multi, contexts, BrokenGenerator())
+    
+    errors = [result.validation_errors for result in processor.code_results]
+    assert errors[0] is None
+    assert "SyntaxError" in errors[1][0] and "undefined_label" in errors[2][0]
+    assert "self.wait(1)" in code.split("def scene_1(self):")[1]
+    assert '"Text 2"' in code.split("def scene_2(self):")[1].split("def scene_3")[0]
+    assert "undefined_label" not in code
+    assert CodeValidator().validate(code).ok
+
+
+def test_fallback_shows_the_chunk_title_and_text():
+    from data_processing.multi_scene_processor import DocumentChunk
+    
+    processor, multi, contexts = setup(3, max_workers=1)
+    chunks = [DocumentChunk(id=str(i), title=f"Chunk \"{i}\"", content=f"Content of chunk {i}. " * 40)
+              for i in range(3)]
+    code = processor._create_combined_scene_code(multi, contexts, BrokenGenerator(), chunks=chunks)
+    
+    scene_2 = code.split("def scene_2(self):")[1].split("def scene_3")[0]
+    assert 'Text("Chunk \\"1\\""' in scene_2 and "Content of chunk 1." in scene_2
+    assert scene_2.count("\\n") == 5 and " ...\"" in scene_2
+    compile(code, "<combined>", "exec")
@@ -0,0 +1,171 @@
+"""
+Test system-prompt caching and the compact code generation prompt.
+"""
+
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from code_generation.manim_code_generator import ManimCodeGenerator
+from data_processing.scene_parser import SceneParser
+from data_processing.scene_structure import SceneStructure
+from models.llm import LLM, CachedPromptChat, estimate_tokens
+
+
+SCENE = {
+    "settings": {"title": "Circle", "description": "A circle appears", "duration": 4},
+    "objects": [
+        {"id": "title", "type": "text", "text_content": "Circles", "position": [0, 3, 0]},
+        {"id": "circle", "type": "circle", "position": [0, 0, 0], "color": {"name": "BLUE"}}
+    ],
+    "animations": [
+        {"id": "a2", "type": "create", "target_objects": ["circle"], "delay": 1.5, "duration": 2},
+        {"id": "a1", "type": "write", "target_objects": ["title"]}
+    ]
+}
+
+
+class RecordingClient:
+    def __init__(self):
+        self.messages = []
+    
+    def invoke(self, messages, **kwargs):
+        self.messages.append(messages)
+        return type("Response", (), {"content": "from manim import *\n\nclass GeneratedScene(Scene):\n    def construct(self):\n        self.wait()\n"})()
+
+
+class FakeLLM:
+    def __init__(self):
+        self.client = RecordingClient()
+        self.system_prompts = []
+    
+    def create_cached_chat(self, system_prompt):
+        self.system_prompts.append(system_prompt)
+        return CachedPromptChat(self.client, system_prompt)
+
+
+def context():
+    return SceneParser().parse(SceneStructure.from_dict(SCENE))
+
+
+def test_cached_chat_prepends_prompt_unless_provider_holds_it():
+    client = RecordingClient()
+    CachedPromptChat(client, "static").invoke([("user", "hi")])
+    CachedPromptChat(client, "static", cache_name="cachedContents/1").invoke([("user", "hi")])
+    assert client.messages == [[("system", "static"), ("user", "hi")], [("user", "hi")]]
+
+
+class ContextCaches:
+    """Stands in for the provider: hands out numbered caches and records deletions."""
+    
+    def __init__(self):
+        self.created = 0
+        self.deleted = []
+    
+    def create(self):
+        self.created += 1
+        return RecordingClient(), f"cachedContents/{self.created}", time.monotonic() + 3600
+    
+    def chat(self):
+        client, name, expires_at = self.create()
+        return CachedPromptChat(client, "static", cache_name=name, expires_at=expires_at,
+                                renew=self.create, delete=self.deleted.append)
+
+
+class MissingCacheClient(RecordingClient):
+    def invoke(self, messages, **kwargs):
+        raise RuntimeError("404 NOT_FOUND: CachedContent not found (or permission denied)")
+
+
+def test_cache_is_recreated_before_it_expires():
+    caches = ContextCaches()
+    chat = caches.chat()
+    chat.expires_at = time.monotonic() + chat.renew_margin / 2
+    
+    chat.invoke([("user", "hi")])
+    
+    assert chat.cache_name == "cachedContents/2"
+    assert caches.deleted == ["cachedContents/1"]
+    assert chat.client.messages == [[("user", "hi")]]
+
+
+def test_missing_cache_is_recreated_and_the_request_retried():
+    caches = ContextCaches()
+    chat = caches.chat()
+    chat.client = MissingCacheClient()
+    
+    chat.invoke([("user", "hi")])
+    
+    assert chat.cache_name == "cachedContents/2"
+    assert chat.client.messages == [[("user", "hi")]]
+
+
+def test_close_deletes_context_caches():
+    caches = ContextCaches()
+    llm = LLM(provider="google_genai", model_name="test-model", api_key="test-key")
+    llm.llm._create_cached_chat = lambda system_prompt: caches.chat()
+    chat = llm.create_cached_chat("Long system prompt")
+    
+    llm.close()
+    
+    assert caches.deleted == ["cachedContents/1"]
+    assert llm.create_cached_chat("Long system prompt") is not chat
+    # A closed chat makes a new cache when used again, without deleting the old one twice
+    chat.invoke([("user", "hi")])
+    assert chat.cache_name == "cachedContents/3"
+    assert caches.deleted == ["cachedContents/1"]
+
+
+def test_concurrent_requests_create_one_cache_per_prompt():
+    caches = ContextCaches()
+    llm = LLM(provider="google_genai", model_name="test-model", api_key="test-key")
+    
+    def slow_chat(system_prompt):
+        time.sleep(0.05)
+        return caches.chat()
+    
+    llm.llm._create_cached_chat = slow_chat
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        chats = list(pool.map(lambda _: llm.create_cached_chat("Long system prompt"), range(4)))
+    
+    assert caches.created == 1
+    assert all(chat is chats[0] for chat in chats)
+
+
+def test_short_prompts_use_implicit_caching_and_are_reused():
+    llm = LLM(provider="google_genai", model_name="test-model", api_key="test-key")
+    chat = llm.create_cached_chat("Short system prompt")
+    assert chat.cache_name is None
+    assert llm.create_cached_chat("Short system prompt") is chat
+
+
+def test_compact_prompt_is_smaller_and_drops_timeline():
+    verbose = ManimCodeGenerator(api_key="x", prompt_format="verbose").build_user_prompt(context())
+    compact = ManimCodeGenerator(api_key="x").build_user_prompt(context())
+    
+    assert "Animation Timeline" in verbose
+    assert "Animation Timeline" not in compact
+    assert "\n  " not in compact
+    assert "manim_class" not in compact
+    assert estimate_tokens(compact) < estimate_tokens(verbose) * 0.7
+    # Animations are listed by start time, so the write at 0s comes first
+    assert compact.index('"id":"a1"') < compact.index('"id":"a2"')
+
+
+def test_generate_code_sends_static_system_prompt_through_cache():
+    generator = ManimCodeGenerator(api_key="x")
+    generator.llm = FakeLLM()
+    
+    generator.generate_code(context())
+    generator.generate_code(context())
+    
+    assert generator.llm.system_prompts == [generator.system_prompt] * 2
+    assert "SCENE DATA TYPES" in generator.system_prompt
+    first, second = generator.llm.client.messages
+    assert first[0] == ("system", generator.system_prompt)
+    assert first[1][0] == "user" and "Scene Title: Circle" in first[1][1]
+    assert first == second
@@ -0,0 +1,91 @@
+"""
+Test the static render-cost analyzer and the executor's render budget.
+"""
+
+import sys
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from execution.manim_executor import ManimExecutor
+from execution.render_cost import RenderCostAnalyzer, analyze_render_cost
+
+
+COMBINED = '''from manim import *
+
+class CombinedVideo(Scene):
+    def construct(self):
+        title = Text("Mechanics", font_size=48)
+        self.play(Write(title))
+        self.wait(1)
+        self.scene_1()
+        self.scene_2()
+
+    def scene_1(self):
+        equation = MathTex(r"F = ma")
+        for _ in range(3):
+            self.play(Create(Circle()), run_time=2)
+        self.wait(0.5)
+
+    def scene_2(self):
+        """identical to scene 1"""
+        self.scene_1()
+        axes = Axes()
+        graph = axes.plot(lambda x: x ** 2)
+        self.play(Create(axes), Write(graph, run_time=3))
+'''
+
+SLOW = '''from manim import *
+
+class GeneratedScene(Scene):
+    def construct(self):
+        dot = Dot().add_updater(lambda m, dt: m.shift(RIGHT * dt))
+        self.play(FadeIn(dot), run_time=400)
+        while True:
+            self.wait()
+'''
+
+
+def test_counts_follow_loops_and_scene_calls():
+    cost = analyze_render_cost(COMBINED)
+    
+    scene_1, scene_2 = cost.scenes
+    assert (scene_1.play_calls, scene_1.animation_seconds, scene_1.wait_seconds) == (3, 6.0, 0.5)
+    assert scene_1.tex_objects == 1 and not scene_1.dynamic
+    assert scene_2.play_calls == 4 and scene_2.animation_seconds == 9.0
+    assert scene_2.graph_objects == 2 and scene_2.tex_objects == 1
+    
+    total = cost.total
+    assert total.name == "CombinedVideo"
+    assert total.play_calls == 8 and total.duration == 18.0
+    assert total.text_objects == 1 and total.tex_objects == 2
+
+
+def test_frames_and_render_time_grow_with_quality():
+    total = analyze_render_cost(COMBINED).total
+    
+    assert total.frames["low"] == 18 * 15 and total.frames["high"] == 18 * 60
+    seconds = [total.render_seconds[quality] for quality in ("low", "medium", "high", "production", "ultra")]
+    assert seconds == sorted(seconds) and seconds[0] < seconds[-1]
+
+
+def test_pathological_scenes_are_flagged_and_downscaled():
+    cost = RenderCostAnalyzer().analyze(SLOW)
+    scene = cost.scenes[0]
+    
+    assert scene.dynamic and scene.updaters == 1
+    assert cost.pathological(max_scene_seconds=120) == [scene]
+    assert scene.affordable_quality("high", max_render_seconds=scene.render_seconds["medium"]) == "medium"
+    assert scene.affordable_quality("high", max_render_seconds=1) is None
+
+
+def test_executor_downscales_or_rejects_over_budget_code(tmp_path):
+    low = analyze_render_cost(SLOW).total.render_seconds["low"]
+    
+    executor = ManimExecutor(output_dir=str(tmp_path), simulation_mode=True, max_render_seconds=low + 1)
+    assert executor._budget_quality(SLOW, "GeneratedScene", "high") == "low"
+    
+    strict = ManimExecutor(output_dir=str(tmp_path), simulation_mode=True, max_render_seconds=low / 2)
+    result = strict.execute_code(SLOW, scene_name="GeneratedScene", quality="high")
+    assert not result.success and "exceeds" in result.error_message
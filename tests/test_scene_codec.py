@@ -0,0 +1,155 @@
+"""
+Test the binary scene codec.
+"""
+
+import sys
+from io import BytesIO
+from pathlib import Path
+
+import pytest
+
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from data_processing import scene_codec
+from data_processing.scene_codec import (
+    encode_scene, decode_scene, encode_multi_scene, decode_multi_scene, write_multi_scene,
+    MultiSceneReader, SceneCodecError
+)
+from data_processing.scene_structure import SceneStructure
+from data_processing.multi_scene_processor import MultiSceneStructure
+
+
+SCENE_DATA = {
+    "settings": {
+        "title": "Pythagoras",
+        "description": "a² + b² = c²",
+        "duration": 8.5,
+        "background_color": {"name": None, "hex": "#101820", "rgb": None},
+        "camera_position": [0, 0, 0],
+        "quality": "high_quality",
+        "resolution": "1080p"
+    },
+    "objects": [
+        {"id": "tri", "type": "polygon", "properties": {"vertices": [[0, 0, 0], [3, 0, 0], [0, 4, 0]]},
+         "position": [-2.5, 0.5, 0], "color": {"name": "BLUE", "hex": None, "rgb": None}, "layer": 1},
+        {"id": "eq", "type": "mathtext", "text_content": "a^2+b^2=c^2", "position": [0, -3, 0],
+         "color": {"name": None, "hex": None, "rgb": [1.0, 0.5, 0.25]}, "size": 1.2, "opacity": 0.8}
+    ],
+    "animations": [
+        {"id": "draw", "type": "create", "target_objects": ["tri"], "duration": 2.0},
+        {"id": "morph", "type": "transform", "target_objects": ["eq"], "delay": 2.0, "easing": "linear",
+         "from_object": "tri", "to_object": "eq", "target_position": [1, 1, 0], "offset": [0.5, -70000, 0]}
+    ]
+}
+
+
+def make_multi_scene(count=3):
+    scenes = []
+    for i in range(count):
+        scene = SceneStructure.from_dict(SCENE_DATA)
+        scene.settings.title = f"Part {i + 1}"
+        scenes.append(scene)
+    return MultiSceneStructure(
+        title="Geometry",
+        description="Three parts",
+        total_duration=sum(s.settings.duration for s in scenes),
+        scenes=scenes,
+        scene_order=[f"scene_{i + 1}" for i in range(count)],
+        transitions={"scene_1": "fade"}
+    )
+
+
+def test_scene_round_trip():
+    scene = SceneStructure.from_dict(SCENE_DATA)
+    data = encode_scene(scene)
+    assert data[:3] == b"EVZ"
+    assert decode_scene(data) == scene
+    assert SceneStructure.from_bytes(scene.to_bytes()) == scene
+    assert len(data) < len(scene.to_json().encode("utf-8")) / 2
+
+
+def test_multi_scene_round_trip():
+    multi = make_multi_scene()
+    assert decode_multi_scene(encode_multi_scene(multi)) == multi
+    assert MultiSceneStructure.from_bytes(multi.to_bytes()) == multi
+    assert MultiSceneStructure.from_json(multi.to_json()) == multi
+
+
+def test_reader_streams_scenes_lazily():
+    buffer = BytesIO()
+    write_multi_scene(make_multi_scene(), buffer)
+    buffer.seek(0)
+    
+    reader = MultiSceneReader(buffer)
+    assert reader.title == "Geometry"
+    assert reader.scene_count == 3
+    
+    scenes = iter(reader)
+    assert next(scenes).settings.title == "Part 1"
+    assert buffer.tell() < len(buffer.getvalue())
+    assert [s.settings.title for s in scenes] == ["Part 2", "Part 3"]
+
+
+def test_header_is_checked():
+    data = encode_scene(SceneStructure.from_dict(SCENE_DATA))
+    with pytest.raises(SceneCodecError, match="magic"):
+        decode_scene(b"XXX" + data[3:])
+    with pytest.raises(SceneCodecError, match="version"):
+        decode_scene(data[:3] + bytes([99]) + data[4:])
+    with pytest.raises(SceneCodecError, match="kind"):
+        decode_multi_scene(data)
+
+
+def test_truncated_payloads_are_rejected():
+    scene_data = encode_scene(SceneStructure.from_dict(SCENE_DATA))
+    with pytest.raises(SceneCodecError):
+        decode_scene(scene_data[:-10])
+    
+    multi_data = encode_multi_scene(make_multi_scene())
+    with pytest.raises(SceneCodecError):
+        decode_multi_scene(multi_data[:-10])
+
+
+def test_pure_python_packer_matches_wire_format():
+    record = scene_codec.scene_to_record(SceneStructure.from_dict(SCENE_DATA))
+    out = []
+    scene_codec._pack(record, out)
+    packed = b"".join(out)
+    
+    value, pos = scene_codec._unpack(packed, 0)
+    assert pos == len(packed)
+    assert scene_codec.scene_from_record(value) == SceneStructure.from_dict(SCENE_DATA)
+    
+    msgpack = pytest.importorskip("msgpack")
+    assert msgpack.unpackb(packed, raw=False) == value
+    assert scene_codec._unpack(msgpack.packb(record, use_bin_type=True), 0)[0] == value
+
+
+def test_large_integers_use_wide_formats():
+    for value in (200, 70000, -200, -70000, 2 ** 40, -(2 ** 40)):
+        out = []
+        scene_codec._pack(value, out)
+        assert scene_codec._unpack(b"".join(out), 0)[0] == value
+
+
+def test_type_codes_are_explicit_and_cover_every_member():
+    from data_processing.scene_structure import (
+        ObjectType, AnimationType, OBJECT_TYPE_CODES, ANIMATION_TYPE_CODES, OBJECT_TYPES, ANIMATION_TYPES
+    )
+    
+    for codes, members, enum in ((OBJECT_TYPE_CODES, OBJECT_TYPES, ObjectType),
+                                 (ANIMATION_TYPE_CODES, ANIMATION_TYPES, AnimationType)):
+        assert set(codes) == set(enum)
+        assert sorted(codes.values()) == list(range(len(enum)))
+        assert all(members[code] is member for member, code in codes.items())
+    # Codes are part of the on-disk format and must never change
+    assert OBJECT_TYPE_CODES[ObjectType.CIRCLE] == 1 and OBJECT_TYPE_CODES[ObjectType.GROUP] == 12
+    assert ANIMATION_TYPE_CODES[AnimationType.WRITE] == 1 and ANIMATION_TYPE_CODES[AnimationType.CIRCUMSCRIBE] == 16
+
+
+def test_unknown_type_codes_are_rejected():
+    record = scene_codec.scene_to_record(SceneStructure.from_dict(SCENE_DATA))
+    record[1][0][1] = -1
+    with pytest.raises(SceneCodecError):
+        scene_codec.scene_from_record(record)
@@ -0,0 +1,98 @@
+"""
+Test the columnar scene analytics view.
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from data_processing.scene_columns import SceneColumns, PYARROW_AVAILABLE
+from data_processing.scene_structure import SceneStructure
+
+
+def make_scene(title, duration, objects, animations):
+    return SceneStructure.from_dict({
+        "settings": {"title": title, "duration": duration},
+        "objects": [
+            {"id": f"o{i}", "type": obj_type, "position": position}
+            for i, (obj_type, position) in enumerate(objects)
+        ],
+        "animations": [
+            {"id": f"a{i}", "type": anim_type, "target_objects": ["o0"], "delay": delay, "duration": anim_duration}
+            for i, (anim_type, delay, anim_duration) in enumerate(animations)
+        ]
+    })
+
+
+SCENES = [
+    make_scene("Intro", 4.0,
+               [("text", [0, 3, 0]), ("circle", [-2, 0, 0]), ("circle", [2, 0, 0])],
+               [("write", 0.0, 1.0), ("create", 0.0, 2.0), ("fade_in", 1.0, 1.0)]),
+    make_scene("Empty", 2.0, [], []),
+    make_scene("Outro", 3.0,
+               [("text", [0, -3, 0])],
+               [("fade_out", 0.5, 2.0)]),
+]
+
+
+def test_columns_flatten_scenes():
+    columns = SceneColumns.from_scenes(SCENES)
+    assert columns.num_scenes == 3
+    assert columns.object_position.shape == (4, 3)
+    assert columns.objects_per_scene().tolist() == [3, 0, 1]
+    assert columns.animations_per_scene().tolist() == [3, 0, 1]
+    assert columns.object_scene.tolist() == [0, 0, 0, 2]
+    assert columns.total_duration == 9.0
+
+
+def test_histograms_and_durations():
+    columns = SceneColumns.from_scenes(SCENES)
+    object_types = columns.object_type_histogram()
+    assert object_types["circle"] == 2
+    assert object_types["text"] == 2
+    assert object_types["square"] == 0
+    assert columns.animation_type_histogram()["fade_out"] == 1
+    
+    stats = columns.duration_stats()
+    assert stats["count"] == 4
+    assert stats["max"] == 2.0
+    assert stats["p50"] == 1.5
+    
+    counts, edges = columns.duration_histogram(bins=2)
+    assert counts.sum() == 4
+
+
+def test_timeline_density():
+    columns = SceneColumns.from_scenes(SCENES)
+    # Scene-relative: [0,1) write+create, [0,2) create, [1,2) fade_in, [0.5,2.5) fade_out
+    assert columns.timeline_density(bin_size=1.0).tolist() == [3, 3, 1]
+    # Course time: Outro starts at 6.0, so its fade_out covers bins 6-8
+    assert columns.timeline_density(bin_size=1.0, course_time=True).tolist() == [2, 2, 0, 0, 0, 0, 1, 1, 1]
+    with pytest.raises(ValueError):
+        columns.timeline_density(bin_size=0)
+
+
+def test_concat_renumbers_scenes():
+    combined = SceneColumns.concat([SceneColumns.from_scenes(SCENES[:2]), SceneColumns.from_scenes(SCENES[2:])])
+    expected = SceneColumns.from_scenes(SCENES)
+    assert combined.object_scene.tolist() == expected.object_scene.tolist()
+    assert combined.summary() == expected.summary()
+
+
+def test_empty_library():
+    columns = SceneColumns.from_scenes([])
+    summary = columns.summary()
+    assert summary["num_objects"] == 0
+    assert summary["peak_concurrent_animations"] == 0
+    assert columns.object_position.shape == (0, 3)
+
+
+@pytest.mark.skipif(not PYARROW_AVAILABLE, reason="pyarrow not installed")
+def test_arrow_export():
+    tables = SceneColumns.from_scenes(SCENES).to_arrow()
+    assert tables["objects"].num_rows == 4
+    assert tables["animations"].column("type").to_pylist()[0] == "write"
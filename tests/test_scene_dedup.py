@@ -0,0 +1,113 @@
+"""
+Test structural scene hashing and course-level deduplication.
+"""
+
+import sys
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from data_processing.scene_dedup import scene_fingerprint, deduplicate_scenes
+from data_processing.scene_structure import SceneStructure
+from data_processing.multi_scene_processor import MultiSceneStructure
+
+
+def title_card(title, ids=("heading", "underline"), text="Summary", duration=4):
+    heading, underline = ids
+    return SceneStructure.from_dict({
+        "settings": {"title": title, "description": f"{title} card", "duration": duration},
+        "objects": [
+            {"id": heading, "type": "text", "text_content": text, "position": [0, 1, 0]},
+            {"id": underline, "type": "line", "position": [0, 0.5, 0], "properties": {"below": heading}}
+        ],
+        "animations": [
+            {"id": "a1", "type": "write", "target_objects": [heading], "duration": 1.5},
+            {"id": "a2", "type": "create", "target_objects": [underline], "delay": 1.5},
+            {"id": "a3", "type": "transform", "target_objects": [heading],
+             "from_object": heading, "to_object": underline, "delay": 3}
+        ]
+    })
+
+
+def test_fingerprint_ignores_ids_title_and_number_format():
+    base = scene_fingerprint(title_card("Part 1"))
+    assert scene_fingerprint(title_card("Part 7", ids=("t", "line_0"))) == base
+    assert scene_fingerprint(title_card("Part 1", duration=4.0)) == base
+
+
+def test_fingerprint_changes_with_content():
+    base = scene_fingerprint(title_card("Part 1"))
+    assert scene_fingerprint(title_card("Part 1", text="Recap")) != base
+    assert scene_fingerprint(title_card("Part 1", duration=5)) != base
+    
+    swapped = title_card("Part 1")
+    swapped.animations[2].from_object, swapped.animations[2].to_object = "underline", "heading"
+    assert scene_fingerprint(swapped) != base
+
+
+def test_report_counts_saved_work():
+    scenes = [title_card("A"), title_card("B", text="Other"), title_card("C", ids=("x", "y")), title_card("D")]
+    report = deduplicate_scenes(scenes)
+    assert report.duplicates == {2: 0, 3: 0}
+    assert report.unique_scenes == 2
+    assert report.llm_calls_saved == 2
+    # Rendering is only saved once the video replays a duplicate (see the processor tests)
+    assert report.render_seconds_saved == 0
+    assert "2 of 4 scenes" in report.summary() and "rendering" not in report.summary()
+
+
+class CountingGenerator:
+    def __init__(self):
+        self.calls = 0
+    
+    def generate_code(self, context):
+        self.calls += 1
+        return f"from manim import *\n\nclass GeneratedScene(Scene):\n    def construct(self):\n        self.wait({self.calls})\n"
+
+
+def test_duplicate_scenes_reuse_generated_code():
+    from data_processing.multi_scene_processor import MultiSceneProcessor
+    
+    processor = MultiSceneProcessor(api_key="test-key")
+    scenes = [title_card("Intro"), title_card("Body", text="Body"), title_card("Outro", ids=("h", "u"))]
+    multi = MultiSceneStructure(title="Course", description="", total_duration=12,
+                                scenes=scenes, scene_order=["1", "2", "3"])
+    contexts = [processor.parser.parse(scene) for scene in scenes]
+    generator = CountingGenerator()
+    
+    processor.dedup_report = report = deduplicate_scenes(scenes)
+    code = processor._create_combined_scene_code(multi, contexts, generator, report.duplicates)
+    
+    assert generator.calls == 2
+    assert report.replayed == [2]
+    assert report.render_seconds_saved == scenes[2].settings.duration
+    assert "def scene_3(self):" in code
+    assert "self.scene_1()" in code.split("def scene_3(self):")[1]
+    compile(code, "<combined>", "exec")
+
+
+class TitledGenerator:
+    def generate_code(self, context):
+        return ("from manim import *\n\nclass GeneratedScene(Scene):\n    def construct(self):\n"
+                f"        title = Text({context.scene_title!r})\n        self.play(Write(title))\n")
+
+
+def test_duplicates_that_draw_their_title_show_their_own():
+    from data_processing.multi_scene_processor import MultiSceneProcessor
+    
+    processor = MultiSceneProcessor(api_key="test-key")
+    scenes = [title_card("Intro"), title_card("Outro", ids=("h", "u"))]
+    multi = MultiSceneStructure(title="Course", description="", total_duration=8,
+                                scenes=scenes, scene_order=["1", "2"])
+    contexts = [processor.parser.parse(scene) for scene in scenes]
+    
+    processor.dedup_report = report = deduplicate_scenes(scenes)
+    code = processor._create_combined_scene_code(multi, contexts, TitledGenerator(), report.duplicates)
+    
+    scene_2 = code.split("def scene_2(self):")[1]
+    assert "Text('Outro')" in scene_2 and "Intro" not in scene_2
+    assert processor.code_results[1].duplicate_of == 0
+    # Rendered on its own, so no rendering is saved
+    assert report.replayed == [] and report.render_seconds_saved == 0
+    compile(code, "<combined>", "exec")
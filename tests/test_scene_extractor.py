@@ -0,0 +1,105 @@
+"""
+Test recovering SceneStructure summaries from Manim code and the direct chunk-to-code mode.
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from code_generation.scene_extractor import SceneExtractionError, extract_scene_structure
+from data_processing.scene_structure import AnimationType, ObjectType
+
+
+CODE = '''from manim import *
+
+class GeneratedScene(Scene):
+    """Pythagoras"""
+    def construct(self):
+        title = Text("Pythagorean theorem", font_size=40)
+        title.set_max_width(11)
+        title.move_to([0, 3.0, 0])
+        title.set_color(WHITE)
+        formula = MathTex(r"a^2 + b^2 = c^2").move_to(DOWN * 0.5)
+        box = Square(color=BLUE).shift(2 * LEFT)
+        
+        current_time = 0.0
+        if 1.0 > current_time:
+            self.wait(1.0 - current_time)
+        self.play(Write(title), run_time=1.5)
+        self.play(FadeIn(formula), Create(box, run_time=2))
+        self.play(box.animate.shift(RIGHT * 3))
+        self.play(Transform(title, formula))
+        self.wait(2)
+'''
+
+
+def test_objects_positions_and_colors():
+    scene = extract_scene_structure(CODE)
+    objects = {obj.id: obj for obj in scene.objects}
+    
+    assert scene.settings.title == "Pythagoras"
+    assert objects["title"].type == ObjectType.TEXT
+    assert objects["title"].text_content == "Pythagorean theorem"
+    assert objects["title"].position.to_list() == [0.0, 3.0, 0.0]
+    assert objects["title"].color.name == "WHITE"
+    assert objects["formula"].type == ObjectType.MATHTEXT
+    assert objects["formula"].position.y == -0.5
+    assert objects["box"].position.x == -2.0
+    assert objects["box"].color.name == "BLUE"
+
+
+def test_animation_timeline():
+    scene = extract_scene_structure(CODE, title="Override")
+    timeline = [(anim.type, anim.target_objects, anim.delay, anim.duration) for anim in scene.animations]
+    
+    assert scene.settings.title == "Override"
+    assert timeline == [
+        (AnimationType.WRITE, ["title"], 1.0, 1.5),
+        (AnimationType.FADE_IN, ["formula"], 2.5, 1.0),
+        (AnimationType.CREATE, ["box"], 2.5, 2.0),
+        (AnimationType.SHIFT, ["box"], 4.5, 1.0),
+        (AnimationType.TRANSFORM, ["title"], 5.5, 1.0),
+    ]
+    assert scene.animations[3].offset.x == 3.0
+    assert (scene.animations[4].from_object, scene.animations[4].to_object) == ("title", "formula")
+    assert scene.settings.duration == 8.5
+
+
+def test_invalid_code_is_rejected():
+    with pytest.raises(SceneExtractionError):
+        extract_scene_structure("class Broken(Scene:\n")
+    with pytest.raises(SceneExtractionError):
+        extract_scene_structure("x = 1\n")
+
+
+def test_direct_mode_uses_one_call_per_chunk(monkeypatch):
+    from code_generation.manim_code_generator import ManimCodeGenerator
+    from data_processing.multi_scene_processor import MultiSceneProcessor
+    
+    calls = []
+    
+    def fake_generate(self, content, title="", description=""):
+        calls.append(title)
+        if title.endswith("Part 2"):
+            raise RuntimeError("Failed to generate Manim code: timeout")
+        return CODE
+    
+    monkeypatch.setattr(ManimCodeGenerator, "generate_code_from_content", fake_generate)
+    processor = MultiSceneProcessor(api_key="test-key")
+    processor.chunker.llm = None
+    processor.chunker.max_chunk_size = 80
+    processor.processor.llm = None  # the scene JSON stage must not be used
+    
+    text = "\n\n".join(f"Paragraph {i} covers a separate idea about right triangles." for i in range(3))
+    code, multi_scene = processor.generate_code_direct(text_input=text, document_title="Geometry")
+    
+    assert len(calls) == 3
+    assert [result.ok for result in processor.code_results] == [True, False, True]
+    assert len(multi_scene.scenes[0].animations) == 5
+    assert multi_scene.scenes[1].objects == []
+    assert "(code generation failed)" in code.split("def scene_2(self):")[1]
+    compile(code, "<combined>", "exec")
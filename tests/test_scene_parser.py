@@ -0,0 +1,114 @@
+"""
+Test SceneParser grouping and the lazily derived context fields.
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from data_processing.scene_parser import SceneParser, DependencyCycleError
+from data_processing.scene_structure import SceneStructure, ObjectType, AnimationType
+
+
+SCENE = SceneStructure.from_dict({
+    "settings": {"title": "Chains", "duration": 9.0},
+    "objects": [
+        {"id": "a", "type": "mathtext", "text_content": "x"},
+        {"id": "b", "type": "formula", "text_content": "y"},
+        {"id": "c", "type": "mathtext", "text_content": "z"},
+        {"id": "label", "type": "text", "text_content": "label"},
+        {"id": "box", "type": "square"},
+        {"id": "img", "type": "image"}
+    ],
+    "animations": [
+        {"id": "t2", "type": "transform", "target_objects": ["b"], "from_object": "b", "to_object": "c", "delay": 4.0},
+        {"id": "t1", "type": "replace_transform", "target_objects": ["a"], "from_object": "a", "to_object": "b", "delay": 2.0},
+        {"id": "w", "type": "write", "target_objects": ["a"], "delay": 0.0},
+        {"id": "f", "type": "fade_out", "target_objects": ["box"], "delay": 2.0},
+        {"id": "u", "type": "uncreate", "target_objects": ["label"], "delay": 6.0}
+    ]
+})
+
+
+def test_objects_and_animations_are_bucketed_by_type():
+    context = SceneParser().parse(SCENE)
+    assert [o.id for o in context.math_objects] == ["a", "b", "c"]
+    assert [o.id for o in context.text_objects] == ["label"]
+    assert [o.id for o in context.shape_objects] == ["box"]
+    assert [o.id for o in context.all_objects] == ["label", "box", "a", "b", "c"]
+    assert [a.id for a in context.transformation_animations] == ["t2", "t1"]
+    assert [a.id for a in context.all_animations] == ["w", "t2", "t1", "f"]
+
+
+def test_derived_fields_are_computed_lazily():
+    context = SceneParser().parse(SCENE)
+    assert "animation_timeline" not in context.__dict__
+    
+    timeline = context.animation_timeline
+    assert [anim.id for _, anim in timeline] == ["w", "t1", "f", "t2", "u"]
+    assert context.animation_timeline is timeline
+
+
+def test_dependencies_and_transformation_chains():
+    context = SceneParser().parse(SCENE)
+    assert context.object_dependencies["c"] == ["b"]
+    assert context.object_dependencies["b"] == ["a"]
+    assert context.object_dependencies["label"] == []
+    # Chains start from the first transform seen, matching the previous parser
+    assert context.transformation_chains == [["b", "c"]]
+
+
+def make_transform_scene(objects, transforms):
+    return SceneStructure.from_dict({
+        "settings": {"title": "Deps"},
+        "objects": [{"id": obj_id, "type": "circle", "layer": layer} for obj_id, layer in objects],
+        "animations": [
+            {"id": f"t{i}", "type": "transform", "target_objects": [src], "from_object": src, "to_object": dst}
+            for i, (src, dst) in enumerate(transforms)
+        ]
+    })
+
+
+def test_creation_order_respects_dependencies_then_layer():
+    parser = SceneParser()
+    # d depends on c, c depends on a; b and e are free
+    scene = make_transform_scene(
+        [("d", 0), ("c", 0), ("a", 2), ("b", 1), ("e", 0)],
+        [("a", "c"), ("c", "d")]
+    )
+    context = parser.parse(scene)
+    
+    assert [o.id for o in parser.get_object_creation_order(context)] == ["e", "b", "a", "c", "d"]
+    assert [[o.id for o in batch] for batch in parser.get_creation_batches(context)] == [["e", "b", "a"], ["c"], ["d"]]
+
+
+def test_dependency_cycle_is_reported():
+    parser = SceneParser()
+    scene = make_transform_scene([("a", 0), ("b", 0), ("c", 0), ("free", 0)], [("a", "b"), ("b", "c"), ("c", "a")])
+    context = parser.parse(scene)
+    
+    with pytest.raises(DependencyCycleError) as excinfo:
+        parser.get_creation_batches(context)
+    assert excinfo.value.cycle[0] == excinfo.value.cycle[-1]
+    assert set(excinfo.value.cycle) == {"a", "b", "c"}
+
+
+def test_self_transform_and_unknown_ids_are_ignored():
+    parser = SceneParser()
+    scene = make_transform_scene([("a", 0), ("b", 0)], [("a", "a"), ("ghost", "b")])
+    batches = parser.get_creation_batches(parser.parse(scene))
+    assert [[o.id for o in batch] for batch in batches] == [["a", "b"]]
+
+
+def test_animation_groups_use_interval_overlap():
+    parser = SceneParser()
+    groups = parser.get_animation_groups(parser.parse(SCENE))
+    # w [0,1) | t1 [2,3) overlaps f [2,3) | t2 [4,5) | u [6,7)
+    assert [[anim.id for anim in group] for group in groups] == [["w"], ["t1", "f"], ["t2"], ["u"]]
+    
+    compacted = parser.get_animation_groups(parser.parse(SCENE), max_idle_gap=0.0)
+    assert [anim.delay for group in compacted for anim in group] == [0.0, 1.0, 1.0, 2.0, 3.0]
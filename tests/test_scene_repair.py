@@ -0,0 +1,163 @@
+"""
+Test the per-scene repair loop for failed CombinedVideo renders.
+"""
+
+import sys
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from execution.manim_executor import ExecutionResult
+from execution.scene_repair import (
+    SceneRepairLoop, locate_failing_scene, replace_method, segment_code
+)
+
+
+COMBINED = '''from manim import *
+
+class CombinedVideo(Scene):
+    def construct(self):
+        self.scene_1()
+        self.scene_2()
+
+    def scene_1(self):
+        """Scene 1: Forces"""
+        self.play(Write(Text("Forces", font_size=36)))
+        self.wait(0.5)
+
+    def scene_2(self):
+        """Scene 2: Energy"""
+        label = Text("Energy", font_size=36)
+        self.play(Write(label.set_font_size(20)))
+        self.wait(0.5)
+'''
+
+FIXED_SCENE_2 = '''```python
+def scene_2(self):
+    """Scene 2: Energy"""
+    label = Text("Energy", font_size=20)
+    self.play(Write(label))
+    self.wait(0.5)
+```'''
+
+PYTHON_TRACEBACK = '''Traceback (most recent call last):
+  File "/usr/lib/python3/site-packages/manim/scene/scene.py", line 229, in render
+    self.construct()
+  File "/tmp/manim_scene_1a2b.py", line 6, in construct
+    self.scene_2()
+  File "/tmp/manim_scene_1a2b.py", line 16, in scene_2
+    self.play(Write(label.set_font_size(20)))
+AttributeError: Text object has no attribute 'set_font_size'
+'''
+
+
+class FakeResponse:
+    def __init__(self, content):
+        self.content = content
+
+
+class FakeModel:
+    """Returns canned fixes in order and records the prompts it was sent."""
+    
+    def __init__(self, *replies):
+        self.replies = list(replies)
+        self.prompts = []
+    
+    def create_cached_chat(self, system_prompt):
+        return self
+    
+    def invoke(self, messages):
+        self.prompts.append(messages[-1][1])
+        return FakeResponse(self.replies.pop(0))
+
+
+class FakeExecutor:
+    """Fails any render whose code still calls set_font_size."""
+    
+    def __init__(self):
+        self.rendered = []
+        self.script_names = []
+    
+    def execute_code(self, code, scene_name="CombinedVideo", quality=None, video_name=None, script_name=None):
+        self.rendered.append((code, quality))
+        self.script_names.append(script_name)
+        if "set_font_size" in code:
+            return ExecutionResult(success=False, stderr=PYTHON_TRACEBACK, temp_files=[])
+        return ExecutionResult(success=True, video_path=None, temp_files=[])
+    
+    def cleanup_temp_files(self, temp_files):
+        pass
+
+
+def test_failing_scene_is_located_from_python_and_rich_tracebacks():
+    assert locate_failing_scene(COMBINED, PYTHON_TRACEBACK) == "scene_2"
+    
+    rich = "│ /tmp/manim_scene_1a2b.py:10 in <module> │\n│ /tmp/manim_scene_1a2b.py:10 in method │"
+    assert locate_failing_scene(COMBINED, rich) == "scene_1"
+    assert locate_failing_scene(COMBINED, "ffmpeg: broken pipe") is None
+
+
+def test_replace_and_segment_keep_the_other_scenes_intact():
+    patched = replace_method(COMBINED, "scene_2", FIXED_SCENE_2.strip("`").replace("python\n", ""))
+    assert "set_font_size" not in patched
+    assert patched.count('"""Scene 1: Forces"""') == 1
+    
+    segment = segment_code(patched, "scene_2")
+    compile(segment, "<segment>", "exec")
+    assert "scene_1" not in segment and "self.scene_2()" in segment
+
+
+def test_only_the_failing_scene_is_sent_for_repair_and_rerendered():
+    executor, model = FakeExecutor(), FakeModel(FIXED_SCENE_2)
+    loop = SceneRepairLoop(executor, llm=model)
+    
+    result, code = loop.render(COMBINED, quality="medium")
+    
+    assert result.success
+    assert "set_font_size" not in code and "Forces" in code
+    assert len(model.prompts) == 1
+    assert "def scene_2" in model.prompts[0] and "def scene_1" not in model.prompts[0]
+    assert "AttributeError" in model.prompts[0]
+    # full render, repaired segment at low quality, full render again
+    assert [quality for _, quality in executor.rendered] == ["medium", "low", "medium"]
+    assert "Forces" not in executor.rendered[1][0]
+    assert loop.report.repaired_scenes == ["scene_2"]
+
+
+def test_full_renders_share_a_script_name_for_the_partial_movie_cache(tmp_path):
+    from execution.manim_executor import ManimExecutor
+    
+    executor = FakeExecutor()
+    SceneRepairLoop(executor, llm=FakeModel(FIXED_SCENE_2)).render(COMBINED, video_name="forces_generated")
+    
+    full, segment, rerender = executor.script_names
+    assert full == rerender == "forces_generated"
+    assert segment is None
+    
+    manim = ManimExecutor(output_dir=str(tmp_path / "media"), temp_dir=str(tmp_path), simulation_mode=True)
+    assert Path(manim._create_temp_file("", "forces_generated")).name == "forces_generated.py"
+
+
+def test_fix_that_does_not_parse_uses_the_next_attempt():
+    model = FakeModel("def scene_2(self):\n    x = (", FIXED_SCENE_2)
+    loop = SceneRepairLoop(FakeExecutor(), llm=model)
+    
+    result, code = loop.render(COMBINED)
+    
+    assert result.success
+    assert [attempt.stage for attempt in loop.report.attempts] == ["validation", ""]
+    assert "does not parse" in model.prompts[1]
+    assert loop.report.repaired_scenes == ["scene_2"]
+
+
+def test_attempt_budget_is_bounded():
+    still_broken = FakeModel(*[f"def scene_2(self):\n    self.play(Write(Text('x').set_font_size({i})))" for i in range(5)])
+    loop = SceneRepairLoop(FakeExecutor(), llm=still_broken, max_attempts_per_scene=2)
+    
+    result, _ = loop.render(COMBINED)
+    
+    assert not result.success
+    assert len(still_broken.prompts) == 2
+    assert all(attempt.stage == "segment" for attempt in loop.report.attempts)
+    assert "still fails" in loop.report.summary()
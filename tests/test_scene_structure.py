@@ -0,0 +1,62 @@
+"""
+Test the compact scene dataclasses.
+"""
+
+import dataclasses
+import sys
+from pathlib import Path
+
+import pytest
+
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from data_processing.scene_structure import SceneStructure, SceneObject, Position, ObjectType, ORIGIN
+
+
+SCENE_DATA = {
+    "settings": {"title": "Demo", "background_color": {"name": "BLACK"}, "camera_position": [0, 0, 0]},
+    "objects": [
+        {"id": "a", "type": "text", "text_content": "A", "color": {"name": "BLUE"}},
+        {"id": "b", "type": "circle", "position": [1, 2, 0], "color": {"name": "BLUE"}},
+    ],
+    "animations": [{"id": "w", "type": "write", "target_objects": ["a"], "target_position": [0, 1, 0]}]
+}
+
+
+def test_scene_dataclasses_have_no_instance_dict():
+    scene = SceneStructure.from_dict(SCENE_DATA)
+    for instance in [scene, scene.settings, scene.objects[0], scene.animations[0], scene.objects[1].position]:
+        assert not hasattr(instance, "__dict__")
+
+
+def test_positions_and_named_colors_are_shared():
+    scene = SceneStructure.from_dict(SCENE_DATA)
+    assert scene.objects[0].position is ORIGIN
+    assert scene.settings.camera_position is ORIGIN
+    assert SceneObject("c", ObjectType.SQUARE).position is ORIGIN
+    assert scene.objects[0].color is scene.objects[1].color
+
+
+def test_positions_are_immutable():
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        ORIGIN.x = 1.0
+    
+    obj = SceneObject("c", ObjectType.SQUARE)
+    obj.position = Position(1, 1, 0)
+    assert ORIGIN == Position()
+
+
+def test_null_string_fields_are_accepted_without_validation():
+    data = dict(SCENE_DATA, settings=dict(SCENE_DATA["settings"], quality=None, resolution=None))
+    data["animations"] = [dict(SCENE_DATA["animations"][0], easing=None)]
+    
+    scene = SceneStructure.from_dict(data)
+    
+    assert scene.animations[0].easing is None
+    assert scene.settings.quality is None and scene.settings.resolution is None
+
+
+def test_dict_round_trip():
+    scene = SceneStructure.from_dict(SCENE_DATA)
+    assert SceneStructure.from_dict(scene.to_dict()).to_dict() == scene.to_dict()
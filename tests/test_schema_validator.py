@@ -0,0 +1,66 @@
+"""
+Test the compiled scene schema validator.
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from data_processing.schema_validator import compile_schema, SchemaValidationError
+from data_processing.scene_structure import SceneStructure, validate_scene_dict
+
+
+VALID_SCENE = {
+    "settings": {"title": "Demo", "duration": 5, "camera_position": [0, 0, 0], "quality": "low_quality"},
+    "objects": [{"id": "t", "type": "text", "text_content": "Hi", "color": None, "layer": 1}],
+    "animations": [{"id": "a", "type": "write", "target_objects": ["t"], "delay": 0.5}]
+}
+
+
+def test_valid_payload_has_no_errors():
+    assert validate_scene_dict(VALID_SCENE) == []
+
+
+def test_all_errors_are_reported_in_one_pass():
+    payload = {
+        "settings": {"duration": -2, "resolution": "8k"},
+        "objects": [{"type": "hexagon", "opacity": 1.5}],
+        "animations": [{"id": "a", "type": "write", "target_objects": "t"}]
+    }
+    errors = validate_scene_dict(payload)
+    
+    assert "$.settings.duration: -2 is less than 0" in errors
+    assert any(e.startswith("$.settings.resolution:") for e in errors)
+    assert "$.objects[0]: missing required property 'id'" in errors
+    assert any(e.startswith("$.objects[0].type:") for e in errors)
+    assert "$.objects[0].opacity: 1.5 is greater than 1" in errors
+    assert "$.animations[0].target_objects: expected array, got str" in errors
+
+
+def test_booleans_are_not_numbers():
+    validate = compile_schema({"type": "object", "properties": {"n": {"type": "number"}, "i": {"type": "integer"}}})
+    assert validate({"n": True, "i": False}) == [
+        "$.n: expected number, got bool",
+        "$.i: expected integer, got bool",
+    ]
+    assert validate({"n": 1, "i": 2}) == []
+
+
+def test_nullable_types_only_check_constraints_on_matching_type():
+    validate = compile_schema({"type": ["array", "null"], "items": {"type": "number"}, "minItems": 2})
+    assert validate(None) == []
+    assert validate([1]) == ["$: expected at least 2 items, got 1"]
+
+
+def test_from_dict_raises_with_every_violation():
+    with pytest.raises(SchemaValidationError) as exc_info:
+        SceneStructure.from_dict({"objects": [{"id": 3, "type": "circle"}], "animations": []}, validate=True)
+    
+    assert exc_info.value.errors == [
+        "$: missing required property 'settings'",
+        "$.objects[0].id: expected string, got int",
+    ]
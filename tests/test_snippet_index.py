@@ -0,0 +1,101 @@
+"""
+Test the BM25 index of validated scene code and few-shot prompting.
+"""
+
+import sys
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from code_generation.manim_code_generator import ManimCodeGenerator
+from code_generation.snippet_index import SnippetIndex
+from data_processing.scene_parser import SceneParser
+from data_processing.scene_structure import SceneStructure
+
+
+def context(title, objects, animation="write"):
+    structure = SceneStructure.from_dict({
+        "settings": {"title": title, "description": "", "duration": 3},
+        "objects": [
+            {"id": f"o{i}", "type": kind, "text_content": text}
+            for i, (kind, text) in enumerate(objects)
+        ],
+        "animations": [{"id": "a0", "type": animation, "target_objects": ["o0"]}]
+    })
+    return SceneParser().parse(structure)
+
+
+def code(label):
+    return f'from manim import *\n\nclass GeneratedScene(Scene):\n    def construct(self):\n        self.play(Write(Text("{label}")))\n'
+
+
+PENDULUM = context("Pendulum motion", [("text", "Simple pendulum"), ("formula", "T = 2 \\pi \\sqrt{L/g}")])
+SPRING = context("Spring oscillation", [("text", "Mass on a spring"), ("formula", "T = 2 \\pi \\sqrt{m/k}")])
+CELLS = context("Cell biology", [("circle", None), ("arrow", None)], animation="create")
+
+
+class FakeModel:
+    def __init__(self, *replies):
+        self.replies = list(replies)
+        self.prompts = []
+    
+    def create_cached_chat(self, system_prompt):
+        return self
+    
+    def invoke(self, messages):
+        self.prompts.append(messages[-1][1])
+        
+        class Response:
+            content = self.replies.pop(0)
+        return Response()
+
+
+def test_search_ranks_scenes_sharing_types_and_words_first():
+    index = SnippetIndex()
+    index.add(PENDULUM, code("pendulum"))
+    index.add(CELLS, code("cells"))
+    
+    results = index.search(SPRING, k=2)
+    
+    assert [snippet.title for snippet in results][0] == "Pendulum motion"
+    assert len(index.search(context("Empty", [("square", None)], animation="fade_in"))) == 0
+
+
+def test_validated_code_is_indexed_and_offered_to_later_scenes():
+    index = SnippetIndex()
+    model = FakeModel(code("pendulum"), "this is not python (", code("spring"))
+    generator = ManimCodeGenerator(llm=model, snippet_index=index)
+    
+    generator.generate_code(PENDULUM)
+    generator.generate_code(CELLS)
+    generator.generate_code(SPRING)
+    
+    assert "VALIDATED CODE FROM SIMILAR SCENES" not in model.prompts[0]
+    assert "# Scene: Pendulum motion" in model.prompts[2]
+    assert len(index) == 2  # the invalid code was not indexed
+    
+    report = index.report()
+    assert report["with_examples"]["calls"] == 1 and report["with_examples"]["success_rate"] == 1.0
+    assert report["without_examples"]["calls"] == 2 and report["without_examples"]["success_rate"] == 0.5
+    assert "retries/scene" in index.summary()
+
+
+def test_retries_are_counted_per_scene():
+    index = SnippetIndex()
+    index.record(SPRING, used_examples=True, ok=False)
+    index.record(SPRING, used_examples=True, ok=True)
+    index.record(PENDULUM, used_examples=False, ok=True)
+    
+    report = index.report()
+    assert report["with_examples"]["retry_rate"] == 1.0
+    assert report["without_examples"]["retry_rate"] == 0.0
+
+
+def test_entries_persist_in_jsonl(tmp_path):
+    path = tmp_path / "snippets.jsonl"
+    SnippetIndex(path=str(path)).add(PENDULUM, code("pendulum"))
+    
+    reloaded = SnippetIndex(path=str(path))
+    assert len(reloaded) == 1
+    assert reloaded.search(SPRING)[0].code == code("pendulum")
@@ -0,0 +1,120 @@
+"""
+Test incremental parsing of streamed scene JSON.
+"""
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from data_processing.stream_parser import IncrementalSceneParser, StreamingParseError
+
+
+SCENE_JSON = json.dumps({
+    "settings": {"title": "Binomial", "duration": 6.0},
+    "objects": [
+        {"id": "title", "type": "text", "text_content": "Expand {a+b}", "position": [0, 3, 0]},
+        {"id": "formula", "type": "mathtext", "text_content": "(a+b)^2", "position": [0, 0, 0]}
+    ],
+    "animations": [
+        {"id": "write_title", "type": "write", "target_objects": ["title"], "duration": 1.5},
+        {"id": "show_formula", "type": "fade_in", "target_objects": ["formula"], "delay": 1.5}
+    ]
+}, indent=2)
+
+
+def feed_in_pieces(parser, text, size=7):
+    for i in range(0, len(text), size):
+        parser.feed(text[i:i + size])
+
+
+def test_elements_are_emitted_before_the_stream_ends():
+    """Objects are handed downstream as soon as their closing brace arrives."""
+    emitted = []
+    parser = IncrementalSceneParser(on_object=lambda obj: emitted.append(obj.id))
+    
+    cutoff = SCENE_JSON.index('"animations"')
+    feed_in_pieces(parser, SCENE_JSON[:cutoff])
+    assert emitted == ["title", "formula"]
+    assert not parser.finished
+    
+    feed_in_pieces(parser, SCENE_JSON[cutoff:])
+    scene = parser.close()
+    assert [anim.id for anim in scene.animations] == ["write_title", "show_formula"]
+    assert scene.settings.title == "Binomial"
+    assert scene.objects[0].text_content == "Expand {a+b}"
+
+
+def test_markdown_fences_are_tolerated():
+    parser = IncrementalSceneParser()
+    feed_in_pieces(parser, "```json\n" + SCENE_JSON + "\n```")
+    assert len(parser.close().objects) == 2
+
+
+def test_malformed_output_is_detected_mid_stream():
+    parser = IncrementalSceneParser()
+    parser.feed('{"settings": {"title": "x"}, "objects": [')
+    with pytest.raises(StreamingParseError):
+        parser.feed('{id: "oops"')
+
+
+def test_prose_before_json_is_rejected_immediately():
+    parser = IncrementalSceneParser()
+    with pytest.raises(StreamingParseError):
+        parser.feed("Sure! Here is the scene")
+
+
+def test_invalid_element_is_rejected_when_it_closes():
+    parser = IncrementalSceneParser()
+    with pytest.raises(StreamingParseError):
+        parser.feed('{"objects": [{"id": "a", "type": "hexagon"}')
+
+
+def test_truncated_stream_fails_on_close():
+    parser = IncrementalSceneParser()
+    parser.feed(SCENE_JSON[:len(SCENE_JSON) // 2])
+    with pytest.raises(StreamingParseError):
+        parser.close()
+
+
+class FakeStreamingChat:
+    """Chat stub that streams a scripted response per attempt."""
+    
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.closed = 0
+    
+    def stream(self, messages):
+        text = self.responses.pop(0)
+        try:
+            for i in range(0, len(text), 5):
+                yield type("Chunk", (), {"content": text[i:i + 5]})()
+        finally:
+            self.closed += 1
+
+
+class FakeLLM:
+    def __init__(self, chat):
+        self.chat = chat
+    
+    def create_chat(self):
+        return self.chat
+
+
+def test_input_processor_retries_after_malformed_stream():
+    from data_processing.input_processor import InputProcessor
+    
+    processor = InputProcessor(api_key="test-key")
+    chat = FakeStreamingChat(["Here is your JSON: {", SCENE_JSON])
+    processor.llm = FakeLLM(chat)
+    
+    emitted = []
+    scene = processor.stream_text_input("(a+b)^2", on_object=lambda obj: emitted.append(obj.id))
+    
+    assert emitted == ["title", "formula"]
+    assert len(scene.animations) == 2
+    assert chat.closed == 2
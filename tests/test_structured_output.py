@@ -0,0 +1,112 @@
+"""
+Test the provider-native structured output path for scene JSON.
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from data_processing.input_processor import InputProcessor
+from data_processing.scene_structure import SCENE_STRUCTURE_SCHEMA, ObjectType
+from models.llm import LLM
+
+
+SCENE_DATA = {
+    "settings": {"title": "Circle", "duration": 4.0},
+    "objects": [{"id": "c1", "type": "circle", "position": [1, 0, 0]}],
+    "animations": [{"id": "a1", "type": "create", "target_objects": ["c1"]}]
+}
+
+
+class FakeRunnable:
+    def __init__(self, result):
+        self.result = result
+        self.calls = 0
+    
+    def invoke(self, messages):
+        self.calls += 1
+        if isinstance(self.result, Exception):
+            raise self.result
+        return self.result
+
+
+class FakeStructuredLLM:
+    """LLM stub that either supports structured output or refuses it."""
+    
+    def __init__(self, supported=True, rejects_on_invoke=False, invoke_error=None):
+        self.supported = supported
+        if rejects_on_invoke:
+            invoke_error = RuntimeError("Invalid JSON payload: response_schema")
+        self.structured = FakeRunnable(invoke_error or SCENE_DATA)
+        self.plain = FakeRunnable(type("Message", (), {"content": "```json\n{\"settings\": {}, \"objects\": [], \"animations\": []}\n```"})())
+    
+    def create_structured_chat(self, schema):
+        assert schema is SCENE_STRUCTURE_SCHEMA
+        if not self.supported:
+            raise NotImplementedError("no JSON mode")
+        return self.structured
+    
+    def create_chat(self):
+        return self.plain
+
+
+def test_structured_output_skips_text_parsing():
+    processor = InputProcessor(api_key="test-key")
+    processor.llm = FakeStructuredLLM()
+    
+    scene = processor.process_text_input("Draw a circle")
+    
+    assert scene.objects[0].type == ObjectType.CIRCLE
+    assert processor.llm.structured.calls == 1
+    assert processor.llm.plain.calls == 0
+
+
+def test_falls_back_to_json_prompting_when_unsupported():
+    processor = InputProcessor(api_key="test-key")
+    processor.llm = FakeStructuredLLM(supported=False)
+    
+    scene = processor.process_text_input("Draw a circle")
+    
+    assert scene.objects == []
+    assert processor.use_structured_output is False
+    assert processor.llm.plain.calls == 1
+
+
+def test_falls_back_when_the_provider_rejects_the_schema_at_request_time():
+    processor = InputProcessor(api_key="test-key")
+    processor.llm = FakeStructuredLLM(rejects_on_invoke=True)
+    
+    scene = processor.process_text_input("Draw a circle")
+    processor.process_text_input("Draw another circle")
+    
+    assert scene.objects == []
+    assert processor.use_structured_output is False
+    assert processor.llm.structured.calls == 1
+    assert processor.llm.plain.calls == 2
+
+
+def test_transient_errors_do_not_disable_structured_output():
+    processor = InputProcessor(api_key="test-key")
+    processor.llm = FakeStructuredLLM(invoke_error=TimeoutError("429 Resource exhausted, retry later"))
+    
+    with pytest.raises(RuntimeError):
+        processor.process_text_input("Draw a circle")
+    
+    assert processor.use_structured_output is True
+    assert processor.llm.plain.calls == 0
+    
+    processor.llm.structured.result = SCENE_DATA
+    assert processor.process_text_input("Draw a circle").objects
+
+
+def test_providers_bind_the_scene_schema():
+    for provider, kwargs in [
+        ("google_genai", {}),
+        ("chatopenai", {"base_url": "http://localhost:1/v1"}),
+    ]:
+        llm = LLM(provider=provider, model_name="test-model", api_key="test-key", **kwargs)
+        assert llm.create_structured_chat(SCENE_STRUCTURE_SCHEMA) is not None
@@ -0,0 +1,120 @@
+"""
+Test the cached text metrics service.
+"""
+
+import sys
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from code_generation.manim_code_generator import ManimCodeGenerator
+from data_processing.text_metrics import TextMetrics, estimate_extent
+
+
+class CountingMeasurer:
+    """Pretends every character is 0.5 units wide at the reference font size."""
+    
+    def __init__(self, fail_on=()):
+        self.calls = []
+        self.fail_on = fail_on
+    
+    def __call__(self, kind, text):
+        self.calls.append((kind, text))
+        if text in self.fail_on:
+            raise RuntimeError("latex not found")
+        return 0.5 * len(text), 1.0
+
+
+def test_each_string_is_measured_once_and_scaled_by_font_size():
+    measurer = CountingMeasurer()
+    metrics = TextMetrics(measurer=measurer)
+    
+    assert metrics.measure("Force", 48) == (2.5, 1.0)
+    assert metrics.measure("Force", 24) == (1.25, 0.5)
+    assert metrics.width("Force", 96, kind="math") == 5.0
+    
+    assert measurer.calls == [("text", "Force"), ("math", "Force")]
+    assert metrics.stats.hits == 1 and metrics.stats.measured == 2
+
+
+def test_measurements_persist_but_estimates_do_not(tmp_path):
+    cache_path = tmp_path / "metrics.json"
+    metrics = TextMetrics(cache_path=str(cache_path), measurer=CountingMeasurer(fail_on={r"\frac{a}{b}"}))
+    metrics.measure("Energy")
+    assert metrics.measure(r"\frac{a}{b}", kind="math") == estimate_extent("math", r"\frac{a}{b}")
+    metrics.save()
+    
+    measurer = CountingMeasurer()
+    reloaded = TextMetrics(cache_path=str(cache_path), measurer=measurer)
+    reloaded.measure("Energy")
+    reloaded.measure(r"\frac{a}{b}", kind="math")
+    assert measurer.calls == [("math", r"\frac{a}{b}")]
+
+
+def test_a_short_run_persists_when_the_generator_closes(tmp_path):
+    cache_path = tmp_path / "metrics.json"
+    metrics = TextMetrics(cache_path=str(cache_path), measurer=CountingMeasurer())
+    generator = ManimCodeGenerator(api_key="x", text_metrics=metrics)
+    for text in ("Mass", "Force", "Energy"):
+        metrics.measure(text)
+    assert not cache_path.exists()
+    
+    generator.close()
+    
+    measurer = CountingMeasurer()
+    TextMetrics(cache_path=str(cache_path), measurer=measurer).measure("Force")
+    assert measurer.calls == []
+
+
+def test_least_recently_used_measurements_are_dropped():
+    measurer = CountingMeasurer()
+    metrics = TextMetrics(max_entries=2, measurer=measurer)
+    for text in ("a", "b", "a", "c", "a", "b"):
+        metrics.measure(text)
+    
+    assert [text for _, text in measurer.calls] == ["a", "b", "c", "b"]
+
+
+def test_overflow_fix_caps_only_texts_wider_than_the_safe_area():
+    generator = ManimCodeGenerator(llm=object(), text_metrics=TextMetrics(measurer=CountingMeasurer()))
+    code = "\n".join([
+        "        short = Text(\"Newton's Laws\", font_size=36)",
+        "        long = Text(\"An object in motion stays in motion unless acted upon\", font_size=36)",
+    ])
+    fixed = generator._fix_text_overflow_and_sizing(code)
+    
+    assert "short.set_max_width" not in fixed
+    assert "long.set_max_width(12)" in fixed
+
+
+def test_text_without_font_size_is_measured_at_manims_default():
+    generator = ManimCodeGenerator(llm=object(), text_metrics=TextMetrics(measurer=CountingMeasurer()))
+    sentence = "Energy is conserved in every closed system we will study today"
+    fixed = generator._fix_text_overflow_and_sizing(f'        t = Text("{sentence}")')
+    
+    assert "t.set_max_width(12)" in fixed
+
+
+def test_real_measurements_run_one_at_a_time():
+    import threading
+    import time
+    from concurrent.futures import ThreadPoolExecutor
+    
+    state = {"active": 0, "peak": 0}
+    lock = threading.Lock()
+    
+    def measurer(kind, text):
+        with lock:
+            state["active"] += 1
+            state["peak"] = max(state["peak"], state["active"])
+        time.sleep(0.01)
+        with lock:
+            state["active"] -= 1
+        return 1.0, 1.0
+    
+    metrics = TextMetrics(measurer=measurer)
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        list(pool.map(metrics.measure, [f"Label {i % 8}" for i in range(32)]))
+    
+    assert state["peak"] == 1 and metrics.stats.measured == 8
@@ -0,0 +1,83 @@
+"""
+Test the interval timeline used for animation grouping.
+"""
+
+import random
+import sys
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from data_processing.timeline import AnimationTimeline, IntervalTree
+from data_processing.scene_structure import AnimationStep, AnimationType
+
+
+def step(anim_id, delay, duration, targets=("obj",)):
+    return AnimationStep(id=anim_id, type=AnimationType.FADE_IN, target_objects=list(targets),
+                         delay=delay, duration=duration)
+
+
+def test_overlapping_animations_share_a_group():
+    timeline = AnimationTimeline([
+        step("a", 0.0, 2.0, ["x"]),
+        step("b", 1.0, 2.0, ["y"]),   # overlaps a
+        step("c", 3.0, 1.0, ["z"]),   # starts exactly when b ends
+        step("d", 2.9999, 0.5, ["w"])  # near-equal to 3.0: follows b, starts with c
+    ])
+    groups = timeline.groups()
+    assert [[anim.id for anim in group.animations] for group in groups] == [["a", "b"], ["d", "c"]]
+    assert groups[0].entries[1][0] == 1.0
+    assert groups[0].end == 3.0
+    assert [offset for offset, _ in groups[1].entries] == [0.0, 0.0]
+
+
+def test_near_equal_start_times_are_grouped():
+    timeline = AnimationTimeline([step("a", 2.0, 0.0), step("b", 1.9999, 0.0), step("c", 2.5, 0.0)])
+    groups = timeline.groups()
+    assert [[anim.id for anim in group.animations] for group in groups] == [["b", "a"], ["c"]]
+    assert [offset for offset, _ in groups[0].entries] == [0.0, 0.0]
+
+
+def test_conflicts_on_the_same_target():
+    timeline = AnimationTimeline([
+        step("move", 0.0, 2.0, ["circle"]),
+        step("fade", 1.5, 1.0, ["circle", "label"]),
+        step("write", 1.0, 1.0, ["label"]),
+        step("after", 2.5, 1.0, ["circle"])
+    ])
+    conflicts = [(c.target, c.first.id, c.second.id) for c in timeline.conflicts()]
+    assert conflicts == [("circle", "move", "fade"), ("label", "write", "fade")]
+    assert timeline.conflicts()[0].overlap == 0.5
+
+
+def test_compaction_removes_idle_time():
+    animations = [step("a", 1.0, 1.0), step("b", 5.0, 1.0), step("c", 5.5, 1.0), step("d", 10.0, 1.0)]
+    timeline = AnimationTimeline(animations)
+    assert timeline.idle_gaps() == [(0.0, 1.0), (2.0, 5.0), (6.5, 10.0)]
+    
+    compacted = timeline.compact(max_gap=0.5)
+    assert [anim.delay for anim in compacted.animations] == [0.5, 2.0, 2.5, 4.0]
+    assert compacted.end == 5.0
+    assert animations[1].delay == 5.0
+
+
+def test_interval_tree_matches_brute_force():
+    rng = random.Random(1)
+    intervals = []
+    for index in range(300):
+        start = rng.uniform(0, 50)
+        intervals.append((start, start + rng.choice([0.0, rng.uniform(0, 5)]), index))
+    tree = IntervalTree(intervals)
+    for _ in range(200):
+        lo = rng.uniform(-1, 51)
+        hi = lo + rng.uniform(0, 3)
+        expected = {index for start, end, index in intervals if start <= hi and end >= lo}
+        assert set(tree.query(lo, hi)) == expected
+
+
+def test_active_at():
+    timeline = AnimationTimeline([step("a", 0.0, 2.0), step("b", 1.0, 2.0)])
+    assert [anim.id for anim in timeline.active_at(1.5)] == ["a", "b"]
+    assert [anim.id for anim in timeline.active_at(2.0)] == ["b"]
+    assert [anim.id for anim in timeline.overlapping(2.5, 4.0)] == ["b"]